@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 import uuid
@@ -9,6 +10,7 @@ from pathlib import Path
 from dataclasses import dataclass, field
 
 from fastapi import FastAPI, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
@@ -20,6 +22,13 @@ app = FastAPI(title="Scraper Backend")
 
 BACKEND_SECRET = os.environ.get("BACKEND_SECRET", "")
 
+# `/product-search` dans le process (service résident) plutôt qu'un
+# subprocess CLI par requête. PRODUCT_SEARCH_IN_PROCESS=0 → ancien chemin.
+PRODUCT_SEARCH_IN_PROCESS = os.environ.get("PRODUCT_SEARCH_IN_PROCESS", "1") not in ("0", "false", "False")
+# Recherches in-process simultanées : au-delà, 503 plutôt que d'empiler des
+# threads dans le threadpool partagé avec les autres routes.
+PRODUCT_SEARCH_MAX_CONCURRENT = max(1, int(os.environ.get("PRODUCT_SEARCH_MAX_CONCURRENT", "4")))
+
 # ---------------------------------------------------------------------------
 # Auth middleware
 # ---------------------------------------------------------------------------
@@ -105,6 +114,16 @@ def _stream_output(proc: subprocess.Popen, job: JobState):
             job.has_error = True
 
 
+def _stream_cron_output(proc: subprocess.Popen, job: JobState):
+    """`_stream_output` du cron, puis invalidation des inventaires de recherche."""
+    _stream_output(proc, job)
+    if PRODUCT_SEARCH_IN_PROCESS:
+        # Le cron vient de réécrire scraped_site_data : le service de
+        # recherche revérifie ses inventaires à la prochaine requête.
+        from scraper_ai.scraper_search.service import mark_search_inventories_stale
+        mark_search_inventories_stale()
+
+
 def _cleanup_old_jobs():
     """Remove jobs older than 6 hours."""
     cutoff = time.time() - 6 * 3600
@@ -167,7 +186,7 @@ class ScraperUsineRunRequest(BaseModel):
 
 
 class ScraperUsineBatchRequest(BaseModel):
-    """Génère plusieurs scrapers en série depuis une liste d'URLs.
+    """Génère plusieurs scrapers (en série, ou `parallel` à la fois) depuis une liste d'URLs.
 
     Une URL = un scraper. Le job tourne en arrière-plan, l'admin sonde les
     logs via le même endpoint que pour un run unique (/scraper/logs).
@@ -176,6 +195,8 @@ class ScraperUsineBatchRequest(BaseModel):
     dryRun: bool = False
     forcePlaywright: bool = False
     publishThreshold: int = 95
+    # >1 : sites traités en parallèle dans le même process (`--parallel`)
+    parallel: int = 1
 
 
 class ProductSearchAdapters(BaseModel):
@@ -339,7 +360,7 @@ async def cron_scrape():
         )
         job.pid = proc.pid
 
-        thread = threading.Thread(target=_stream_output, args=(proc, job), daemon=True)
+        thread = threading.Thread(target=_stream_cron_output, args=(proc, job), daemon=True)
         thread.start()
 
         return {
@@ -691,6 +712,9 @@ async def scraper_usine_batch(body: ScraperUsineBatchRequest):
         args.append("--dry-run")
     if body.forcePlaywright:
         args.append("--force-playwright")
+    parallel = max(1, min(body.parallel, 4))
+    if parallel > 1:
+        args += ["--parallel", str(parallel)]
 
     env = {
         **os.environ,
@@ -730,8 +754,9 @@ async def scraper_usine_batch(body: ScraperUsineBatchRequest):
         "skipped_examples": skipped[:5],
         "batch_file": str(batch_file.relative_to(PROJECT_ROOT)),
         "message": (
-            f"scraper_usine batch lancé : {len(valid_urls)} URL(s) à traiter en série "
-            f"(estimation : {len(valid_urls) * 8} min max)"
+            f"scraper_usine batch lancé : {len(valid_urls)} URL(s) à traiter "
+            + (f"{parallel} à la fois " if parallel > 1 else "en série ")
+            + f"(estimation : {-(-len(valid_urls) // parallel) * 8} min max)"
         ),
     }
 
@@ -815,10 +840,6 @@ async def product_search(body: ProductSearchRequest):
     process_timeout = total_timeout + 5
 
     args = [
-        sys.executable,
-        "-u",
-        "-m",
-        "scraper_ai.scraper_search.main",
         query,
         "--json",
         "--quiet",
@@ -871,6 +892,78 @@ async def product_search(body: ProductSearchRequest):
         # Recherche interactive : lire les inventaires en cache sans scraper live.
         args.append("--dedicated-cache-only")
 
+    if PRODUCT_SEARCH_IN_PROCESS:
+        return await _product_search_in_process(args, process_timeout)
+    return _product_search_subprocess(args, process_timeout)
+
+
+_PRODUCT_SEARCH_TIMEOUT_CONTENT = {
+    "error": "product_search_timeout",
+    "message": (
+        "La recherche a pris trop de temps. "
+        "Essaie avec moins de sources actives ou une requête plus précise."
+    ),
+}
+
+
+_PRODUCT_SEARCH_BUSY_CONTENT = {
+    "error": "product_search_busy",
+    "message": "Trop de recherches en cours. Réessaie dans quelques secondes.",
+}
+
+# Marge au-delà de l'échéance passée au service (sérialisation du résultat)
+_PRODUCT_SEARCH_GRACE_S = 5.0
+
+# Créneau pris avant de lancer le thread, rendu quand le thread se termine
+# (pas quand la requête abandonne l'attente)
+_product_search_slots = threading.BoundedSemaphore(PRODUCT_SEARCH_MAX_CONCURRENT)
+
+
+def _release_product_search_slot(task: "asyncio.Future") -> None:
+    _product_search_slots.release()
+    if not task.cancelled():
+        task.exception()  # consommée : pas d'avertissement asyncio si personne n'attend plus
+
+
+async def _product_search_in_process(args: list[str], timeout: float):
+    """Recherche via le service résident (modules et inventaires en mémoire).
+
+    Le service reçoit une échéance et rend la main entre ses phases une fois
+    dépassée ; au plus PRODUCT_SEARCH_MAX_CONCURRENT recherches occupent un
+    thread à la fois, les suivantes reçoivent un 503.
+    """
+    from scraper_ai.scraper_search.service import SearchTimeout, get_search_service
+
+    if not _product_search_slots.acquire(blocking=False):
+        return JSONResponse(status_code=503, content=_PRODUCT_SEARCH_BUSY_CONTENT,
+                            headers={"Retry-After": "2"})
+    service = get_search_service()
+    task = asyncio.ensure_future(
+        run_in_threadpool(service.search, args, deadline=time.monotonic() + timeout))
+    task.add_done_callback(_release_product_search_slot)
+    try:
+        # shield : à l'expiration, le thread garde son créneau jusqu'à sa fin
+        result = await asyncio.wait_for(asyncio.shield(task), timeout=timeout + _PRODUCT_SEARCH_GRACE_S)
+    except (asyncio.TimeoutError, SearchTimeout):
+        return JSONResponse(status_code=504, content=_PRODUCT_SEARCH_TIMEOUT_CONTENT)
+    except ValueError as e:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "product_search_invalid", "message": str(e)},
+        )
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "error": "product_search_failed",
+                "message": f"{type(e).__name__}: {e}"[-1000:],
+            },
+        )
+    return JSONResponse(content=result)
+
+
+def _product_search_subprocess(args: list[str], process_timeout: float):
+    """Ancien chemin : un process CLI par requête."""
     env = {
         **os.environ,
         "PYTHONUNBUFFERED": "1",
@@ -886,7 +979,7 @@ async def product_search(body: ProductSearchRequest):
 
     try:
         proc = subprocess.run(
-            args,
+            [sys.executable, "-u", "-m", "scraper_ai.scraper_search.main", *args],
             cwd=str(PROJECT_ROOT),
             capture_output=True,
             text=True,
@@ -894,16 +987,7 @@ async def product_search(body: ProductSearchRequest):
             env=env,
         )
     except subprocess.TimeoutExpired:
-        return JSONResponse(
-            status_code=504,
-            content={
-                "error": "product_search_timeout",
-                "message": (
-                    "La recherche a pris trop de temps. "
-                    "Essaie avec moins de sources actives ou une requête plus précise."
-                ),
-            },
-        )
+        return JSONResponse(status_code=504, content=_PRODUCT_SEARCH_TIMEOUT_CONTENT)
 
     if proc.returncode != 0:
         message = (proc.stderr or proc.stdout or "Recherche produit échouée").strip()
@@ -930,6 +1014,16 @@ async def product_search(body: ProductSearchRequest):
         )
 
 
+@app.get("/product-search/stats", dependencies=[Depends(verify_secret)])
+async def product_search_stats():
+    """Latences p50/p95 et invalidations du service de recherche résident."""
+    if not PRODUCT_SEARCH_IN_PROCESS:
+        return {"in_process": False}
+    from scraper_ai.scraper_search.service import get_search_service
+
+    return {"in_process": True, **get_search_service().stats()}
+
+
 @app.get("/product-search/categories", dependencies=[Depends(verify_secret)])
 async def product_search_categories():
     """Renvoie la taxonomie de catégories sous forme d'arbre JSON.
@@ -968,6 +1062,23 @@ async def product_search_categories():
     return {"tree": tree}
 
 
+@app.on_event("startup")
+async def warm_product_search():
+    """Charge registre et inventaires en cache avant la 1re recherche."""
+    if not PRODUCT_SEARCH_IN_PROCESS:
+        return
+
+    def warm():
+        try:
+            from scraper_ai.scraper_search.service import get_search_service
+            loaded = get_search_service().warm()
+            print(f"🔎 Service de recherche prêt ({loaded} inventaire(s) en mémoire)")
+        except Exception as e:
+            print(f"⚠️  Préchargement du service de recherche impossible : {e}")
+
+    threading.Thread(target=warm, name="product-search-warmup", daemon=True).start()
+
+
 @app.get("/health")
 async def health():
     active_jobs = sum(1 for j in jobs.values() if not j.is_complete)
@@ -42,6 +42,12 @@ export interface AdapterRunStats {
    */
   products_scanned?: number
   cache_hit: boolean
+  /** Lectures de l'inventaire servies par la mémoire du process de recherche. */
+  cache_memory_hits?: number
+  /** Lectures chargées depuis le disque ou Supabase. */
+  cache_misses?: number
+  /** Lectures ayant attendu le chargement lancé par un autre adapter. */
+  cache_coalesced?: number
   error: string
 }
 
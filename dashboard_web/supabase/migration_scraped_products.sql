@@ -0,0 +1,284 @@
+-- ============================================================================
+-- Migration: Stockage normalisé des produits pré-scrapés (une ligne par unité)
+-- Date: 2026-10-16
+-- À appliquer via le SQL Editor Supabase (DDL manuel).
+--
+-- scraped_site_data.products contient tout l'inventaire d'un site dans un seul
+-- tableau JSON : chaque upsert du cron réécrit plusieurs Mo par site et chaque
+-- lecture rapatrie tout le tableau. scraped_products stocke une ligne par
+-- produit, clé (site_domain, unit_key) :
+--   - le cron (scripts/_product_store.py) n'envoie que le diff : lignes
+--     nouvelles/modifiées (content_hash différent) et unit_keys disparues ;
+--   - colonnes de filtre indexées (marque_norm, annee, etat, source_categorie)
+--     pour des lectures filtrées côté serveur. compare_from_cache lit encore
+--     le tableau complet : une comparaison a besoin de tout l'inventaire
+--     (les produits concurrents non appariés sont aussi enregistrés).
+--
+-- Pendant la migration, scraped_site_data.products reste la source des
+-- lecteurs existants (dashboard, detectChanges, trigger product_price_history).
+-- Il devient DÉRIVÉ : apply_scraped_products() le reconstruit depuis les
+-- lignes dans la même transaction, donc le trigger d'historique de prix voit
+-- exactement les mêmes OLD/NEW qu'avant.
+--
+-- unit_key : scraper_ai/grouping.py::compute_unit_key. Deux produits d'un même
+-- site avec la même clé (rare : même inventaire republié) sont distingués par
+-- un suffixe « #<empreinte> » tiré de sourceUrl/inventaire/vin (jamais du rang
+-- dans le scrape), voir _product_store._unique_key.
+--
+-- pos : rang du produit dans le dernier scrape. Le tableau dérivé est
+-- reconstruit dans cet ordre (celui qu'avaient les lecteurs du tableau).
+-- ============================================================================
+
+create table if not exists scraped_products (
+  site_domain text not null,
+  unit_key text not null,
+  content_hash text not null,
+  product jsonb not null,
+
+  -- Colonnes de filtre (extraites du produit à l'écriture)
+  marque_norm text,
+  annee int,
+  etat text,
+  source_categorie text,
+
+  -- Rang dans le dernier scrape (ordre du tableau dérivé)
+  pos int,
+
+  scraped_at timestamptz not null default now(),
+  updated_at timestamptz not null default now(),
+  primary key (site_domain, unit_key)
+);
+
+alter table scraped_products add column if not exists pos int;
+
+create index if not exists idx_scraped_products_marque
+  on scraped_products (site_domain, marque_norm);
+create index if not exists idx_scraped_products_annee
+  on scraped_products (site_domain, annee);
+create index if not exists idx_scraped_products_categorie
+  on scraped_products (site_domain, source_categorie);
+
+alter table scraped_products enable row level security;
+
+create policy "Authenticated users can read scraped products"
+  on scraped_products for select
+  using (auth.uid() is not null);
+
+-- Lignes en attente d'un scrape en flux (ProductStream) : rien n'atteint
+-- scraped_products avant la validation du scrape (complétude) ; un scrape
+-- rejeté laisse ses lignes ici, effacées à la promotion suivante du site.
+-- RLS sans policy : accessible au seul service_role.
+create table if not exists scraped_products_staging (
+  site_domain text not null,
+  run_id text not null,
+  unit_key text not null,
+  content_hash text not null,
+  product jsonb not null,
+  pos int,
+  primary key (site_domain, run_id, unit_key)
+);
+
+alter table scraped_products_staging enable row level security;
+
+comment on table scraped_products is 'Une ligne par produit pré-scrapé (clé site_domain + unit_key). Écrit par diff depuis scripts/_product_store.py.';
+comment on column scraped_products.content_hash is 'Empreinte du produit complet — une ligne n''est réécrite que si elle change';
+
+-- ----------------------------------------------------------------------------
+-- Vue : l'ancien tableau products, reconstruit depuis les lignes.
+-- security_invoker (Postgres >= 15) : la RLS de scraped_products s'applique à
+-- l'utilisateur qui lit la vue, pas à son propriétaire.
+-- ----------------------------------------------------------------------------
+create or replace view scraped_products_blob
+with (security_invoker = true) as
+select
+  site_domain,
+  coalesce(jsonb_agg(product order by pos nulls last, unit_key), '[]'::jsonb) as products,
+  count(*)::int as product_count
+from scraped_products
+group by site_domain;
+
+-- ----------------------------------------------------------------------------
+-- Application d'un diff (appelé en RPC par le cron).
+--   p_upserts : [{unit_key, content_hash, product, pos}]
+--   p_deletes : unit_keys disparues du scrape
+--   p_order   : unit_keys dans l'ordre du scrape si cet ordre a changé (les
+--               positions des lignes inchangées sont réécrites), sinon null
+--   p_rebuild_blob : reconstruire scraped_site_data.products (true tant que
+--                    des lecteurs lisent encore le tableau)
+--   p_stage_run : run dont les lignes en attente (stage_scraped_products) sont
+--                 promues avec ce diff ; la zone d'attente du site est vidée
+-- Retourne le nombre de lignes du site après application.
+-- ----------------------------------------------------------------------------
+-- Signatures précédentes : une surcharge rendrait l'appel RPC ambigu
+drop function if exists apply_scraped_products(text, jsonb, text[], timestamptz, boolean);
+drop function if exists apply_scraped_products(text, jsonb, text[], text[], timestamptz, boolean);
+
+create or replace function apply_scraped_products(
+  p_site_domain text,
+  p_upserts jsonb,
+  p_deletes text[],
+  p_order text[] default null,
+  p_scraped_at timestamptz default now(),
+  p_rebuild_blob boolean default true,
+  p_stage_run text default null
+)
+returns int
+language plpgsql
+as $$
+declare
+  v_count int;
+begin
+  if p_stage_run is not null then
+    select coalesce(jsonb_agg(jsonb_build_object(
+             'unit_key', unit_key, 'content_hash', content_hash,
+             'product', product, 'pos', pos)), '[]'::jsonb)
+           || coalesce(p_upserts, '[]'::jsonb)
+    into p_upserts
+    from scraped_products_staging
+    where site_domain = p_site_domain
+      and run_id = p_stage_run;
+
+    delete from scraped_products_staging
+    where site_domain = p_site_domain;
+  end if;
+
+  if coalesce(array_length(p_deletes, 1), 0) > 0 then
+    delete from scraped_products
+    where site_domain = p_site_domain
+      and unit_key = any(p_deletes);
+  end if;
+
+  insert into scraped_products
+    (site_domain, unit_key, content_hash, product,
+     marque_norm, annee, etat, source_categorie, pos, scraped_at, updated_at)
+  select
+    p_site_domain,
+    u->>'unit_key',
+    u->>'content_hash',
+    u->'product',
+    nullif(lower(trim(coalesce(u->'product'->>'marque', ''))), ''),
+    case when u->'product'->>'annee' ~ '^[0-9]{4}$'
+         then (u->'product'->>'annee')::int end,
+    nullif(lower(trim(coalesce(u->'product'->>'etat', ''))), ''),
+    nullif(u->'product'->>'sourceCategorie', ''),
+    (u->>'pos')::int,
+    p_scraped_at,
+    now()
+  from jsonb_array_elements(coalesce(p_upserts, '[]'::jsonb)) as u
+  on conflict (site_domain, unit_key) do update set
+    content_hash = excluded.content_hash,
+    product = excluded.product,
+    marque_norm = excluded.marque_norm,
+    annee = excluded.annee,
+    etat = excluded.etat,
+    source_categorie = excluded.source_categorie,
+    pos = excluded.pos,
+    scraped_at = excluded.scraped_at,
+    updated_at = now();
+
+  if p_order is not null then
+    update scraped_products p
+    set pos = o.ord - 1
+    from unnest(p_order) with ordinality as o(unit_key, ord)
+    where p.site_domain = p_site_domain
+      and p.unit_key = o.unit_key
+      and p.pos is distinct from o.ord - 1;
+  end if;
+
+  select count(*) into v_count
+  from scraped_products
+  where site_domain = p_site_domain;
+
+  if p_rebuild_blob then
+    -- Déclenche trg_product_price_history avec le tableau reconstruit
+    update scraped_site_data d
+    set products = b.products,
+        product_count = b.product_count
+    from scraped_products_blob b
+    where d.site_domain = p_site_domain
+      and b.site_domain = p_site_domain
+      and d.products is distinct from b.products;
+  end if;
+
+  return v_count;
+end;
+$$;
+
+-- ----------------------------------------------------------------------------
+-- Mise en attente d'un paquet de lignes d'un scrape en flux.
+--   p_upserts : [{unit_key, content_hash, product, pos}]
+-- ----------------------------------------------------------------------------
+create or replace function stage_scraped_products(
+  p_site_domain text,
+  p_run_id text,
+  p_upserts jsonb
+)
+returns void
+language sql
+as $$
+  insert into scraped_products_staging
+    (site_domain, run_id, unit_key, content_hash, product, pos)
+  select p_site_domain, p_run_id, u->>'unit_key', u->>'content_hash', u->'product', (u->>'pos')::int
+  from jsonb_array_elements(coalesce(p_upserts, '[]'::jsonb)) as u
+  on conflict (site_domain, run_id, unit_key) do update set
+    content_hash = excluded.content_hash,
+    product = excluded.product,
+    pos = excluded.pos;
+$$;
+
+-- RPC d'écriture : réservées au cron (service_role)
+revoke execute on function apply_scraped_products(text, jsonb, text[], text[], timestamptz, boolean, text)
+  from public, anon, authenticated;
+revoke execute on function stage_scraped_products(text, text, jsonb)
+  from public, anon, authenticated;
+
+-- ----------------------------------------------------------------------------
+-- Reprise de l'existant : une ligne par produit des tableaux actuels.
+-- content_hash vide : le premier passage du cron réécrit chaque ligne une
+-- fois avec l'empreinte calculée côté Python, puis seuls les diffs passent.
+-- Les doublons de clé ne gardent que la première occurrence ici ; le cron
+-- les recrée avec leur suffixe au premier passage.
+-- ----------------------------------------------------------------------------
+insert into scraped_products
+  (site_domain, unit_key, content_hash, product,
+   marque_norm, annee, etat, source_categorie, pos, scraped_at)
+select distinct on (s.site_domain, u.unit_key)
+  s.site_domain,
+  u.unit_key,
+  '',
+  p,
+  nullif(lower(trim(coalesce(p->>'marque', ''))), ''),
+  case when p->>'annee' ~ '^[0-9]{4}$' then (p->>'annee')::int end,
+  nullif(lower(trim(coalesce(p->>'etat', ''))), ''),
+  nullif(p->>'sourceCategorie', ''),
+  (e.pos - 1)::int,
+  coalesce(s.scraped_at, now())
+from scraped_site_data s
+cross join lateral jsonb_array_elements(coalesce(s.products, '[]'::jsonb)) with ordinality as e(p, pos)
+cross join lateral (
+  -- Même cascade que compute_unit_key (et fn_pph_expand_units, mono-unité)
+  select coalesce(
+    case when length(trim(upper(coalesce(p->>'vin', '')))) >= 10
+         then trim(upper(p->>'vin')) end,
+    nullif(trim(coalesce(p->>'inventaire', '')), ''),
+    lower((regexp_match(rtrim(coalesce(p->>'sourceUrl', ''), '/'),
+                        '-([a-zA-Z]{0,8}[0-9]{1,10})$'))[1]),
+    nullif(rtrim(coalesce(p->>'sourceUrl', ''), '/'), ''),
+    substr(md5(lower(trim(coalesce(p->>'name', ''))) || '|' ||
+               lower(trim(coalesce(p->>'couleur', '')))), 1, 12)
+  ) as unit_key
+) u
+where s.status = 'success'
+  and s.site_domain <> '__cron_lock__'
+order by s.site_domain, u.unit_key, e.pos
+on conflict (site_domain, unit_key) do nothing;
+
+-- ----------------------------------------------------------------------------
+-- Contrôles post-application
+-- ----------------------------------------------------------------------------
+-- 1. Même nombre de produits (aux doublons de clé près) :
+--    select d.site_domain, d.product_count, b.product_count
+--    from scraped_site_data d join scraped_products_blob b using (site_domain)
+--    where d.product_count <> b.product_count;
+-- 2. Lecture filtrée côté serveur (PostgREST) :
+--    GET /rest/v1/scraped_products?site_domain=eq.X&marque_norm=in.(kawasaki)&select=product
@@ -0,0 +1,12 @@
+-- Migration: Clés de matching précalculées dans scraped_site_data
+-- Date: 2026-10-16
+-- Description: Le cron calcule, à chaque scraping réussi, les clés
+--              normalisées (marque, modèle, année, modèle de base) de chaque
+--              produit, avec et sans couleurs. compare_from_cache les lit et
+--              ne fait plus que des jointures par hash. Un index d'une autre
+--              version du normaliseur est ignoré (recalcul à la volée).
+
+ALTER TABLE scraped_site_data
+ADD COLUMN IF NOT EXISTS match_keys JSONB;
+
+COMMENT ON COLUMN scraped_site_data.match_keys IS 'Index {version, keys: {ignore_colors|keep_colors: {empreinte produit: [marque, modele, annee, modele_base]}}} — voir scraper_ai/comparison.py build_match_key_index';
@@ -0,0 +1,15 @@
+-- Migration: Résumé matériel des produits dans scraped_site_data
+-- Date: 2026-10-16
+-- Description: Le cron stocke, à chaque écriture de products, une empreinte
+--              par unité (unit_key) des seuls champs matériels : prix,
+--              disponibilité, identité (voir PRICE_FIELDS dans
+--              scripts/_product_store.py). Au passage suivant, si le nouveau
+--              scrape a le même résumé, le cron n'écrit que scraped_at /
+--              status / metadata : products n'est pas renvoyé, le trigger
+--              product_price_history ne se déclenche pas (aucun prix n'a
+--              changé) et detectChanges lit le même tableau.
+
+ALTER TABLE scraped_site_data
+ADD COLUMN IF NOT EXISTS product_digest JSONB;
+
+COMMENT ON COLUMN scraped_site_data.product_digest IS 'Résumé {version, units: {unit_key: empreinte des champs matériels}} du dernier tableau products écrit — voir scripts/_product_store.py product_digest';
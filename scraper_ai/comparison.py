@@ -2,8 +2,12 @@
 Fonctions de comparaison de produits — module léger sans dépendances lourdes.
 Extrait de scraper_ai/main.py pour éviter d'importer Gemini/Playwright/etc.
 """
+import hashlib
+import json
 import re
-from typing import List, Dict, Tuple
+import unicodedata
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 
 
 # Liste des couleurs communes à ignorer pour le matching
@@ -37,11 +41,18 @@ COLOR_KEYWORDS = [
 ]
 
 
+_ACCENT_MARK_CATEGORIES = ('Mn', 'Mc', 'Me')
+
+_LETTER_DIGIT_RE = re.compile(r'([a-z])(\d)')
+_DIGIT_LETTER_RE = re.compile(r'(\d)([a-z])')
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+_SPACES_RE = re.compile(r'\s+')
+
+
 def _strip_accents(text: str) -> str:
     """Retire les accents d'une chaîne (é→e, è→e, etc.)"""
-    import unicodedata
     nfkd = unicodedata.normalize('NFKD', text)
-    return ''.join(c for c in nfkd if not unicodedata.category(c).startswith('M'))
+    return ''.join(c for c in nfkd if unicodedata.category(c) not in _ACCENT_MARK_CATEGORIES)
 
 
 def _deep_normalize(text: str) -> str:
@@ -50,22 +61,20 @@ def _deep_normalize(text: str) -> str:
     Fusionne les lettres simples consécutives en un seul token (r l → rl, s x f → sxf)
     pour que "KLX110R L" et "KLX110RL" produisent le même résultat.
     """
-    import re
     if not text:
         return ''
     text = text.lower().strip()
     text = _strip_accents(text)
     # Insérer un espace entre lettres et chiffres collés: "ninja500" → "ninja 500"
-    text = re.sub(r'([a-z])(\d)', r'\1 \2', text)
-    text = re.sub(r'(\d)([a-z])', r'\1 \2', text)
+    text = _LETTER_DIGIT_RE.sub(r'\1 \2', text)
+    text = _DIGIT_LETTER_RE.sub(r'\1 \2', text)
     # Retirer tout sauf lettres, chiffres, espaces
-    text = re.sub(r'[^a-z0-9\s]', ' ', text)
-    # Unifier les espaces multiples
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = _NON_ALNUM_RE.sub(' ', text)
 
     # Fusionner les lettres simples consécutives: "r l" → "rl", "s x f" → "sxf"
     # Cela uniformise "KLX110R L" (→ klx 110 r l → klx 110 rl)
     # et "KLX110RL" (→ klx 110 rl) vers le même résultat.
+    # split() sans argument unifie aussi les espaces multiples.
     words = text.split()
     merged: list = []
     i = 0
@@ -90,6 +99,10 @@ def _deep_normalize(text: str) -> str:
     return text
 
 
+# Mots-couleur normalisés une seule fois (au chargement du module)
+_NORMALIZED_COLORS = frozenset(_deep_normalize(c) for c in COLOR_KEYWORDS if c)
+
+
 def remove_colors_from_string(text: str) -> str:
     """Retire les mots de couleur d'une chaîne de caractères.
     Compare des mots entiers (pas de substring) pour éviter les faux positifs.
@@ -97,18 +110,8 @@ def remove_colors_from_string(text: str) -> str:
     if not text:
         return ''
 
-    normalized = _deep_normalize(text)
-    words = normalized.split()
-    filtered_words = []
-
-    # Normaliser les mots-couleur une seule fois
-    normalized_colors = set(_deep_normalize(c) for c in COLOR_KEYWORDS if c)
-
-    for word in words:
-        if word not in normalized_colors:
-            filtered_words.append(word)
-
-    return ' '.join(filtered_words)
+    words = _deep_normalize(text).split()
+    return ' '.join(word for word in words if word not in _NORMALIZED_COLORS)
 
 
 # Liste des marques connues pour identification (triée par longueur décroissante)
@@ -236,72 +239,149 @@ def enrich_product_year(product: dict) -> None:
         product['annee'] = year
 
 
+# ── Moteur de normalisation des clés produit ──
+# Tout est compilé une seule fois au chargement du module : normalize_product_key
+# est appelé pour chaque produit de référence et concurrent de chaque
+# comparaison (et de nouveau pour chaque utilisateur de compare_from_cache
+# quand un site n'a pas d'index de clés à jour).
+
+_MARQUE_PREFIX_RE = re.compile(r'^(manufacturier|fabricant|marque|brand)\s*:\s*', re.I)
+_MODELE_PREFIX_RE = re.compile(r'^(modèle|modele|model)\s*:\s*', re.I)
+_YEAR_RE = re.compile(r'\b(19|20)\d{2}\b')
+
+# Détection de marque en une seule passe : l'alternance suit l'ordre de
+# priorité de _NORMALIZED_BRANDS (longueur décroissante) et le lookahead
+# donne, à chaque position du nom, la marque la plus prioritaire qui y
+# commence. La marque retenue est la plus prioritaire toutes positions
+# confondues, à sa première occurrence — exactement le résultat de l'ancien
+# balayage linéaire `find()` marque par marque.
+_BRAND_RANK = {norm: rank for rank, (norm, _) in enumerate(_NORMALIZED_BRANDS)}
+_BRAND_SCAN_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(norm) for norm, _ in _NORMALIZED_BRANDS) + '))'
+)
+
+# ── Nettoyage du modèle : retirer UNIQUEMENT localisation, concessionnaire, état ──
+# Tout le reste (couleurs, trims, variantes) est conservé pour un matching strict.
+_DEALER_NOISE_PATTERNS = [re.compile(p, re.I) for p in (
+    r'\b(?:en\s+vente|disponible|neuf|usage|usag[ée]|occasion)\s+(?:a|à|chez|au)\b.*$',
+    r"\bd['\u2019]?occasion\s+(?:a|à|chez|au)\b.*$",
+    r'\b(?:a|à)\s+vendre\s+(?:a|à|chez|au)\b.*$',
+    r'\b(?:concessionnaire|dealer|showroom|magasin|succursale)\b.*$',
+    r'\b\w+\s+(?:motosport|motorsport|powersports?)\s*$',
+    r'\b(?:moto|motos|auto|autos)\s+\w+\s*$',
+    r'\b\w+\s+(?:moto|motos|sport[s]?|auto[s]?|motors?|marine|performance|center|centre)\s*$',
+)]
+
+_CATEGORY_PREFIX_PATTERNS = [re.compile(p, re.I) for p in (
+    r'^(?:c[oô]te\s+[aà]\s+c[oô]te|cote\s+a\s+cote|side\s*by\s*side|sxs)\s+',
+    r'^(?:vtt|atv|quad|motoneige|snowmobile|moto|scooter)\s+',
+    r'^(?:motomarine|watercraft|jet\s*ski|personal\s+watercraft|pwc)\s+',
+    r'^(?:ponton|pontoon|bateau|boat|embarcation)\s+',
+    r'^(?:moteur\s+hors[\s-]?bord|outboard|hors[\s-]?bord)\s+',
+    r'^(?:sportive|routiere|routière|touring|adventure|aventure|cruiser|custom|standard|naked|enduro|supermoto|trail|dual[\s-]?sport|double[\s-]?usage|sport[\s-]?touring|grand[\s-]?touring|retro)\s+',
+    r'^(?:3[\s-]?roues|three[\s-]?wheel|trike)\s+',
+    r'^(?:velo[\s-]?electrique|e[\s-]?bike|ebike)\s+',
+)]
+
+_ETAT_STANDALONE_RE = re.compile(
+    r'\b(?:neuf|new|usage|usagee?|occasion|used|demo|demonstrateur|preowned|pre[\s-]?owned|certifie|certified)\b',
+    re.I)
+_PRE_COMMANDE_RE = re.compile(r'\bpre\s*commande\b', re.I)
+_PRE_ORDER_RE = re.compile(r'\bpre\s*order\b', re.I)
+_ANNIVERSARY_RE = re.compile(r'(\d+)\s+(?:th|st|nd|rd|e|eme)\s+(?:annivers\w*|anniv)\b')
+
+# Nombre de clés mémorisées ; couvre largement l'inventaire de tous les
+# sites d'un run de comparaison.
+NORMALIZE_CACHE_SIZE = 65536
+
+
+def _detect_brand(name_norm: str) -> Tuple[str, int]:
+    """Retourne (marque normalisée, position) de la marque connue prioritaire, ou ('', -1)."""
+    best = ''
+    best_rank = len(_NORMALIZED_BRANDS)
+    best_idx = -1
+    for match in _BRAND_SCAN_RE.finditer(name_norm):
+        brand = match.group(1)
+        rank = _BRAND_RANK[brand]
+        if rank < best_rank:
+            best, best_rank, best_idx = brand, rank, match.start()
+            if rank == 0:
+                break
+    return best, best_idx
+
+
 def normalize_product_key(product: dict, ignore_colors: bool = True) -> Tuple[str, str, int]:
     """Crée une clé normalisée pour identifier les produits (marque + modèle + année).
 
     Exclut du matching : localisation, concessionnaire, préfixes catégorie, couleurs.
     L'état (neuf/occasion) n'est PAS dans la clé — un usagé peut matcher un neuf du même modèle.
+
+    Mémoïsé sur le contenu des champs utilisés (marque, modèle, année, nom,
+    URL) : un même produit n'est normalisé qu'une fois par process.
     """
-    import re
+    fields = (
+        str(product.get('marque', '')),
+        str(product.get('modele', '')),
+        product.get('annee', 0),
+        product.get('name', ''),
+        product.get('sourceUrl', ''),
+        ignore_colors,
+    )
+    try:
+        return _cached_product_key(*fields)
+    except TypeError:
+        # Champ non hashable (liste, dict…) : calcul direct, sans cache
+        return _compute_product_key(*fields)
 
-    raw_marque = str(product.get('marque', '')).strip()
-    raw_modele = str(product.get('modele', '')).strip()
-    annee = product.get('annee', 0) or 0
+
+def _compute_product_key(raw_marque: str, raw_modele: str, annee, name, source_url,
+                         ignore_colors: bool) -> Tuple[str, str, int]:
+    raw_marque = raw_marque.strip()
+    raw_modele = raw_modele.strip()
+    annee = annee or 0
 
     # ── Toujours tenter d'extraire l'année si absente ──
     if not annee:
-        annee = extract_year_from_text(product.get('name', ''))
+        annee = extract_year_from_text(name)
     if not annee:
-        annee = extract_year_from_url(product.get('sourceUrl', ''))
+        annee = extract_year_from_url(source_url)
 
     # Nettoyer les préfixes courants
-    raw_marque = re.sub(
-        r'^(manufacturier|fabricant|marque|brand)\s*:\s*', '', raw_marque, flags=re.I)
-    raw_modele = re.sub(r'^(modèle|modele|model)\s*:\s*',
-                        '', raw_modele, flags=re.I)
+    raw_marque = _MARQUE_PREFIX_RE.sub('', raw_marque)
+    raw_modele = _MODELE_PREFIX_RE.sub('', raw_modele)
 
     marque = _deep_normalize(raw_marque)
     modele = _deep_normalize(raw_modele)
 
     # ── Extraction depuis 'name' si marque ou modèle manquant ──
     if not marque or not modele:
-        name = str(product.get('name', '')).strip()
+        name = str(name).strip()
         if name:
             name_norm = _deep_normalize(name)
 
-            detected_brand = ''
+            detected_brand, idx = _detect_brand(name_norm)
             rest_of_name = name_norm
-
-            for norm_brand, original_brand in _NORMALIZED_BRANDS:
-                if name_norm.startswith(norm_brand + ' ') or name_norm == norm_brand:
-                    detected_brand = norm_brand
-                    rest_of_name = name_norm[len(norm_brand):].strip()
-                    break
-                # Chercher la marque n'importe où dans le nom
-                idx = name_norm.find(norm_brand)
-                if idx >= 0:
-                    detected_brand = norm_brand
-                    rest_of_name = (
-                        name_norm[:idx] + ' ' + name_norm[idx + len(norm_brand):]).strip()
-                    rest_of_name = re.sub(r'\s+', ' ', rest_of_name)
-                    break
+            if detected_brand:
+                rest_of_name = (
+                    name_norm[:idx] + ' ' + name_norm[idx + len(detected_brand):]).strip()
+                rest_of_name = _SPACES_RE.sub(' ', rest_of_name)
 
             if detected_brand:
                 if not marque:
                     marque = detected_brand
                 if not modele:
                     # Retirer l'année du reste pour avoir le modèle pur
-                    year_match = re.search(r'\b(19|20)\d{2}\b', rest_of_name)
+                    year_match = _YEAR_RE.search(rest_of_name)
                     if year_match:
                         if not annee:
                             annee = int(year_match.group(0))
                         rest_of_name = rest_of_name[:year_match.start(
                         )] + rest_of_name[year_match.end():]
-                    modele = re.sub(r'\s+', ' ', rest_of_name).strip()
+                    modele = _SPACES_RE.sub(' ', rest_of_name).strip()
             elif not modele:
                 # Aucune marque connue détectée dans le nom — utiliser le nom nettoyé comme modèle
                 # Cas fréquent : marque déjà définie (JSON-LD), nom = juste le modèle (ex: "Z900")
-                year_match = re.search(r'\b(19|20)\d{2}\b', name_norm)
+                year_match = _YEAR_RE.search(name_norm)
                 if year_match:
                     if not annee:
                         annee = int(year_match.group(0))
@@ -316,60 +396,38 @@ def normalize_product_key(product: dict, ignore_colors: bool = True) -> Tuple[st
                     elif cleaned_name.endswith(' ' + marque_norm):
                         cleaned_name = cleaned_name[:-
                                                     len(marque_norm):].strip()
-                modele = re.sub(r'\s+', ' ', cleaned_name).strip()
+                modele = _SPACES_RE.sub(' ', cleaned_name).strip()
 
     # Unifier les alias de marques
     marque = _BRAND_ALIASES.get(marque, marque)
 
-    # ── Nettoyage du modèle : retirer UNIQUEMENT localisation, concessionnaire, état ──
-    # Tout le reste (couleurs, trims, variantes) est conservé pour un matching strict.
-
-    _DEALER_NOISE_PATTERNS = [
-        r'\b(?:en\s+vente|disponible|neuf|usage|usag[ée]|occasion)\s+(?:a|à|chez|au)\b.*$',
-        r"\bd['\u2019]?occasion\s+(?:a|à|chez|au)\b.*$",
-        r'\b(?:a|à)\s+vendre\s+(?:a|à|chez|au)\b.*$',
-        r'\b(?:concessionnaire|dealer|showroom|magasin|succursale)\b.*$',
-        r'\b\w+\s+(?:motosport|motorsport|powersports?)\s*$',
-        r'\b(?:moto|motos|auto|autos)\s+\w+\s*$',
-        r'\b\w+\s+(?:moto|motos|sport[s]?|auto[s]?|motors?|marine|performance|center|centre)\s*$',
-    ]
     for pattern in _DEALER_NOISE_PATTERNS:
-        modele = re.sub(pattern, '', modele, flags=re.I).strip()
-
-    _CATEGORY_PREFIX_PATTERNS = [
-        r'^(?:c[oô]te\s+[aà]\s+c[oô]te|cote\s+a\s+cote|side\s*by\s*side|sxs)\s+',
-        r'^(?:vtt|atv|quad|motoneige|snowmobile|moto|scooter)\s+',
-        r'^(?:motomarine|watercraft|jet\s*ski|personal\s+watercraft|pwc)\s+',
-        r'^(?:ponton|pontoon|bateau|boat|embarcation)\s+',
-        r'^(?:moteur\s+hors[\s-]?bord|outboard|hors[\s-]?bord)\s+',
-        r'^(?:sportive|routiere|routière|touring|adventure|aventure|cruiser|custom|standard|naked|enduro|supermoto|trail|dual[\s-]?sport|double[\s-]?usage|sport[\s-]?touring|grand[\s-]?touring|retro)\s+',
-        r'^(?:3[\s-]?roues|three[\s-]?wheel|trike)\s+',
-        r'^(?:velo[\s-]?electrique|e[\s-]?bike|ebike)\s+',
-    ]
+        modele = pattern.sub('', modele).strip()
+
     for pattern in _CATEGORY_PREFIX_PATTERNS:
-        modele = re.sub(pattern, '', modele, flags=re.I).strip()
+        modele = pattern.sub('', modele).strip()
 
-    _ETAT_STANDALONE = r'\b(?:neuf|new|usage|usagee?|occasion|used|demo|demonstrateur|preowned|pre[\s-]?owned|certifie|certified)\b'
-    modele = re.sub(_ETAT_STANDALONE, '', modele, flags=re.I).strip()
+    modele = _ETAT_STANDALONE_RE.sub('', modele).strip()
 
-    modele = re.sub(r'\bpre\s*commande\b', '', modele, flags=re.I).strip()
-    modele = re.sub(r'\bpre\s*order\b', '', modele, flags=re.I).strip()
+    modele = _PRE_COMMANDE_RE.sub('', modele).strip()
+    modele = _PRE_ORDER_RE.sub('', modele).strip()
 
     if ignore_colors:
         modele = remove_colors_from_string(modele)
 
-    modele = re.sub(
-        r'(\d+)\s+(?:th|st|nd|rd|e|eme)\s+(?:annivers\w*|anniv)\b',
-        r'\1 anniversaire',
-        modele,
-    )
+    modele = _ANNIVERSARY_RE.sub(r'\1 anniversaire', modele)
 
-    marque = re.sub(r'\s+', ' ', marque).strip()
-    modele = re.sub(r'\s+', ' ', modele).strip()
+    marque = _SPACES_RE.sub(' ', marque).strip()
+    modele = _SPACES_RE.sub(' ', modele).strip()
 
     return (marque, modele, annee)
 
 
+# typed=True : 2024, 2024.0 et "2024" restent des entrées distinctes (l'année
+# est renvoyée telle quelle dans la clé).
+_cached_product_key = lru_cache(maxsize=NORMALIZE_CACHE_SIZE, typed=True)(_compute_product_key)
+
+
 MATCH_MODES = ('exact', 'base', 'no_year', 'flexible')
 
 _TRIM_SUFFIXES = re.compile(
@@ -392,6 +450,71 @@ def _strip_model_suffixes(modele: str) -> str:
     return re.sub(r'\s+', ' ', base).strip()
 
 
+# ── Index de clés précalculées (colonne scraped_site_data.match_keys) ──
+# Les clés ne changent qu'au re-scrape d'un site : le cron les calcule une
+# fois à la sauvegarde et chaque comparaison (compare_from_cache, par
+# utilisateur ou en batch) se contente de jointures par hash.
+# À incrémenter à toute modification de normalize_product_key ou de
+# _strip_model_suffixes : un index d'une autre version est ignoré et les
+# clés sont recalculées à la volée.
+NORMALIZER_VERSION = 1
+
+_KEY_TABLES = {True: 'ignore_colors', False: 'keep_colors'}
+
+
+def match_key_fingerprint(product: dict) -> str:
+    """Empreinte des champs lus par normalize_product_key.
+
+    Un produit dont un de ces champs a changé depuis le calcul de l'index
+    (nom nettoyé autrement, année enrichie…) ne retrouve pas son entrée et
+    repasse par le calcul à la volée.
+    """
+    payload = json.dumps([
+        str(product.get('marque', '')),
+        str(product.get('modele', '')),
+        product.get('annee', 0),
+        product.get('name', ''),
+        product.get('sourceUrl', ''),
+    ], ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def build_match_key_index(products: List[dict]) -> dict:
+    """Précalcule les clés de matching de chaque produit, avec et sans couleurs.
+
+    Les clés sont calculées sur la forme que compare_from_cache compare
+    (année enrichie, nom nettoyé) sans modifier les produits. Chaque entrée
+    [marque, modele, annee, modele_base] couvre les quatre MATCH_MODES.
+
+    Format : {'version': N, 'keys': {'ignore_colors'|'keep_colors': {empreinte: entrée}}}
+    """
+    index = {'version': NORMALIZER_VERSION, 'keys': {name: {} for name in _KEY_TABLES.values()}}
+    for product in products:
+        add_match_keys(index, product)
+    return index
+
+
+def add_match_keys(index: dict, product: dict) -> None:
+    """Ajoute les clés d'un produit à un index de `build_match_key_index`
+    (construction au fil d'un scrape en flux)."""
+    prepared = dict(product)
+    enrich_product_year(prepared)
+    clean_product_name(prepared)
+    fingerprint = match_key_fingerprint(prepared)
+    tables = index['keys']
+    for ignore_colors, name in _KEY_TABLES.items():
+        marque, modele, annee = normalize_product_key(prepared, ignore_colors=ignore_colors)
+        tables[name][fingerprint] = [marque, modele, annee, _strip_model_suffixes(modele)]
+
+
+def _stored_key_table(match_keys, ignore_colors: bool) -> Dict[str, list]:
+    """Table empreinte → clés d'un index stocké, ou {} si absent/d'une autre version."""
+    if not isinstance(match_keys, dict) or match_keys.get('version') != NORMALIZER_VERSION:
+        return {}
+    table = (match_keys.get('keys') or {}).get(_KEY_TABLES[bool(ignore_colors)])
+    return table if isinstance(table, dict) else {}
+
+
 def _pick_best_ref(ref_matches: List[dict], current_price: float) -> dict:
     """Sélectionne le meilleur produit de référence parmi les candidats (prix le plus proche)."""
     best = None
@@ -408,10 +531,17 @@ def _pick_best_ref(ref_matches: List[dict], current_price: float) -> dict:
     return best or ref_matches[0]
 
 
+def _silent(*args, **kwargs) -> None:
+    pass
+
+
 def find_matching_products(reference_products: List[dict], comparison_products: List[dict],
                            reference_url: str, comparison_url: str,
                            ignore_colors: bool = True,
-                           match_mode: str = 'exact') -> List[dict]:
+                           match_mode: str = 'exact',
+                           reference_match_keys: Optional[dict] = None,
+                           comparison_match_keys: Optional[dict] = None,
+                           verbose: bool = True) -> List[dict]:
     """
     Trouve les produits du concurrent qui existent aussi dans le site de référence.
 
@@ -420,10 +550,19 @@ def find_matching_products(reference_products: List[dict], comparison_products:
       base     — marque + modèle de base (sans suffixes ABS/SE/EPS/Limited…) + année + état
       no_year  — marque + modèle complet + état (ignore l'année)
       flexible — marque + modèle de base + état (ignore suffixes ET année)
+
+    reference_match_keys / comparison_match_keys : index stockés par le cron
+    (voir build_match_key_index). Les produits présents dans l'index ne sont
+    pas re-normalisés ; les autres (ou un index d'une autre version) le sont.
+
+    verbose=False coupe le journal détaillé (mode batch de compare_from_cache,
+    où plusieurs comparaisons tournent en parallèle).
     """
     if match_mode not in MATCH_MODES:
         match_mode = 'exact'
 
+    log = print if verbose else _silent
+
     mode_labels = {
         'exact': 'marque + modèle + année + état',
         'base': 'marque + modèle de base + année + état',
@@ -431,24 +570,36 @@ def find_matching_products(reference_products: List[dict], comparison_products:
         'flexible': 'marque + modèle de base + état (toutes années)',
     }
 
-    print(f"\n{'='*60}")
-    print(f"🔍 COMPARAISON AVEC LE SITE DE RÉFÉRENCE")
-    print(f"{'='*60}")
-    print(f"📊 Référence: {reference_url} ({len(reference_products)} produits)")
-    print(
+    log(f"\n{'='*60}")
+    log(f"🔍 COMPARAISON AVEC LE SITE DE RÉFÉRENCE")
+    log(f"{'='*60}")
+    log(f"📊 Référence: {reference_url} ({len(reference_products)} produits)")
+    log(
         f"📊 Concurrent: {comparison_url} ({len(comparison_products)} produits)")
-    print(f"🔒 Mode: {match_mode} — {mode_labels[match_mode]}")
+    log(f"🔒 Mode: {match_mode} — {mode_labels[match_mode]}")
 
     for rp in reference_products:
         enrich_product_year(rp)
     for cp in comparison_products:
         enrich_product_year(cp)
 
-    def _build_key(product, mode):
-        marque, modele, annee = normalize_product_key(
-            product, ignore_colors=ignore_colors)
-        if mode in ('base', 'flexible'):
-            modele = _strip_model_suffixes(modele)
+    ref_table = _stored_key_table(reference_match_keys, ignore_colors)
+    comp_table = _stored_key_table(comparison_match_keys, ignore_colors)
+    stored_hits = 0
+
+    def _build_key(product, mode, table=None):
+        nonlocal stored_hits
+        stored = table.get(match_key_fingerprint(product)) if table else None
+        if stored:
+            stored_hits += 1
+            marque, modele, annee, base_modele = stored
+            if mode in ('base', 'flexible'):
+                modele = base_modele
+        else:
+            marque, modele, annee = normalize_product_key(
+                product, ignore_colors=ignore_colors)
+            if mode in ('base', 'flexible'):
+                modele = _strip_model_suffixes(modele)
         if mode in ('no_year', 'flexible'):
             annee = 0
         return (marque, modele, annee)
@@ -458,13 +609,13 @@ def find_matching_products(reference_products: List[dict], comparison_products:
     skipped_ref = 0
 
     for rp in reference_products:
-        key = _build_key(rp, match_mode)
+        key = _build_key(rp, match_mode, ref_table)
         if not key[1]:
             skipped_ref += 1
             continue
         ref_index.setdefault(key, []).append(rp)
 
-    print(
+    log(
         f"   📋 Clés de référence: {len(ref_index)} (ignorées: {skipped_ref})")
 
     matched_products = []
@@ -472,7 +623,7 @@ def find_matching_products(reference_products: List[dict], comparison_products:
     match_levels: Dict[str, int] = {}
 
     for product in comparison_products:
-        key = _build_key(product, match_mode)
+        key = _build_key(product, match_mode, comp_table)
         marque, modele, annee = key
 
         if not modele:
@@ -519,24 +670,27 @@ def find_matching_products(reference_products: List[dict], comparison_products:
 
         if product['differencePrix'] is not None:
             diff_str = f"+{product['differencePrix']:.0f}$" if product['differencePrix'] >= 0 else f"{product['differencePrix']:.0f}$"
-            print(f"   ✅ [{match_mode}] {marque} {modele} {annee or '*'}: "
+            log(f"   ✅ [{match_mode}] {marque} {modele} {annee or '*'}: "
                   f"{current_price:.0f}$ vs {ref_price:.0f}$ ({diff_str})")
 
     match_rate = (len(matched_products) / len(comparison_products)
                   * 100) if comparison_products else 0
 
     levels_str = ', '.join(f"{k}={v}" for k, v in match_levels.items())
-    print(f"\n   📊 Matching: {levels_str or 'aucun'}")
+    log(f"\n   📊 Matching: {levels_str or 'aucun'}")
+    if ref_table or comp_table:
+        total = len(reference_products) + len(comparison_products)
+        log(f"   🔑 Clés précalculées réutilisées: {stored_hits}/{total}")
 
     if not matched_products and comparison_products:
-        print(f"   ⚠️ Aucune correspondance! Échantillon des clés concurrent:")
+        log(f"   ⚠️ Aucune correspondance! Échantillon des clés concurrent:")
         for p in comparison_products[:5]:
             k = _build_key(p, match_mode)
-            print(f"      Conc: marque='{k[0]}' modele='{k[1]}' annee={k[2]} "
+            log(f"      Conc: marque='{k[0]}' modele='{k[1]}' annee={k[2]} "
                   f"| name='{p.get('name', '')[:50]}'")
 
-    print(
+    log(
         f"\n📈 Correspondances: {len(matched_products)}/{len(comparison_products)} ({match_rate:.0f}%)")
-    print(f"{'='*60}\n")
+    log(f"{'='*60}\n")
 
     return matched_products
@@ -0,0 +1,370 @@
+"""
+Moteur asynchrone (opt-in) pour l'extraction des pages détail des scrapers dédiés.
+
+Le chemin historique (`DedicatedScraper._extract_all`) recrée un
+ThreadPoolExecutor de 12 workers par batch et sérialise les rounds de retry
+avec des `time.sleep`. Ici, une seule boucle asyncio pilote tout le site :
+  - un seul `httpx.AsyncClient` (pool de connexions partagé, HTTP/2 si le
+    paquet `h2` est installé et que le serveur le négocie) ;
+  - chaque requête prend un créneau du `HostRateController` de l'hôte
+    (`scraper._rate_controller`), comme `RateControlledSession` : cadence
+    AIMD, Retry-After et pauses partagés avec le chemin threads et le
+    navigateur. Un sémaphore par hôte (`ASYNC_PER_HOST`, par défaut
+    MAX_WORKERS) borne en plus les threads en attente d'un créneau ;
+  - retry par URL sans bloquer les autres URLs : un 429 est signalé au
+    contrôleur (`penalize`), qui retient tout l'hôte ; backoff local
+    seulement pour les 5xx et erreurs réseau ;
+  - parsing BeautifulSoup + `extract_from_detail_page` déporté dans un pool
+    de process (`ASYNC_PARSE_WORKERS`), les sous-classes gardent leur
+    signature synchrone. Chaque process instancie sa propre copie du
+    scraper ; si le pool casse, repli sur un parsing en thread.
+
+Le cache de validateurs (_http_cache.py) et le store incrémental
+(_incremental.py) sont honorés comme dans le chemin threads ; le HTML est
+décodé exactement comme `requests.Response.text`, pour que les sélecteurs
+voient les mêmes chaînes.
+
+Activation : `ASYNC_FETCH = True` sur la classe, ou SCRAPER_ASYNC_FETCH=1
+pour tout le process (SCRAPER_ASYNC_FETCH=0 force le chemin threads).
+Sans httpx, le chemin threads est toujours utilisé.
+Bench : scripts/bench_detail_fetch.py.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from requests.compat import chardet
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - dépendance de scraper_ai/requirements.txt
+    httpx = None
+
+from ._http_cache import ConditionalCacheAdapter
+from ._rate_control import parse_retry_after
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Mêmes paramètres que le Retry de la session requests (base.py)
+STATUS_RETRIES = 4
+BACKOFF_FACTOR = 1.0
+MAX_RETRY_AFTER = 60.0
+
+# Headers propres à HTTP/1.1, refusés par h2
+_HOP_BY_HOP = ('connection', 'keep-alive', 'upgrade', 'transfer-encoding')
+
+
+def async_fetch_enabled(class_flag: bool) -> bool:
+    """SCRAPER_ASYNC_FETCH (0/1) l'emporte sur l'attribut de classe."""
+    if httpx is None:
+        return False
+    env = os.environ.get("SCRAPER_ASYNC_FETCH")
+    if env is not None:
+        return env not in ("0", "false", "False", "")
+    return class_flag
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def decode_like_requests(content: bytes, headers) -> str:
+    """Même décodage que `requests.Response.text` (charset, ISO-8859-1, détection)."""
+    encoding = get_encoding_from_headers(headers)
+    if encoding is None and chardet is not None:
+        encoding = chardet.detect(content)['encoding']
+    try:
+        return str(content, encoding or 'utf-8', errors='replace')
+    except (LookupError, TypeError):
+        return str(content, errors='replace')
+
+
+# ── Process de parsing ──
+
+_worker_scraper = None
+
+
+def _init_parse_worker(module: str, qualname: str) -> None:
+    global _worker_scraper
+    target: Any = importlib.import_module(module)
+    for part in qualname.split('.'):
+        target = getattr(target, part)
+    _worker_scraper = target()
+
+
+def _parse_in_worker(url: str, html: str) -> Optional[Dict]:
+    try:
+        return _worker_scraper._parse_detail(url, html)
+    except Exception:
+        return None
+
+
+class AsyncDetailEngine:
+    """Fetch + extraction de toutes les pages détail d'un scraper dédié."""
+
+    def __init__(self, scraper, per_host: Optional[int] = None,
+                 max_connections: Optional[int] = None,
+                 parse_workers: Optional[int] = None):
+        self.scraper = scraper
+        self.per_host = max(1, per_host or scraper.ASYNC_PER_HOST or scraper.MAX_WORKERS)
+        self.max_connections = max(self.per_host, max_connections or scraper.ASYNC_MAX_CONNECTIONS)
+        if parse_workers is None:
+            parse_workers = scraper.ASYNC_PARSE_WORKERS
+        if parse_workers is None:
+            parse_workers = min(4, max(1, (os.cpu_count() or 2) - 1))
+        self.parse_workers = parse_workers
+        self.http2 = http2_available()
+        self.timeout = scraper.HTTP_TIMEOUT
+        self.attempts = 1 + max(STATUS_RETRIES, scraper.MAX_RETRIES_PER_URL)
+
+        adapter = getattr(scraper, '_http_adapter', None)
+        self._validators = adapter if isinstance(adapter, ConditionalCacheAdapter) else None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stats = {
+            'fetched': 0, 'not_modified': 0, 'reused': 0, 'failed': 0,
+            'retries': 0, 'timeouts': 0, 'http2_responses': 0,
+        }
+
+    # ── API ──
+
+    def run(self, urls: List[str]) -> List[Dict]:
+        """Produits extraits (ordre de complétion, non dédupliqués)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._run(urls))
+        # Déjà dans une boucle (backend FastAPI…) : boucle dédiée dans un thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._run(urls)).result()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'per_host': self.per_host,
+            'http2': self.http2,
+            'parse_workers': self.parse_workers if self._pool is not None else 0,
+        }
+
+    # ── Boucle ──
+
+    async def _run(self, urls: List[str]) -> List[Dict]:
+        total = len(urls)
+        products: List[Dict] = []
+        start = time.time()
+        self._start_parse_pool()
+        try:
+            async with self._client() as client:
+                tasks = [asyncio.ensure_future(self._one(client, url)) for url in urls]
+                for processed, task in enumerate(asyncio.as_completed(tasks), 1):
+                    product = await task
+                    if product:
+                        products.append(product)
+                    if processed % 50 == 0 or processed == total:
+                        elapsed = time.time() - start
+                        rate = processed / elapsed if elapsed > 0 else 0
+                        print(f"   📊 [{processed}/{total}] {len(products)} produits — {rate:.1f} URLs/s")
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+        return products
+
+    def _client(self):
+        session = self.scraper.session
+        headers = {k: v for k, v in session.headers.items() if k.lower() not in _HOP_BY_HOP}
+        return httpx.AsyncClient(
+            http2=self.http2,
+            headers=headers,
+            cookies={c.name: c.value for c in session.cookies},
+            follow_redirects=True,
+            timeout=httpx.Timeout(self.timeout, connect=min(10, self.timeout)),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    def _start_parse_pool(self) -> None:
+        if self.parse_workers <= 0:
+            return
+        cls = type(self.scraper)
+        try:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                # spawn : pas de fork d'un process qui porte déjà des threads
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_parse_worker,
+                initargs=(cls.__module__, cls.__qualname__),
+            )
+        except Exception as e:
+            print(f"   ⚠️  Pool de parsing indisponible ({e}) — parsing en thread")
+            self._pool = None
+
+    async def _one(self, client, url: str) -> Optional[Dict]:
+        store = self.scraper._incremental
+        if store is not None:
+            cached = store.lookup(url)
+            if cached is not None:
+                self._stats['reused'] += 1
+                return cached
+        try:
+            html = await self._fetch(client, url)
+        except Exception:
+            self._stats['failed'] += 1
+            return None
+        product = await self._parse(url, html) if html is not None else None
+        if store is not None:
+            store.record(url, product)
+        return product
+
+    # ── Fetch ──
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return limit
+
+    async def _fetch(self, client, url: str) -> Optional[str]:
+        """HTML de la page (None si non-200 ou redirigée ailleurs). Lève après
+        épuisement des essais sur erreur réseau."""
+        domain = urlparse(url).netloc.replace('www.', '')
+        entry = None
+        extra_headers = {}
+        if self._validators is not None:
+            entry = await asyncio.to_thread(self._validators.cache.get, url)
+            if entry is not None:
+                etag, last_modified, _, _ = entry
+                if etag:
+                    extra_headers['If-None-Match'] = etag
+                if last_modified:
+                    extra_headers['If-Modified-Since'] = last_modified
+                self._validators._count(domain, 'hit')
+            else:
+                self._validators._count(domain, 'miss')
+
+        limit = self._host_limit(urlparse(url).netloc)
+        controller = self.scraper._rate_controller(url)
+        response = None
+        for attempt in range(self.attempts):
+            try:
+                async with limit:
+                    response, retry_after = await self._send(client, controller, url, extra_headers)
+            except httpx.TimeoutException:
+                self._stats['timeouts'] += 1
+                if attempt >= self.scraper.MAX_RETRIES_PER_URL:
+                    raise
+                self._stats['retries'] += 1
+                await asyncio.sleep(BACKOFF_FACTOR * 1.5 * (attempt + 1))
+                continue
+            except httpx.TransportError:
+                if attempt >= self.scraper.MAX_RETRIES_PER_URL:
+                    raise
+                self._stats['retries'] += 1
+                await asyncio.sleep(BACKOFF_FACTOR * 1.5 * (attempt + 1))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < STATUS_RETRIES:
+                self._stats['retries'] += 1
+                if response.status_code == 429:
+                    # Pause de tout l'hôte : le prochain acquire l'attend
+                    controller.penalize(retry_after or self._retry_delay(response, attempt))
+                else:
+                    await asyncio.sleep(self._retry_delay(response, attempt))
+                continue
+            break
+
+        if response is None:
+            return None
+        if response.http_version == 'HTTP/2':
+            self._stats['http2_responses'] += 1
+
+        if response.status_code == 304 and entry is not None:
+            _, _, headers, body = entry
+            await asyncio.to_thread(self._validators.cache.touch, url)
+            self._validators._count(domain, 'not_modified')
+            self._validators._count(domain, 'bytes_saved', len(body))
+            self._stats['not_modified'] += 1
+            return decode_like_requests(body, headers)
+
+        if response.status_code != 200:
+            return None
+        self._stats['fetched'] += 1
+        if self._validators is not None:
+            # Mêmes règles que le chemin requests (httpx expose headers/content)
+            await asyncio.to_thread(self._validators._store, url, response)
+        if response.history and self.scraper._redirected_elsewhere(url, str(response.url)):
+            return None
+        return decode_like_requests(response.content, response.headers)
+
+    async def _send(self, client, controller, url: str, headers: Dict[str, str]):
+        """Une requête dans un créneau du contrôleur de l'hôte ; retourne la
+        réponse et son Retry-After (429/503)."""
+        started = await self._acquire(controller)
+        try:
+            response = await client.get(url, headers=headers)
+        except httpx.TransportError:
+            controller.release(started, error=True)
+            raise
+        except BaseException:
+            controller.release(started)
+            raise
+        retry_after = None
+        if response.status_code in (429, 503):
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        controller.release(started, status=response.status_code, retry_after=retry_after)
+        return response, retry_after
+
+    @staticmethod
+    async def _acquire(controller) -> float:
+        """`controller.acquire` (bloquant) dans un thread. Si la tâche est
+        annulée pendant l'attente, le créneau obtenu ensuite est rendu."""
+        future = asyncio.ensure_future(asyncio.to_thread(controller.acquire))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(
+                lambda f: f.cancelled() or f.exception() is not None
+                or controller.release(f.result()))
+            raise
+
+    @staticmethod
+    def _retry_delay(response, attempt: int) -> float:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        return BACKOFF_FACTOR * (2 ** attempt)
+
+    # ── Parsing ──
+
+    async def _parse(self, url: str, html: str) -> Optional[Dict]:
+        pool = self._pool
+        if pool is not None:
+            try:
+                return await asyncio.wrap_future(pool.submit(_parse_in_worker, url, html))
+            except BrokenProcessPool:
+                self._disable_pool()
+            except Exception:
+                pass
+        try:
+            return await asyncio.to_thread(self.scraper._parse_detail, url, html)
+        except Exception:
+            return None
+
+    def _disable_pool(self) -> None:
+        if self._pool is None:
+            return
+        print("   ⚠️  Pool de parsing interrompu — parsing en thread pour la suite")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
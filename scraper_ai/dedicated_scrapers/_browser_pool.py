@@ -0,0 +1,418 @@
+"""
+Pool de Chromium chauds partagé dans le process (BrowserAgent, BrowserRuntime).
+
+Chaque `with BrowserAgent(...)` (adapters SERP Walmart/Costco/Best Buy/
+Amazon…, SiteAnalyzer, api_interceptor) et chaque `BrowserRuntime().start()`
+des scrapers générés démarrait Playwright puis lançait Chromium : 1-3 s de
+cold start par appel. Le pool garde N navigateurs lancés et prête à chaque
+appelant un BrowserContext isolé (cookies, stockage, proxy propres),
+configuré par l'appelant (stealth) avant d'être remis. Un navigateur sert
+jusqu'à `contexts_per_browser` contextes à la fois : un appelant qui garde
+son bail longtemps (adapter SERP sur toutes ses URLs, SiteAnalyzer) ne
+bloque pas les autres. Pool plein : l'appelant attend au plus
+LEASE_TIMEOUT_S puis lance son propre Chromium.
+
+Contrainte Playwright : l'API sync est liée au thread qui l'a démarrée.
+Chaque slot du pool possède donc son thread ; le bail (`BrowserLease`)
+exécute les opérations dans ce thread via `lease.call(fn, ...)`, ce qui
+rend aussi le bail utilisable depuis n'importe quel thread appelant.
+
+Recyclage : un navigateur est relancé après `max_pages` rendus, ou quand la
+mémoire des process Chromium dépasse `max_rss_mb` par navigateur lancé
+(psutil, si installé). La mesure est globale (tous les process enfants) :
+en cas de dépassement, seul le navigateur qui a rendu le plus de pages
+depuis son lancement est recyclé, pas tous les slots à la fois.
+
+Stats (`browser_pool_stats()` / `log_browser_pool_stats()`) : cold starts et
+leur durée, rendus et latence par rendu, attente de bail, recyclages.
+
+SCRAPER_BROWSER_POOL=0 désactive le pool (un Chromium par appelant, comme
+avant) ; SCRAPER_BROWSER_POOL_SIZE règle N (défaut 2) et
+SCRAPER_BROWSER_CONTEXTS le nombre de contextes par navigateur (défaut 4).
+Sans dépendance à
+scraper_usine : importable par un scraper généré en production.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_CONTEXTS_PER_BROWSER = 4
+DEFAULT_MAX_PAGES = 200
+DEFAULT_MAX_RSS_MB = 2048
+# Au-delà, l'appelant lance son propre Chromium plutôt que d'attendre : un
+# bail peut durer tout un adapter SERP, attendre plus longtemps mangerait
+# le timeout de l'appelant (60 s par adapter dans FederatedSearch).
+LEASE_TIMEOUT_S = 1.5
+
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+
+def pool_enabled() -> bool:
+    return os.environ.get("SCRAPER_BROWSER_POOL", "1") not in ("0", "false", "False")
+
+
+def _chromium_rss_mb() -> Optional[float]:
+    """RSS cumulée des process enfants (driver Playwright + Chromium)."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    total = 0
+    try:
+        for child in psutil.Process().children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+    except psutil.Error:
+        return None
+    return total / 1_048_576
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, float] = {
+            "cold_starts": 0, "cold_start_ms": 0.0,
+            "leases": 0, "lease_wait_ms": 0.0, "lease_timeouts": 0,
+            "renders": 0, "render_ms": 0.0,
+            "recycles": 0,
+        }
+
+    def add(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._data[key] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            data = dict(self._data)
+        data["avg_cold_start_ms"] = round(data["cold_start_ms"] / data["cold_starts"]) if data["cold_starts"] else 0
+        data["avg_render_ms"] = round(data["render_ms"] / data["renders"]) if data["renders"] else 0
+        data["avg_lease_wait_ms"] = round(data["lease_wait_ms"] / data["leases"]) if data["leases"] else 0
+        return data
+
+
+class _BrowserSlot:
+    """Un Chromium et le thread qui le possède.
+
+    `active` (contextes prêtés) et `retiring` (recyclage en attente de la
+    fermeture du dernier contexte) sont protégés par `pool._cond`.
+    """
+
+    def __init__(self, pool: "BrowserPool", index: int) -> None:
+        self.pool = pool
+        self.pages = 0
+        self.active = 0
+        self.retiring = False
+        self._pw = None
+        self._browser = None
+        self._jobs: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._loop, name=f"browser-pool-{index}", daemon=True)
+        self._thread.start()
+
+    # ── Exécution dans le thread propriétaire ──
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Any:
+        if threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+        future: Future = Future()
+        self._jobs.put((fn, args, kwargs, future))
+        return future.result()
+
+    def _loop(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            fn, args, kwargs, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        self._shutdown_browser()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._jobs.put(None)
+        self._thread.join(timeout)
+
+    # ── Opérations (thread propriétaire) ──
+
+    def _ensure_browser(self) -> None:
+        if self._browser is not None:
+            try:
+                if self._browser.is_connected():
+                    return
+            except Exception:
+                pass
+            self._shutdown_browser()
+        from playwright.sync_api import sync_playwright
+
+        t0 = time.time()
+        if self._pw is None:
+            self._pw = sync_playwright().start()
+        self._browser = self._pw.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        self.pages = 0
+        self.pool.stats.add("cold_starts")
+        self.pool.stats.add("cold_start_ms", (time.time() - t0) * 1000)
+        self.pool._log(f"[BrowserPool] Chromium lancé ({time.time() - t0:.1f}s)")
+
+    def open_context(self, options: Dict[str, Any], setup: Optional[Callable[[Any], None]]):
+        self._ensure_browser()
+        context = self._browser.new_context(**options)
+        if setup is not None:
+            try:
+                setup(context)
+            except Exception:
+                context.close()
+                raise
+        return context
+
+    def close_context(self, context, pages: int) -> bool:
+        """Ferme le contexte ; True si le navigateur a atteint son budget
+        (pages ou mémoire) et doit être recyclé."""
+        try:
+            context.close()
+        except Exception:
+            pass
+        self.pages += pages
+        reason = ""
+        if self.pages >= self.pool.max_pages:
+            reason = f"{self.pages} pages"
+        else:
+            rss = _chromium_rss_mb()
+            live = self.pool._live_slots()
+            budget = self.pool.max_rss_mb * max(1, len(live))
+            if (rss is not None and rss > budget
+                    and self.pages >= max(slot.pages for slot in live or [self])):
+                reason = f"{rss:.0f} Mo pour {len(live)} navigateur(s)"
+        if reason and not self.retiring:
+            self.pool._log(f"[BrowserPool] recyclage du navigateur ({reason})")
+        return bool(reason)
+
+    def recycle(self) -> None:
+        self.pool.stats.add("recycles")
+        self._close_browser()
+
+    def _close_browser(self) -> None:
+        try:
+            if self._browser is not None:
+                self._browser.close()
+        except Exception:
+            pass
+        self._browser = None
+
+    def _shutdown_browser(self) -> None:
+        self._close_browser()
+        try:
+            if self._pw is not None:
+                self._pw.stop()
+        except Exception:
+            pass
+        self._pw = None
+
+
+class BrowserLease:
+    """Contexte isolé prêté par le pool. Toute opération Playwright passe par
+    `call(fn, *args)` → `fn(context, *args)` dans le thread du navigateur."""
+
+    def __init__(self, pool: "BrowserPool", slot: _BrowserSlot, context) -> None:
+        self._pool = pool
+        self._slot = slot
+        self._context = context
+        self._pages = 0
+        self._released = False
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        if self._released:
+            raise RuntimeError("BrowserLease déjà rendu")
+        return self._slot.submit(fn, self._context, *args, **kwargs)
+
+    def record_render(self, elapsed_ms: float) -> None:
+        self._pages += 1
+        self._pool.stats.add("renders")
+        self._pool.stats.add("render_ms", elapsed_ms)
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        exhausted = False
+        try:
+            exhausted = self._slot.submit(self._slot.close_context, self._context, self._pages)
+        finally:
+            self._pool._release(self._slot, exhausted)
+
+    def __enter__(self) -> "BrowserLease":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class BrowserPool:
+    """N navigateurs Chromium chauds, lancés à la première demande, chacun
+    partagé par au plus `contexts_per_browser` contextes simultanés."""
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        *,
+        contexts_per_browser: int = DEFAULT_CONTEXTS_PER_BROWSER,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        max_rss_mb: float = DEFAULT_MAX_RSS_MB,
+        log_fn: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._log = log_fn or (lambda _msg: None)
+        self.stats = _Stats()
+        self._cond = threading.Condition()
+        self._slots = [_BrowserSlot(self, i) for i in range(max(1, size))]
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return len(self._slots)
+
+    @property
+    def capacity(self) -> int:
+        """Nombre de contextes prêtables simultanément."""
+        return self.size * self.contexts_per_browser
+
+    def reserve(self, contexts: int) -> None:
+        """Ajoute des navigateurs jusqu'à pouvoir prêter `contexts` contextes
+        simultanés (batch de l'usine). Ne réduit jamais le pool : des baux
+        peuvent être en cours."""
+        wanted = -(-contexts // self.contexts_per_browser)
+        with self._cond:
+            if self._closed or wanted <= self.size:
+                return
+            self._slots.extend(_BrowserSlot(self, i) for i in range(self.size, wanted))
+            self._cond.notify_all()
+        self._log(f"[BrowserPool] {self.size} navigateur(s) pour {contexts} contexte(s)")
+
+    def _live_slots(self) -> list:
+        """Slots dont le navigateur est lancé (lecture sans verrou : sert
+        seulement à répartir le budget mémoire)."""
+        return [s for s in list(self._slots) if s._browser is not None]
+
+    def _pick_slot(self) -> Optional[_BrowserSlot]:
+        """Navigateur déjà lancé d'abord, puis le moins chargé (sous _cond)."""
+        candidates = [s for s in self._slots
+                      if not s.retiring and s.active < self.contexts_per_browser]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda s: (s._browser is None, s.active))
+
+    def _release(self, slot: _BrowserSlot, exhausted: bool) -> None:
+        with self._cond:
+            slot.active -= 1
+            if exhausted:
+                slot.retiring = True
+            recycle = slot.retiring and slot.active == 0
+        if recycle:
+            # Plus aucun contexte ouvert et le slot n'est plus choisi : on
+            # peut fermer le navigateur sans couper un autre appelant.
+            try:
+                slot.submit(slot.recycle)
+            finally:
+                with self._cond:
+                    slot.retiring = False
+        with self._cond:
+            self._cond.notify_all()
+
+    def lease(
+        self,
+        *,
+        context_options: Optional[Dict[str, Any]] = None,
+        setup: Optional[Callable[[Any], None]] = None,
+        timeout: float = LEASE_TIMEOUT_S,
+    ) -> Optional[BrowserLease]:
+        """Contexte neuf sur un navigateur chaud ; None si aucune place ne se
+        libère avant `timeout` (l'appelant lance alors son propre Chromium)."""
+        if self._closed:
+            return None
+        t0 = time.time()
+        deadline = t0 + timeout
+        with self._cond:
+            while (slot := self._pick_slot()) is None:
+                remaining = deadline - time.time()
+                if remaining <= 0 or self._closed:
+                    self.stats.add("lease_timeouts")
+                    return None
+                self._cond.wait(remaining)
+            slot.active += 1
+        self.stats.add("leases")
+        self.stats.add("lease_wait_ms", (time.time() - t0) * 1000)
+        try:
+            context = slot.submit(slot.open_context, dict(context_options or {}), setup)
+        except BaseException:
+            self._release(slot, False)
+            raise
+        return BrowserLease(self, slot, context)
+
+    def warm(self) -> None:
+        """Lance tous les navigateurs d'avance (démons longue durée)."""
+        for slot in self._slots:
+            slot.submit(slot._ensure_browser)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for slot in self._slots:
+            slot.stop()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> Optional[BrowserPool]:
+    """Pool du process (créé à la première demande), None si désactivé."""
+    global _pool
+    if not pool_enabled():
+        return None
+    with _pool_lock:
+        if _pool is None:
+            size = int(os.environ.get("SCRAPER_BROWSER_POOL_SIZE", DEFAULT_POOL_SIZE))
+            contexts = int(os.environ.get("SCRAPER_BROWSER_CONTEXTS", DEFAULT_CONTEXTS_PER_BROWSER))
+            _pool = BrowserPool(size, contexts_per_browser=contexts)
+            atexit.register(close_browser_pool)
+        return _pool
+
+
+def close_browser_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def browser_pool_stats() -> Dict[str, Any]:
+    pool = _pool
+    return pool.stats.snapshot() if pool is not None else {}
+
+
+def log_browser_pool_stats(logger: Callable[[str], None] = print) -> None:
+    stats = browser_pool_stats()
+    if not stats or not (stats["leases"] or stats["cold_starts"]):
+        return
+    logger(
+        f"🧭 Pool Chromium : {stats['cold_starts']} cold start(s) "
+        f"(moy. {stats['avg_cold_start_ms']} ms), {stats['leases']} bail(s) "
+        f"(attente moy. {stats['avg_lease_wait_ms']} ms), {stats['renders']} rendu(s) "
+        f"(moy. {stats['avg_render_ms']} ms), {stats['recycles']} recyclage(s)"
+    )
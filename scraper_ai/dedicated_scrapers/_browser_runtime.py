@@ -11,6 +11,10 @@ Stratégie clé (identique à BrowserAgent) :
 
 Évite de payer 20-25 s de timeout `networkidle` quand le site a des
 heartbeats permanents (analytics, websockets, chat widgets).
+
+Chromium vient du pool du process (_browser_pool.py) : start() emprunte un
+contexte isolé sur un navigateur chaud, close() le rend. Le bail est
+utilisable depuis les threads d'extraction du scraper.
 """
 from __future__ import annotations
 
@@ -104,11 +108,14 @@ class BrowserRuntime:
         self._pw = None
         self._browser = None
         self._context = None
+        self._lease = None
         self._started = False
 
     def start(self) -> "BrowserRuntime":
         if self._started:
             return self
+        if self._start_pooled():
+            return self
         try:
             from playwright.sync_api import sync_playwright
         except ImportError as e:
@@ -128,16 +135,45 @@ class BrowserRuntime:
             locale=self.locale,
             viewport={"width": 1366, "height": 800},
         )
-        try:
-            self._context.add_init_script(_STEALTH_INIT_SCRIPT)
-        except Exception:
-            pass
+        _apply_stealth(self._context)
         self._started = True
         return self
 
+    def _start_pooled(self) -> bool:
+        try:
+            from ._browser_pool import get_browser_pool
+            pool = get_browser_pool()
+            if pool is None:
+                return False
+            options: Dict[str, Any] = {
+                "user_agent": self.user_agent,
+                "locale": self.locale,
+                "viewport": {"width": 1366, "height": 800},
+            }
+            if self.proxy:
+                options["proxy"] = self.proxy
+            lease = pool.lease(context_options=options, setup=_apply_stealth)
+        except Exception as e:
+            self._log(f"[BrowserRuntime] pool indisponible ({type(e).__name__}: {e})")
+            return False
+        if lease is None:
+            self._log("[BrowserRuntime] pool saturé — lancement dédié")
+            return False
+        self._lease = lease
+        self._started = True
+        return True
+
     def close(self) -> None:
         if not self._started:
             return
+        if self._lease is not None:
+            try:
+                self._lease.release()
+            except Exception:
+                pass
+            self._lease = None
+            self._started = False
+            return
         for closer in (self._context, self._browser):
             try:
                 if closer is not None:
@@ -180,6 +216,36 @@ class BrowserRuntime:
         if not self._started:
             self.start()
 
+        kwargs = dict(
+            timeout_ms=timeout_ms,
+            networkidle_ms=networkidle_ms,
+            capture_responses=capture_responses,
+            scroll=scroll,
+            max_scrolls=max_scrolls,
+            load_more_selector=load_more_selector,
+            max_load_more_clicks=max_load_more_clicks,
+            post_load_wait_ms=post_load_wait_ms,
+        )
+        if self._lease is not None:
+            result = self._lease.call(self._render, url, **kwargs)
+            self._lease.record_render(result.elapsed_ms)
+            return result
+        return self._render(self._context, url, **kwargs)
+
+    def _render(
+        self,
+        context,
+        url: str,
+        *,
+        timeout_ms: int,
+        networkidle_ms: int,
+        capture_responses: bool,
+        scroll: bool,
+        max_scrolls: int,
+        load_more_selector: str,
+        max_load_more_clicks: int,
+        post_load_wait_ms: Optional[int],
+    ) -> RenderResult:
         import time as _time
 
         result = RenderResult()
@@ -188,7 +254,7 @@ class BrowserRuntime:
         )
 
         captured: List[Dict[str, Any]] = []
-        page = self._context.new_page()
+        page = context.new_page()
 
         try:
             if self.block_assets:
@@ -322,6 +388,13 @@ class BrowserRuntime:
         return proxy
 
 
+def _apply_stealth(context) -> None:
+    try:
+        context.add_init_script(_STEALTH_INIT_SCRIPT)
+    except Exception:
+        pass
+
+
 def _scroll_page(page, max_scrolls: int = 5) -> None:
     for _ in range(max_scrolls):
         try:
@@ -0,0 +1,243 @@
+"""
+Cache de validateurs HTTP (ETag / Last-Modified) partagé par les scrapers dédiés.
+
+Quand un serveur de concessionnaire supporte les requêtes conditionnelles,
+un 304 coûte une fraction d'un 200 avec 200 Ko de HTML. L'adaptateur
+`ConditionalCacheAdapter` est monté sur la `requests.Session` de
+`DedicatedScraper` :
+  - GET avec entrée en cache → ajoute `If-None-Match` / `If-Modified-Since` ;
+  - 304 → rejoue le corps stocké comme un 200 (transparent pour
+    `_fetch_and_extract` et tous les `_fetch_and_parse_detail`) ;
+  - 200 avec ETag ou Last-Modified → stocke le corps et ses validateurs.
+
+Backend : SQLite dans `scraper_cache/http_validators.sqlite` (WAL — les
+workers batch du cron écrivent en parallèle), borné en taille avec
+éviction LRU. Toute erreur du cache dégrade en requête normale.
+
+Compteurs par domaine (par adaptateur, donc par scraper) :
+  - hit          : entrée trouvée, validateurs envoyés
+  - not_modified : 304 reçu, corps rejoué
+  - miss         : aucune entrée (ou serveur sans validateurs)
+  - bytes_saved  : octets de corps non re-téléchargés
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+
+CACHE_PATH = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "http_validators.sqlite"
+
+# Plafond disque total ; l'éviction redescend à ~90 % en supprimant les
+# entrées les moins récemment utilisées.
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# Corps plus gros (exports, flux JSON géants) : pas mis en cache.
+MAX_ENTRY_BYTES = 5 * 1024 * 1024
+# Vérification du total toutes les N écritures (SUM() sur la table).
+EVICTION_CHECK_EVERY = 200
+
+# Headers du 200 d'origine réappliqués sur le 304 rejoué.
+_REPLAYED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Content-Language')
+
+
+def cache_enabled() -> bool:
+    """SCRAPER_HTTP_CACHE=0 désactive le cache pour tout le process."""
+    return os.environ.get("SCRAPER_HTTP_CACHE", "1") not in ("0", "false", "False")
+
+
+class ValidatorCache:
+    """Stockage SQLite (url → validateurs + corps). Thread-safe, multi-process."""
+
+    def __init__(self, path: Path = CACHE_PATH, max_bytes: int = MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " url TEXT PRIMARY KEY,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " headers TEXT NOT NULL,"
+                " body BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], Dict[str, str], bytes]]:
+        """Retourne (etag, last_modified, headers, body) ou None."""
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT etag, last_modified, headers, body FROM entries WHERE url = ?",
+                    (url,),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        etag, last_modified, headers, body = row
+        return etag, last_modified, json.loads(headers), bytes(body)
+
+    def touch(self, url: str) -> None:
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def put(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> None:
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries"
+                    " (url, etag, last_modified, headers, body, size, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, etag, last_modified, json.dumps(headers), body, len(body), time.time()),
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % EVICTION_CHECK_EVERY == 0:
+                    self._evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Supprime les entrées LRU jusqu'à ~90 % du plafond (lock tenu)."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for url, size in conn.execute("SELECT url, size FROM entries ORDER BY accessed_at"):
+            if total - freed <= target:
+                break
+            doomed.append((url,))
+            freed += size
+        conn.executemany("DELETE FROM entries WHERE url = ?", doomed)
+        conn.commit()
+
+
+_shared_cache: Optional[ValidatorCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> ValidatorCache:
+    """Une seule connexion SQLite par process, partagée par tous les scrapers."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ValidatorCache()
+        return _shared_cache
+
+
+class ConditionalCacheAdapter(HTTPAdapter):
+    """HTTPAdapter qui revalide les GET via le cache de validateurs."""
+
+    def __init__(self, *args, cache: Optional[ValidatorCache] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache or get_shared_cache()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+
+    def send(self, request, stream=False, **kwargs):
+        if request.method != 'GET' or stream:
+            return super().send(request, stream=stream, **kwargs)
+
+        url = request.url
+        domain = urlparse(url).netloc.replace('www.', '')
+        entry = self.cache.get(url)
+        if entry is not None:
+            etag, last_modified, _, _ = entry
+            if etag:
+                request.headers['If-None-Match'] = etag
+            if last_modified:
+                request.headers['If-Modified-Since'] = last_modified
+            self._count(domain, 'hit')
+        else:
+            self._count(domain, 'miss')
+
+        response = super().send(request, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            _, _, headers, body = entry
+            self._replay(response, headers, body)
+            self.cache.touch(url)
+            self._count(domain, 'not_modified')
+            self._count(domain, 'bytes_saved', len(body))
+        elif response.status_code == 200:
+            self._store(url, response)
+        return response
+
+    @staticmethod
+    def _replay(response, headers: Dict[str, str], body: bytes) -> None:
+        """Transforme le 304 en 200 portant le corps stocké."""
+        response.status_code = 200
+        response.reason = 'OK'
+        for name, value in headers.items():
+            response.headers[name] = value
+        response.headers.pop('Content-Encoding', None)
+        response.headers['Content-Length'] = str(len(body))
+        response._content = body
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.from_validator_cache = True
+
+    def _store(self, url: str, response) -> None:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        if 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return
+        declared = response.headers.get('Content-Length')
+        if declared and declared.isdigit() and int(declared) > MAX_ENTRY_BYTES:
+            return
+        body = response.content
+        if not body or len(body) > MAX_ENTRY_BYTES:
+            return
+        headers = {
+            name: response.headers[name]
+            for name in _REPLAYED_HEADERS if name in response.headers
+        }
+        self.cache.put(url, etag, last_modified, headers, body)
+
+    def _count(self, domain: str, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            counters = self._stats.setdefault(
+                domain, {'hit': 0, 'not_modified': 0, 'miss': 0, 'bytes_saved': 0})
+            counters[key] += amount
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._stats_lock:
+            return {domain: dict(counters) for domain, counters in self._stats.items()}
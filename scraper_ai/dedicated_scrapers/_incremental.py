@@ -0,0 +1,216 @@
+"""
+Re-scrape incrémental des pages détail, piloté par le `<lastmod>` des sitemaps.
+
+Le cron horaire re-télécharge chaque page détail alors que l'essentiel de
+l'inventaire ne bouge pas d'une heure à l'autre. Ce module garde, par site,
+un store local (url → lastmod sitemap, empreinte du produit, date du dernier
+fetch, dernier produit extrait) et décide pour chaque URL s'il faut la
+re-fetcher ou réutiliser le produit déjà extrait.
+
+Une page est re-fetchée si :
+  - elle est nouvelle (absente du store) ;
+  - son `<lastmod>` dans le sitemap a bougé depuis le dernier fetch ;
+  - son dernier fetch date de plus de `max_age_hours` ;
+  - le sitemap ne fournit pas de `<lastmod>` pour elle (on ne peut rien
+    affirmer → comportement historique).
+
+Aucun code par site : `DedicatedScraper.enable_incremental()` branche un hook
+de réponse sur la session (capture des `<lastmod>` de TOUT sitemap récupéré)
+et enveloppe `_fetch_and_extract` / `_fetch_and_parse_detail` (premier
+argument = URL).
+
+Backend : un fichier JSON par site dans `scraper_cache/incremental/`.
+Ce module ne dépend que de la stdlib.
+"""
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import html
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+INCREMENTAL_DIR = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "incremental"
+
+# Au-delà, une page est re-fetchée même si son lastmod n'a pas bougé
+# (filet de sécurité contre un sitemap dont le lastmod ne suit pas le prix).
+DEFAULT_MAX_AGE_HOURS = 24
+
+# Une entrée qui n'a plus été vue depuis ce délai (produit vendu, URL
+# retirée du sitemap) est purgée à la sauvegarde.
+PRUNE_AFTER_HOURS = 24 * 7
+
+STORE_VERSION = 1
+
+_URL_BLOCK_RE = re.compile(r'<url>(.*?)</url>', re.DOTALL | re.IGNORECASE)
+_LOC_RE = re.compile(r'<loc>\s*(?:<!\[CDATA\[)?\s*([^<\s\]]+)', re.IGNORECASE)
+_LASTMOD_RE = re.compile(r'<lastmod>\s*([^<\s]+)\s*</lastmod>', re.IGNORECASE)
+
+
+def normalize_url(url: str) -> str:
+    """Clé de store : entités XML décodées, sans slash final."""
+    return html.unescape(url or '').strip().rstrip('/')
+
+
+def product_hash(product: Dict[str, Any]) -> str:
+    """Empreinte stable d'un produit extrait (ordre des clés ignoré)."""
+    payload = json.dumps(product, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def parse_sitemap_lastmods(xml_text: str) -> Dict[str, str]:
+    """Extrait les paires `<loc>` → `<lastmod>` des blocs `<url>` d'un sitemap.
+
+    Les entrées sans `<lastmod>` sont ignorées ; les index de sitemaps
+    (`<sitemap>`) aussi, puisqu'ils ne pointent pas vers des pages produit.
+    """
+    lastmods: Dict[str, str] = {}
+    if not xml_text or '<lastmod>' not in xml_text.lower():
+        return lastmods
+    for block in _URL_BLOCK_RE.finditer(xml_text):
+        body = block.group(1)
+        loc = _LOC_RE.search(body)
+        lastmod = _LASTMOD_RE.search(body)
+        if loc and lastmod:
+            lastmods[normalize_url(loc.group(1))] = lastmod.group(1)
+    return lastmods
+
+
+class IncrementalStore:
+    """Store d'empreintes par URL pour un site. Thread-safe."""
+
+    def __init__(
+        self,
+        slug: str,
+        max_age_hours: float = DEFAULT_MAX_AGE_HOURS,
+        path: Optional[Path] = None,
+    ):
+        self.slug = slug
+        self.max_age_seconds = max_age_hours * 3600
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in (slug or 'site').lower())
+        self.path = path or INCREMENTAL_DIR / f"{safe}.json"
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        # lastmod vus dans les sitemaps de CE run uniquement
+        self._lastmods: Dict[str, str] = {}
+        self._stats = {'checked': 0, 'reused': 0, 'refetched': 0, 'changed': 0, 'failed': 0}
+
+    # ── Persistance ──
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (json.JSONDecodeError, OSError):
+            return {}
+        if data.get('version') != STORE_VERSION:
+            return {}
+        entries = data.get('entries')
+        return entries if isinstance(entries, dict) else {}
+
+    def save(self) -> None:
+        """Écrit le store (atomique) après purge des entrées périmées."""
+        cutoff = time.time() - PRUNE_AFTER_HOURS * 3600
+        with self._lock:
+            entries = {
+                url: entry for url, entry in self._entries.items()
+                if entry.get('seen_at', entry.get('checked_at', 0)) >= cutoff
+            }
+            self._entries = entries
+            payload = {'version': STORE_VERSION, 'slug': self.slug, 'entries': entries}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix('.tmp')
+                tmp.write_text(
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                    encoding='utf-8',
+                )
+                tmp.replace(self.path)
+            except OSError:
+                pass
+
+    # ── Sitemaps ──
+
+    def record_sitemap(self, xml_text: str) -> int:
+        """Mémorise les lastmod d'un sitemap. Retourne le nombre d'URLs datées."""
+        lastmods = parse_sitemap_lastmods(xml_text)
+        if lastmods:
+            with self._lock:
+                self._lastmods.update(lastmods)
+        return len(lastmods)
+
+    # ── Décision fetch / réutilisation ──
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Retourne une copie du produit stocké si la page peut être réutilisée."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            self._stats['checked'] += 1
+            lastmod = self._lastmods.get(key)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['seen_at'] = now
+            if (
+                lastmod is None
+                or entry is None
+                or entry.get('product') is None
+                or entry.get('lastmod') != lastmod
+                or now - entry.get('checked_at', 0) > self.max_age_seconds
+            ):
+                return None
+            self._stats['reused'] += 1
+            return copy.deepcopy(entry['product'])
+
+    def record(self, url: str, product: Optional[Dict[str, Any]]) -> None:
+        """Enregistre le résultat d'un fetch réel (None = échec, rien stocké)."""
+        key = normalize_url(url)
+        with self._lock:
+            self._stats['refetched'] += 1
+            if not product:
+                self._stats['failed'] += 1
+                return
+            digest = product_hash(product)
+            previous = self._entries.get(key)
+            if previous is not None and previous.get('content_hash') != digest:
+                self._stats['changed'] += 1
+            now = time.time()
+            self._entries[key] = {
+                'lastmod': self._lastmods.get(key),
+                'content_hash': digest,
+                'checked_at': now,
+                'seen_at': now,
+                'product': copy.deepcopy(product),
+            }
+
+    def wrap(self, fetch: Callable[..., Optional[Dict]]) -> Callable[..., Optional[Dict]]:
+        """Enveloppe une méthode de fetch détail dont le 1er argument est l'URL."""
+
+        @functools.wraps(fetch)
+        def wrapper(*args, **kwargs):
+            url = args[0] if args else kwargs.get('url')
+            if not isinstance(url, str):
+                return fetch(*args, **kwargs)
+            cached = self.lookup(url)
+            if cached is not None:
+                return cached
+            product = fetch(*args, **kwargs)
+            self.record(url, product)
+            return product
+
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['sitemap_dated_urls'] = len(self._lastmods)
+        stats['reuse_ratio'] = (
+            round(stats['reused'] / stats['checked'], 3) if stats['checked'] else 0.0
+        )
+        return stats
@@ -0,0 +1,300 @@
+# AUTO-GENERE par scripts/build_scraper_manifest.py. Ne pas modifier.
+# Source : registry.py (_BUILTIN_SCRAPERS, _BUILTIN_DOMAINS) + _generated_registry.py
+MANIFEST = {
+    'mvm-motosport': {
+        'module': 'mvm_motosport',
+        'class': 'MvmMotosportScraper',
+        'domains': ['mvmmotosport.com'],
+        'site_name': 'MVM Moto Sport',
+        'site_url': 'https://www.mvmmotosport.com/fr/',
+        'site_domain': 'mvmmotosport.com',
+    },
+    'motoplex': {
+        'module': 'motoplex',
+        'class': 'MotoplexScraper',
+        'domains': ['motoplex.ca', 'motoplexsteustache.ca'],
+        'site_name': 'Motoplex St-Eustache',
+        'site_url': 'https://www.motoplex.ca/fr/',
+        'site_domain': 'motoplex.ca',
+    },
+    'motoplex-mirabel': {
+        'module': 'motoplex_mirabel',
+        'class': 'MotoplexMirabelScraper',
+        'domains': ['motoplexmirabel.ca', 'motoplexmirabel.com'],
+        'site_name': 'Motoplex Mirabel',
+        'site_url': 'https://www.motoplexmirabel.ca/fr/',
+        'site_domain': 'motoplexmirabel.ca',
+    },
+    'motosport4saisons': {
+        'module': 'motosport4saisons',
+        'class': 'Motosport4SaisonsScraper',
+        'domains': ['motosport4saisons.com'],
+        'site_name': 'Motosport 4 Saisons',
+        'site_url': 'https://www.motosport4saisons.com/fr/',
+        'site_domain': 'motosport4saisons.com',
+    },
+    'motos-illimitees': {
+        'module': 'motos_illimitees',
+        'class': 'MotosIllimiteesScraper',
+        'domains': ['motosillimitees.com'],
+        'site_name': 'Motos Illimitées',
+        'site_url': 'https://www.motosillimitees.com/fr/',
+        'site_domain': 'motosillimitees.com',
+    },
+    'motovanier': {
+        'module': 'motovanier',
+        'class': 'MotoVanierScraper',
+        'domains': ['motovanier.ca'],
+        'site_name': 'Moto Vanier',
+        'site_url': 'https://motovanier.ca/',
+        'site_domain': 'motovanier.ca',
+    },
+    'mathias-sports': {
+        'module': 'mathias_sports',
+        'class': 'MathiasSportsScraper',
+        'domains': ['mathiassports.com'],
+        'site_name': 'Mathias Sports',
+        'site_url': 'https://mathiassports.com/',
+        'site_domain': 'mathiassports.com',
+    },
+    'joliette-recreatif': {
+        'module': 'joliette_recreatif',
+        'class': 'JolietteRecreatifScraper',
+        'domains': ['jolietterecreatif.ca'],
+        'site_name': 'Joliette Récréatif',
+        'site_url': 'https://www.jolietterecreatif.ca/fr/',
+        'site_domain': 'jolietterecreatif.ca',
+    },
+    'db-moto': {
+        'module': 'db_moto',
+        'class': 'DBMotoScraper',
+        'domains': ['dbmoto.ca'],
+        'site_name': 'DB Moto',
+        'site_url': 'https://www.dbmoto.ca/fr/',
+        'site_domain': 'dbmoto.ca',
+    },
+    'gregoire-sport': {
+        'module': 'gregoire_sport',
+        'class': 'GregoireSportScraper',
+        'domains': ['gregoiresport.com'],
+        'site_name': 'Grégoire Sport',
+        'site_url': 'https://www.gregoiresport.com/fr/',
+        'site_domain': 'gregoiresport.com',
+    },
+    'nadon-sport': {
+        'module': 'nadon_sport',
+        'class': 'NadonSportScraper',
+        'domains': ['nadonsport.com'],
+        'site_name': 'Nadon Sport',
+        'site_url': 'https://www.nadonsport.com/fr/',
+        'site_domain': 'nadonsport.com',
+    },
+    'maximum-aventure': {
+        'module': 'maximum_aventure',
+        'class': 'MaximumAventureScraper',
+        'domains': ['maximumaventure.com'],
+        'site_name': 'Maximum Aventure',
+        'site_url': 'https://www.maximumaventure.com/en/',
+        'site_domain': 'maximumaventure.com',
+    },
+    'laval-moto': {
+        'module': 'laval_moto',
+        'class': 'LavalMotoScraper',
+        'domains': ['lavalmoto.com'],
+        'site_name': 'Laval Moto',
+        'site_url': 'https://www.lavalmoto.com/fr/',
+        'site_domain': 'lavalmoto.com',
+    },
+    'motopro-granby': {
+        'module': 'motopro_granby',
+        'class': 'MotoProGranbyScraper',
+        'domains': ['motoprogranby.com'],
+        'site_name': 'MotoPro Granby',
+        'site_url': 'https://www.motoprogranby.com/fr/',
+        'site_domain': 'motoprogranby.com',
+    },
+    'moto-ducharme': {
+        'module': 'moto_ducharme',
+        'class': 'MotoDucharmeScraper',
+        'domains': ['motoducharme.com'],
+        'site_name': 'Moto Ducharme',
+        'site_url': 'https://www.motoducharme.com/',
+        'site_domain': 'motoducharme.com',
+    },
+    'picotte-motosport': {
+        'module': 'picotte_motosport',
+        'class': 'PicotteMotosportScraper',
+        'domains': ['picottemotosport.com'],
+        'site_name': 'Picotte Motosport',
+        'site_url': 'https://www.picottemotosport.com/fr/',
+        'site_domain': 'picottemotosport.com',
+    },
+    'morin-sports': {
+        'module': 'morin_sports',
+        'class': 'MorinSportsScraper',
+        'domains': ['morinsports.com'],
+        'site_name': 'Morin Sports & Marine',
+        'site_url': 'https://www.morinsports.com/fr/',
+        'site_domain': 'morinsports.com',
+    },
+    'centre-du-sport-lac-st-jean': {
+        'module': 'centre_du_sport_lac_st_jean',
+        'class': 'CentreDuSportLacStJeanScraper',
+        'domains': ['centredusportlacstjean.com'],
+        'site_name': 'Centre du Sport Lac-St-Jean',
+        'site_url': 'https://www.centredusportlacstjean.com/fr/',
+        'site_domain': 'centredusportlacstjean.com',
+    },
+    'smsport': {
+        'module': 'smsport',
+        'class': 'SmsportScraper',
+        'domains': ['smsport.ca'],
+        'site_name': 'SM Sport',
+        'site_url': 'https://smsport.ca/fr/',
+        'site_domain': 'smsport.ca',
+    },
+    'moto-falardeau': {
+        'module': 'moto_falardeau',
+        'class': 'MotoFalardeauScraper',
+        'domains': ['motofalardeau.com'],
+        'site_name': 'Moto Falardeau',
+        'site_url': 'https://motofalardeau.com/fr/',
+        'site_domain': 'motofalardeau.com',
+    },
+    'jean-dumas-maximum-sport': {
+        'module': 'jean_dumas_maximum_sport',
+        'class': 'JeanDumasMaximumSportScraper',
+        'domains': ['jeandumasmaximumsport.ca'],
+        'site_name': 'Jean Dumas Maximum Sport',
+        'site_url': 'https://www.jeandumasmaximumsport.ca/fr/',
+        'site_domain': 'jeandumasmaximumsport.ca',
+    },
+    'evolution-x-jonquiere': {
+        'module': 'evolution_x_jonquiere',
+        'class': 'EvolutionXJonquiereScraper',
+        'domains': ['evolutionxjonquiere.ca'],
+        'site_name': 'Évolution X Jonquière',
+        'site_url': 'https://www.evolutionxjonquiere.ca/fr/',
+        'site_domain': 'evolutionxjonquiere.ca',
+    },
+    'gobeil-equipement': {
+        'module': 'gobeil_equipement',
+        'class': 'GobeilEquipementScraper',
+        'domains': ['gobeilequipement.ca'],
+        'site_name': 'Gobeil Équipement',
+        'site_url': 'https://www.gobeilequipement.ca/fr/',
+        'site_domain': 'gobeilequipement.ca',
+    },
+    'sport-cgr': {
+        'module': 'sport_cgr',
+        'class': 'SportCgrScraper',
+        'domains': ['sportcgr.com'],
+        'site_name': 'Les sports CGR Gaudreault',
+        'site_url': 'https://sportcgr.com/fr/',
+        'site_domain': 'sportcgr.com',
+    },
+    'saguenay-marine': {
+        'module': 'saguenay_marine',
+        'class': 'SaguenayMarineScraper',
+        'domains': ['saguenaymarine.com'],
+        'site_name': 'Saguenay Marine',
+        'site_url': 'https://www.saguenaymarine.com/fr/',
+        'site_domain': 'saguenaymarine.com',
+    },
+    'sports-drc': {
+        'module': 'sports_drc',
+        'class': 'SportsDrcScraper',
+        'domains': ['sportsdrc.com'],
+        'site_name': 'Sports DRC',
+        'site_url': 'https://sportsdrc.com/fr/',
+        'site_domain': 'sportsdrc.com',
+    },
+    'evasion-sport': {
+        'module': 'evasion_sport',
+        'class': 'EvasionSportScraper',
+        'domains': ['evasion-sport.com'],
+        'site_name': 'Évasion Sport',
+        'site_url': 'https://evasion-sport.com/fr/',
+        'site_domain': 'evasion-sport.com',
+    },
+    'pro-performance': {
+        'module': 'pro_performance',
+        'class': 'ProPerformanceScraper',
+        'domains': ['properformance.ca'],
+        'site_name': 'Pro Performance',
+        'site_url': 'https://www.properformance.ca/fr/',
+        'site_domain': 'properformance.ca',
+    },
+    'excelmoto': {
+        'module': 'excelmoto',
+        'class': 'ExcelmotoScraper',
+        'domains': ['excelmoto.com'],
+        'site_name': 'Excel Moto',
+        'site_url': 'https://www.excelmoto.com/fr/',
+        'site_domain': 'excelmoto.com',
+    },
+    'alary-sport': {
+        'module': 'alary_sport',
+        'class': 'AlarySportScraper',
+        'domains': ['alarysport.com'],
+        'site_name': 'Alary Sport',
+        'site_url': 'https://www.alarysport.com/fr/',
+        'site_domain': 'alarysport.com',
+    },
+    'marketplace-kijiji-ca': {
+        'module': 'marketplace_kijiji',
+        'class': 'KijijiMarketplaceScraper',
+        'domains': ['kijiji.ca'],
+        'site_name': 'Kijiji',
+        'site_url': 'https://www.kijiji.ca',
+        'site_domain': 'kijiji.ca',
+    },
+    'marketplace-lespac': {
+        'module': 'marketplace_lespac',
+        'class': 'LesPacMarketplaceScraper',
+        'domains': ['lespac.com'],
+        'site_name': 'LesPAC',
+        'site_url': 'https://www.lespac.com',
+        'site_domain': 'lespac.com',
+    },
+    'marketplace-autotrader-ca': {
+        'module': 'marketplace_autotrader',
+        'class': 'AutoTraderMarketplaceScraper',
+        'domains': ['autotrader.ca'],
+        'site_name': 'AutoTrader.ca',
+        'site_url': 'https://www.autotrader.ca',
+        'site_domain': 'autotrader.ca',
+    },
+    'marketplace-cycletrader': {
+        'module': 'marketplace_cycletrader',
+        'class': 'CycleTraderMarketplaceScraper',
+        'domains': ['cycletrader.com'],
+        'site_name': 'CycleTrader.com',
+        'site_url': 'https://www.cycletrader.com',
+        'site_domain': 'cycletrader.com',
+    },
+    'motorcycledealers-ca': {
+        'module': 'motorcycledealers',
+        'class': 'MotorcycleDealersScraper',
+        'domains': ['motorcycledealers.ca'],
+        'site_name': 'MotorcycleDealers.ca',
+        'site_url': 'https://www.motorcycledealers.ca',
+        'site_domain': 'motorcycledealers.ca',
+    },
+    'st-onge-ford': {
+        'module': 'st_onge_ford',
+        'class': 'StOngeFordScraper',
+        'domains': ['st-onge-ford.com'],
+        'site_name': 'St-Onge Ford | Ford Dealership in Shawinigan and La Tuque',
+        'site_url': 'https://www.st-onge-ford.com/fr/',
+        'site_domain': 'st-onge-ford.com',
+    },
+    'adrenalinesports': {
+        'module': 'adrenalinesports',
+        'class': 'AdrenalinesportsScraper',
+        'domains': ['adrenalinesports.ca'],
+        'site_name': 'Adrenaline Sports | Multi-concessionnaire au Quebec',
+        'site_url': 'https://www.adrenalinesports.ca/fr/',
+        'site_domain': 'adrenalinesports.ca',
+    },
+}
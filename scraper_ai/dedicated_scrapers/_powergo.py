@@ -0,0 +1,494 @@
+"""
+Moteur d'extraction de la plateforme PowerGO / Next.js (recette
+POWERGO_NEXTJS de scraper_usine/platforms.py).
+
+Les scrapers PowerGO écrits à la main (smsport, gobeil_equipement,
+saguenay_marine, …) répétaient tous le même flux, à quelques regex près :
+  1. découverte par le sitemap inventory-detail.xml (les listings sont
+     rendus côté client, inutilisables en requests) — AUCUN plafond ;
+  2. page détail → JSON-LD "Vehicle" niché dans un @graph ;
+  3. fallbacks og:title / og:image, prix barré du bloc pg-vehicle-price,
+     état / catégorie / type depuis l'URL.
+
+Ici le flux est écrit une fois et les scrapers de site ne sont plus que de
+la configuration (SITE_*, regex de nom, boilerplate de description…).
+
+Parsing sans BeautifulSoup : un seul arbre lxml par page (`_extract_detail`
+remplace la soupe de `DedicatedScraper._parse_detail`), scripts JSON-LD,
+balises og et bloc prix lus par XPath. Bench :
+scripts/bench_powergo_parse.py.
+
+Configuration d'un site (attributs de classe) :
+  - SITEMAP_CANDIDATES : défaut = <origine de SITE_URL> + INVENTORY_SITEMAP_PATH,
+    puis /sitemap.xml ; SITEMAP_SKIP : sous-sitemaps d'un index à ignorer
+  - _PRODUCT_URL_RE : URL de fiche (/fr/(neuf|usage)/<segment>/inventaire/…)
+  - _NAME_NOISE_RES : regex retirées du nom (ville, nom du concessionnaire)
+  - NAME_DEDUP_WINDOW : 2 = écho de marque non adjacent (« Adly Moto ADLY »)
+  - _DESC_NOISE_RES : boilerplate marketing retiré de la description
+  - VEHICLE_TYPE_MAP, _KNOWN_BRANDS : défauts communs à la plateforme
+"""
+import html as html_lib
+import json
+import re
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+
+from .base import DedicatedScraper
+
+# Même valeur que PLATFORM_RECIPES[POWERGO_NEXTJS].default_sitemap_path
+INVENTORY_SITEMAP_PATH = "/sitemaps/inventory-detail.xml"
+
+_LOC_RE = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>')
+_SEGMENT_RE = re.compile(r'/fr/(?:neuf|usage)/([a-z0-9-]+)/')
+_DEMO_RE = re.compile(r'\b(démo|demo|démonstrateur)\b')
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x1f\x7f]')
+
+# XPath du parseur (bloc prix : mêmes sélecteurs que le CSS d'origine
+# `[class*="pg-vehicle-price"]` puis `del, s, [class*="line-through"], [class*="strike"]`)
+_XP_JSON_LD = '//script[contains(@type, "ld+json")]/text()'
+_XP_OG = '//meta[@property="{}"]/@content'
+_XP_PRICE_BOX = '//*[contains(@class, "pg-vehicle-price")]'
+_XP_STRIKE = ('.//*[self::del or self::s or contains(@class, "line-through")'
+              ' or contains(@class, "strike")]')
+
+
+def parse_tree(html: str):
+    """Arbre lxml de la page (None si vide ou illisible)."""
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # Déclaration d'encodage dans une chaîne unicode
+        try:
+            parser = lxml_html.HTMLParser(encoding='utf-8')
+            return lxml_html.document_fromstring(html.encode('utf-8', 'replace'), parser=parser)
+        except (etree.ParserError, ValueError):
+            return None
+    except etree.ParserError:
+        return None
+
+
+def _text(node) -> str:
+    """Texte des descendants (sans commentaires), comme `get_text()`."""
+    return ''.join(node.xpath('.//text()'))
+
+
+class PowerGoScraper(DedicatedScraper):
+    """Scraper d'un concessionnaire PowerGO : sitemap + JSON-LD + fallbacks DOM."""
+
+    MAX_WORKERS = 10
+
+    SITEMAP_CANDIDATES: Tuple[str, ...] = ()
+    # Sous-sitemaps d'un index ignorés (showroom, pages de contenu…)
+    SITEMAP_SKIP: Tuple[str, ...] = ()
+
+    # Stock numérique (« a-vendre-13867 »), alphanumérique (« w-get-85 ») ou
+    # avec underscores (« na_stock_893b4a01 ») — au moins un chiffre requis.
+    _PRODUCT_URL_RE = re.compile(
+        r'/fr/(neuf|usage)/[a-z0-9-]+/inventaire/[^/]*a-vendre-[a-z0-9_-]*\d[a-z0-9_-]*/?$')
+
+    # Segment d'URL (/fr/neuf/<segment>/…) → type de véhicule lisible ;
+    # segment inconnu → segment capitalisé.
+    VEHICLE_TYPE_MAP = {
+        'motocyclette': 'Moto',
+        'motos-trois-roues': 'Moto trois roues',
+        'vehicules-a-3-roues': 'Véhicule à 3 roues',
+        'vtt': 'VTT',
+        'cote-a-cote': 'Côte-à-côte',
+        'motoneige': 'Motoneige',
+        'motomarine': 'Motomarine',
+        'moteur-hors-bord': 'Moteur hors-bord',
+        'moteurs-hors-bord': 'Moteur hors-bord',
+        'bateau': 'Bateau',
+        'bateaux-de-peche': 'Bateau de pêche',
+        'chaloupes': 'Chaloupe',
+        'ponton': 'Ponton',
+        'remorque': 'Remorque',
+        'souffleuses': 'Souffleuse',
+        'equipement-mecanique': 'Équipement mécanique',
+        'produits-mecaniques': 'Équipement mécanique',
+        'voiturettes-de-golf': 'Voiturette de golf',
+        'scooter': 'Scooter',
+        'velo-electrique': 'Vélo électrique',
+        'autres': 'Autre',
+    }
+
+    _LD_TYPE_PRIORITY = ('Vehicle', 'Car', 'AutomotiveVehicle', 'MotorVehicle',
+                         'Motorcycle', 'Product', 'IndividualProduct')
+
+    # Marques reconnues en tête de nom (fallback marque/modèle/année pour les
+    # pages sans JSON-LD Vehicle) — préfixe le plus long d'abord
+    # (« adly moto » avant « adly », « indian motorcycle » avant « indian »).
+    _KNOWN_BRANDS = tuple(sorted((
+        'harley-davidson', 'arctic cat', 'can-am', 'sea-doo', 'ski-doo',
+        'adly moto', 'adly', 'honda', 'polaris', 'kawasaki', 'cfmoto',
+        'husqvarna', 'suzuki', 'yamaha', 'ktm', 'gasgas', 'triumph', 'kymco',
+        'segway', 'argo', 'mercury', 'legend', 'beta', 'sherco', 'stacyc',
+        'indian motorcycle', 'indian', 'ducati', 'bmw', 'aprilia', 'vespa',
+        'piaggio', 'mv agusta', 'slingshot', 'super soco', 'kollter', 'remeq',
+        'princecraft', 'lund', 'starcraft', 'alumacraft', 'sportspal',
+        'godfrey marine', 'smoker-craft', 'smoker craft', 'suzumar', 'ant deck',
+    ), key=len, reverse=True))
+
+    # Suffixes propres au site retirés du nom (« … neuf à Québec »,
+    # « … | SM Sport »), appliqués après « à vendre … »
+    _NAME_NOISE_RES: Tuple[Pattern, ...] = ()
+    # 1 = tokens adjacents dupliqués ; 2 = aussi l'écho de marque à un token
+    # d'écart, pour les tokens alphabétiques seulement (« CFORCE 600 Touring
+    # 600 » reste intact)
+    NAME_DEDUP_WINDOW = 1
+
+    # Boilerplate du concessionnaire retiré de la description, dans l'ordre
+    _DESC_NOISE_RES: Tuple[Pattern, ...] = ()
+
+    # ──────────────────────────────────────────────────────────────
+    # DÉCOUVERTE (sitemap — les listings sont client-side)
+    # ──────────────────────────────────────────────────────────────
+
+    def _sitemap_candidates(self) -> Tuple[str, ...]:
+        if self.SITEMAP_CANDIDATES:
+            return self.SITEMAP_CANDIDATES
+        parsed = urlparse(self.SITE_URL)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        return (origin + INVENTORY_SITEMAP_PATH, origin + "/sitemap.xml")
+
+    def discover_product_urls(self, categories: List[str] = None) -> List[str]:
+        urls: List[str] = []
+        seen = set()
+
+        for sitemap_url in self._sitemap_candidates():
+            try:
+                resp = self.session.get(sitemap_url, timeout=30)
+                if resp.status_code != 200 or '<loc>' not in resp.text:
+                    continue
+            except Exception:
+                continue
+
+            locs = _LOC_RE.findall(resp.text)
+
+            # Index de sitemaps → suivre les sous-sitemaps inventaire
+            if '<sitemapindex' in resp.text:
+                sub_locs = []
+                for sub in locs[:15]:
+                    if any(skip in sub.lower() for skip in self.SITEMAP_SKIP):
+                        continue
+                    try:
+                        sub_resp = self.session.get(sub, timeout=30)
+                        if sub_resp.status_code == 200:
+                            sub_locs.extend(_LOC_RE.findall(sub_resp.text))
+                    except Exception:
+                        continue
+                locs = sub_locs
+
+            for url in locs:
+                norm = url.rstrip('/').lower()
+                if norm in seen:
+                    continue
+                if self._is_product_url(url):
+                    seen.add(norm)
+                    urls.append(url)
+
+            if urls:
+                neuf = sum(1 for u in urls if '/neuf/' in u)
+                print(f"   🗺️  Sitemap {sitemap_url}: {len(urls)} URLs produit "
+                      f"({neuf} neuf, {len(urls) - neuf} usagé) — AUCUN plafond")
+                break
+
+        return urls
+
+    def _is_product_url(self, url: str) -> bool:
+        if not url or self.SITE_DOMAIN not in url.lower():
+            return False
+        return bool(self._PRODUCT_URL_RE.search(url.lower().rstrip('/') + '/'))
+
+    # ──────────────────────────────────────────────────────────────
+    # EXTRACTION PAGE DÉTAIL (lxml seul)
+    # ──────────────────────────────────────────────────────────────
+
+    def extract_from_detail_page(self, url: str, html: str, soup: BeautifulSoup) -> Optional[Dict]:
+        """Compatibilité : la soupe est ignorée, le parsing reste lxml."""
+        return self._extract_detail(url, html)
+
+    def _extract_detail(self, url: str, html: str) -> Optional[Dict]:
+        tree = parse_tree(html)
+        if tree is None:
+            return None
+        specs: Dict[str, Any] = {}
+
+        ld = self._find_vehicle_json_ld(tree)
+        if ld:
+            self._apply_json_ld(specs, ld)
+
+        # Fallbacks OG si JSON-LD incomplet
+        if not specs.get('name'):
+            og_title = tree.xpath(_XP_OG.format('og:title'))
+            if og_title and og_title[0]:
+                specs['name'] = self._clean_name(og_title[0])
+        if not specs.get('image'):
+            og_image = tree.xpath(_XP_OG.format('og:image'))
+            if og_image and og_image[0]:
+                specs['image'] = og_image[0]
+
+        # Pages sans JSON-LD : le nom « Marque Modèle Année » reste la
+        # meilleure source pour marque/modèle/année (ne remplit que les trous).
+        self._fill_from_name(specs)
+        self._apply_price_box(specs, tree)
+
+        # État + catégories depuis l'URL (/fr/neuf/… vs /fr/usage/…)
+        url_lower = url.lower()
+        if not specs.get('etat'):
+            specs['etat'] = 'occasion' if '/usage/' in url_lower else 'neuf'
+        specs['sourceCategorie'] = (
+            'vehicules_occasion' if specs['etat'] == 'occasion' else 'inventaire')
+
+        seg_match = _SEGMENT_RE.search(url_lower)
+        if seg_match:
+            segment = seg_match.group(1)
+            specs['vehicule_type'] = self.VEHICLE_TYPE_MAP.get(
+                segment, segment.replace('-', ' ').capitalize())
+
+        name = specs.get('name', '')
+        if name and _DEMO_RE.search(name.lower()):
+            specs['etat'] = 'demonstrateur'
+
+        return specs if specs.get('name') else None
+
+    def _apply_json_ld(self, specs: Dict[str, Any], ld: Dict) -> None:
+        name = ld.get('name')
+        if self._valid(name):
+            specs['name'] = self._clean_name(str(name))
+
+        brand = ld.get('brand') or ld.get('manufacturer')
+        if isinstance(brand, dict):
+            brand = brand.get('name')
+        if self._valid(brand):
+            specs['marque'] = str(brand).strip()
+
+        model = ld.get('model')
+        if isinstance(model, dict):
+            model = model.get('name')
+        if self._valid(model):
+            specs['modele'] = self._clean_name(str(model))
+
+        year = self.clean_year(str(
+            ld.get('vehicleModelDate') or ld.get('modelDate')
+            or ld.get('productionDate') or ''))
+        if year:
+            specs['annee'] = year
+
+        color = ld.get('color')
+        if self._valid(color):
+            specs['couleur'] = str(color).strip()
+
+        mileage = ld.get('mileageFromOdometer')
+        if isinstance(mileage, dict):
+            km = self.clean_mileage(str(mileage.get('value') or ''))
+            # None/0 = odomètre non renseigné (systématique sur le neuf)
+            if km:
+                specs['kilometrage'] = km
+
+        sku = ld.get('sku') or ld.get('mpn') or ld.get('productID')
+        if self._valid(sku):
+            specs['inventaire'] = str(sku).strip()
+
+        vin = ld.get('vehicleIdentificationNumber') or ld.get('vin')
+        if self._valid(vin) and len(str(vin).strip()) >= 11:
+            specs['vin'] = str(vin).strip()
+
+        condition = str(ld.get('itemCondition', ''))
+        if 'New' in condition:
+            specs['etat'] = 'neuf'
+        elif 'Used' in condition:
+            specs['etat'] = 'occasion'
+
+        offers = ld.get('offers')
+        if isinstance(offers, list):
+            offers = offers[0] if offers else None
+        if isinstance(offers, dict):
+            price = self.clean_price(str(offers.get('price', '')))
+            if price:
+                specs['prix'] = price
+
+        image = ld.get('image')
+        if isinstance(image, list):
+            image = image[0] if image else None
+        elif isinstance(image, dict):
+            image = image.get('url') or image.get('contentUrl')
+        if self._valid(image) and str(image).startswith('http'):
+            specs['image'] = str(image)
+
+        description = ld.get('description')
+        if self._valid(description):
+            # L'écho final reprend le nom BRUT (« ADLY MOTO ADLY … ») ou le
+            # nom nettoyé → passer les deux variantes.
+            cleaned = self._clean_description(
+                str(description), (str(name or ''), specs.get('name', '')))
+            if cleaned:
+                specs['description'] = cleaned
+
+    def _apply_price_box(self, specs: Dict[str, Any], tree) -> None:
+        """Prix barré (et prix à défaut du JSON-LD) du bloc CSS PowerGO :
+        <span class="list-price … line-through">38 069 $</span>
+        <div class="sale-price …">35 499 $</div>. list-price est présent
+        même sans rabais — le garde-fou != prix filtre ce cas."""
+        boxes = tree.xpath(_XP_PRICE_BOX)
+        if not boxes:
+            return
+        price_box = boxes[0]
+        strikes = price_box.xpath(_XP_STRIKE)
+        strike = strikes[0] if strikes else None
+        if strike is not None:
+            old_price = self.clean_price(_text(strike))
+            if old_price and old_price != specs.get('prix'):
+                specs['prix_original'] = old_price
+        if not specs.get('prix'):
+            box_text = ' '.join(
+                t.strip() for t in price_box.xpath('.//text()') if t.strip())
+            strike_text = _text(strike).strip() if strike is not None else ''
+            current = self.clean_price(box_text.replace(strike_text, ''))
+            if current:
+                specs['prix'] = current
+
+    def _fill_from_name(self, specs: Dict[str, Any]) -> None:
+        """Complète marque/modèle/année manquants depuis le nom nettoyé
+        (« Kawasaki Z900 2025 »). Marque reconnue en tête de nom seulement,
+        année = 4 chiffres en fin de nom."""
+        name = specs.get('name') or ''
+        if not name:
+            return
+        low = name.lower()
+
+        if not specs.get('annee'):
+            year_match = re.search(r'\b(19|20)\d{2}\s*$', name)
+            if year_match:
+                year = self.clean_year(year_match.group(0))
+                if year:
+                    specs['annee'] = year
+
+        rest = name
+        if not specs.get('marque'):
+            for brand in self._KNOWN_BRANDS:
+                if low.startswith(brand + ' ') or low == brand:
+                    specs['marque'] = name[:len(brand)]
+                    rest = name[len(brand):].strip()
+                    break
+        elif low.startswith(str(specs['marque']).lower()):
+            rest = name[len(str(specs['marque'])):].strip()
+
+        if not specs.get('modele') and specs.get('marque'):
+            rest = re.sub(r'\b(19|20)\d{2}\s*$', '', rest).strip(' -')
+            if rest:
+                specs['modele'] = rest
+
+    def _find_vehicle_json_ld(self, tree) -> Optional[Dict]:
+        """Déballe les blocs JSON-LD (liste racine ou @graph) et retourne le
+        meilleur candidat par priorité de type — sur PowerGO le Vehicle est
+        presque toujours niché dans un @graph. Caractères de contrôle bruts
+        tolérés (strict=False, puis nettoyage)."""
+        candidates: List[Dict] = []
+
+        for raw in tree.xpath(_XP_JSON_LD):
+            raw = raw.strip()
+            try:
+                data = json.loads(raw, strict=False)
+            except (json.JSONDecodeError, TypeError):
+                try:
+                    data = json.loads(_CONTROL_CHARS_RE.sub(' ', raw), strict=False)
+                except (json.JSONDecodeError, TypeError):
+                    continue
+            candidates.extend(self._unpack_ld(data))
+
+        candidates.sort(key=lambda item: next(
+            (i for i, t in enumerate(self._LD_TYPE_PRIORITY)
+             if item.get('@type') == t), 99))
+
+        for item in candidates:
+            if item.get('@type') in self._LD_TYPE_PRIORITY:
+                return item
+        return None
+
+    def _unpack_ld(self, node: Any) -> List[Dict]:
+        results: List[Dict] = []
+        if isinstance(node, list):
+            for sub in node:
+                results.extend(self._unpack_ld(sub))
+        elif isinstance(node, dict):
+            graph = node.get('@graph')
+            if isinstance(graph, list):
+                for sub in graph:
+                    results.extend(self._unpack_ld(sub))
+            else:
+                results.append(node)
+        return results
+
+    # ──────────────────────────────────────────────────────────────
+    # DÉDUP & NETTOYAGE
+    # ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _dedup_key(product: Dict) -> Optional[str]:
+        """Chaque unité PowerGO a une URL unique (…a-vendre-<stock>) : clé =
+        sourceUrl UNIQUEMENT, jamais nom+prix (plusieurs unités identiques
+        du même modèle coexistent)."""
+        return product.get('sourceUrl', '').rstrip('/') or None
+
+    @staticmethod
+    def _fix_mojibake(text: str) -> str:
+        """Répare l'UTF-8 double-encodé des champs PowerGO (« hÃ©roÃ¯ne »)."""
+        if not text or ('Ã' not in text and 'Â' not in text and 'â' not in text):
+            return text
+        try:
+            fixed = text.encode('latin-1', errors='ignore').decode('utf-8', errors='ignore')
+            if fixed and ('Ã' not in fixed or len(fixed) < len(text)):
+                return fixed
+        except Exception:
+            pass
+        return text
+
+    def _clean_name(self, name: str) -> str:
+        if not name:
+            return name
+        name = html_lib.unescape(self._fix_mojibake(name))
+        name = re.sub(r'\s*[àa]\s+vendre.*$', '', name, flags=re.I)
+        for pattern in self._NAME_NOISE_RES:
+            name = pattern.sub('', name)
+        name = re.sub(r'\s*(\.{3}|…)\s*$', '', name)
+        name = re.sub(r'\s+', ' ', name).strip(' -|')
+        tokens = name.split(' ')
+        deduped: List[str] = []
+        for t in tokens:
+            window = self.NAME_DEDUP_WINDOW if t.isalpha() else 1
+            if any(t.casefold() == prev.casefold() for prev in deduped[-window:]):
+                continue
+            deduped.append(t)
+        return ' '.join(deduped)
+
+    def _clean_description(self, description: str, names=()) -> str:
+        """Unescape (entités parfois doublées), bannières « **…** », espaces,
+        boilerplate du site, puis écho du nom répété en fin de description
+        (sur les occasions elle n'est souvent QUE cet écho → chaîne vide)."""
+        description = html_lib.unescape(html_lib.unescape(
+            self._fix_mojibake(description)))
+        description = re.sub(r'\*{2,}', ' ', description)
+        description = re.sub(r'\s+', ' ', description).strip()
+        for pattern in self._DESC_NOISE_RES:
+            description = pattern.sub('', description).strip()
+        if isinstance(names, str):
+            names = (names,)
+        for name in names:
+            if not name:
+                continue
+            echo = re.escape(re.sub(r'\s+', ' ', name).strip())
+            description = re.sub(
+                r'(?:\s*' + echo + r'\s*)+$', '', description, flags=re.I).strip()
+        return description[:2000]
+
+    @staticmethod
+    def _valid(value) -> bool:
+        if value is None:
+            return False
+        text = str(value).strip()
+        return bool(text) and text.lower() not in ('s/o', 'n/a', 'null', '-', 'none')
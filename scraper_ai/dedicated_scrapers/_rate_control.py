@@ -0,0 +1,355 @@
+"""
+Contrôle de débit par hôte, partagé par toutes les sessions des scrapers dédiés.
+
+Chaque site réinventait sa cadence : réduction des workers de 2/3 par batch
+dans `_extract_all`, verrou global + intervalle fixe dans certains scrapers,
+`MAX_WORKERS = 1` en dur ailleurs. Ici, un `HostRateController` par hôte
+(partagé par toutes les instances du process) décide quand une requête peut
+partir :
+
+  - concurrence AIMD : +1/limite par réponse saine (≈ +1 par « fenêtre »),
+    ×0.5 sur 429 / 503 / timeout / erreur de connexion, ×0.8 quand la
+    latence lissée dépasse LATENCY_CONGESTION_FACTOR × la latence de base ;
+  - intervalle minimal entre deux départs (plancher MIN_REQUEST_INTERVAL du
+    scraper, + jitter optionnel), doublé sur 429, relâché par les succès ;
+  - Retry-After (secondes ou date HTTP) : plus aucune requête vers l'hôte
+    avant l'échéance ; un 429 est rejoué par la session après la pause.
+
+L'ajustement est continu (à chaque réponse), pas par batch. La limite et
+l'intervalle appris sont sauvegardés par domaine dans
+`scraper_cache/rate_limits.json` (`save_learned_rates`) : le cron suivant
+démarre directement à la bonne vitesse.
+
+`RateControlledSession` est la `requests.Session` de `DedicatedScraper` :
+tout `session.get/post` passe par le contrôleur de l'hôte visé, sans code
+par site. SCRAPER_RATE_CONTROL=0 garde uniquement la cadence fixe
+(MAX_WORKERS, MIN_REQUEST_INTERVAL), sans adaptation ni persistance.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+import requests
+
+RATES_PATH = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "rate_limits.json"
+
+# Taux appris plus vieux : ignorés (le site a pu changer d'hébergement)
+LEARNED_MAX_AGE_DAYS = 14
+# Facteurs AIMD
+DECREASE_FACTOR = 0.5
+LATENCY_DECREASE_FACTOR = 0.8
+LATENCY_CONGESTION_FACTOR = 2.5
+# En dessous, un écart de latence est du bruit, pas de la congestion
+LATENCY_FLOOR = 0.25
+# Intervalle entre départs : après un 429 au moins THROTTLE_MIN_INTERVAL,
+# jamais plus que MAX_INTERVAL ; chaque succès le multiplie par INTERVAL_RELAX
+THROTTLE_MIN_INTERVAL = 0.25
+MAX_INTERVAL = 10.0
+INTERVAL_RELAX = 0.95
+# Retry-After plafonné (un serveur qui demande 1 h bloquerait tout le cron)
+MAX_RETRY_AFTER = 120.0
+# Un 429 est rejoué au plus N fois par la session
+THROTTLE_RETRIES = 2
+
+
+def rate_control_enabled() -> bool:
+    """SCRAPER_RATE_CONTROL=0 : cadence fixe, sans adaptation ni persistance."""
+    return os.environ.get("SCRAPER_RATE_CONTROL", "1") not in ("0", "false", "False")
+
+
+def host_key(url_or_host: str) -> str:
+    """Hôte normalisé (minuscules, sans www.) d'une URL ou d'un domaine."""
+    text = (url_or_host or "").strip().lower()
+    host = urlparse(text).hostname if "://" in text else text.split("/")[0]
+    host = host or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Secondes d'attente d'un header Retry-After (délai ou date HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class HostRateController:
+    """Cadence et concurrence des requêtes vers un hôte. Thread-safe."""
+
+    def __init__(self, host: str, *, max_concurrency: int, min_interval: float = 0.0,
+                 jitter: float = 0.0, adaptive: bool = True,
+                 learned: Optional[Dict[str, Any]] = None) -> None:
+        self.host = host
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.min_interval = max(0.0, min_interval)
+        self.jitter = max(0.0, jitter)
+        self.adaptive = adaptive
+        self.limit = float(self.max_concurrency)
+        self.interval = self.min_interval
+        if adaptive and learned:
+            self.limit = min(float(self.max_concurrency), max(1.0, float(learned.get("limit", self.limit))))
+            self.interval = min(MAX_INTERVAL, max(self.min_interval, float(learned.get("interval", 0.0))))
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._next_start = 0.0
+        self._cooldown_until = 0.0
+        self._last_decrease = 0.0
+        self._latency: Optional[float] = None
+        self._base_latency: Optional[float] = None
+        self._stats = {"requests": 0, "throttled": 0, "errors": 0, "retry_after_waits": 0,
+                       "decreases": 0, "waited_seconds": 0.0}
+        self._start_limit = self.limit
+
+    # ── Cycle d'une requête ──
+
+    def acquire(self) -> float:
+        """Bloque jusqu'à ce qu'une requête puisse partir ; retourne l'instant
+        de départ (à repasser à `release`)."""
+        asked = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._in_flight < max(1, int(self.limit)):
+                    start_at = max(self._next_start, self._cooldown_until)
+                    if start_at <= now:
+                        self._in_flight += 1
+                        pace = self.interval + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+                        self._next_start = now + pace
+                        self._stats["waited_seconds"] += now - asked
+                        return now
+                    self._cond.wait(start_at - now)
+                else:
+                    self._cond.wait(1.0)
+
+    def release(self, started: float, *, status: Optional[int] = None, error: bool = False,
+                retry_after: Optional[float] = None) -> None:
+        """Libère le créneau et ajuste la cadence selon la réponse."""
+        now = time.monotonic()
+        latency = now - started
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._stats["requests"] += 1
+            if retry_after:
+                self._cooldown_until = max(self._cooldown_until, now + retry_after)
+                self._stats["retry_after_waits"] += 1
+            if status == 429:
+                self._stats["throttled"] += 1
+            if error:
+                self._stats["errors"] += 1
+            if self.adaptive:
+                if error or status == 429 or (status == 503 and retry_after):
+                    self._decrease(now, DECREASE_FACTOR, slow_down=status == 429)
+                elif status is not None and status < 500:
+                    self._observe(now, latency)
+            self._cond.notify_all()
+
+    def _decrease(self, now: float, factor: float, *, slow_down: bool = False) -> None:
+        # Une rafale d'échecs simultanés ne compte que pour une réduction
+        window = max(1.0, self._latency or 0.0)
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit * factor)
+        if slow_down:
+            self.interval = min(MAX_INTERVAL, max(self.interval * 2, THROTTLE_MIN_INTERVAL, self.min_interval))
+        self._stats["decreases"] += 1
+
+    def _observe(self, now: float, latency: float) -> None:
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+        if self._base_latency is None or self._latency < self._base_latency:
+            self._base_latency = self._latency
+        else:
+            # La base remonte lentement : un serveur durablement plus lent
+            # n'est pas « congestionné » pour toujours
+            self._base_latency *= 1.01
+        if self._latency > max(LATENCY_FLOOR, LATENCY_CONGESTION_FACTOR * self._base_latency):
+            self._decrease(now, LATENCY_DECREASE_FACTOR)
+            return
+        self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        self.interval = max(self.min_interval, self.interval * INTERVAL_RELAX)
+
+    def tighten(self, *, max_concurrency: int, min_interval: float = 0.0,
+                jitter: float = 0.0) -> None:
+        """Nouvel enregistrement sur l'hôte (autre scraper, autre adapter) :
+        la contrainte la plus prudente l'emporte — concurrence minimale,
+        intervalle et jitter maximaux."""
+        with self._cond:
+            cap = max(1, int(max_concurrency))
+            if cap < self.max_concurrency:
+                self.max_concurrency = cap
+                self.limit = min(self.limit, float(cap))
+                self._start_limit = min(self._start_limit, float(cap))
+            if min_interval > self.min_interval:
+                self.min_interval = min_interval
+                self.interval = max(self.interval, min_interval)
+            self.jitter = max(self.jitter, jitter)
+
+    def penalize(self, cooldown: float) -> None:
+        """Signal externe de blocage (ex. rafale de 403 anti-bot) : réduction
+        et pause de `cooldown` secondes pour tout l'hôte."""
+        with self._cond:
+            now = time.monotonic()
+            self._cooldown_until = max(self._cooldown_until, now + cooldown)
+            if self.adaptive:
+                self._decrease(now, DECREASE_FACTOR, slow_down=True)
+            self._cond.notify_all()
+
+    # ── État ──
+
+    def learned(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "interval": round(self.interval, 3),
+                "latency_ms": round(self._latency * 1000) if self._latency is not None else None,
+                "updated_at": time.time(),
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            data: Dict[str, Any] = dict(self._stats)
+            data["waited_seconds"] = round(data["waited_seconds"], 1)
+            data["start_limit"] = round(self._start_limit, 2)
+            data["limit"] = round(self.limit, 2)
+            data["interval"] = round(self.interval, 3)
+            if self._latency is not None:
+                data["latency_ms"] = round(self._latency * 1000)
+            return data
+
+
+_controllers: Dict[str, HostRateController] = {}
+_controllers_lock = threading.Lock()
+_learned: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def _learned_rates() -> Dict[str, Dict[str, Any]]:
+    # Appelé sous _controllers_lock
+    global _learned
+    if _learned is None:
+        _learned = _read_rates()
+    return _learned
+
+
+def _read_rates() -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads(RATES_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    cutoff = time.time() - LEARNED_MAX_AGE_DAYS * 86400
+    return {host: entry for host, entry in data.items()
+            if isinstance(entry, dict) and entry.get("updated_at", 0) >= cutoff}
+
+
+def host_controller(host: str, *, max_concurrency: int, min_interval: float = 0.0,
+                    jitter: float = 0.0) -> HostRateController:
+    """Contrôleur partagé de `host` (créé au premier appel, avec le taux
+    appris lors des runs précédents). Chaque appel suivant resserre les
+    bornes (`HostRateController.tighten`) : quel que soit l'ordre
+    d'enregistrement, l'hôte est borné par la plus petite concurrence et
+    le plus grand intervalle demandés."""
+    key = host_key(host)
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is None:
+            adaptive = rate_control_enabled()
+            controller = _controllers[key] = HostRateController(
+                key, max_concurrency=max_concurrency, min_interval=min_interval, jitter=jitter,
+                adaptive=adaptive, learned=_learned_rates().get(key) if adaptive else None,
+            )
+        else:
+            controller.tighten(max_concurrency=max_concurrency, min_interval=min_interval,
+                               jitter=jitter)
+        return controller
+
+
+def save_learned_rates(hosts: Optional[Iterable[str]] = None) -> None:
+    """Fusionne les taux appris (de `hosts`, ou de tous les contrôleurs)
+    dans `scraper_cache/rate_limits.json`."""
+    if not rate_control_enabled():
+        return
+    with _controllers_lock:
+        keys = [host_key(h) for h in hosts] if hosts is not None else list(_controllers)
+        updates = {k: _controllers[k].learned() for k in keys
+                   if k in _controllers and _controllers[k].snapshot()["requests"]}
+        if not updates:
+            return
+        # Relu juste avant l'écriture : les workers cron d'autres process
+        # ont pu sauvegarder leurs propres hôtes entre-temps
+        rates = _read_rates()
+        rates.update(updates)
+        try:
+            RATES_PATH.parent.mkdir(parents=True, exist_ok=True)
+            tmp = RATES_PATH.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(rates, indent=1, sort_keys=True), encoding="utf-8")
+            tmp.replace(RATES_PATH)
+        except OSError:
+            pass
+        learned = _learned_rates()
+        learned.update(updates)
+
+
+class RateControlledSession(requests.Session):
+    """Session dont chaque requête passe par le contrôleur de son hôte."""
+
+    def __init__(self, *, max_concurrency: int, min_interval: float = 0.0,
+                 jitter: float = 0.0) -> None:
+        super().__init__()
+        self.rate_max_concurrency = max_concurrency
+        self.rate_min_interval = min_interval
+        self.rate_jitter = jitter
+        self.rate_hosts: set = set()
+        self._local = threading.local()
+
+    def controller(self, host: str) -> HostRateController:
+        key = host_key(host)
+        self.rate_hosts.add(key)
+        return host_controller(key, max_concurrency=self.rate_max_concurrency,
+                               min_interval=self.rate_min_interval, jitter=self.rate_jitter)
+
+    def send(self, request, **kwargs):
+        # Redirections suivies par Session.send : même créneau que la requête d'origine
+        if getattr(self._local, "active", False):
+            return super().send(request, **kwargs)
+        controller = self.controller(request.url)
+        self._local.active = True
+        try:
+            for attempt in range(THROTTLE_RETRIES + 1):
+                started = controller.acquire()
+                try:
+                    response = super().send(request, **kwargs)
+                except Exception as e:
+                    controller.release(started, error=isinstance(
+                        e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)))
+                    raise
+                retry_after = None
+                if response.status_code in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                controller.release(started, status=response.status_code, retry_after=retry_after)
+                if response.status_code != 429 or attempt == THROTTLE_RETRIES:
+                    return response
+                response.close()
+        finally:
+            self._local.active = False
+
+    def rate_report(self) -> Dict[str, Dict[str, Any]]:
+        """Compteurs des contrôleurs des hôtes visités par cette session."""
+        with _controllers_lock:
+            controllers = {h: _controllers[h] for h in self.rate_hosts if h in _controllers}
+        return {h: c.snapshot() for h, c in controllers.items() if c.snapshot()["requests"]}
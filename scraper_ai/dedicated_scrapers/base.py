@@ -6,13 +6,19 @@ méthodes d'extraction avec des sélecteurs CSS hardcodés.
 import re
 import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import Any, Dict, Iterator, List, Optional
 from urllib.parse import urlparse, urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from bs4 import BeautifulSoup
 
+from ._http_cache import ConditionalCacheAdapter, cache_enabled
+from ._incremental import DEFAULT_MAX_AGE_HOURS, IncrementalStore
+from ._rate_control import (
+    HostRateController, RateControlledSession, rate_control_enabled, save_learned_rates,
+)
+
 
 class DedicatedScraper(ABC):
     """Classe abstraite pour les scrapers dédiés (sans Gemini)."""
@@ -27,8 +33,40 @@ class DedicatedScraper(ABC):
     FUTURE_RESULT_TIMEOUT: int = 30
     MAX_RETRIES_PER_URL: int = 2
 
+    # Mode incrémental (cf. _incremental.py) : une page détail dont le
+    # <lastmod> sitemap n'a pas bougé est réutilisée depuis le store local
+    # pendant au plus INCREMENTAL_MAX_AGE_HOURS.
+    INCREMENTAL_MAX_AGE_HOURS: float = DEFAULT_MAX_AGE_HOURS
+
+    # Requêtes conditionnelles (ETag / Last-Modified) via _http_cache.py.
+    # Désactivable par site, ou globalement avec SCRAPER_HTTP_CACHE=0.
+    HTTP_VALIDATOR_CACHE: bool = True
+
+    # Moteur asyncio pour les pages détail (cf. _async_fetch.py), opt-in par
+    # site ou globalement avec SCRAPER_ASYNC_FETCH=1. ASYNC_PER_HOST vaut
+    # MAX_WORKERS par défaut ; ASYNC_PARSE_WORKERS=0 parse en thread.
+    ASYNC_FETCH: bool = False
+    ASYNC_PER_HOST: Optional[int] = None
+    ASYNC_MAX_CONNECTIONS: int = 64
+    ASYNC_PARSE_WORKERS: Optional[int] = None
+
+    # Contrôle de débit par hôte (cf. _rate_control.py) : MAX_WORKERS est le
+    # plafond de requêtes simultanées, la cadence réelle est apprise (AIMD,
+    # Retry-After) et persistée entre les runs. MIN_REQUEST_INTERVAL impose
+    # un écart minimal entre deux départs (+ jitter aléatoire ≤ REQUEST_JITTER).
+    MIN_REQUEST_INTERVAL: float = 0.0
+    REQUEST_JITTER: float = 0.0
+
     def __init__(self):
-        self.session = requests.Session()
+        self.session = RateControlledSession(
+            max_concurrency=self.MAX_WORKERS,
+            min_interval=self.MIN_REQUEST_INTERVAL,
+            jitter=self.REQUEST_JITTER,
+        )
+        self._incremental: Optional[IncrementalStore] = None
+        self._async_fetch_report: Optional[Dict[str, Any]] = None
+        # Métadonnées du dernier `scrape` / `iter_products` terminé
+        self.last_scrape_metadata: Dict[str, Any] = {}
 
         try:
             import brotli  # noqa: F401
@@ -59,18 +97,82 @@ class DedicatedScraper(ABC):
             }
         base_headers['Accept-Encoding'] = accept_enc
         self.session.headers.update(base_headers)
-        adapter = requests.adapters.HTTPAdapter(
+        adapter_cls = (
+            ConditionalCacheAdapter
+            if self.HTTP_VALIDATOR_CACHE and cache_enabled()
+            else requests.adapters.HTTPAdapter
+        )
+        adapter = adapter_cls(
             pool_connections=20,
             pool_maxsize=20,
+            # 429 : rejoué par RateControlledSession (Retry-After, réduction
+            # de cadence de tout l'hôte), pas en silence par urllib3
             max_retries=requests.adapters.Retry(
                 total=4, backoff_factor=1.0,
-                status_forcelist=[429, 500, 502, 503, 504],
+                status_forcelist=[500, 502, 503, 504],
                 allowed_methods=["GET", "HEAD"],
                 respect_retry_after_header=True,
             )
         )
         self.session.mount('http://', adapter)
         self.session.mount('https://', adapter)
+        self._http_adapter = adapter
+
+    def enable_incremental(self, max_age_hours: Optional[float] = None) -> None:
+        """Active le re-scrape incrémental piloté par les <lastmod> des sitemaps.
+
+        Aucun code par site : les sitemaps passent déjà par `self.session`
+        (hook de réponse) et les pages détail par `_fetch_and_extract` ou
+        `_fetch_and_parse_detail(url, ...)`, enveloppés ici.
+        """
+        if self._incremental is not None:
+            return
+        store = IncrementalStore(
+            self.SITE_SLUG,
+            max_age_hours=max_age_hours if max_age_hours is not None else self.INCREMENTAL_MAX_AGE_HOURS,
+        )
+        self._incremental = store
+        self.session.hooks['response'].append(self._capture_sitemap_lastmods)
+        for name in ('_fetch_and_extract', '_fetch_and_parse_detail'):
+            method = getattr(self, name, None)
+            if callable(method):
+                setattr(self, name, store.wrap(method))
+
+    def incremental_report(self) -> Optional[Dict[str, Any]]:
+        """Sauvegarde le store incrémental et retourne ses compteurs (None si inactif)."""
+        if self._incremental is None:
+            return None
+        self._incremental.save()
+        return self._incremental.stats()
+
+    def rate_control_report(self) -> Dict[str, Dict[str, Any]]:
+        """Sauvegarde les cadences apprises et retourne les compteurs du
+        contrôleur de débit, par hôte visité."""
+        save_learned_rates(self.session.rate_hosts)
+        return self.session.rate_report()
+
+    def _rate_controller(self, host: Optional[str] = None) -> HostRateController:
+        """Contrôleur de débit de `host` (défaut : le site), pour les requêtes
+        qui ne passent pas par `self.session` (navigateur…)."""
+        return self.session.controller(host or self.SITE_DOMAIN or self.SITE_URL)
+
+    def http_cache_report(self) -> Dict[str, Dict[str, Any]]:
+        """Compteurs hit/304/miss du cache de validateurs, par domaine."""
+        if isinstance(self._http_adapter, ConditionalCacheAdapter):
+            return self._http_adapter.stats()
+        return {}
+
+    def _capture_sitemap_lastmods(self, response, *args, **kwargs):
+        """Hook requests : mémorise les <lastmod> de tout sitemap XML récupéré."""
+        try:
+            if response.status_code != 200:
+                return
+            content_type = response.headers.get('Content-Type', '').lower()
+            if 'xml' not in content_type and not urlparse(response.url).path.endswith('.xml'):
+                return
+            self._incremental.record_sitemap(response.text)
+        except Exception:
+            pass
 
     @abstractmethod
     def discover_product_urls(self, categories: List[str] = None) -> List[str]:
@@ -82,6 +184,37 @@ class DedicatedScraper(ABC):
 
     def scrape(self, categories: List[str] = None, inventory_only: bool = False) -> Dict[str, Any]:
         """Pipeline complet: découverte URLs → extraction parallèle → résultats."""
+        products = list(self._stream_products(categories, inventory_only))
+        return {
+            'products': products,
+            'metadata': self.last_scrape_metadata,
+            'scraper_info': {
+                'type': 'dedicated',
+                'module': self.SITE_SLUG,
+                'selectors': 'hardcoded',
+            }
+        }
+
+    def iter_products(self, categories: List[str] = None,
+                      inventory_only: bool = False) -> Iterator[Dict]:
+        """Variante en flux de `scrape` : chaque produit est produit dès que sa
+        page détail est parsée, dédupliqué au fil de l'eau (seules les clés de
+        déduplication restent en mémoire). Une fois le générateur épuisé,
+        `last_scrape_metadata` contient les métadonnées de `scrape`.
+
+        Un scraper qui surcharge `scrape` (regroupement des unités identiques,
+        parcours propre au site) a besoin de tout l'inventaire avant de
+        conclure : ses produits sont émis d'un bloc à la fin.
+        """
+        if type(self).scrape is not DedicatedScraper.scrape:
+            result = self.scrape(categories=categories, inventory_only=inventory_only)
+            self.last_scrape_metadata = result.get('metadata', {})
+            yield from result.get('products', [])
+            return
+        yield from self._stream_products(categories, inventory_only)
+
+    def _stream_products(self, categories: Optional[List[str]],
+                         inventory_only: bool) -> Iterator[Dict]:
         start_time = time.time()
 
         print(f"\n{'='*70}")
@@ -95,42 +228,58 @@ class DedicatedScraper(ABC):
 
         if not product_urls:
             elapsed = time.time() - start_time
-            return self._empty_result(elapsed)
-
-        products = self._extract_all(product_urls)
+            self.last_scrape_metadata = self._empty_result(elapsed)['metadata']
+            return
 
-        if inventory_only:
-            products = [p for p in products if p.get('sourceCategorie') != 'catalogue']
+        count = 0
+        for product in self._iter_extracted(product_urls):
+            if inventory_only and product.get('sourceCategorie') == 'catalogue':
+                continue
+            count += 1
+            yield product
 
         elapsed = time.time() - start_time
 
         print(f"\n{'='*70}")
-        print(f"✅ {self.SITE_NAME}: {len(products)} produits en {elapsed:.1f}s")
+        print(f"✅ {self.SITE_NAME}: {count} produits en {elapsed:.1f}s")
         print(f"{'='*70}")
 
-        return {
-            'products': products,
-            'metadata': {
-                'site_url': self.SITE_URL,
-                'site_name': self.SITE_NAME,
-                'scraper_type': 'dedicated',
-                'scraper_module': self.SITE_SLUG,
-                'products_count': len(products),
-                'urls_processed': len(product_urls),
-                'execution_time_seconds': round(elapsed, 2),
-                'categories': categories or ['inventaire', 'occasion'],
-                'cache_status': 'dedicated',
-            },
-            'scraper_info': {
-                'type': 'dedicated',
-                'module': self.SITE_SLUG,
-                'selectors': 'hardcoded',
-            }
+        metadata = {
+            'site_url': self.SITE_URL,
+            'site_name': self.SITE_NAME,
+            'scraper_type': 'dedicated',
+            'scraper_module': self.SITE_SLUG,
+            'products_count': count,
+            'urls_processed': len(product_urls),
+            'execution_time_seconds': round(elapsed, 2),
+            'categories': categories or ['inventaire', 'occasion'],
+            'cache_status': 'dedicated',
         }
+        if self._async_fetch_report is not None:
+            metadata['async_fetch'] = self._async_fetch_report
+        self.last_scrape_metadata = metadata
 
     def _extract_all(self, urls: List[str]) -> List[Dict]:
         """Extraction parallèle de toutes les URLs avec retry et concurrence adaptative."""
-        all_products = []
+        return list(self._iter_extracted(urls))
+
+    def _iter_extracted(self, urls: List[str]) -> Iterator[Dict]:
+        """`_extract_all` en flux : chaque produit unique est produit dès que
+        sa page détail est parsée (ordre d'achèvement, premier vu gardé)."""
+        if self._use_async_fetch():
+            yield from self._extract_all_async(urls)
+            return
+        if type(self)._deduplicate is not DedicatedScraper._deduplicate:
+            # Déduplication propre au site : elle voit toute la liste
+            yield from self._deduplicate(list(self._iter_extracted_raw(urls)))
+            return
+        yield from self._iter_extracted_raw(urls, dedup=True)
+
+    def _iter_extracted_raw(self, urls: List[str], dedup: bool = False) -> Iterator[Dict]:
+        """Fetch + parse parallèles avec retries ; `dedup` filtre par `_dedup_key`."""
+        seen: set = set()
+        unique = 0
+        extracted = 0
         total = len(urls)
         processed = 0
         workers = min(self.MAX_WORKERS, total)
@@ -143,6 +292,9 @@ class DedicatedScraper(ABC):
         per_url_timeout = max(self.HTTP_TIMEOUT + 15, self.FUTURE_RESULT_TIMEOUT)
         global_timeout = max(600, total * per_url_timeout // workers)
 
+        # Contrôle de débit adaptatif : la concurrence réelle est réglée en
+        # continu par le contrôleur de l'hôte, plus de redimensionnement par batch
+        adaptive = rate_control_enabled()
         print(f"\n📥 Extraction de {total} pages ({workers} workers, timeout HTTP {self.HTTP_TIMEOUT}s)...")
 
         remaining_urls = list(urls)
@@ -165,9 +317,14 @@ class DedicatedScraper(ABC):
                         url = futures[future]
                         try:
                             product = future.result(timeout=self.FUTURE_RESULT_TIMEOUT)
-                            if product:
-                                all_products.append(product)
                             batch_ok += 1
+                            if product:
+                                extracted += 1
+                                key = self._dedup_key(product) if dedup else None
+                                if key is None or key not in seen:
+                                    seen.add(key)
+                                    unique += 1
+                                    yield product
                         except Exception as e:
                             err_str = str(e).lower()
                             if 'timeout' in err_str or 'timed out' in err_str:
@@ -178,7 +335,7 @@ class DedicatedScraper(ABC):
                         if processed % 50 == 0 or processed == total:
                             elapsed = time.time() - extract_start
                             rate = processed / elapsed if elapsed > 0 else 0
-                            print(f"   📊 [{processed}/{total}] {len(all_products)} produits — {rate:.1f} URLs/s")
+                            print(f"   📊 [{processed}/{total}] {extracted} produits — {rate:.1f} URLs/s")
                 except TimeoutError:
                     pending = len(batch) - (batch_ok + batch_timeouts)
                     timeout_count += pending
@@ -186,13 +343,15 @@ class DedicatedScraper(ABC):
                     failed_urls.extend(timed_out_urls)
                     print(
                         f"   ⚠️  Batch timeout — {pending} URL(s) abandonnée(s), "
-                        f"{len(all_products)} produit(s) conservé(s)"
+                        f"{extracted} produit(s) conservé(s)"
                     )
                     for future in futures:
                         future.cancel()
 
             batch_total = batch_ok + batch_timeouts
-            if batch_total > 0 and batch_timeouts / batch_total > 0.25:
+            if adaptive or not batch_total:
+                continue
+            if batch_timeouts / batch_total > 0.25:
                 old_w = workers
                 workers = max(3, workers * 2 // 3)
                 if workers != old_w:
@@ -233,8 +392,13 @@ class DedicatedScraper(ABC):
                             try:
                                 product = future.result(timeout=self.FUTURE_RESULT_TIMEOUT + 10)
                                 if product:
-                                    all_products.append(product)
                                     retry_successes += 1
+                                    extracted += 1
+                                    key = self._dedup_key(product) if dedup else None
+                                    if key is None or key not in seen:
+                                        seen.add(key)
+                                        unique += 1
+                                        yield product
                             except Exception:
                                 still_failed.append(url)
                     except TimeoutError:
@@ -246,10 +410,40 @@ class DedicatedScraper(ABC):
                 urls_to_retry = still_failed
 
         elapsed = time.time() - extract_start
-        unique = self._deduplicate(all_products)
 
         if timeout_count > 0:
             print(f"   ⚠️  {timeout_count} timeout(s) au total, {len(failed_urls)} URL(s) définitivement échouée(s)")
+        if dedup:
+            print(f"   ✅ {unique} produits uniques (dédupliqués de {extracted}) en {elapsed:.1f}s")
+        else:
+            print(f"   ✅ {extracted} produits extraits en {elapsed:.1f}s")
+
+    def _use_async_fetch(self) -> bool:
+        """Moteur async seulement si le fetch détail n'est pas surchargé."""
+        from ._async_fetch import async_fetch_enabled
+        return (
+            async_fetch_enabled(self.ASYNC_FETCH)
+            and type(self)._fetch_and_extract is DedicatedScraper._fetch_and_extract
+        )
+
+    def _extract_all_async(self, urls: List[str]) -> List[Dict]:
+        """Même contrat que `_extract_all`, via AsyncDetailEngine."""
+        from ._async_fetch import AsyncDetailEngine
+
+        engine = AsyncDetailEngine(self)
+        extract_start = time.time()
+        print(
+            f"\n📥 Extraction async de {len(urls)} pages (≤{engine.per_host}/hôte, "
+            f"HTTP/{'2' if engine.http2 else '1.1'}, parsing {engine.parse_workers or 'thread'}, "
+            f"timeout HTTP {self.HTTP_TIMEOUT}s)..."
+        )
+        all_products = engine.run(urls)
+        report = self._async_fetch_report = engine.report()
+
+        elapsed = time.time() - extract_start
+        unique = self._deduplicate(all_products)
+        if report['failed'] or report['timeouts']:
+            print(f"   ⚠️  {report['timeouts']} timeout(s), {report['failed']} URL(s) définitivement échouée(s)")
         print(f"   ✅ {len(unique)} produits uniques (dédupliqués de {len(all_products)}) en {elapsed:.1f}s")
         return unique
 
@@ -261,47 +455,69 @@ class DedicatedScraper(ABC):
             if response.status_code != 200:
                 return None
 
-            if response.history:
-                original_path = urlparse(url).path.rstrip('/')
-                final_path = urlparse(response.url).path.rstrip('/')
-                if original_path != final_path:
-                    orig_last = original_path.split('/')[-1] if original_path else ''
-                    if orig_last and orig_last not in final_path:
-                        return None
-
-            html = response.text
-            soup = BeautifulSoup(html, 'lxml')
-
-            product = self.extract_from_detail_page(url, html, soup)
-            if product:
-                product['sourceUrl'] = url
-                product['sourceSite'] = self.SITE_URL
-                product['quantity'] = 1
-                product['groupedUrls'] = [url]
+            if response.history and self._redirected_elsewhere(url, response.url):
+                return None
 
-            return product
+            return self._parse_detail(url, response.text)
 
         except requests.exceptions.Timeout:
             raise
         except Exception:
             return None
 
+    @staticmethod
+    def _redirected_elsewhere(url: str, final_url: str) -> bool:
+        """Redirection vers une autre page (fiche vendue → listing, accueil…)."""
+        original_path = urlparse(url).path.rstrip('/')
+        final_path = urlparse(final_url).path.rstrip('/')
+        if original_path == final_path:
+            return False
+        orig_last = original_path.split('/')[-1] if original_path else ''
+        return bool(orig_last) and orig_last not in final_path
+
+    def _parse_detail(self, url: str, html: str) -> Optional[Dict]:
+        """Parse le HTML d'une page détail et complète les champs de source.
+
+        Sans I/O : appelé par `_fetch_and_extract` et par le moteur async
+        (_async_fetch.py), éventuellement dans un process de parsing.
+        """
+        product = self._extract_detail(url, html)
+        if product:
+            product['sourceUrl'] = url
+            product['sourceSite'] = self.SITE_URL
+            product['quantity'] = 1
+            product['groupedUrls'] = [url]
+        return product
+
+    def _extract_detail(self, url: str, html: str) -> Optional[Dict]:
+        """Construit la soupe et délègue à `extract_from_detail_page`.
+
+        Les moteurs de plateforme (_powergo.py) le surchargent pour parser
+        sans BeautifulSoup.
+        """
+        soup = BeautifulSoup(html, 'lxml')
+        return self.extract_from_detail_page(url, html, soup)
+
     def _deduplicate(self, products: List[Dict]) -> List[Dict]:
-        """Déduplique par inventaire/stock ou par nom+prix."""
-        seen = {}
+        """Déduplique selon `_dedup_key` (premier vu gardé)."""
+        seen = set()
         unique = []
         for p in products:
-            stock = p.get('inventaire', '')
-            if stock:
-                key = stock.lower().strip()
-            else:
-                key = f"{p.get('name', '')}-{p.get('prix', 0)}".lower()
-
-            if key not in seen:
-                seen[key] = True
+            key = self._dedup_key(p)
+            if key is None or key not in seen:
+                seen.add(key)
                 unique.append(p)
         return unique
 
+    @staticmethod
+    def _dedup_key(product: Dict) -> Optional[str]:
+        """Clé de déduplication : inventaire/stock, sinon nom+prix.
+        None = produit jamais dédupliqué."""
+        stock = product.get('inventaire', '')
+        if stock:
+            return stock.lower().strip()
+        return f"{product.get('name', '')}-{product.get('prix', 0)}".lower()
+
     def _empty_result(self, elapsed: float) -> Dict:
         return {
             'products': [],
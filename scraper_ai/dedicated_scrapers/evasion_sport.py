@@ -28,7 +28,8 @@ LISTING-ONLY :
   3. Garde-fou anti-partiel : si la pagination du listing principal est
      interrompue avant la dernière page annoncée, échec FRANC (l'ancien
      cache est conservé) — jamais de sauvegarde tronquée « success ».
-  4. Pacing REQUEST_DELAY_S entre les pages (en plus des 2-4 s de rendu).
+  4. Pacing MIN_REQUEST_INTERVAL entre les pages via le contrôleur de débit
+     de l'hôte (en plus des 2-4 s de rendu ; 403 → ralentissement).
 
 Champs indisponibles côté listing : km, couleur, VIN, description utile
 (la description carte = écho du nom + boilerplate) → omis honnêtement.
@@ -60,7 +61,7 @@ class EvasionSportScraper(DedicatedScraper):
     # Jamais de fiches détail sur ce site (anti-bot) — listing-only via
     # navigateur (le rendu ajoute ~2-4 s/page, pacing léger en plus).
     MAX_WORKERS = 1
-    REQUEST_DELAY_S = 0.4
+    MIN_REQUEST_INTERVAL = 0.4
     LISTING_MAX_PAGES = 200
     LISTING_MAX_CONSECUTIVE_FAILS = 3
 
@@ -239,12 +240,19 @@ class EvasionSportScraper(DedicatedScraper):
         if self._browser is None:
             from ._browser_runtime import BrowserRuntime
             self._browser = BrowserRuntime(log_fn=lambda _m: None).start()
-        if self._request_count:
-            time.sleep(self.REQUEST_DELAY_S)
+        # Rendus hors `self.session` : même contrôleur de débit que le reste du site
+        controller = self._rate_controller()
+        started = controller.acquire()
         self._request_count += 1
-        result = self._browser.render(url, networkidle_ms=3000, post_load_wait_ms=800)
+        try:
+            result = self._browser.render(url, networkidle_ms=3000, post_load_wait_ms=800)
+        except Exception:
+            controller.release(started, error=True)
+            raise
         html = result.html or ''
-        if result.status == 403 or 'temporarily blocked' in html:
+        blocked = result.status == 403 or 'temporarily blocked' in html
+        controller.release(started, status=429 if blocked else result.status, error=not html)
+        if blocked:
             raise RuntimeError("403 anti-bot")
         if not html:
             raise RuntimeError(f"render vide (status={result.status}, err={result.error})")
@@ -381,19 +389,11 @@ class EvasionSportScraper(DedicatedScraper):
     # DÉDUP & NETTOYAGE
     # ──────────────────────────────────────────────────────────────
 
-    def _deduplicate(self, products: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _dedup_key(product: Dict) -> Optional[str]:
         """L'adid (dans l'URL) identifie l'unité : clé = sourceUrl UNIQUEMENT,
         jamais nom+prix (plusieurs unités identiques du même modèle)."""
-        seen_urls: set = set()
-        unique: List[Dict] = []
-        for product in products:
-            url = product.get('sourceUrl', '').rstrip('/')
-            if url and url in seen_urls:
-                continue
-            if url:
-                seen_urls.add(url)
-            unique.append(product)
-        return unique
+        return product.get('sourceUrl', '').rstrip('/') or None
 
     @staticmethod
     def _fix_mojibake(text: str) -> str:
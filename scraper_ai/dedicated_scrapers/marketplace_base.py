@@ -17,6 +17,14 @@ référence n'a encore de produits dans `scraped_site_data`, on retombe
 sur la liste de seeds génériques par défaut pour garder un snapshot
 minimal disponible.
 
+Exécution : les seeds passent par `SEED_WORKERS` workers en parallèle,
+chacun avec son propre adaptateur (donc son propre contexte navigateur
+prêté par le pool Chromium). Un budget de politesse par marketplace
+(`SEEDS_PER_MINUTE`) espace les départs de seeds, tous workers et
+instances confondus. Les seeds larges ("honda") passent avant les seeds
+étroites ("honda crf450r") : si la recherche large est exhaustive (liste
+non tronquée), les seeds qu'elle couvre sont sautées.
+
 Le scraper hérite de `DedicatedScraper` pour s'intégrer naturellement
 avec le scraper_cron.py horaire (qui scrape tous les `shared_scrapers`
 actifs).
@@ -24,12 +32,15 @@ actifs).
 from __future__ import annotations
 
 import os
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 
 import requests
 from bs4 import BeautifulSoup
 
+from ._browser_pool import browser_pool_stats, log_browser_pool_stats
 from .base import DedicatedScraper
 
 # Seeds de fallback : marques powersport courantes. Utilisées seulement
@@ -52,6 +63,9 @@ DEFAULT_MARKETPLACE_SEEDS: List[str] = [
 # 80 seeds × 30 résultats = 2 400 produits, ~30 min Playwright = OK.
 MAX_TARGETED_SEEDS = 80
 
+# Parallélisme par défaut = taille par défaut du pool Chromium
+DEFAULT_SEED_WORKERS = 2
+
 
 class MarketplaceSnapshotScraper(DedicatedScraper):
     """Scraper qui interroge un adaptateur de recherche fédérée avec des
@@ -64,12 +78,17 @@ class MarketplaceSnapshotScraper(DedicatedScraper):
     Les sous-classes peuvent override :
       - DEFAULT_SEEDS : seeds de fallback (si aucune référence dispo)
       - PER_SEED_MAX_RESULTS : nb de hits par requête
+      - SEED_WORKERS : seeds exécutées en parallèle (env
+        MARKETPLACE_SEED_WORKERS prioritaire)
+      - SEEDS_PER_MINUTE : budget de politesse du marketplace (0 = aucun)
     """
 
-    MAX_WORKERS: int = 1  # adaptateurs Playwright → un seul à la fois
+    MAX_WORKERS: int = 1  # pages détail : non utilisées par les marketplaces
     DEFAULT_SEEDS: List[str] = DEFAULT_MARKETPLACE_SEEDS
     PER_SEED_MAX_RESULTS: int = 30
     PER_SEED_TIMEOUT_SECONDS: int = 60
+    SEED_WORKERS: int = DEFAULT_SEED_WORKERS
+    SEEDS_PER_MINUTE: float = 12.0
 
     def _build_adapter(self):
         """À implémenter dans les sous-classes — retourne un SearchAdapter prêt."""
@@ -108,17 +127,27 @@ class MarketplaceSnapshotScraper(DedicatedScraper):
             print(f"   ❌ Échec construction adaptateur {self.SITE_DOMAIN}: {e}")
             return self._empty_marketplace_result(start_time=start_time)
 
+        plan = _SeedPlan(seeds)
+        workers = max(1, min(self._seed_workers(), len(plan)))
+        budget = _politeness_budget(self.SITE_DOMAIN, self.SEEDS_PER_MINUTE)
+        if workers > 1:
+            pace = f"{self.SEEDS_PER_MINUTE:g} seeds/min max" if self.SEEDS_PER_MINUTE > 0 else "sans budget"
+            print(f"   ⚡ {workers} workers en parallèle ({pace})")
+
         all_products: List[Dict[str, Any]] = []
         seen_urls: set[str] = set()
-        success_seeds = 0
-
-        for seed in seeds:
-            try:
-                query = self._build_query_for_seed(SearchQuery, seed)
-                seed_start = time.time()
-                hits = adapter.search(query, max_results=self.PER_SEED_MAX_RESULTS) or []
-                elapsed = time.time() - seed_start
-                kept = 0
+        lock = threading.Lock()
+        counters = {'executed': 0, 'succeeded': 0}
+
+        def run_seed(worker_adapter, seed: str) -> bool:
+            """Exécute une seed ; True si sa recherche est exhaustive."""
+            query = self._build_query_for_seed(SearchQuery, seed)
+            budget.acquire()
+            seed_start = time.time()
+            hits = worker_adapter.search(query, max_results=self.PER_SEED_MAX_RESULTS) or []
+            elapsed = time.time() - seed_start
+            kept = 0
+            with lock:
                 for hit in hits:
                     url = getattr(hit, "source_url", "") or ""
                     if url and url in seen_urls:
@@ -130,16 +159,50 @@ class MarketplaceSnapshotScraper(DedicatedScraper):
                         seen_urls.add(url)
                     all_products.append(product)
                     kept += 1
-                success_seeds += 1
-                print(f"   ✅ seed '{seed}': {kept} produit(s) en {elapsed:.1f}s")
-            except Exception as e:
-                print(f"   ⚠️  seed '{seed}' a échoué: {type(e).__name__} — {e}")
-                continue
-
+                counters['succeeded'] += 1
+            print(f"   ✅ seed '{seed}': {kept} produit(s) en {elapsed:.1f}s")
+            return self._search_exhaustive(worker_adapter, hits)
+
+        def worker(worker_adapter) -> None:
+            if worker_adapter is None:
+                # Un adaptateur par worker : l'état par recherche
+                # (last_products_scanned, session, contexte) n'est pas partagé
+                try:
+                    worker_adapter = self._build_adapter()
+                except Exception as e:
+                    print(f"   ⚠️  Worker {self.SITE_DOMAIN} sans adaptateur: {e}")
+                    return
+            while True:
+                seed = plan.next()
+                if seed is None:
+                    return
+                exhaustive = False
+                with lock:
+                    counters['executed'] += 1
+                try:
+                    exhaustive = run_seed(worker_adapter, seed)
+                except Exception as e:
+                    print(f"   ⚠️  seed '{seed}' a échoué: {type(e).__name__} — {e}")
+                finally:
+                    plan.done(seed, exhaustive)
+
+        if workers == 1:
+            worker(adapter)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="seed") as executor:
+                for future in [executor.submit(worker, adapter if i == 0 else None)
+                               for i in range(workers)]:
+                    future.result()
+
+        success_seeds = counters['succeeded']
+        executed = counters['executed']
         elapsed = time.time() - start_time
+        seeds_per_minute = executed / (elapsed / 60) if elapsed > 0 else 0.0
         print(f"\n{'='*70}")
         print(f"✅ {self.SITE_NAME}: {len(all_products)} produit(s) "
-              f"({success_seeds}/{len(seeds)} seeds OK) en {elapsed:.1f}s")
+              f"({success_seeds}/{executed} seeds OK, {len(plan.skipped)} couverte(s)) "
+              f"en {elapsed:.1f}s — {seeds_per_minute:.1f} seeds/min")
+        log_browser_pool_stats()
         print(f"{'='*70}")
 
         return {
@@ -151,10 +214,19 @@ class MarketplaceSnapshotScraper(DedicatedScraper):
                 'scraper_module': self.SITE_SLUG,
                 'products_count': len(all_products),
                 'seeds_source': seed_source,
-                'seeds_executed': len(seeds),
+                'seeds_total': len(seeds),
+                'seeds_executed': executed,
                 'seeds_succeeded': success_seeds,
+                # Seeds sautées : en double, ou couvertes par une seed plus
+                # large dont la recherche était exhaustive
+                'seeds_skipped_duplicate': plan.duplicates,
+                'seeds_skipped_covered': len(plan.skipped),
+                'seed_workers': workers,
+                'seeds_per_minute': round(seeds_per_minute, 2),
                 'execution_time_seconds': round(elapsed, 2),
                 'cache_status': 'marketplace',
+                # Compteurs du pool Chromium (cumulés sur le process)
+                'browser_pool': browser_pool_stats(),
             },
             'scraper_info': {
                 'type': 'marketplace_snapshot',
@@ -162,6 +234,25 @@ class MarketplaceSnapshotScraper(DedicatedScraper):
             }
         }
 
+    def _seed_workers(self) -> int:
+        raw = os.environ.get("MARKETPLACE_SEED_WORKERS")
+        if raw:
+            try:
+                return max(1, int(raw))
+            except ValueError:
+                pass
+        return max(1, self.SEED_WORKERS)
+
+    def _search_exhaustive(self, adapter, hits: list) -> bool:
+        """True si la recherche a remonté toute la liste du marketplace.
+
+        Conservateur : la page de résultats doit être non tronquée
+        (moins de produits parcourus que PER_SEED_MAX_RESULTS, donc moins
+        qu'une page pleine) et non vide (0 produit = rendu raté possible).
+        """
+        scanned = getattr(adapter, "last_products_scanned", 0) or 0
+        return 0 < scanned < self.PER_SEED_MAX_RESULTS and len(hits) < self.PER_SEED_MAX_RESULTS
+
     def _build_query_for_seed(self, SearchQuery, seed: str):
         """Construit une SearchQuery depuis une seed textuelle.
 
@@ -231,6 +322,100 @@ class MarketplaceSnapshotScraper(DedicatedScraper):
         }
 
 
+# ── Planification des seeds ────────────────────────────────────────────
+
+def _seed_tokens(seed: str) -> FrozenSet[str]:
+    return frozenset(seed.lower().split())
+
+
+class _SeedPlan:
+    """File de seeds partagée par les workers.
+
+    - dédoublonne les seeds (mêmes mots, casse/ordre ignorés) ;
+    - sert les seeds larges d'abord (moins de mots), ordre d'origine sinon ;
+    - retient une seed tant qu'une seed plus large qui la contient est en
+      cours, puis la saute si cette dernière s'est révélée exhaustive.
+    """
+
+    def __init__(self, seeds: List[str]) -> None:
+        unique: Dict[FrozenSet[str], str] = {}
+        for seed in seeds:
+            tokens = _seed_tokens(seed)
+            if tokens and tokens not in unique:
+                unique[tokens] = seed
+        self.duplicates = len(seeds) - len(unique)
+        self._pending: List[Tuple[str, FrozenSet[str]]] = sorted(
+            ((seed, tokens) for tokens, seed in unique.items()), key=lambda st: len(st[1]))
+        self._running: Dict[str, FrozenSet[str]] = {}
+        self._exhaustive: List[FrozenSet[str]] = []
+        self._cond = threading.Condition()
+        self.skipped: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def next(self) -> Optional[str]:
+        """Prochaine seed à exécuter, None quand tout est traité."""
+        with self._cond:
+            while self._pending:
+                blocked = False
+                for i, (seed, tokens) in enumerate(self._pending):
+                    if any(broad <= tokens for broad in self._exhaustive):
+                        del self._pending[i]
+                        self.skipped.append(seed)
+                        print(f"   ⏭️  seed '{seed}' couverte par une seed plus large")
+                        break
+                    if any(running < tokens for running in self._running.values()):
+                        blocked = True
+                        continue
+                    del self._pending[i]
+                    self._running[seed] = tokens
+                    return seed
+                else:
+                    if blocked:
+                        self._cond.wait()
+            return None
+
+    def done(self, seed: str, exhaustive: bool) -> None:
+        with self._cond:
+            tokens = self._running.pop(seed, None)
+            if exhaustive and tokens is not None:
+                self._exhaustive.append(tokens)
+            self._cond.notify_all()
+
+
+class _PolitenessBudget:
+    """Intervalle minimal entre deux départs de seed sur un marketplace."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at)
+            self._next_at = start_at + self.interval
+        if start_at > now:
+            time.sleep(start_at - now)
+
+
+_budgets: Dict[str, _PolitenessBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def _politeness_budget(domain: str, per_minute: float) -> _PolitenessBudget:
+    """Budget partagé par toutes les instances d'un même marketplace."""
+    with _budgets_lock:
+        budget = _budgets.get(domain)
+        if budget is None or budget.interval != (60.0 / per_minute if per_minute > 0 else 0.0):
+            budget = _budgets[domain] = _PolitenessBudget(per_minute)
+        return budget
+
+
 # ── Collecte des seeds ciblées depuis Supabase ─────────────────────────
 
 def _collect_targeted_seeds(
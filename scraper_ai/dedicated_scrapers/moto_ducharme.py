@@ -18,7 +18,6 @@ Marques: Honda, Kawasaki, Husqvarna, Polaris, Talaria, E-Bike
 """
 import re
 import time
-import random
 import threading
 import xml.etree.ElementTree as ET
 from typing import Dict, List, Optional, Any
@@ -69,6 +68,9 @@ class MotoDucharmeScraper(DedicatedScraper):
 
     PRODUCTS_PER_PAGE = 36
     WORKERS = 3
+    # ~1 requête/s (cf. _rate_control.py), pour tout l'hôte
+    MIN_REQUEST_INTERVAL = 1.0
+    REQUEST_JITTER = 0.15
     LISTING_MAX_RETRIES = 3
     LISTING_RETRY_DELAY = 4
     TIME_BUDGET_SECONDS = 1050  # ~17.5 min — marge avant le timeout cron de 20 min
@@ -127,9 +129,6 @@ class MotoDucharmeScraper(DedicatedScraper):
 
     def __init__(self):
         super().__init__()
-        self._request_lock = threading.Lock()
-        self._last_request_time = 0.0
-        self._min_request_interval = 1.0
         self._scrape_start_time = 0.0
         self._shutdown = threading.Event()
 
@@ -932,13 +931,7 @@ class MotoDucharmeScraper(DedicatedScraper):
         if self._shutdown.is_set() or self._time_remaining() < 5:
             self._shutdown.set()
             raise TimeoutError("Budget temps épuisé")
-        with self._request_lock:
-            now = time.monotonic()
-            interval = self._min_request_interval + random.uniform(0, 0.15)
-            elapsed = now - self._last_request_time
-            if elapsed < interval:
-                time.sleep(interval - elapsed)
-            self._last_request_time = time.monotonic()
+        # Cadence (MIN_REQUEST_INTERVAL + jitter) appliquée par la session
         return self.session.get(url, **kwargs)
 
     def _fetch_with_retry(self, url: str) -> Optional[requests.Response]:
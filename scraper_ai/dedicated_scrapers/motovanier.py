@@ -48,6 +48,8 @@ class MotoVanierScraper(DedicatedScraper):
 
     PRODUCTS_PER_PAGE = 12
     WORKERS = 3
+    MIN_REQUEST_INTERVAL = 0.7
+    REQUEST_JITTER = 0.3
     LISTING_MAX_RETRIES = 5
     LISTING_RETRY_DELAY = 8
 
@@ -77,8 +79,6 @@ class MotoVanierScraper(DedicatedScraper):
     def __init__(self):
         super().__init__()
         self._request_lock = threading.Lock()
-        self._last_request_time = 0.0
-        self._min_request_interval = 0.6
         self._session_warmed = False
         self._consecutive_403 = 0
         self._cooling_until = 0.0
@@ -397,14 +397,7 @@ class MotoVanierScraper(DedicatedScraper):
             wait = self._cooling_until - now
             time.sleep(wait)
 
-        with self._request_lock:
-            now = time.monotonic()
-            jitter = random.uniform(0.1, 0.4)
-            interval = self._min_request_interval + jitter
-            elapsed = now - self._last_request_time
-            if elapsed < interval:
-                time.sleep(interval - elapsed)
-            self._last_request_time = time.monotonic()
+        # Cadence (MIN_REQUEST_INTERVAL + jitter) appliquée par la session
         return self.session.get(url, **kwargs)
 
     def _register_403(self):
@@ -414,6 +407,7 @@ class MotoVanierScraper(DedicatedScraper):
             if self._consecutive_403 >= 3:
                 cooldown = min(30, 5 * self._consecutive_403)
                 self._cooling_until = time.monotonic() + cooldown
+                self._rate_controller().penalize(cooldown)
                 print(f"      ❄️ Cooling global: {cooldown}s ({self._consecutive_403} x 403 consécutifs)")
 
     def _register_success(self):
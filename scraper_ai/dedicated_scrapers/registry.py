@@ -1,93 +1,78 @@
 """
 Registre des scrapers dédiés.
 Permet de trouver et instancier un scraper dédié à partir d'une URL ou d'un slug.
+
+Résolution paresseuse : `get_by_slug` / `get_by_url` / `list_all` lisent le
+manifeste statique `_manifest.py` (slug → domaines, module, classe,
+métadonnées) et n'importent QUE le module du scraper demandé. Importer ce
+registre ne charge donc ni BeautifulSoup, ni requests, ni les ~40 modules
+de scrapers.
+
+Les déclarations ci-dessous (chaînes uniquement) et `_generated_registry.py`
+restent la source de vérité ; après tout ajout/modification de scraper :
+
+    python scripts/build_scraper_manifest.py          # régénère _manifest.py
+    python scripts/build_scraper_manifest.py --check  # vérifie manifeste ↔ classes
+
+Un slug absent du manifeste (scraper tout juste généré par scraper_usine)
+retombe sur l'import de `_generated_registry.py`.
 """
-from typing import Dict, Optional, Type
+import importlib
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Tuple, Type
 from urllib.parse import urlparse
 
-from .base import DedicatedScraper
-from .mvm_motosport import MvmMotosportScraper
-from .motoplex import MotoplexScraper
-from .motoplex_mirabel import MotoplexMirabelScraper
-from .motosport4saisons import Motosport4SaisonsScraper
-from .motos_illimitees import MotosIllimiteesScraper
-from .motovanier import MotoVanierScraper
-from .mathias_sports import MathiasSportsScraper
-from .joliette_recreatif import JolietteRecreatifScraper
-from .db_moto import DBMotoScraper
-from .gregoire_sport import GregoireSportScraper
-from .nadon_sport import NadonSportScraper
-
-from .maximum_aventure import MaximumAventureScraper
-from .laval_moto import LavalMotoScraper
-from .motopro_granby import MotoProGranbyScraper
-from .picotte_motosport import PicotteMotosportScraper
-from .moto_ducharme import MotoDucharmeScraper
-from .morin_sports import MorinSportsScraper
-
-# Sources de marché (annonces multi-vendeurs)
-from .marketplace_kijiji import KijijiMarketplaceScraper
-from .centre_du_sport_lac_st_jean import CentreDuSportLacStJeanScraper
-from .smsport import SmsportScraper
-from .moto_falardeau import MotoFalardeauScraper
-from .jean_dumas_maximum_sport import JeanDumasMaximumSportScraper
-from .evolution_x_jonquiere import EvolutionXJonquiereScraper
-from .gobeil_equipement import GobeilEquipementScraper
-from .sport_cgr import SportCgrScraper
-from .saguenay_marine import SaguenayMarineScraper
-from .sports_drc import SportsDrcScraper
-from .evasion_sport import EvasionSportScraper
-from .pro_performance import ProPerformanceScraper
-from .excelmoto import ExcelmotoScraper
-from .alary_sport import AlarySportScraper
-from .marketplace_lespac import LesPacMarketplaceScraper
-from .marketplace_autotrader import AutoTraderMarketplaceScraper
-from .marketplace_cycletrader import CycleTraderMarketplaceScraper
-from .motorcycledealers import MotorcycleDealersScraper
-
-
-_SCRAPERS: Dict[str, Type[DedicatedScraper]] = {
-    'mvm-motosport': MvmMotosportScraper,
-    'motoplex': MotoplexScraper,
-    'motoplex-mirabel': MotoplexMirabelScraper,
-    'motosport4saisons': Motosport4SaisonsScraper,
-    'motos-illimitees': MotosIllimiteesScraper,
-    'motovanier': MotoVanierScraper,
-    'mathias-sports': MathiasSportsScraper,
-    'joliette-recreatif': JolietteRecreatifScraper,
-    'db-moto': DBMotoScraper,
-    'gregoire-sport': GregoireSportScraper,
-    'nadon-sport': NadonSportScraper,
-
-    'maximum-aventure': MaximumAventureScraper,
-    'laval-moto': LavalMotoScraper,
-    'motopro-granby': MotoProGranbyScraper,
-    'moto-ducharme': MotoDucharmeScraper,
-    'picotte-motosport': PicotteMotosportScraper,
-    'morin-sports': MorinSportsScraper,
-    'centre-du-sport-lac-st-jean': CentreDuSportLacStJeanScraper,
-    'smsport': SmsportScraper,
-    'moto-falardeau': MotoFalardeauScraper,
-    'jean-dumas-maximum-sport': JeanDumasMaximumSportScraper,
-    'evolution-x-jonquiere': EvolutionXJonquiereScraper,
-    'gobeil-equipement': GobeilEquipementScraper,
-    'sport-cgr': SportCgrScraper,
-    'saguenay-marine': SaguenayMarineScraper,
-    'sports-drc': SportsDrcScraper,
-    'evasion-sport': EvasionSportScraper,
-    'pro-performance': ProPerformanceScraper,
-    'excelmoto': ExcelmotoScraper,
-    'alary-sport': AlarySportScraper,
+from ._manifest import MANIFEST
+
+if TYPE_CHECKING:
+    from .base import DedicatedScraper
+
+
+# slug → (module relatif, classe). Chaînes seulement : aucun import ici.
+_BUILTIN_SCRAPERS: Dict[str, Tuple[str, str]] = {
+    'mvm-motosport': ('mvm_motosport', 'MvmMotosportScraper'),
+    'motoplex': ('motoplex', 'MotoplexScraper'),
+    'motoplex-mirabel': ('motoplex_mirabel', 'MotoplexMirabelScraper'),
+    'motosport4saisons': ('motosport4saisons', 'Motosport4SaisonsScraper'),
+    'motos-illimitees': ('motos_illimitees', 'MotosIllimiteesScraper'),
+    'motovanier': ('motovanier', 'MotoVanierScraper'),
+    'mathias-sports': ('mathias_sports', 'MathiasSportsScraper'),
+    'joliette-recreatif': ('joliette_recreatif', 'JolietteRecreatifScraper'),
+    'db-moto': ('db_moto', 'DBMotoScraper'),
+    'gregoire-sport': ('gregoire_sport', 'GregoireSportScraper'),
+    'nadon-sport': ('nadon_sport', 'NadonSportScraper'),
+
+    'maximum-aventure': ('maximum_aventure', 'MaximumAventureScraper'),
+    'laval-moto': ('laval_moto', 'LavalMotoScraper'),
+    'motopro-granby': ('motopro_granby', 'MotoProGranbyScraper'),
+    'moto-ducharme': ('moto_ducharme', 'MotoDucharmeScraper'),
+    'picotte-motosport': ('picotte_motosport', 'PicotteMotosportScraper'),
+    'morin-sports': ('morin_sports', 'MorinSportsScraper'),
+    'centre-du-sport-lac-st-jean': ('centre_du_sport_lac_st_jean', 'CentreDuSportLacStJeanScraper'),
+    'smsport': ('smsport', 'SmsportScraper'),
+    'moto-falardeau': ('moto_falardeau', 'MotoFalardeauScraper'),
+    'jean-dumas-maximum-sport': ('jean_dumas_maximum_sport', 'JeanDumasMaximumSportScraper'),
+    'evolution-x-jonquiere': ('evolution_x_jonquiere', 'EvolutionXJonquiereScraper'),
+    'gobeil-equipement': ('gobeil_equipement', 'GobeilEquipementScraper'),
+    'sport-cgr': ('sport_cgr', 'SportCgrScraper'),
+    'saguenay-marine': ('saguenay_marine', 'SaguenayMarineScraper'),
+    'sports-drc': ('sports_drc', 'SportsDrcScraper'),
+    'evasion-sport': ('evasion_sport', 'EvasionSportScraper'),
+    'pro-performance': ('pro_performance', 'ProPerformanceScraper'),
+    'excelmoto': ('excelmoto', 'ExcelmotoScraper'),
+    'alary-sport': ('alary_sport', 'AlarySportScraper'),
 
     # Marketplaces (multi-vendeurs)
-    'marketplace-kijiji-ca': KijijiMarketplaceScraper,
-    'marketplace-lespac': LesPacMarketplaceScraper,
-    'marketplace-autotrader-ca': AutoTraderMarketplaceScraper,
-    'marketplace-cycletrader': CycleTraderMarketplaceScraper,
-    'motorcycledealers-ca': MotorcycleDealersScraper,
+    'marketplace-kijiji-ca': ('marketplace_kijiji', 'KijijiMarketplaceScraper'),
+    'marketplace-lespac': ('marketplace_lespac', 'LesPacMarketplaceScraper'),
+    'marketplace-autotrader-ca': ('marketplace_autotrader', 'AutoTraderMarketplaceScraper'),
+    'marketplace-cycletrader': ('marketplace_cycletrader', 'CycleTraderMarketplaceScraper'),
+    'motorcycledealers-ca': ('motorcycledealers', 'MotorcycleDealersScraper'),
 }
 
-_DOMAIN_MAP: Dict[str, str] = {
+
+_BUILTIN_DOMAINS: Dict[str, str] = {
     'mvmmotosport.com': 'mvm-motosport',
     'motoplex.ca': 'motoplex',
     'motoplexsteustache.ca': 'motoplex',
@@ -131,11 +116,138 @@ _DOMAIN_MAP: Dict[str, str] = {
 }
 
 
+def _manifest_domains() -> Dict[str, str]:
+    domains: Dict[str, str] = {}
+    for slug, entry in MANIFEST.items():
+        for domain in entry['domains']:
+            domains[domain] = slug
+    return domains
+
+
+# Domaine → slug, résolu depuis le manifeste (dict pur, sans import).
+_DOMAIN_MAP: Dict[str, str] = _manifest_domains()
+
+_GENERATED_REGISTRY_PATH = Path(__file__).with_name('_generated_registry.py')
+_MANIFEST_PATH = Path(__file__).with_name('_manifest.py')
+_GENERATED_ENTRY_RE = re.compile(
+    r"from \.(\w+) import (\w+)\s+GENERATED_SCRAPERS\['([^']+)'\] = \2")
+_GENERATED_DOMAIN_RE = re.compile(r"GENERATED_DOMAINS\['([^']+)'\] = '([^']+)'")
+
+_generated_loaded = False
+_generated_sources: Dict[str, Tuple[str, str]] = {}
+
+
+def _parse_generated_registry() -> Tuple[Dict[str, Tuple[str, str]], Dict[str, str]]:
+    """Lit `_generated_registry.py` comme du texte : (slug → (module, classe), domaine → slug).
+
+    Ses `try: from .x import X` ne sont PAS exécutés.
+    """
+    try:
+        source = _GENERATED_REGISTRY_PATH.read_text(encoding='utf-8')
+    except OSError:
+        return {}, {}
+    sources = {
+        slug: (module_name, class_name)
+        for module_name, class_name, slug in _GENERATED_ENTRY_RE.findall(source)
+    }
+    return sources, dict(_GENERATED_DOMAIN_RE.findall(source))
+
+
+def _load_generated() -> None:
+    """Fallback pour les scrapers générés absents du manifeste : le module
+    n'est importé que si son slug est effectivement demandé."""
+    global _generated_loaded
+    if _generated_loaded:
+        return
+    _generated_loaded = True
+    sources, domains = _parse_generated_registry()
+    for slug, source in sources.items():
+        if slug not in MANIFEST:
+            _generated_sources[slug] = source
+    for domain, slug in domains.items():
+        _DOMAIN_MAP.setdefault(domain, slug)
+
+
+def _load_class(slug: str) -> Optional[Type['DedicatedScraper']]:
+    """Importe uniquement le module du slug demandé."""
+    entry = MANIFEST.get(slug)
+    if entry is not None:
+        module_name, class_name = entry['module'], entry['class']
+    else:
+        _load_generated()
+        if slug not in _generated_sources:
+            return None
+        module_name, class_name = _generated_sources[slug]
+        try:
+            module = importlib.import_module(f"{__package__}.{module_name}")
+            return getattr(module, class_name)
+        except Exception:
+            # Même tolérance que les `try/except Exception` de _generated_registry.py
+            return None
+    module = importlib.import_module(f"{__package__}.{module_name}")
+    return getattr(module, class_name)
+
+
+class _LazyScraperMap(Mapping):
+    """Vue slug → classe qui n'importe un module qu'au premier accès.
+
+    Conserve l'interface de l'ancien dict `_SCRAPERS` pour les appelants
+    existants (`_SCRAPERS.get(slug)`).
+    """
+
+    def __init__(self):
+        self._classes: Dict[str, Type['DedicatedScraper']] = {}
+
+    def __getitem__(self, slug: str) -> Type['DedicatedScraper']:
+        cls = self._classes.get(slug)
+        if cls is None:
+            cls = _load_class(slug)
+            if cls is None:
+                raise KeyError(slug)
+            self._classes[slug] = cls
+        return cls
+
+    def __iter__(self) -> Iterator[str]:
+        _load_generated()
+        yield from MANIFEST
+        yield from _generated_sources
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+_SCRAPERS = _LazyScraperMap()
+
+
+def _domain_of(url: str) -> str:
+    return urlparse(url).netloc.replace('www.', '')
+
+
+def _info(slug: str) -> Optional[Dict[str, Any]]:
+    entry = MANIFEST.get(slug)
+    if entry is not None:
+        return {
+            'slug': slug,
+            'site_name': entry['site_name'],
+            'site_url': entry['site_url'],
+            'site_domain': entry['site_domain'],
+        }
+    cls = _SCRAPERS.get(slug)
+    if cls is None:
+        return None
+    return {
+        'slug': slug,
+        'site_name': cls.SITE_NAME,
+        'site_url': cls.SITE_URL,
+        'site_domain': cls.SITE_DOMAIN,
+    }
+
+
 class DedicatedScraperRegistry:
     """Registre central des scrapers dédiés."""
 
     @staticmethod
-    def get_by_slug(slug: str) -> Optional[DedicatedScraper]:
+    def get_by_slug(slug: str) -> Optional['DedicatedScraper']:
         """Retourne une instance du scraper dédié par son slug."""
         scraper_class = _SCRAPERS.get(slug)
         if scraper_class:
@@ -143,12 +255,13 @@ class DedicatedScraperRegistry:
         return None
 
     @staticmethod
-    def get_by_url(url: str) -> Optional[DedicatedScraper]:
+    def get_by_url(url: str) -> Optional['DedicatedScraper']:
         """Retourne un scraper dédié si l'URL correspond à un site connu."""
-        parsed = urlparse(url)
-        domain = parsed.netloc.replace('www.', '')
-
+        domain = _domain_of(url)
         slug = _DOMAIN_MAP.get(domain)
+        if not slug:
+            _load_generated()
+            slug = _DOMAIN_MAP.get(domain)
         if slug:
             scraper_class = _SCRAPERS.get(slug)
             if scraper_class:
@@ -158,37 +271,31 @@ class DedicatedScraperRegistry:
     @staticmethod
     def has_dedicated_scraper(url: str) -> bool:
         """Vérifie si une URL a un scraper dédié."""
-        parsed = urlparse(url)
-        domain = parsed.netloc.replace('www.', '')
+        domain = _domain_of(url)
+        if domain in _DOMAIN_MAP:
+            return True
+        _load_generated()
         return domain in _DOMAIN_MAP
 
+    @staticmethod
+    def get_info(slug: str) -> Optional[Dict[str, Any]]:
+        """Métadonnées d'un scraper (nom, URL, domaine) sans importer son module."""
+        return _info(slug)
+
     @staticmethod
     def list_all() -> list:
         """Liste tous les scrapers dédiés disponibles."""
-        result = []
-        for slug, scraper_class in _SCRAPERS.items():
-            result.append({
-                'slug': slug,
-                'site_name': scraper_class.SITE_NAME,
-                'site_url': scraper_class.SITE_URL,
-                'site_domain': scraper_class.SITE_DOMAIN,
-            })
-        return result
+        return [info for info in (_info(slug) for slug in _SCRAPERS) if info]
 
     @staticmethod
     def search(query: str) -> list:
         """Recherche un scraper dédié par mot-clé."""
         query_lower = query.lower().strip()
         results = []
-        for slug, scraper_class in _SCRAPERS.items():
-            searchable = f"{scraper_class.SITE_NAME} {slug} {scraper_class.SITE_DOMAIN}".lower()
+        for info in DedicatedScraperRegistry.list_all():
+            searchable = f"{info['site_name']} {info['slug']} {info['site_domain']}".lower()
             if query_lower in searchable:
-                results.append({
-                    'slug': slug,
-                    'site_name': scraper_class.SITE_NAME,
-                    'site_url': scraper_class.SITE_URL,
-                    'site_domain': scraper_class.SITE_DOMAIN,
-                })
+                results.append(info)
         return results
 
 
@@ -196,10 +303,102 @@ def get_registry() -> DedicatedScraperRegistry:
     return DedicatedScraperRegistry()
 
 
-# --- Scrapers générés par scraper_usine ---
-try:
-    from ._generated_registry import GENERATED_SCRAPERS, GENERATED_DOMAINS
-    _SCRAPERS.update(GENERATED_SCRAPERS)
-    _DOMAIN_MAP.update(GENERATED_DOMAINS)
-except ImportError:
-    pass
+# ---------------------------------------------------------------------------
+# Manifeste — construction et vérification (scripts/build_scraper_manifest.py)
+# ---------------------------------------------------------------------------
+
+def build_manifest() -> Dict[str, Dict[str, Any]]:
+    """Construit le manifeste en important TOUTES les classes déclarées.
+
+    Lent (c'est exactement le coût que le manifeste évite au runtime) :
+    réservé à l'outil de régénération et aux tests.
+    """
+    generated_sources, generated_domains = _parse_generated_registry()
+
+    sources: Dict[str, Tuple[str, str]] = dict(_BUILTIN_SCRAPERS)
+    domains: Dict[str, List[str]] = {}
+    for domain, slug in _BUILTIN_DOMAINS.items():
+        domains.setdefault(slug, []).append(domain)
+
+    # Même priorité que l'ancien `_SCRAPERS.update(GENERATED_SCRAPERS)` :
+    # une entrée générée écrase l'entrée déclarée à la main.
+    sources.update(generated_sources)
+    for domain, slug in generated_domains.items():
+        if domain not in domains.setdefault(slug, []):
+            domains[slug].append(domain)
+
+    manifest: Dict[str, Dict[str, Any]] = {}
+    for slug, (module_name, class_name) in sources.items():
+        try:
+            module = importlib.import_module(f"{__package__}.{module_name}")
+            cls = getattr(module, class_name)
+        except Exception:
+            if slug in generated_sources:
+                # Même tolérance que les `try/except Exception` de
+                # _generated_registry.py : un scraper généré cassé est ignoré.
+                continue
+            raise
+        slug_domains = domains.get(slug) or [cls.SITE_DOMAIN]
+        manifest[slug] = {
+            'module': module_name,
+            'class': class_name,
+            'domains': slug_domains,
+            'site_name': cls.SITE_NAME,
+            'site_url': cls.SITE_URL,
+            'site_domain': cls.SITE_DOMAIN,
+        }
+    return manifest
+
+
+def check_manifest(manifest: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+    """Compare le manifeste sur disque aux classes. Retourne la liste des écarts."""
+    from .base import DedicatedScraper
+
+    expected = manifest if manifest is not None else build_manifest()
+    problems: List[str] = []
+
+    for slug in sorted(set(expected) | set(MANIFEST)):
+        if slug not in MANIFEST:
+            problems.append(f"{slug}: absent du manifeste")
+            continue
+        if slug not in expected:
+            problems.append(f"{slug}: dans le manifeste mais plus déclaré")
+            continue
+        for field, value in expected[slug].items():
+            if MANIFEST[slug].get(field) != value:
+                problems.append(
+                    f"{slug}: {field} = {MANIFEST[slug].get(field)!r}, attendu {value!r}")
+
+    seen: Dict[str, str] = {}
+    for slug, entry in expected.items():
+        cls = _load_class(slug) if slug in MANIFEST else None
+        if cls is not None and not issubclass(cls, DedicatedScraper):
+            problems.append(f"{slug}: {entry['class']} n'hérite pas de DedicatedScraper")
+        for domain in entry['domains']:
+            if domain in seen and seen[domain] != slug:
+                problems.append(f"{domain}: revendiqué par {seen[domain]} et {slug}")
+            seen[domain] = slug
+    return problems
+
+
+def render_manifest(manifest: Dict[str, Dict[str, Any]]) -> str:
+    """Sérialise le manifeste en module Python (import quasi gratuit)."""
+    lines = [
+        "# AUTO-GENERE par scripts/build_scraper_manifest.py. Ne pas modifier.",
+        "# Source : registry.py (_BUILTIN_SCRAPERS, _BUILTIN_DOMAINS) + _generated_registry.py",
+        "MANIFEST = {",
+    ]
+    for slug, entry in manifest.items():
+        lines.append(f"    {slug!r}: {{")
+        for field in ('module', 'class', 'domains', 'site_name', 'site_url', 'site_domain'):
+            lines.append(f"        {field!r}: {entry[field]!r},")
+        lines.append("    },")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def refresh_manifest() -> int:
+    """Reconstruit et réécrit `_manifest.py`. Retourne le nombre de scrapers."""
+    manifest = build_manifest()
+    _MANIFEST_PATH.write_text(render_manifest(manifest), encoding='utf-8')
+    return len(manifest)
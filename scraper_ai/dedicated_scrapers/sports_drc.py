@@ -312,20 +312,12 @@ class SportsDrcScraper(DedicatedScraper):
     # DÉDUP & NETTOYAGE
     # ──────────────────────────────────────────────────────────────
 
-    def _deduplicate(self, products: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _dedup_key(product: Dict) -> Optional[str]:
         """Chaque unité a une URL unique (…-a-vendre-<stock>) : clé =
         sourceUrl UNIQUEMENT, jamais nom+prix (plusieurs unités identiques
         du même modèle coexistent)."""
-        seen_urls: set = set()
-        unique: List[Dict] = []
-        for product in products:
-            url = product.get('sourceUrl', '').rstrip('/')
-            if url and url in seen_urls:
-                continue
-            if url:
-                seen_urls.add(url)
-            unique.append(product)
-        return unique
+        return product.get('sourceUrl', '').rstrip('/') or None
 
     @staticmethod
     def _fix_mojibake(text: str) -> str:
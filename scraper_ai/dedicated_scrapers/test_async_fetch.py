@@ -0,0 +1,202 @@
+"""Tests du moteur async des pages détail (dedicated_scrapers/_async_fetch.py)."""
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from scraper_ai.dedicated_scrapers import _rate_control  # noqa: E402
+from scraper_ai.dedicated_scrapers._async_fetch import AsyncDetailEngine  # noqa: E402
+from scraper_ai.dedicated_scrapers.base import DedicatedScraper  # noqa: E402
+
+
+def _page(i: int) -> bytes:
+    # Pas de charset : requests décode en ISO-8859-1, le moteur async aussi
+    return (f"<html><body><h1>Modèle {i}</h1>"
+            f"<span class='prix'>{10000 + i} $</span>"
+            f"<span class='stock'>U{i}</span></body></html>").encode("latin-1")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    fail_first = {}
+    fail_status = 503
+    retry_after = "0"
+    hits = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            cls.hits += 1
+            remaining = cls.fail_first.get(self.path, 0)
+            if remaining:
+                cls.fail_first[self.path] = remaining - 1
+        try:
+            time.sleep(0.02)
+            if remaining:
+                body, status = b"busy", cls.fail_status
+            elif self.path.startswith("/sold/"):
+                self.send_response(301)
+                self.send_header("Location", "/inventaire/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            elif self.path.startswith("/p/"):
+                body, status = _page(int(self.path.split("/")[2])), 200
+            else:
+                body, status = b"<html><body>liste</body></html>", 200
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            if status in (429, 503):
+                self.send_header("Retry-After", cls.retry_after)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+class LocalScraper(DedicatedScraper):
+    SITE_NAME = "Local"
+    SITE_SLUG = "local-test"
+    SITE_URL = "http://127.0.0.1/"
+    HTTP_VALIDATOR_CACHE = False
+    MAX_WORKERS = 4
+
+    def discover_product_urls(self, categories=None):
+        return []
+
+    def extract_from_detail_page(self, url, html, soup):
+        prix = soup.select_one(".prix")
+        if prix is None:
+            return None
+        return {
+            "name": soup.select_one("h1").get_text(strip=True),
+            "prix": self.clean_price(prix.get_text()),
+            "inventaire": soup.select_one(".stock").get_text(strip=True),
+        }
+
+
+@pytest.fixture(autouse=True)
+def _fresh_controllers(monkeypatch):
+    # Contrôleurs par hôte partagés au niveau du module : un par test
+    monkeypatch.setattr(_rate_control, "_controllers", {})
+    monkeypatch.setattr(_rate_control, "_learned", {})
+
+
+@pytest.fixture()
+def server():
+    _Handler.active = _Handler.peak = _Handler.hits = 0
+    _Handler.fail_first = {}
+    _Handler.fail_status = 503
+    _Handler.retry_after = "0"
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def _sorted(products):
+    return sorted(products, key=lambda p: p["sourceUrl"])
+
+
+def test_async_matches_thread_path(server):
+    urls = [f"{server}/p/{i}" for i in range(40)] + [f"{server}/sold/1", f"{server}/liste"]
+    scraper = LocalScraper()
+    expected = scraper._extract_all(urls)
+    products = AsyncDetailEngine(scraper, parse_workers=0).run(urls)
+
+    assert len(products) == 40
+    assert _sorted(products) == _sorted(expected)
+    assert "Modèle 7" in {p["name"] for p in products}
+
+
+def test_per_host_limit_respected(server):
+    urls = [f"{server}/p/{i}" for i in range(30)]
+    engine = AsyncDetailEngine(LocalScraper(), per_host=3, parse_workers=0)
+    engine.run(urls)
+    assert _Handler.peak <= 3
+
+
+def test_retry_on_503_without_blocking_others(server):
+    _Handler.fail_first = {"/p/0": 2}
+    urls = [f"{server}/p/{i}" for i in range(10)]
+    engine = AsyncDetailEngine(LocalScraper(), parse_workers=0)
+    products = engine.run(urls)
+    assert len(products) == 10
+    assert engine.report()["retries"] == 2
+
+
+def test_requests_go_through_host_controller(server):
+    _Handler.fail_first = {"/p/0": 1}
+    _Handler.fail_status = 429
+    _Handler.retry_after = "1"
+    scraper = LocalScraper()
+    urls = [f"{server}/p/{i}" for i in range(6)]
+    engine = AsyncDetailEngine(scraper, parse_workers=0)
+    start = time.monotonic()
+    products = engine.run(urls)
+
+    assert len(products) == 6
+    stats = scraper._rate_controller(server).snapshot()
+    assert stats["requests"] == _Handler.hits == 7
+    assert stats["throttled"] == 1 and stats["retry_after_waits"] == 1
+    assert stats["decreases"] >= 1
+    # Le Retry-After retient l'hôte (pause du contrôleur), pas un sleep local
+    assert time.monotonic() - start >= 1.0
+    assert engine.report()["retries"] == 1
+
+
+def test_incremental_store_reused(server, tmp_path, monkeypatch):
+    from scraper_ai.dedicated_scrapers import _incremental
+
+    monkeypatch.setattr(_incremental, "INCREMENTAL_DIR", tmp_path)
+    scraper = LocalScraper()
+    scraper.enable_incremental()
+    store = scraper._incremental
+    urls = [f"{server}/p/{i}" for i in range(5)]
+    store.record_sitemap("<urlset>" + "".join(
+        f"<url><loc>{u}</loc><lastmod>2026-10-01</lastmod></url>" for u in urls) + "</urlset>")
+
+    engine = AsyncDetailEngine(scraper, parse_workers=0)
+    assert len(engine.run(urls)) == 5
+    hits = _Handler.hits
+    engine = AsyncDetailEngine(scraper, parse_workers=0)
+    assert len(engine.run(urls)) == 5
+    assert _Handler.hits == hits
+    assert engine.report()["reused"] == 5
+
+
+def test_parse_in_process_pool(server):
+    urls = [f"{server}/p/{i}" for i in range(8)]
+    engine = AsyncDetailEngine(LocalScraper(), parse_workers=2)
+    products = engine.run(urls)
+    assert len(products) == 8
+    assert {p["inventaire"] for p in products} == {f"U{i}" for i in range(8)}
+    assert engine.report()["parse_workers"] == 2
+
+
+def test_opt_in_dispatch(server, monkeypatch):
+    monkeypatch.setenv("SCRAPER_ASYNC_FETCH", "1")
+    monkeypatch.setattr(LocalScraper, "ASYNC_PARSE_WORKERS", 0)
+    scraper = LocalScraper()
+    assert scraper._use_async_fetch()
+    products = scraper._extract_all([f"{server}/p/{i}" for i in range(3)])
+    assert len(products) == 3 and scraper._async_fetch_report["fetched"] == 3
+
+    monkeypatch.setenv("SCRAPER_ASYNC_FETCH", "0")
+    assert not LocalScraper()._use_async_fetch()
@@ -0,0 +1,182 @@
+"""Tests du pool Chromium (dedicated_scrapers/_browser_pool.py).
+
+Le navigateur est remplacé par un double qui enregistre le thread de chaque
+appel : l'API sync de Playwright exige que tout passe par le thread qui l'a
+démarrée.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from scraper_ai.dedicated_scrapers import _browser_pool
+from scraper_ai.dedicated_scrapers._browser_pool import BrowserPool
+
+
+class _FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.closed = False
+        self.threads = set()
+
+    def touch(self):
+        self.threads.add(threading.get_ident())
+        return self.browser.id
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    launched = 0
+
+    def __init__(self):
+        type(self).launched += 1
+        self.id = type(self).launched
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    def new_context(self, **options):
+        return _FakeContext(self, options)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture()
+def pool(monkeypatch):
+    _FakeBrowser.launched = 0
+
+    def ensure(slot):
+        if slot._browser is None or slot._browser.closed:
+            slot._browser = _FakeBrowser()
+            slot.pages = 0
+            slot.pool.stats.add("cold_starts")
+
+    monkeypatch.setattr(_browser_pool._BrowserSlot, "_ensure_browser", ensure)
+    monkeypatch.setattr(_browser_pool, "_chromium_rss_mb", lambda: None)
+    p = BrowserPool(2, contexts_per_browser=2, max_pages=3)
+    yield p
+    p.close()
+
+
+def test_contexts_reuse_warm_browser(pool):
+    for _ in range(3):
+        with pool.lease(context_options={"locale": "fr-CA"}) as lease:
+            assert lease.call(lambda ctx: ctx.options["locale"]) == "fr-CA"
+    stats = pool.stats.snapshot()
+    assert stats["cold_starts"] == 1 and stats["leases"] == 3
+
+
+def test_calls_run_on_the_browser_thread(pool):
+    lease = pool.lease(setup=lambda ctx: ctx.touch())
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(lease.call(lambda ctx: ctx.touch())))
+               for _ in range(4)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    context = lease._context
+    lease.release()
+    assert len(results) == 4 and len(context.threads) == 1
+    assert threading.get_ident() not in context.threads
+    assert context.closed
+
+
+def test_browser_recycled_after_page_budget(pool):
+    for _ in range(2):
+        with pool.lease() as lease:
+            for _ in range(3):
+                lease.record_render(10)
+    stats = pool.stats.snapshot()
+    assert stats["recycles"] == 2 and stats["cold_starts"] == 2
+    assert stats["renders"] == 6 and stats["avg_render_ms"] == 10
+
+
+def test_more_concurrent_leases_than_browsers(pool):
+    # 4 appelants qui gardent leur bail (adapters SERP) sur 2 navigateurs :
+    # aucun n'attend, chaque navigateur porte 2 contextes isolés.
+    barrier = threading.Barrier(4)
+    leases, waits = [], []
+
+    def caller():
+        t0 = time.time()
+        lease = pool.lease(timeout=5)
+        waits.append(time.time() - t0)
+        leases.append(lease)
+        barrier.wait(timeout=5)
+
+    workers = [threading.Thread(target=caller) for _ in range(4)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    assert all(lease is not None for lease in leases) and max(waits) < 1
+    browsers = [lease.call(lambda ctx: ctx.browser.id) for lease in leases]
+    assert sorted(browsers) == [1, 1, 2, 2]
+    assert len({id(lease._context) for lease in leases}) == 4
+    for lease in leases:
+        lease.release()
+    assert pool.stats.snapshot()["cold_starts"] == 2
+
+
+def test_lease_times_out_when_pool_is_full(pool):
+    held = [pool.lease() for _ in range(pool.capacity)]
+    t0 = time.time()
+    assert pool.lease(timeout=0.05) is None
+    assert time.time() - t0 < 1
+    held[0].release()
+    assert pool.lease(timeout=0.05) is not None
+    assert pool.stats.snapshot()["lease_timeouts"] == 1
+
+
+def test_recycle_waits_for_last_context(pool):
+    first, second = pool.lease(), pool.lease()
+    assert first._slot is second._slot
+    for _ in range(3):
+        first.record_render(1)
+    first.release()
+    # Budget atteint mais un contexte reste ouvert : pas de fermeture
+    assert not second._context.browser.closed
+    assert pool.lease()._slot is not first._slot
+    second.release()
+    assert pool.stats.snapshot()["recycles"] == 1
+    assert first._slot._browser is None and not first._slot.retiring
+
+
+def test_memory_budget_scales_with_live_browsers(pool, monkeypatch):
+    busy, idle = pool.lease(), pool.lease()
+    other = pool.lease()
+    assert busy._slot is idle._slot and other._slot is not busy._slot
+    busy.record_render(1)
+    busy.record_render(1)
+    other.record_render(1)
+    # 3 Go pour 2 navigateurs lancés : sous le budget (2 × 2 Go)
+    monkeypatch.setattr(_browser_pool, "_chromium_rss_mb", lambda: 3000)
+    for lease in (other, busy, idle):
+        lease.release()
+    assert pool.stats.snapshot()["recycles"] == 0
+
+    # Dépassement : seul le navigateur le plus chargé (en pages) est recyclé
+    monkeypatch.setattr(_browser_pool, "_chromium_rss_mb", lambda: 5000)
+    heavy, light = pool.lease(), pool.lease()
+    assert heavy._slot is busy._slot and light._slot is other._slot
+    light.release()
+    heavy.release()
+    assert pool.stats.snapshot()["recycles"] == 1
+    assert busy._slot._browser is None and other._slot._browser is not None
+
+
+def test_default_lease_wait_is_short():
+    assert _browser_pool.LEASE_TIMEOUT_S <= 2
+
+
+def test_pool_disabled_by_env(monkeypatch):
+    monkeypatch.setenv("SCRAPER_BROWSER_POOL", "0")
+    assert _browser_pool.get_browser_pool() is None
@@ -0,0 +1,83 @@
+"""Tests du cache de validateurs HTTP (dedicated_scrapers/_http_cache.py)."""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from scraper_ai.dedicated_scrapers._http_cache import ConditionalCacheAdapter, ValidatorCache
+
+BODY = "<html><body>Prix : 9 999 $ — modèle é</body></html>".encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    full_hits = 0
+
+    def do_GET(self):
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        _Handler.full_hits += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(BODY)))
+        if self.path == "/etag":
+            self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    httpd = HTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.full_hits = 0
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+def _session(tmp_path, max_bytes=10_000_000):
+    session = requests.Session()
+    adapter = ConditionalCacheAdapter(cache=ValidatorCache(tmp_path / "v.sqlite", max_bytes=max_bytes))
+    session.mount("http://", adapter)
+    return session, adapter
+
+
+def test_304_replays_stored_body(tmp_path, server):
+    session, adapter = _session(tmp_path)
+    first = session.get(f"{server}/etag")
+    second = session.get(f"{server}/etag")
+    assert second.status_code == 200
+    assert second.content == first.content == BODY
+    assert "modèle é" in second.text
+    assert getattr(second, "from_validator_cache", False)
+    assert _Handler.full_hits == 1
+    stats = next(iter(adapter.stats().values()))
+    assert stats["miss"] == 1 and stats["hit"] == 1 and stats["not_modified"] == 1
+    assert stats["bytes_saved"] == len(BODY)
+
+
+def test_response_without_validators_is_not_cached(tmp_path, server):
+    session, adapter = _session(tmp_path)
+    session.get(f"{server}/plain")
+    session.get(f"{server}/plain")
+    assert _Handler.full_hits == 2
+    assert next(iter(adapter.stats().values()))["miss"] == 2
+
+
+def test_eviction_keeps_cache_under_bound(tmp_path):
+    cache = ValidatorCache(tmp_path / "v.sqlite", max_bytes=1000)
+    for i in range(250):
+        cache.put(f"http://x/{i}", f'"{i}"', None, {}, b"x" * 100)
+    conn = cache._connect()
+    total = conn.execute("SELECT SUM(size) FROM entries").fetchone()[0]
+    assert total <= 1000 + 50 * 100
+    assert cache.get("http://x/249") is not None
+    assert cache.get("http://x/0") is None
@@ -0,0 +1,87 @@
+"""Tests du re-scrape incrémental (dedicated_scrapers/_incremental.py)."""
+from __future__ import annotations
+
+import time
+
+from scraper_ai.dedicated_scrapers._incremental import (
+    IncrementalStore,
+    parse_sitemap_lastmods,
+)
+
+SITEMAP = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://x.ca/fr/neuf/a-vendre-1/</loc><lastmod>2026-10-01T10:00:00Z</lastmod></url>
+  <url><loc>https://x.ca/fr/neuf/a-vendre-2/</loc></url>
+  <url>
+    <loc>https://x.ca/fr/usage/a-vendre-3?a=1&amp;b=2</loc>
+    <lastmod>2026-10-02</lastmod>
+  </url>
+</urlset>"""
+
+
+def _store(tmp_path, **kwargs) -> IncrementalStore:
+    return IncrementalStore("x", path=tmp_path / "x.json", **kwargs)
+
+
+def test_parse_sitemap_lastmods_skips_undated_and_unescapes():
+    lastmods = parse_sitemap_lastmods(SITEMAP)
+    assert lastmods == {
+        "https://x.ca/fr/neuf/a-vendre-1": "2026-10-01T10:00:00Z",
+        "https://x.ca/fr/usage/a-vendre-3?a=1&b=2": "2026-10-02",
+    }
+
+
+def test_unchanged_lastmod_is_reused_across_runs(tmp_path):
+    calls = []
+
+    def fetch(url, etat="neuf"):
+        calls.append(url)
+        return {"name": "Moto", "prix": 9999.0, "sourceUrl": url}
+
+    first = _store(tmp_path)
+    first.record_sitemap(SITEMAP)
+    wrapped = first.wrap(fetch)
+    wrapped("https://x.ca/fr/neuf/a-vendre-1/", "neuf")
+    first.save()
+
+    second = _store(tmp_path)
+    second.record_sitemap(SITEMAP)
+    product = second.wrap(fetch)("https://x.ca/fr/neuf/a-vendre-1/", "neuf")
+    assert product["prix"] == 9999.0
+    assert len(calls) == 1
+    assert second.stats()["reused"] == 1
+
+
+def test_moved_lastmod_undated_url_or_stale_entry_is_refetched(tmp_path):
+    calls = []
+
+    def fetch(url):
+        calls.append(url)
+        return {"name": "Moto", "sourceUrl": url}
+
+    first = _store(tmp_path)
+    first.record_sitemap(SITEMAP)
+    wrapped = first.wrap(fetch)
+    wrapped("https://x.ca/fr/neuf/a-vendre-1")
+    wrapped("https://x.ca/fr/neuf/a-vendre-2")
+    first.save()
+
+    moved = _store(tmp_path)
+    moved.record_sitemap(SITEMAP.replace("2026-10-01T10:00:00Z", "2026-10-03T08:00:00Z"))
+    moved.wrap(fetch)("https://x.ca/fr/neuf/a-vendre-1")
+    moved.wrap(fetch)("https://x.ca/fr/neuf/a-vendre-2")
+    assert len(calls) == 4
+
+    expired = _store(tmp_path, max_age_hours=1)
+    expired.record_sitemap(SITEMAP)
+    expired._entries["https://x.ca/fr/neuf/a-vendre-1"]["checked_at"] = time.time() - 7200
+    expired.wrap(fetch)("https://x.ca/fr/neuf/a-vendre-1")
+    assert len(calls) == 5
+
+
+def test_failed_fetch_is_not_stored(tmp_path):
+    store = _store(tmp_path)
+    store.record_sitemap(SITEMAP)
+    store.wrap(lambda url: None)("https://x.ca/fr/neuf/a-vendre-1")
+    assert store.lookup("https://x.ca/fr/neuf/a-vendre-1") is None
+    assert store.stats()["failed"] == 1
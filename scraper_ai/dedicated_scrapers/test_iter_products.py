@@ -0,0 +1,71 @@
+"""Tests de l'extraction en flux (DedicatedScraper.iter_products)."""
+from __future__ import annotations
+
+import threading
+
+from scraper_ai.dedicated_scrapers.base import DedicatedScraper
+
+
+class FakeScraper(DedicatedScraper):
+    SITE_NAME = "Local"
+    SITE_SLUG = "local-test"
+    SITE_URL = "http://dealer.test/"
+    HTTP_VALIDATOR_CACHE = False
+    MAX_WORKERS = 2
+
+    def __init__(self, urls):
+        super().__init__()
+        self.urls = urls
+        self.gate = threading.Event()
+
+    def discover_product_urls(self, categories=None):
+        return list(self.urls)
+
+    def extract_from_detail_page(self, url, html, soup):
+        return None
+
+    def _fetch_and_extract(self, url):
+        slug = url.rsplit("/", 1)[-1]
+        product = {"name": f"Moto {slug}", "prix": 1000, "inventaire": slug.split("-")[0],
+                   "sourceUrl": url}
+        if slug == "last":
+            # Ne se termine que si le consommateur a déjà reçu un produit
+            product["released"] = self.gate.wait(5)
+        return product
+
+
+def test_products_are_yielded_before_extraction_ends():
+    scraper = FakeScraper([f"http://dealer.test/{i}" for i in range(3)] + ["http://dealer.test/last"])
+    products = scraper.iter_products()
+    first = next(products)
+    scraper.gate.set()
+    rest = list(products)
+
+    assert first["name"].startswith("Moto")
+    assert [p for p in rest if p.get("released")]
+    assert scraper.last_scrape_metadata["products_count"] == 4
+
+
+def test_stream_matches_scrape():
+    urls = [f"http://dealer.test/{i}" for i in range(20)] + [f"http://dealer.test/{i}-bis" for i in range(5)]
+    streamed = FakeScraper(urls)
+    streamed.gate.set()
+    products = list(streamed.iter_products())
+    batch = FakeScraper(urls)
+    batch.gate.set()
+    result = batch.scrape()
+
+    # Doublons (même inventaire) filtrés au fil de l'eau, premier vu gardé
+    assert len(products) == len(result["products"]) == 20
+    assert {p["inventaire"] for p in products} == {p["inventaire"] for p in result["products"]}
+    assert streamed.last_scrape_metadata["products_count"] == result["metadata"]["products_count"]
+
+
+def test_site_specific_deduplicate_sees_every_product():
+    class KeepAll(FakeScraper):
+        def _deduplicate(self, products):
+            return products
+
+    scraper = KeepAll([f"http://dealer.test/{i}" for i in range(3)] + ["http://dealer.test/1-bis"])
+    scraper.gate.set()
+    assert len(list(scraper.iter_products())) == 4
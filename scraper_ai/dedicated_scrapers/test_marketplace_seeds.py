@@ -0,0 +1,113 @@
+"""Tests du runner de seeds parallèle (dedicated_scrapers/marketplace_base.py)."""
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("scraper_ai.scraper_search.models")
+
+from scraper_ai.dedicated_scrapers import marketplace_base  # noqa: E402
+from scraper_ai.dedicated_scrapers.marketplace_base import (  # noqa: E402
+    MarketplaceSnapshotScraper,
+    _SeedPlan,
+)
+
+# seed → nb d'annonces de la liste du marketplace (page pleine = 40)
+LISTINGS = {"honda": 12, "yamaha": 40, "yamaha yz250f": 5, "honda crf450r": 3}
+
+
+class _FakeAdapter:
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    searched: list = []
+    built = 0
+
+    def __init__(self):
+        cls = type(self)
+        with cls.lock:
+            cls.built += 1
+
+    def search(self, query, *, max_results):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            cls.searched.append(query.raw_text)
+        try:
+            time.sleep(0.03)
+            text = query.raw_text.lower()
+            marque = text.split()[0]
+            n = LISTINGS.get(text, 0)
+            self.last_products_scanned = n
+            # Les annonces d'une seed étroite sont aussi dans la liste large
+            return [SimpleNamespace(name=f"{marque} annonce {i}", prix=1000 + i,
+                                    source_url=f"https://m.test/{marque}/{i}")
+                    for i in range(min(n, max_results))]
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+
+class FakeMarketplace(MarketplaceSnapshotScraper):
+    SITE_NAME = "Fake"
+    SITE_SLUG = "marketplace-fake"
+    SITE_URL = "https://m.test"
+    SITE_DOMAIN = "m.test"
+    SEEDS_PER_MINUTE = 0
+
+    def _build_adapter(self):
+        return _FakeAdapter()
+
+    def _resolve_seeds(self):
+        return ["honda crf450r", "yamaha yz250f", "Honda", "yamaha", "honda"], "default"
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    _FakeAdapter.active = _FakeAdapter.peak = _FakeAdapter.built = 0
+    _FakeAdapter.searched = []
+    monkeypatch.delenv("MARKETPLACE_SEED_WORKERS", raising=False)
+    monkeypatch.setattr(marketplace_base, "_budgets", {})
+
+
+def test_parallel_seeds_skip_covered_and_dedupe():
+    result = FakeMarketplace().scrape()
+    meta = result["metadata"]
+
+    assert _FakeAdapter.peak == 2 and _FakeAdapter.built == 2
+    # "honda" exhaustif (12 < 30) → "honda crf450r" sauté ; "yamaha" tronqué
+    assert sorted(_FakeAdapter.searched) == ["Honda", "yamaha", "yamaha yz250f"]
+    assert meta["seeds_skipped_covered"] == 1 and meta["seeds_skipped_duplicate"] == 1
+    assert meta["seeds_executed"] == 3 and meta["seeds_succeeded"] == 3
+    assert meta["seed_workers"] == 2 and meta["seeds_per_minute"] > 0
+    urls = [p["sourceUrl"] for p in result["products"]]
+    assert len(urls) == len(set(urls)) == 12 + 30
+
+
+def test_narrow_seed_waits_for_running_broad_seed():
+    plan = _SeedPlan(["honda crf450r", "honda", "ktm"])
+    first = plan.next()
+    assert first == "honda"
+    # "honda crf450r" est retenue tant que "honda" tourne
+    assert plan.next() == "ktm"
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(plan.next()))
+    waiter.start()
+    time.sleep(0.05)
+    assert not got
+    plan.done("honda", exhaustive=True)
+    waiter.join(1)
+    assert got == [None] and plan.skipped == ["honda crf450r"]
+
+
+def test_single_worker_env_and_politeness_budget(monkeypatch):
+    monkeypatch.setenv("MARKETPLACE_SEED_WORKERS", "1")
+    monkeypatch.setattr(FakeMarketplace, "SEEDS_PER_MINUTE", 1200)  # 50 ms entre seeds
+    start = time.monotonic()
+    meta = FakeMarketplace().scrape()["metadata"]
+    assert meta["seed_workers"] == 1 and _FakeAdapter.peak == 1
+    assert time.monotonic() - start >= 0.1
@@ -0,0 +1,141 @@
+"""Tests du moteur PowerGO (dedicated_scrapers/_powergo.py).
+
+Lancer : ``pytest scraper_ai/dedicated_scrapers/test_powergo.py -v``
+"""
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from scraper_ai.dedicated_scrapers import base
+from scraper_ai.dedicated_scrapers._powergo import PowerGoScraper
+from scraper_ai.dedicated_scrapers.alary_sport import AlarySportScraper
+from scraper_ai.dedicated_scrapers.gobeil_equipement import GobeilEquipementScraper
+from scraper_ai.dedicated_scrapers.pro_performance import ProPerformanceScraper
+from scraper_ai.dedicated_scrapers.smsport import SmsportScraper
+
+NEUF = "https://smsport.ca/fr/neuf/motocyclette/inventaire/kawasaki-ninja-650-a-vendre-13867/"
+USAGE = "https://smsport.ca/fr/usage/motoneige/inventaire/polaris-indy-a-vendre-na_stock_12/"
+
+STRIKE_BOX = ('<div class="pg-vehicle-price"><span class="list-price line-through">10 999 $</span>'
+              '<!-- promo --><div class="sale-price">9 499 $</div></div>')
+
+
+def _page(ld=None, head="", body=""):
+    if ld is not None:
+        head += f'<script type="application/ld+json">{json.dumps(ld, ensure_ascii=False)}</script>'
+    return f"<html><head>{head}</head><body>{body}</body></html>"
+
+
+def _vehicle(**overrides):
+    vehicle = {
+        "@type": "Vehicle",
+        "name": "Kawasaki KAWASAKI Ninja 650 2025 neuf à Québec | SM Sport",
+        "brand": {"@type": "Brand", "name": "Kawasaki"}, "model": "Ninja 650",
+        "vehicleModelDate": "2025", "color": "Vert", "sku": "13867",
+        "mileageFromOdometer": {"value": None}, "itemCondition": "https://schema.org/NewCondition",
+        "offers": {"@type": "Offer", "price": "9499.00"},
+        "image": ["https://cdn.powergo.ca/1.jpg", "https://cdn.powergo.ca/2.jpg"],
+        "description": "Une vraie hÃ©roÃ¯ne **PROMO** &amp;eacute;tÃ©. SM Sport — Votre destination",
+    }
+    vehicle.update(overrides)
+    return {"@graph": [{"@type": "Organization", "name": "SM Sport"}, vehicle]}
+
+
+@pytest.fixture
+def no_soup(monkeypatch):
+    def _boom(*args, **kwargs):
+        raise AssertionError("BeautifulSoup construite")
+    monkeypatch.setattr(base, "BeautifulSoup", _boom)
+
+
+def test_json_ld_vehicle_and_price_box_without_soup(no_soup):
+    product = SmsportScraper()._parse_detail(NEUF, _page(_vehicle(), body=STRIKE_BOX))
+    assert product == {
+        "name": "Kawasaki Ninja 650 2025", "marque": "Kawasaki", "modele": "Ninja 650",
+        "annee": 2025, "couleur": "Vert", "inventaire": "13867", "etat": "neuf",
+        "prix": 9499.0, "prix_original": 10999.0, "image": "https://cdn.powergo.ca/1.jpg",
+        "description": "Une vraie héroïne PROMO été.",
+        "sourceCategorie": "inventaire", "vehicule_type": "Moto",
+        "sourceUrl": NEUF, "sourceSite": SmsportScraper.SITE_URL,
+        "quantity": 1, "groupedUrls": [NEUF],
+    }
+
+
+def test_fallbacks_without_json_ld(no_soup):
+    html = _page(head='<meta property="og:title" content="Suzuki KingQuad 750 démo 2024 à vendre">'
+                      '<meta property="og:image" content="https://cdn.powergo.ca/og.jpg">',
+                 body='<div class="box pg-vehicle-price-box"><del>8 000 $</del> <span>7 250 $</span></div>')
+    product = SmsportScraper()._extract_detail(USAGE, html)
+    assert product["name"] == "Suzuki KingQuad 750 démo 2024"
+    assert (product["marque"], product["modele"], product["annee"]) == ("Suzuki", "KingQuad 750 démo", 2024)
+    assert (product["prix"], product["prix_original"]) == (7250.0, 8000.0)
+    assert product["image"] == "https://cdn.powergo.ca/og.jpg"
+    assert product["etat"] == "demonstrateur" and product["sourceCategorie"] == "vehicules_occasion"
+    assert product["vehicule_type"] == "Motoneige"
+
+
+def test_used_unit_echo_description_and_lenient_json():
+    ld = _vehicle(name="Polaris Indy XCR 2021", itemCondition="UsedCondition",
+                  mileageFromOdometer={"value": 3200}, offers=[{"price": 12000}],
+                  description="POLARIS INDY XCR 2021|POLARIS INDY XCR 2021")
+    # Tabulation brute dans la chaîne JSON : invalide en strict
+    raw = json.dumps(ld).replace("|", "\t")
+    html = f'<script type="application/ld+json">{raw}</script>' + STRIKE_BOX.replace("10 999", "12 000")
+    product = SmsportScraper()._extract_detail(USAGE, html)
+    assert product["etat"] == "occasion" and product["sourceCategorie"] == "vehicules_occasion"
+    assert product["kilometrage"] == 3200 and product["prix"] == 12000.0
+    assert "description" not in product and "prix_original" not in product
+
+
+def test_site_configuration_hooks():
+    gobeil = GobeilEquipementScraper()
+    assert gobeil._clean_name("Adly Moto ADLY Bullseye 2023 à Dolbeau-Mistassini") == "Adly Moto Bullseye 2023"
+    assert gobeil._clean_name("CFORCE 600 Touring 600") == "CFORCE 600 Touring 600"
+    assert SmsportScraper()._clean_name("Adly Moto ADLY Bullseye") == "Adly Moto ADLY Bullseye"
+    assert AlarySportScraper()._clean_name("Yamaha Kodiak 700 2024 Neuf à vendre | Alary Sport") == \
+        "Yamaha Kodiak 700 2024"
+    assert ProPerformanceScraper()._clean_description(
+        "CF MOTO UFORCE 1000 2026. Le meilleur côte-à-côte. FINANCEMENT 2E ET 3E CHANCE disponible",
+        "CFMOTO UFORCE 1000 2026") == "Le meilleur côte-à-côte."
+
+
+def test_discovery_follows_index_and_filters_product_urls():
+    pages = {
+        "https://www.alarysport.com/sitemaps/inventory-detail.xml": "",
+        "https://www.alarysport.com/sitemap-index.xml": (
+            "<sitemapindex><sitemap><loc>https://www.alarysport.com/s/inventory.xml</loc></sitemap>"
+            "<sitemap><loc>https://www.alarysport.com/s/showroom.xml</loc></sitemap></sitemapindex>"),
+        "https://www.alarysport.com/s/inventory.xml": "".join(
+            f"<url><loc>https://www.alarysport.com{path}</loc></url>" for path in (
+                "/fr/neuf/vtt/inventaire/yamaha-kodiak-a-vendre-edl70sde/",
+                "/fr/neuf/vtt/inventaire/yamaha-kodiak-a-vendre-edl70sde",
+                "/en/new/atv/inventory/yamaha-kodiak-for-sale-edl70sde/",
+                "/fr/usage/ponton/inventaire/lund-a-vendre-39171/")),
+    }
+    requested = []
+
+    def get(url, timeout=None):
+        requested.append(url)
+        return SimpleNamespace(status_code=200, text=pages[url])
+
+    scraper = AlarySportScraper()
+    scraper.session = SimpleNamespace(get=get)
+    urls = scraper.discover_product_urls()
+    assert urls == ["https://www.alarysport.com/fr/neuf/vtt/inventaire/yamaha-kodiak-a-vendre-edl70sde/",
+                    "https://www.alarysport.com/fr/usage/ponton/inventaire/lund-a-vendre-39171/"]
+    assert "https://www.alarysport.com/s/showroom.xml" not in requested
+
+
+def test_default_sitemaps_from_site_url():
+    class Dealer(PowerGoScraper):
+        SITE_URL = "https://www.concession.ca/fr/"
+        SITE_DOMAIN = "concession.ca"
+
+    assert Dealer()._sitemap_candidates() == (
+        "https://www.concession.ca/sitemaps/inventory-detail.xml",
+        "https://www.concession.ca/sitemap.xml",
+    )
+    assert Dealer()._extract_detail(NEUF, "") is None
@@ -0,0 +1,141 @@
+"""Tests du contrôle de débit par hôte (dedicated_scrapers/_rate_control.py)."""
+from __future__ import annotations
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper_ai.dedicated_scrapers import _rate_control
+from scraper_ai.dedicated_scrapers._rate_control import (
+    HostRateController, RateControlledSession, host_controller, parse_retry_after,
+    save_learned_rates,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    throttle_first = 0
+    delay = 0.0
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+            throttled = cls.throttle_first > 0
+            cls.throttle_first -= 1
+        time.sleep(cls.delay)
+        with cls.lock:
+            cls.in_flight -= 1
+        if throttled:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def server():
+    _Handler.throttle_first, _Handler.delay, _Handler.in_flight, _Handler.peak = 0, 0.0, 0, 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(_rate_control, "RATES_PATH", tmp_path / "rate_limits.json")
+    monkeypatch.setattr(_rate_control, "_controllers", {})
+    monkeypatch.setattr(_rate_control, "_learned", None)
+    monkeypatch.delenv("SCRAPER_RATE_CONTROL", raising=False)
+
+
+def test_429_retry_after_is_honoured(server):
+    _Handler.throttle_first = 1
+    session = RateControlledSession(max_concurrency=4)
+    t0 = time.monotonic()
+    response = session.get(f"{server}/p/1", timeout=5)
+    assert response.status_code == 200 and time.monotonic() - t0 >= 0.9
+    stats = session.rate_report()["127.0.0.1"]
+    assert stats["throttled"] == 1 and stats["retry_after_waits"] == 1
+    assert stats["limit"] < 4 and stats["interval"] > 0
+
+
+def test_concurrency_capped_per_host(server):
+    _Handler.delay = 0.1
+    sessions = [RateControlledSession(max_concurrency=2) for _ in range(2)]
+    threads = [threading.Thread(target=lambda s=s: [s.get(f"{server}/p", timeout=5) for _ in range(3)])
+               for s in sessions for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Deux sessions (deux scrapers) du même hôte partagent le plafond
+    assert _Handler.peak <= 2
+
+
+def test_aimd_adjusts_on_each_response():
+    controller = HostRateController("dealer.test", max_concurrency=8)
+    for _ in range(3):
+        controller.release(controller.acquire(), error=True)
+    assert controller.limit == 4            # une seule réduction par rafale
+    controller._last_decrease = 0.0
+    controller.release(controller.acquire(), status=429)
+    assert controller.limit == 2 and controller.interval >= _rate_control.THROTTLE_MIN_INTERVAL
+    controller.interval = 0.0
+    for _ in range(40):
+        controller.release(controller.acquire(), status=200)
+    assert controller.limit == 8
+
+
+def test_learned_rate_persisted_between_runs():
+    controller = host_controller("www.dealer.test", max_concurrency=8)
+    controller.release(controller.acquire(), status=200)
+    controller.limit = 3.0
+    save_learned_rates(["dealer.test"])
+
+    _rate_control._controllers.clear()
+    _rate_control._learned = None
+    assert host_controller("https://dealer.test/x", max_concurrency=8).limit == 3.0
+
+
+def test_two_registrations_on_one_host_keep_the_tightest_bounds():
+    # Ordre d'enregistrement indifférent : limite la plus basse, intervalle le plus long
+    for first, second in (((8, 0.0), (2, 0.02)), ((2, 0.02), (8, 0.0))):
+        _rate_control._controllers.clear()
+        fast = host_controller("dealer.test", max_concurrency=first[0], min_interval=first[1])
+        slow = host_controller("www.dealer.test", max_concurrency=second[0], min_interval=second[1])
+        assert fast is slow
+        assert slow.max_concurrency == 2 and slow.limit == 2 and slow.min_interval == 0.02
+        slow.interval = 0.02
+        for _ in range(20):
+            slow.release(slow.acquire() - 0.01, status=200)
+        assert slow.limit == 2 and slow.interval == 0.02
+
+
+def test_fixed_pacing_when_disabled(monkeypatch):
+    monkeypatch.setenv("SCRAPER_RATE_CONTROL", "0")
+    controller = host_controller("dealer.test", max_concurrency=4, min_interval=0.05)
+    for _ in range(3):
+        controller.release(controller.acquire(), error=True)
+    assert controller.limit == 4 and controller.interval == 0.05
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("3600") == _rate_control.MAX_RETRY_AFTER
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("bientôt") is None
@@ -0,0 +1,46 @@
+"""Tests du registre paresseux et de son manifeste (dedicated_scrapers/registry.py)."""
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+from scraper_ai.dedicated_scrapers import registry
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def test_manifest_matches_declared_classes():
+    assert registry.check_manifest() == []
+
+
+def test_lookup_imports_only_the_requested_module():
+    code = (
+        "import sys\n"
+        "from scraper_ai.dedicated_scrapers.registry import DedicatedScraperRegistry as R\n"
+        "assert R.has_dedicated_scraper('https://www.smsport.ca/fr/')\n"
+        "assert len(R.list_all()) > 30\n"
+        "assert 'bs4' not in sys.modules and 'requests' not in sys.modules\n"
+        "scraper = R.get_by_url('https://www.motoplexsteustache.ca/fr/')\n"
+        "assert type(scraper).__name__ == 'MotoplexScraper'\n"
+        "loaded = sorted(m for m in sys.modules if m.startswith('scraper_ai.dedicated_scrapers.'))\n"
+        "print(','.join(loaded))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT,
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    scraper_modules = {
+        name.rsplit(".", 1)[-1] for name in out.split(",")
+    } - {"registry", "_manifest", "base", "_http_cache", "_incremental", "_rate_control"}
+    assert scraper_modules == {"motoplex"}
+
+
+def test_unmanifested_generated_scraper_falls_back(monkeypatch):
+    monkeypatch.delitem(registry.MANIFEST, "adrenalinesports")
+    monkeypatch.setattr(registry, "_generated_loaded", False)
+    monkeypatch.setattr(registry, "_generated_sources", {})
+    monkeypatch.setattr(registry, "_SCRAPERS", registry._LazyScraperMap())
+    monkeypatch.setattr(registry, "_DOMAIN_MAP", registry._manifest_domains())
+    scraper = registry.DedicatedScraperRegistry.get_by_url("https://adrenalinesports.ca/")
+    assert type(scraper).__name__ == "AdrenalinesportsScraper"
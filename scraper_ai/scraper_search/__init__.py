@@ -16,6 +16,8 @@ Architecture :
   - SearchAdapter             → contrat pour interroger une source
   - SearchCache               → cache TTL des inventaires (évite re-scraping)
   - FederatedSearch           → orchestrateur parallèle avec timeout par adapter
+  - SearchService             → service résident du backend (arguments du CLI,
+                                 inventaires gardés en mémoire)
   - SearchResult              → réponse agrégée + scoring de pertinence
   - GenericProductExtractor   → JSON-LD/microdata/OG/heuristiques pour
                                  extraire un produit depuis n'importe quel HTML
@@ -29,6 +29,10 @@ class SearchAdapter(ABC):
     # qui les supportent (sinon ils restent à 0).
     last_products_scanned: int = 0
     last_approximate_count: int = 0
+    # Lectures de SearchCache du dernier `search()` (cf. CacheLookupStats)
+    last_cache_memory_hits: int = 0
+    last_cache_misses: int = 0
+    last_cache_coalesced: int = 0
 
     # Catégories produits historiques (legacy) :
     # ('moto', 'auto', 'vtt', 'motoneige', 'ecommerce', …). Si vide →
@@ -14,7 +14,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from ..cache import SearchCache, DEFAULT_TTL_SECONDS
+from ..cache import CacheLookupStats, SearchCache, DEFAULT_TTL_SECONDS
 from ..models import SearchHit, SearchQuery
 from ..scoring import select_hits
 from .base import AdapterError, SearchAdapter
@@ -64,13 +64,15 @@ class DedicatedScraperAdapter(SearchAdapter):
 
         # Pré-charger les métadonnées (sans instancier le scraper) pour avoir
         # un nom propre dans les logs même si on hit le cache.
+        # Le manifeste du registre fournit ces métadonnées sans importer le
+        # module du scraper.
         try:
-            from scraper_ai.dedicated_scrapers.registry import _SCRAPERS
-            cls = _SCRAPERS.get(slug)
-            if cls:
-                self.name = getattr(cls, "SITE_NAME", slug) or slug
-                self.site_url = getattr(cls, "SITE_URL", "")
-                self._site_domain = getattr(cls, "SITE_DOMAIN", "") or ""
+            from scraper_ai.dedicated_scrapers.registry import DedicatedScraperRegistry
+            info = DedicatedScraperRegistry.get_info(slug)
+            if info:
+                self.name = info.get("site_name") or slug
+                self.site_url = info.get("site_url", "")
+                self._site_domain = info.get("site_domain", "") or ""
         except Exception:
             pass
 
@@ -100,19 +102,26 @@ class DedicatedScraperAdapter(SearchAdapter):
     # ------------------------------------------------------------------
 
     def search(self, query: SearchQuery, *, max_results: int = 50) -> List[SearchHit]:
-        # Optimisation : si cache valide, on évite d'instancier le scraper
-        cached = self.cache.get(
-            self.slug,
-            max_age_seconds=self.cache_ttl,
-            aliases=self._cache_aliases(),
-        )
-        if cached is not None:
-            products = cached
-        elif self.cache_only:
-            raise AdapterError("Inventaire non disponible en cache")
-        else:
-            self._resolve()
-            products = self._get_inventory()
+        lookups = CacheLookupStats()
+        try:
+            # Optimisation : si cache valide, on évite d'instancier le scraper
+            cached = self.cache.get(
+                self.slug,
+                max_age_seconds=self.cache_ttl,
+                aliases=self._cache_aliases(),
+                stats=lookups,
+            )
+            if cached is not None:
+                products = cached
+            elif self.cache_only:
+                raise AdapterError("Inventaire non disponible en cache")
+            else:
+                self._resolve()
+                products = self._get_inventory(lookups)
+        finally:
+            self.last_cache_memory_hits = lookups.memory_hits
+            self.last_cache_misses = lookups.misses
+            self.last_cache_coalesced = lookups.coalesced
         if not products:
             self.last_products_scanned = 0
             self.last_approximate_count = 0
@@ -124,6 +133,7 @@ class DedicatedScraperAdapter(SearchAdapter):
             query, products,
             max_results=max_results,
             source_site=site, source_slug=self.slug,
+            index=self.cache.index_for(self.slug, products),
         )
         self.last_products_scanned = scanned
         self.last_approximate_count = approx
@@ -133,12 +143,13 @@ class DedicatedScraperAdapter(SearchAdapter):
     # Inventaire (avec cache)
     # ------------------------------------------------------------------
 
-    def _get_inventory(self) -> List[Dict[str, Any]]:
+    def _get_inventory(self, lookups: Optional[CacheLookupStats] = None) -> List[Dict[str, Any]]:
         """Retourne la liste de produits scrapés (avec cache TTL)."""
         cached = self.cache.get(
             self.slug,
             max_age_seconds=self.cache_ttl,
             aliases=self._cache_aliases(),
+            stats=lookups,
         )
         if cached is not None:
             return cached
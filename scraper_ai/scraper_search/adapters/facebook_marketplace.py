@@ -125,11 +125,10 @@ class FacebookMarketplaceAdapter(BrowserSerpAdapter):
             with BrowserAgent(block_assets=True, locale="fr-CA",
                               proxy=proxy_dict) as agent:
                 # Injection des cookies dans le contexte Playwright
-                if hasattr(agent, "_context") and agent._context:
-                    try:
-                        agent._context.add_cookies(cookies)
-                    except Exception as e:
-                        raise AdapterError(f"Failed to inject FB cookies: {e}")
+                try:
+                    agent.add_cookies(cookies)
+                except Exception as e:
+                    raise AdapterError(f"Failed to inject FB cookies: {e}")
 
                 for url in urls:
                     try:
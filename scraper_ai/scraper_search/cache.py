@@ -5,8 +5,27 @@ Cache TTL pour les inventaires scrapés.
 télécharge tout son inventaire et le stocke. Les recherches suivantes (dans la
 fenêtre TTL) lisent depuis le cache.
 
-Backend : fichiers JSON dans `scraper_cache/search_inventory/`, avec fallback
-vers `scraped_site_data` (Supabase) rempli par le cron horaire.
+Backend : fichiers `.inv` dans `scraper_cache/search_inventory/` (format
+mmap de inventory_file.py : timestamp lu dans l'en-tête, produits décodés à
+la demande), avec fallback vers `scraped_site_data` (Supabase) rempli par le
+cron horaire. Les anciens fichiers `.json` restent lus ; `set` écrit en
+`.inv` (SEARCH_CACHE_FORMAT=json pour garder l'ancien format).
+
+Les fichiers décodés sont gardés en mémoire (partagés par toutes les
+instances du process) et réutilisés tant que le fichier n'a pas changé
+(mtime + taille) : un process résident (service de recherche) ne relit et
+ne re-décode un inventaire que quand il est réécrit. Chaque inventaire en
+mémoire a son InventoryIndex (index.py), construit à l'écriture par `set`
+ou au premier `index_for` après décodage.
+
+Cette mémoire est un LRU borné en octets (taille des fichiers,
+SEARCH_CACHE_MEMORY_MB) : l'inventaire le moins récemment servi est oublié
+quand la borne est dépassée. Un inventaire absent ou périmé n'est chargé
+qu'une fois à la fois par clé (single-flight) : les adapters concurrents de
+FederatedSearch attendent le chargement en cours au lieu de télécharger
+chacun la colonne `products` de Supabase. Avant ce téléchargement, une sonde
+(`scraped_at` seul) vérifie que Supabase a une copie fraîche et plus récente
+que la copie locale.
 """
 from __future__ import annotations
 
@@ -14,9 +33,13 @@ import json
 import os
 import threading
 import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from .index import InventoryIndex
+from .inventory_file import MappedInventory, open_inventory, read_header, write_inventory
 
 try:
     import requests
@@ -28,11 +51,45 @@ CACHE_DIR = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "s
 # TTL par défaut : 6h. Les inventaires de concessionnaires bougent peu intra-jour.
 DEFAULT_TTL_SECONDS = 6 * 3600
 
+# Borne de la mémoire des inventaires décodés (taille des fichiers)
+DEFAULT_MEMORY_MB = 512
+# Attente max d'un chargement en cours par un autre thread
+FLIGHT_WAIT_SECONDS = 60
+
+# Séquences de produits renvoyées par `get`
+_PRODUCT_SEQUENCES = (list, MappedInventory)
+
+
+@dataclass
+class CacheLookupStats:
+    """Compteurs des `get` d'un appelant (un `search()` d'adapter)."""
+    memory_hits: int = 0        # servi depuis la mémoire du process
+    misses: int = 0             # chargé depuis le disque ou Supabase
+    coalesced: int = 0          # a attendu le chargement d'un autre thread
+
+
+class _Flight:
+    """Chargement en cours d'une clé (single-flight)."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+
+
+def _write_format() -> str:
+    return "json" if os.environ.get("SEARCH_CACHE_FORMAT", "").strip().lower() == "json" else "inv"
+
 
 class SearchCache:
     """Cache fichier thread-safe avec TTL."""
 
     _lock = threading.Lock()
+    # chemin → ((mtime_ns, taille), timestamp, produits décodés, index ou None)
+    # (ordre d'insertion = ordre LRU, le plus récent à la fin)
+    _memory: Dict[str, Tuple[Tuple[int, int], float, Any, Optional[InventoryIndex]]] = {}
+    # clé de cache → chargement en cours
+    _flights: Dict[str, _Flight] = {}
+    memory_bytes = int(float(os.environ.get("SEARCH_CACHE_MEMORY_MB", DEFAULT_MEMORY_MB)) * 1024 * 1024)
 
     def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS):
         self.ttl_seconds = ttl_seconds
@@ -43,64 +100,69 @@ class SearchCache:
         key: str,
         max_age_seconds: Optional[int] = None,
         aliases: Optional[List[str]] = None,
+        stats: Optional[CacheLookupStats] = None,
     ) -> Optional[List[Dict[str, Any]]]:
-        """Lit le cache pour cette clé. Renvoie None si absent ou expiré."""
-        path = self._path(key)
-        cached: Optional[List[Dict[str, Any]]] = None
-        if path.exists():
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                ts = float(data.get("timestamp", 0))
-                ttl = max_age_seconds if max_age_seconds is not None else self.ttl_seconds
-                if time.time() - ts <= ttl:
-                    products = data.get("products", [])
-                    cached = products if isinstance(products, list) else None
-            except (json.JSONDecodeError, OSError, ValueError):
-                cached = None
+        """Lit le cache pour cette clé. Renvoie None si absent ou expiré.
+
+        Depuis un fichier `.inv`, la séquence renvoyée est une
+        MappedInventory (produits décodés au premier accès). `stats` reçoit
+        le type de lecture (mémoire, chargement, chargement partagé)."""
+        ttl = max_age_seconds if max_age_seconds is not None else self.ttl_seconds
+        cached = self._memory_hit(key, ttl)
         if cached is not None:
+            if stats is not None:
+                stats.memory_hits += 1
             return cached
 
-        supabase_entry = self._get_supabase_entry(
-            self._candidate_keys(key, aliases),
-            max_age_seconds=max_age_seconds if max_age_seconds is not None else self.ttl_seconds,
-            include_products=True,
-        )
-        if supabase_entry is None:
-            return None
-        products, timestamp = supabase_entry
-        self.set(key, products, timestamp=timestamp)
+        def load() -> Optional[List[Dict[str, Any]]]:
+            entry = self._read(self._locate(key))
+            local_ts = None
+            if entry is not None:
+                local_ts, products = entry
+                if time.time() - local_ts <= ttl and isinstance(products, _PRODUCT_SEQUENCES):
+                    return products
+            return self._fetch_remote(key, aliases, ttl, local_ts)
+
+        products, leader = self._single_flight(key, load)
+        if stats is not None:
+            if leader:
+                stats.misses += 1
+            else:
+                stats.coalesced += 1
         return products
 
     def set(self, key: str, products: List[Dict[str, Any]], *, timestamp: Optional[float] = None) -> None:
         """Écrit le cache. Idempotent."""
-        path = self._path(key)
-        payload = {
-            "key": key,
-            "timestamp": timestamp if timestamp is not None else time.time(),
-            "count": len(products),
-            "products": products,
-        }
+        fmt = _write_format()
+        path = self._path(key) if fmt == "json" else self._inv_path(key)
+        stale = self._inv_path(key) if fmt == "json" else self._path(key)
+        ts = timestamp if timestamp is not None else time.time()
+        index = InventoryIndex(products)
         try:
             with self._lock:
                 tmp = path.with_suffix(".tmp")
-                tmp.write_text(
-                    json.dumps(payload, ensure_ascii=False, default=str),
-                    encoding="utf-8",
-                )
+                if fmt == "json":
+                    payload = {"key": key, "timestamp": ts, "count": len(products), "products": products}
+                    tmp.write_text(
+                        json.dumps(payload, ensure_ascii=False, default=str),
+                        encoding="utf-8",
+                    )
+                else:
+                    write_inventory(tmp, ts, products, index)
                 tmp.replace(path)
+                self._remember(path, ts, products, index)
+                # L'autre format de la même clé est désormais périmé
+                self._memory.pop(str(stale), None)
+                if stale.exists():
+                    stale.unlink()
         except OSError:
             pass
 
     def age_seconds(self, key: str, aliases: Optional[List[str]] = None) -> Optional[float]:
         """Âge en secondes du cache pour cette clé. None si absent."""
-        path = self._path(key)
-        if path.exists():
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                ts = float(data.get("timestamp", 0))
-                return time.time() - ts
-            except Exception:
-                pass
+        local = self.local_timestamp(key)
+        if local is not None:
+            return time.time() - local
 
         supabase_entry = self._get_supabase_entry(
             self._candidate_keys(key, aliases),
@@ -114,23 +176,179 @@ class SearchCache:
 
     def invalidate(self, key: str) -> bool:
         """Supprime l'entrée. Renvoie True si supprimé."""
-        path = self._path(key)
-        if path.exists():
-            try:
-                path.unlink()
-                return True
-            except OSError:
-                pass
-        return False
+        removed = False
+        for path in (self._inv_path(key), self._path(key)):
+            with self._lock:
+                self._memory.pop(str(path), None)
+            if path.exists():
+                try:
+                    path.unlink()
+                    removed = True
+                except OSError:
+                    pass
+        return removed
+
+    def index_for(self, key: str, products: Any) -> Optional[InventoryIndex]:
+        """Index de l'inventaire en mémoire pour `key`, s'il s'agit bien de
+        la liste `products` renvoyée par `get` (None sinon : scan complet)."""
+        path = str(self._locate(key))
+        memo = self._memory.get(path)
+        if memo is None or memo[2] is not products or not isinstance(products, _PRODUCT_SEQUENCES):
+            return None
+        if memo[3] is not None:
+            return memo[3]
+        index = products.load_index() if isinstance(products, MappedInventory) else None
+        if index is None:
+            index = InventoryIndex(products)
+        with self._lock:
+            current = self._memory.get(path)
+            if current is not None and current[2] is products:
+                self._memory[path] = (*current[:3], index)
+        return index
+
+    def local_timestamp(self, key: str) -> Optional[float]:
+        """Timestamp de l'entrée fichier (sans fallback Supabase). None si absente.
+
+        Fichier `.inv` : lu dans l'en-tête, sans décoder les produits."""
+        path = self._locate(key)
+        if path.suffix == ".inv":
+            memo = self._memory.get(str(path))
+            if memo is not None:
+                return memo[1]
+            header = read_header(path)
+            return header[0] if header is not None else None
+        entry = self._read(path)
+        return entry[0] if entry is not None else None
 
     def list_keys(self) -> List[str]:
-        return [p.stem for p in CACHE_DIR.glob("*.json")]
+        return sorted({p.stem for pattern in ("*.inv", "*.json") for p in CACHE_DIR.glob(pattern)})
+
+    def _memory_hit(self, key: str, ttl: float) -> Optional[List[Dict[str, Any]]]:
+        """Produits en mémoire si le fichier n'a pas changé et est dans le TTL."""
+        path = self._locate(key)
+        memo = self._memory.get(str(path))
+        if memo is None or time.time() - memo[1] > ttl or not isinstance(memo[2], _PRODUCT_SEQUENCES):
+            return None
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if memo[0] != (st.st_mtime_ns, st.st_size):
+            return None
+        with self._lock:
+            if self._memory.get(str(path)) is memo:
+                # Plus récemment servi : en fin d'ordre LRU
+                self._memory[str(path)] = self._memory.pop(str(path))
+        return memo[2]
+
+    def _single_flight(self, key: str, load) -> Tuple[Any, bool]:
+        """(résultat de `load`, True si ce thread l'a exécuté). Un seul
+        `load` par clé à la fois ; les autres threads attendent son résultat."""
+        flight_key = str(self._path(key))
+        with self._lock:
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+        if not leader:
+            if flight.done.wait(FLIGHT_WAIT_SECONDS):
+                return flight.result, False
+            # Chargement bloqué : on n'attend pas indéfiniment
+            return load(), False
+        try:
+            flight.result = load()
+        finally:
+            flight.done.set()
+            with self._lock:
+                self._flights.pop(flight_key, None)
+        return flight.result, True
+
+    def _fetch_remote(self, key: str, aliases: Optional[List[str]], ttl: float,
+                      local_ts: Optional[float]) -> Optional[List[Dict[str, Any]]]:
+        """Télécharge l'inventaire de `scraped_site_data` s'il est frais et
+        plus récent que la copie locale, puis l'écrit en cache local."""
+        probe = self._probe_supabase(self._candidate_keys(key, aliases), max_age_seconds=ttl)
+        if probe is None:
+            return None
+        candidate, remote_ts = probe
+        if local_ts is not None and remote_ts <= local_ts:
+            # Rien de plus récent côté Supabase : pas de téléchargement
+            return None
+        supabase_entry = self._get_supabase_entry(
+            [candidate], max_age_seconds=ttl, include_products=True,
+        )
+        if supabase_entry is None:
+            return None
+        products, timestamp = supabase_entry
+        self.set(key, products, timestamp=timestamp)
+        return products
+
+    def _evict(self, keep: str) -> None:
+        # Appelé sous self._lock : oublie les moins récents au-delà de la borne
+        total = sum(memo[0][1] for memo in self._memory.values())
+        for path in list(self._memory):
+            if total <= self.memory_bytes:
+                break
+            if path == keep:
+                continue
+            total -= self._memory.pop(path)[0][1]
+
+    def _read(self, path: Path) -> Optional[Tuple[float, Any]]:
+        """(timestamp, produits) du fichier, décodé au plus une fois par version."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        memo = self._memory.get(str(path))
+        if memo is not None and memo[0] == stamp:
+            return memo[1], memo[2]
+        if path.suffix == ".inv":
+            opened = open_inventory(path)
+            if opened is None:
+                return None
+            ts, mapped = opened
+            with self._lock:
+                self._memory.pop(str(path), None)
+                self._memory[str(path)] = (stamp, ts, mapped, None)
+                self._evict(keep=str(path))
+            return ts, mapped
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            ts = float(data.get("timestamp", 0))
+        except (json.JSONDecodeError, OSError, ValueError, TypeError, AttributeError):
+            return None
+        products = data.get("products", [])
+        with self._lock:
+            self._memory.pop(str(path), None)
+            self._memory[str(path)] = (stamp, ts, products, None)
+            self._evict(keep=str(path))
+        return ts, products
+
+    def _remember(self, path: Path, timestamp: float, products: Any,
+                  index: Optional[InventoryIndex]) -> None:
+        # Appelé sous self._lock, juste après l'écriture du fichier
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        self._memory.pop(str(path), None)
+        self._memory[str(path)] = ((st.st_mtime_ns, st.st_size), float(timestamp), products, index)
+        self._evict(keep=str(path))
 
     def _path(self, key: str) -> Path:
         # Sanitize : seulement [a-z0-9-_]
         safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in key.lower())
         return CACHE_DIR / f"{safe}.json"
 
+    def _inv_path(self, key: str) -> Path:
+        return self._path(key).with_suffix(".inv")
+
+    def _locate(self, key: str) -> Path:
+        """Fichier de la clé : `.inv` s'il existe, sinon l'ancien `.json`."""
+        inv = self._inv_path(key)
+        return inv if inv.exists() else self._path(key)
+
     def _candidate_keys(self, key: str, aliases: Optional[List[str]]) -> List[str]:
         candidates: List[str] = []
         for candidate in [key, *(aliases or [])]:
@@ -141,17 +359,37 @@ class SearchCache:
                 candidates.append(normalized)
         return candidates
 
-    def _get_supabase_entry(
-        self,
-        candidates: List[str],
-        *,
-        max_age_seconds: Optional[int],
-        include_products: bool,
-    ) -> Optional[tuple[List[Dict[str, Any]], float]]:
-        """Lit le cache central `scraped_site_data` rempli par le cron horaire."""
-        if requests is None or not candidates:
-            return None
+    def remote_timestamps(self) -> Dict[str, float]:
+        """{site_domain: scraped_at} de tous les inventaires OK de
+        `scraped_site_data` (une requête, sans les produits). Sert à détecter
+        les inventaires rafraîchis par le cron depuis leur copie locale."""
+        if requests is None:
+            return {}
+        credentials = self._supabase_credentials()
+        if credentials is None:
+            return {}
+        supabase_url, headers = credentials
+        try:
+            resp = requests.get(
+                f"{supabase_url}/rest/v1/scraped_site_data",
+                params={"select": "site_domain,scraped_at", "status": "eq.success"},
+                headers=headers,
+                timeout=10,
+            )
+            if resp.status_code != 200:
+                return {}
+            rows = resp.json() or []
+        except Exception:
+            return {}
+        stamps: Dict[str, float] = {}
+        for row in rows:
+            domain = str(row.get("site_domain") or "").strip().lower().replace("www.", "")
+            timestamp = self._parse_timestamp(row.get("scraped_at"))
+            if domain and timestamp is not None:
+                stamps[domain] = timestamp
+        return stamps
 
+    def _supabase_credentials(self) -> Optional[Tuple[str, Dict[str, str]]]:
         supabase_url = (
             os.environ.get("SUPABASE_URL")
             or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
@@ -165,11 +403,67 @@ class SearchCache:
         )
         if not supabase_url or not supabase_key:
             return None
-
-        headers = {
+        return supabase_url, {
             "apikey": supabase_key,
             "Authorization": f"Bearer {supabase_key}",
         }
+
+    def _probe_supabase(
+        self,
+        candidates: List[str],
+        *,
+        max_age_seconds: Optional[float],
+    ) -> Optional[Tuple[str, float]]:
+        """(domaine, scraped_at) de la première entrée `scraped_site_data` OK
+        et dans l'âge max, sans la colonne `products`."""
+        if requests is None or not candidates:
+            return None
+        credentials = self._supabase_credentials()
+        if credentials is None:
+            return None
+        supabase_url, headers = credentials
+        for candidate in candidates:
+            try:
+                resp = requests.get(
+                    f"{supabase_url}/rest/v1/scraped_site_data",
+                    params={
+                        "select": "scraped_at,status",
+                        "site_domain": f"eq.{candidate}",
+                        "limit": "1",
+                    },
+                    headers=headers,
+                    timeout=10,
+                )
+                if resp.status_code != 200:
+                    continue
+                rows = resp.json()
+                if not rows or rows[0].get("status") != "success":
+                    continue
+                timestamp = self._parse_timestamp(rows[0].get("scraped_at"))
+                if timestamp is None:
+                    continue
+                if max_age_seconds is not None and time.time() - timestamp > max_age_seconds:
+                    continue
+                return candidate, timestamp
+            except Exception:
+                continue
+        return None
+
+    def _get_supabase_entry(
+        self,
+        candidates: List[str],
+        *,
+        max_age_seconds: Optional[int],
+        include_products: bool,
+    ) -> Optional[tuple[List[Dict[str, Any]], float]]:
+        """Lit le cache central `scraped_site_data` rempli par le cron horaire."""
+        if requests is None or not candidates:
+            return None
+
+        credentials = self._supabase_credentials()
+        if credentials is None:
+            return None
+        supabase_url, headers = credentials
         select = "products,scraped_at,status" if include_products else "scraped_at,status"
 
         for candidate in candidates:
@@ -155,6 +155,9 @@ class FederatedSearch:
             stats.approximate_returned = int(
                 getattr(adapter, "last_approximate_count", 0) or 0
             )
+            stats.cache_memory_hits = int(getattr(adapter, "last_cache_memory_hits", 0) or 0)
+            stats.cache_misses = int(getattr(adapter, "last_cache_misses", 0) or 0)
+            stats.cache_coalesced = int(getattr(adapter, "last_cache_coalesced", 0) or 0)
             approx_suffix = (f" ({stats.approximate_returned} approx)"
                              if stats.approximate_returned else "")
             scanned_suffix = (f" [{stats.products_scanned} scannés]"
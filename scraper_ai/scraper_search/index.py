@@ -0,0 +1,186 @@
+"""
+Index inversé d'un inventaire en cache, pour ne scorer que les candidats.
+
+`select_hits` passe chaque produit d'un inventaire dans `score_product` :
+avec ~40 concessionnaires, une requête score des dizaines de milliers de
+produits, dont l'immense majorité est rejetée par un veto strict (marque
+absente, année trop éloignée, modèle précis incomplet). L'index retrouve
+directement les produits qui peuvent passer ces vetos ; le scoring reste
+celui de `score_product`, donc les hits sont strictement identiques.
+
+Clés indexées (mode véhicule) :
+  - marque : bigrammes de caractères de `marque`, `name` normalisés et du
+    `name` sans espaces. Tout match de `_string_match` / `_string_in_text`
+    (égalité, sous-chaîne, ou SequenceMatcher ≥ 0.85 sur des chaînes de
+    4+ caractères) partage au moins un bigramme avec la marque requête :
+    sinon tous les blocs communs font 1 caractère et le ratio ne peut pas
+    dépasser ~0.78. Marque requête de moins de 4 caractères : pas de fuzzy,
+    tous ses bigrammes doivent être présents ;
+  - année (`_product_year`) : ±1 an autour de `annee`, ou l'intervalle
+    annee_min/annee_max ; les produits sans année restent candidats ;
+  - nombres du texte modèle (`_model_score`) : un modèle précis (ex.
+    "CRF 450") exige chaque nombre comme suite de chiffres entière.
+
+Le prix, la couleur, l'état et la catégorie ne sont pas indexés : ils ne
+sont jamais des vetos du pass strict (pénalités ou filtre catégorie
+permissif), les indexer changerait les résultats.
+
+Les produits dont un champ indexé n'est pas une chaîne restent toujours
+candidats (le scoring décide, comme avant). Mode générique (e-commerce) :
+pas d'index, `candidates()` retourne None → scan complet.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .models import SearchQuery
+from .scoring import _is_precise_model_query, _normalize, _product_year, _tokenize_model
+
+_DIGITS = re.compile(r"[0-9]+")
+# À incrémenter quand les clés indexées changent : les index enregistrés
+# dans les fichiers `.inv` (inventory_file.py) d'une autre version sont ignorés.
+INDEX_VERSION = 1
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class InventoryIndex:
+    """Index d'une liste de produits (positions dans la liste, ordre conservé)."""
+
+    def __init__(self, products: List[Any]) -> None:
+        self.size = len(products)
+        self.scanned = 0
+        self._brand_grams: Dict[str, Set[int]] = {}
+        self._brand_wild: Set[int] = set()
+        self._years: Dict[int, Set[int]] = {}
+        self._no_year: Set[int] = set()
+        self._numbers: Dict[str, Set[int]] = {}
+
+        for i, product in enumerate(products):
+            if not isinstance(product, dict):
+                continue
+            self.scanned += 1
+            self._index_brand(i, product)
+            year = _product_year(product)
+            if isinstance(year, (int, float)):
+                self._years.setdefault(int(year), set()).add(i)
+            else:
+                self._no_year.add(i)
+            blob = _normalize(" ".join(str(product.get(k, ""))
+                                       for k in ("name", "modele", "marque", "description")))
+            for number in set(_DIGITS.findall(blob)):
+                self._numbers.setdefault(number, set()).add(i)
+
+    def _index_brand(self, i: int, product: Dict[str, Any]) -> None:
+        grams: Set[str] = set()
+        for field in ("marque", "name"):
+            value = product.get(field, "")
+            if not value:
+                continue
+            if not isinstance(value, str):
+                # Cas non prévu par le scoring : on le laisse trancher
+                self._brand_wild.add(i)
+                return
+            norm = _normalize(value)
+            grams |= _bigrams(norm)
+            if field == "name":
+                grams |= _bigrams(norm.replace(" ", ""))
+        for gram in grams:
+            self._brand_grams.setdefault(gram, set()).add(i)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Postings sérialisables en JSON (voir `from_payload`)."""
+        return {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "scanned": self.scanned,
+            "brand_grams": {k: sorted(v) for k, v in self._brand_grams.items()},
+            "brand_wild": sorted(self._brand_wild),
+            "years": {str(k): sorted(v) for k, v in self._years.items()},
+            "no_year": sorted(self._no_year),
+            "numbers": {k: sorted(v) for k, v in self._numbers.items()},
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any], size: int) -> Optional["InventoryIndex"]:
+        """Index relu depuis `to_payload`, None si version ou taille différente."""
+        if payload.get("version") != INDEX_VERSION or payload.get("size") != size:
+            return None
+        index = cls([])
+        index.size = size
+        index.scanned = int(payload.get("scanned", 0))
+        index._brand_grams = {k: set(v) for k, v in payload.get("brand_grams", {}).items()}
+        index._brand_wild = set(payload.get("brand_wild", []))
+        index._years = {int(k): set(v) for k, v in payload.get("years", {}).items()}
+        index._no_year = set(payload.get("no_year", []))
+        index._numbers = {k: set(v) for k, v in payload.get("numbers", {}).items()}
+        return index
+
+    def candidates(self, query: SearchQuery) -> Optional[List[int]]:
+        """Positions (croissantes) des produits pouvant passer le pass strict,
+        None si la requête n'a aucun critère indexable (scan complet)."""
+        if query.is_generic_product or query.min_score <= 0:
+            # min_score ≤ 0 : même un produit vetoé (score 0) est un hit
+            return None
+        filters: List[Set[int]] = []
+
+        if query.marque:
+            brand = self._brand_candidates(query.marque)
+            if brand is not None:
+                filters.append(brand)
+
+        if query.annee:
+            years = range(query.annee - 1, query.annee + 2)
+            filters.append(self._year_candidates(years))
+        elif query.annee_min or query.annee_max:
+            lo = query.annee_min or 1900
+            hi = query.annee_max or 2100
+            filters.append(self._year_candidates(y for y in self._years if lo <= y <= hi))
+
+        if query.modele and _is_precise_model_query(query.modele):
+            for token in _tokenize_model(query.modele):
+                norm = _normalize(token)
+                if not norm:
+                    # Token jamais matché → m_score < 1 → veto pour tous
+                    return []
+                if norm.isdigit():
+                    filters.append(self._numbers.get(norm, set()))
+
+        if not filters:
+            return None
+        filters.sort(key=len)
+        result = set(filters[0])
+        for other in filters[1:]:
+            result &= other
+            if not result:
+                break
+        return sorted(result)
+
+    def _brand_candidates(self, marque: str) -> Optional[Set[int]]:
+        norm = _normalize(marque)
+        compact = norm.replace(" ", "")
+        if len(norm) < 2 or len(compact) < 2:
+            return None
+        if len(norm) < 4:
+            # Ni `_string_match` fuzzy (4+) ni `_fuzzy_contains` (5+) :
+            # égalité ou sous-chaîne → tous les bigrammes présents
+            result: Optional[Set[int]] = None
+            for gram in _bigrams(norm):
+                postings = self._brand_grams.get(gram, set())
+                result = set(postings) if result is None else result & postings
+                if not result:
+                    break
+            return (result or set()) | self._brand_wild
+        result = set(self._brand_wild)
+        for gram in _bigrams(norm) | _bigrams(compact):
+            result |= self._brand_grams.get(gram, set())
+        return result
+
+    def _year_candidates(self, years: Iterable[int]) -> Set[int]:
+        result = set(self._no_year)
+        for year in years:
+            result |= self._years.get(year, set())
+        return result
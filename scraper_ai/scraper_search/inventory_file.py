@@ -0,0 +1,167 @@
+"""
+Format binaire des inventaires en cache (`scraper_cache/search_inventory/*.inv`).
+
+Le format `.json` d'origine oblige à décoder tout le fichier pour lire un
+timestamp (`age_seconds`, `--cache-info`) et à décoder tous les produits
+avant le premier scoring. Le fichier `.inv` se lit par mmap :
+
+    en-tête fixe    magic, version, timestamp, nombre de produits,
+                    position + taille de la section index
+    offsets         (count + 1) entiers u64 : début de chaque enregistrement
+    enregistrements un JSON compact par produit (UTF-8)
+    index           postings de l'InventoryIndex (JSON), optionnel
+
+  - `read_header` ne lit que l'en-tête (timestamp, count) ;
+  - `MappedInventory` est une séquence de produits décodés à la demande
+    (puis gardés) : le pass strict indexé ne décode que les candidats ;
+  - l'index est relu depuis le fichier au lieu d'être reconstruit.
+
+Enregistrements en JSON plutôt qu'en msgpack : aucune dépendance ajoutée,
+et le décodage reste celui des fichiers `.json` (mêmes valeurs produites).
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .index import InventoryIndex
+
+MAGIC = b"SRCHINV\x00"
+VERSION = 1
+# magic, version, timestamp, count, offset index, taille index
+_HEADER = struct.Struct("<8sIdIQQ")
+_OFFSET = struct.Struct("<Q")
+
+
+def _interned_object(pairs: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    # Un json.loads par produit ne partage pas les clés entre produits
+    # (contrairement au décodage d'un seul document) : ~20 % de mémoire en plus
+    return {sys.intern(k): v for k, v in pairs}
+
+
+def write_inventory(path: Path, timestamp: float, products: List[Any],
+                    index: Optional[InventoryIndex] = None) -> None:
+    """Écrit `products` au format `.inv` dans `path` (écrasé)."""
+    records = [
+        json.dumps(p, ensure_ascii=False, default=str, separators=(",", ":")).encode("utf-8")
+        for p in products
+    ]
+    offsets_size = _OFFSET.size * (len(records) + 1)
+    position = _HEADER.size + offsets_size
+    offsets = bytearray()
+    for record in records:
+        offsets += _OFFSET.pack(position)
+        position += len(record)
+    offsets += _OFFSET.pack(position)
+    index_blob = b""
+    if index is not None:
+        index_blob = json.dumps(index.to_payload(), separators=(",", ":")).encode("utf-8")
+    header = _HEADER.pack(MAGIC, VERSION, float(timestamp), len(records),
+                          position if index_blob else 0, len(index_blob))
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(offsets)
+        for record in records:
+            f.write(record)
+        f.write(index_blob)
+
+
+def read_header(path: Path) -> Optional[Tuple[float, int]]:
+    """(timestamp, nombre de produits) sans lire les produits. None si le
+    fichier est absent ou n'est pas un `.inv` valide."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(_HEADER.size)
+    except OSError:
+        return None
+    header = _unpack_header(raw)
+    if header is None:
+        return None
+    return header[0], header[1]
+
+
+def open_inventory(path: Path) -> Optional[Tuple[float, "MappedInventory"]]:
+    """(timestamp, produits) d'un fichier `.inv`. None si illisible."""
+    try:
+        with open(path, "rb") as f:
+            if os.name == "nt":
+                # Un fichier mappé ne peut pas être remplacé sous Windows
+                buf: Any = f.read()
+            else:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header = _unpack_header(buf[:_HEADER.size])
+    if header is None:
+        return None
+    timestamp, count, index_offset, index_size = header
+    if len(buf) < _HEADER.size + _OFFSET.size * (count + 1):
+        return None
+    return timestamp, MappedInventory(buf, count, index_offset, index_size)
+
+
+def _unpack_header(raw: bytes) -> Optional[Tuple[float, int, int, int]]:
+    if len(raw) < _HEADER.size:
+        return None
+    magic, version, timestamp, count, index_offset, index_size = _HEADER.unpack(raw[:_HEADER.size])
+    if magic != MAGIC or version != VERSION:
+        return None
+    return timestamp, count, index_offset, index_size
+
+
+class MappedInventory(Sequence):
+    """Produits d'un fichier `.inv`, décodés au premier accès."""
+
+    def __init__(self, buf: Any, count: int, index_offset: int, index_size: int) -> None:
+        self._buf = buf
+        self._count = count
+        self._index_offset = index_offset
+        self._index_size = index_size
+        self._items: List[Any] = [None] * count
+        self._decoded = [False] * count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        if not self._decoded[i]:
+            at = _HEADER.size + _OFFSET.size * i
+            start = _OFFSET.unpack_from(self._buf, at)[0]
+            end = _OFFSET.unpack_from(self._buf, at + _OFFSET.size)[0]
+            self._items[i] = json.loads(self._buf[start:end].decode("utf-8"),
+                                       object_pairs_hook=_interned_object)
+            self._decoded[i] = True
+        return self._items[i]
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self._count):
+            yield self[i]
+
+    @property
+    def decoded(self) -> int:
+        """Nombre de produits déjà décodés."""
+        return sum(self._decoded)
+
+    def load_index(self) -> Optional[InventoryIndex]:
+        """Index enregistré avec l'inventaire (None si absent ou d'une
+        version d'index différente)."""
+        if not self._index_size:
+            return None
+        try:
+            raw = self._buf[self._index_offset:self._index_offset + self._index_size]
+            payload: Dict[str, Any] = json.loads(raw.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return InventoryIndex.from_payload(payload, self._count)
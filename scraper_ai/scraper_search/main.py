@@ -34,7 +34,9 @@ from .models import SearchQuery
 from .query_parser import parse_query
 
 
-def main(argv: Optional[List[str]] = None) -> None:
+def build_parser() -> argparse.ArgumentParser:
+    """Parser du CLI, aussi utilisé par le service résident (service.py) pour
+    interpréter exactement les mêmes arguments que `/product-search`."""
     parser = argparse.ArgumentParser(
         prog="scraper_search",
         description="Recherche fédérée d'un produit sur tous les sites accessibles.",
@@ -114,6 +116,11 @@ def main(argv: Optional[List[str]] = None) -> None:
                         help="Affiche l'état du cache d'inventaire et quitte")
     parser.add_argument("--cache-clear", metavar="SLUG",
                         help="Invalide le cache d'un slug (ou 'all') et quitte")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = build_parser()
     args = parser.parse_args(argv)
 
     # --- Commandes de maintenance ---
@@ -153,15 +160,43 @@ def main(argv: Optional[List[str]] = None) -> None:
         if category_path and not args.quiet and not args.json:
             print(f"  → Catégorie auto-détectée : {category_path}")
 
+    query = build_query(raw_query, category_path, args)
+
+    if not args.quiet and not args.json:
+        _print_parsed_query(query)
+
+    adapters = build_adapters(args)
+
+    if not adapters:
+        print("Aucun adapter disponible. Vérifie le DedicatedScraperRegistry.", file=sys.stderr)
+        sys.exit(2)
+
+    # --- Recherche ---
+    federation = FederatedSearch(
+        adapters,
+        max_workers=args.workers,
+        default_timeout_per_adapter=args.timeout,
+        verbose=not args.quiet and not args.json,
+    )
+    result = federation.search(query, total_timeout=args.total_timeout)
+
+    # --- Sortie ---
+    if args.json:
+        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2, default=str))
+    else:
+        _print_human(result)
+
+
+def build_query(raw_query: str, category_path: Optional[str], args: argparse.Namespace) -> SearchQuery:
     query = parse_query(raw_query)
     query.category_path = category_path
     query.max_results = args.max_results
     query.min_score = args.min_score
+    return query
 
-    if not args.quiet and not args.json:
-        _print_parsed_query(query)
 
-    # --- Adapters ---
+def build_adapters(args: argparse.Namespace) -> list:
+    """Adapters demandés par les arguments (dédiés + marketplaces + génériques)."""
     only_slugs = [s.strip() for s in args.only.split(",")] if args.only else None
     excl_slugs = [s.strip() for s in args.exclude.split(",")] if args.exclude else None
     adapters = []
@@ -226,25 +261,7 @@ def main(argv: Optional[List[str]] = None) -> None:
             ))
         except Exception as e:
             print(f"  ⚠ GenericDealer non chargé : {e}", file=sys.stderr)
-
-    if not adapters:
-        print("Aucun adapter disponible. Vérifie le DedicatedScraperRegistry.", file=sys.stderr)
-        sys.exit(2)
-
-    # --- Recherche ---
-    federation = FederatedSearch(
-        adapters,
-        max_workers=args.workers,
-        default_timeout_per_adapter=args.timeout,
-        verbose=not args.quiet and not args.json,
-    )
-    result = federation.search(query, total_timeout=args.total_timeout)
-
-    # --- Sortie ---
-    if args.json:
-        print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2, default=str))
-    else:
-        _print_human(result)
+    return adapters
 
 
 # ---------------------------------------------------------------------------
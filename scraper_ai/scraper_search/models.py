@@ -144,6 +144,9 @@ class AdapterRunStats:
     hits_returned: int = 0              # nb de produits matchant
     approximate_returned: int = 0       # parmi hits_returned, nb venant du 2e pass relaxé
     cache_hit: bool = False             # données venaient du cache
+    cache_memory_hits: int = 0          # lectures servies par la mémoire du process
+    cache_misses: int = 0               # lectures chargées du disque / Supabase
+    cache_coalesced: int = 0            # lectures ayant attendu le chargement d'un autre adapter
     error: str = ""                     # message si l'adapter a échoué
 
 
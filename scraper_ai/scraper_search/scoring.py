@@ -17,7 +17,9 @@ Pondération :
 from __future__ import annotations
 
 import re
+from collections import Counter
 from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .categories import children_of, get_category, get_path
@@ -351,6 +353,7 @@ def select_hits(
     source_site: str,
     source_slug: str,
     dedup_key=None,
+    index=None,
 ) -> Tuple[List[SearchHit], int, int]:
     """Applique le scoring 2-pass (strict puis relaxé) à une liste de
     produits déjà extraits par un adapter.
@@ -369,7 +372,19 @@ def select_hits(
           (après dédup éventuelle), utile pour distinguer "cache vide" de
           "cache plein mais 0 match" dans les stats adapter.
         - approximate_count : nb de hits venant du 2e pass relaxé.
+
+    `index` (InventoryIndex construit sur cette même liste `products`, voir
+    index.py) limite le pass strict aux candidats pouvant passer ses vetos ;
+    le résultat est identique au scan complet.
     """
+    if index is not None and dedup_key is None:
+        candidates = index.candidates(query)
+        if candidates is not None:
+            return _select_hits_indexed(
+                query, products, candidates, index.scanned,
+                max_results=max_results, source_site=source_site, source_slug=source_slug,
+            )
+
     strict: List[SearchHit] = []
     relaxed: List[SearchHit] = []
     seen = set()
@@ -414,6 +429,56 @@ def select_hits(
     return [], scanned, 0
 
 
+def _select_hits_indexed(
+    query: SearchQuery,
+    products: List[Dict[str, Any]],
+    candidates: List[int],
+    scanned: int,
+    *,
+    max_results: int,
+    source_site: str,
+    source_slug: str,
+) -> Tuple[List[SearchHit], int, int]:
+    """`select_hits` sans dédup, pass strict restreint aux candidats de l'index.
+
+    Le pass relaxé n'est retenu que si aucun produit ne passe le strict :
+    dans ce cas tous les produits ont échoué le strict et on les re-parcourt
+    tous, comme le scan complet.
+    """
+    strict: List[SearchHit] = []
+    for i in candidates:
+        p = products[i]
+        sc, reason = score_product(query, p)
+        if sc >= query.min_score:
+            strict.append(make_hit(
+                p, sc, reason,
+                source_site=source_site, source_slug=source_slug,
+            ))
+    if strict:
+        strict.sort(key=lambda h: h.score, reverse=True)
+        return strict[:max_results], scanned, 0
+    if not has_hard_criteria(query):
+        return [], scanned, 0
+
+    relaxed: List[SearchHit] = []
+    relaxed_threshold = query.min_score * APPROXIMATE_MIN_SCORE_RATIO
+    for p in products:
+        if not isinstance(p, dict):
+            continue
+        sc_relaxed, reason_relaxed = score_product_relaxed(query, p)
+        if sc_relaxed >= relaxed_threshold:
+            relaxed.append(make_hit(
+                p, sc_relaxed, reason_relaxed,
+                source_site=source_site, source_slug=source_slug,
+                is_approximate=True,
+            ))
+    if relaxed:
+        relaxed.sort(key=lambda h: h.score, reverse=True)
+        top = relaxed[:max_results]
+        return top, scanned, len(top)
+    return [], scanned, 0
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -427,7 +492,7 @@ def _string_match(a: str, b: str) -> bool:
         return True
     # Fuzzy fallback : tolère "skidoo"↔"ski doo", "iphone"↔"i phone", typos.
     if len(na) >= 4 and len(nb) >= 4:
-        return SequenceMatcher(None, na, nb).ratio() >= _FUZZY_THRESHOLD
+        return _similar(na, nb)
     return False
 
 
@@ -573,16 +638,20 @@ def _fuzzy_contains(needle: str, haystack: str) -> bool:
     Utilise un seuil de SequenceMatcher.ratio() sur des fenêtres glissantes
     de la taille de l'aiguille. Limité aux aiguilles ≥ 5 caractères pour
     éviter les faux positifs sur les mots courts.
+
+    Les comparaisons passent d'abord par des bornes supérieures du ratio
+    (voir `_similar` / `_window_candidates`) : SequenceMatcher n'est
+    construit que pour les paires qui peuvent atteindre le seuil, le
+    résultat est identique.
     """
     if len(needle) < 5 or not haystack:
         return False
-    n_len = len(needle)
     # Pour les mots, on compare aussi token par token (plus précis qu'une
     # fenêtre glissante naïve).
     for token in haystack.split():
         if len(token) < 3:
             continue
-        if SequenceMatcher(None, needle, token).ratio() >= _FUZZY_THRESHOLD:
+        if _similar(needle, token):
             return True
     # Fenêtre glissante (couvre les cas "ski doo" → "skidoo")
     h_compact = haystack.replace(" ", "")
@@ -590,8 +659,9 @@ def _fuzzy_contains(needle: str, haystack: str) -> bool:
     if n_compact in h_compact:
         return True
     if len(n_compact) >= 5 and len(h_compact) >= len(n_compact):
-        for i in range(0, len(h_compact) - n_compact.__len__() + 1):
-            chunk = h_compact[i:i + len(n_compact)]
+        n_len = len(n_compact)
+        for i in _window_candidates(n_compact, h_compact):
+            chunk = h_compact[i:i + n_len]
             if SequenceMatcher(None, n_compact, chunk).ratio() >= _FUZZY_THRESHOLD:
                 return True
     # Suppression de la ponctuation comme dernier recours
@@ -602,6 +672,57 @@ def _fuzzy_contains(needle: str, haystack: str) -> bool:
     return False
 
 
+@lru_cache(maxsize=65536)
+def _similar(a: str, b: str) -> bool:
+    """`SequenceMatcher(None, a, b).ratio() >= _FUZZY_THRESHOLD`.
+
+    Le ratio vaut 2·M/(len(a)+len(b)) avec M ≤ min(len) et M ≤ nb de
+    caractères communs (multiset) : ces deux bornes (real_quick_ratio et
+    quick_ratio de difflib, même formule) écartent la plupart des paires
+    avant de construire le SequenceMatcher. Mémoïsé : les mêmes paires
+    (token requête, token produit) reviennent d'un produit à l'autre.
+    """
+    total = len(a) + len(b)
+    if not total:
+        return 1.0 >= _FUZZY_THRESHOLD
+    if 2.0 * min(len(a), len(b)) / total < _FUZZY_THRESHOLD:
+        return False
+    common = sum((Counter(a) & Counter(b)).values())
+    if 2.0 * common / total < _FUZZY_THRESHOLD:
+        return False
+    return SequenceMatcher(None, a, b).ratio() >= _FUZZY_THRESHOLD
+
+
+def _window_candidates(needle: str, text: str) -> Iterable[int]:
+    """Débuts des fenêtres de `text` (taille len(needle)) dont le nombre de
+    caractères communs avec `needle` permet d'atteindre le seuil.
+
+    Histogramme glissant mis à jour en O(1) par décalage ; borne supérieure
+    exacte du ratio SequenceMatcher de la fenêtre (comme `_similar`).
+    """
+    n = len(needle)
+    total = 2 * n
+    need = Counter(needle)
+    window: Counter = Counter(text[:n])
+    common = sum(min(count, window[c]) for c, count in need.items())
+    last = len(text) - n
+    i = 0
+    while True:
+        if 2.0 * common / total >= _FUZZY_THRESHOLD:
+            yield i
+        if i >= last:
+            return
+        out, into = text[i], text[i + n]
+        if out != into:
+            if window[out] <= need.get(out, 0):
+                common -= 1
+            window[out] -= 1
+            window[into] += 1
+            if window[into] <= need.get(into, 0):
+                common += 1
+        i += 1
+
+
 def _normalize(s: str) -> str:
     """Normalise une chaîne : minuscules, sans accent, ponctuation → espace,
     espaces compactés. La ponctuation (tirets, apostrophes, points) devient
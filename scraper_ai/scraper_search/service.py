@@ -0,0 +1,241 @@
+"""
+Service de recherche résident (process du backend FastAPI).
+
+`/product-search` lançait `python -m scraper_ai.scraper_search.main` pour
+chaque requête : démarrage de l'interpréteur, import du registre et des
+adapters, relecture + décodage JSON de chaque inventaire en cache. Le
+service garde tout ça vivant dans le process backend :
+  - parser CLI, registre des scrapers dédiés et adapters importés une fois ;
+  - inventaires décodés gardés en mémoire par SearchCache (réutilisés tant
+    que le fichier ne change pas) ;
+  - requêtes concurrentes : chaque requête a sa propre liste d'adapters
+    (objets légers, leurs compteurs `last_*` ne sont pas partagés) et sa
+    FederatedSearch ; seul l'état coûteux (modules, inventaires) est commun.
+
+Les arguments sont ceux du CLI (`build_parser()`) : le backend passe au
+service la même liste que celle qu'il passait au subprocess, la réponse
+est le même JSON.
+
+Échéance : `search(argv, deadline=...)` (horloge `time.monotonic`) vérifie
+l'échéance entre les phases (contrôle de fraîcheur, construction des
+adapters, fédération) et borne le timeout total de la fédération au temps
+restant : le thread appelant rend la main à l'échéance au lieu de finir une
+recherche que plus personne n'attend.
+
+Invalidation : quand le cron réécrit `scraped_site_data`, la copie locale
+d'un inventaire devient périmée. Au plus toutes les `refresh_check_seconds`,
+une requête légère (site_domain, scraped_at) compare les dates et invalide
+les copies plus anciennes ; `mark_stale()` force ce contrôle à la requête
+suivante (appelé par le backend à la fin du job cron).
+"""
+from __future__ import annotations
+
+import json
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .cache import SearchCache
+from .categories import detect_category_from_text
+from .federation import FederatedSearch
+from .main import _resolve_category_path, build_adapters, build_parser, build_query
+
+# Contrôle de fraîcheur des inventaires vs scraped_site_data
+DEFAULT_REFRESH_CHECK_SECONDS = 60
+# Latences conservées pour p50/p95
+LATENCY_WINDOW = 1000
+
+
+class SearchTimeout(TimeoutError):
+    """Échéance de la recherche dépassée avant la fin d'une phase."""
+
+
+class SearchService:
+    """Recherche fédérée en mémoire, appelée avec les arguments du CLI."""
+
+    def __init__(self, *, refresh_check_seconds: float = DEFAULT_REFRESH_CHECK_SECONDS) -> None:
+        self.refresh_check_seconds = refresh_check_seconds
+        self.cache = SearchCache()
+        self._parser = build_parser()
+        # clé de cache → alias (domaines) des inventaires dédiés déjà servis
+        self._inventory_keys: Dict[str, List[str]] = {}
+        self._keys_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._next_refresh_check = 0.0
+        self._stats_lock = threading.Lock()
+        self._latencies_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self._queries = 0
+        self._errors = 0
+        self._invalidations = 0
+
+    # ── API ──
+
+    def search(self, argv: List[str], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Exécute une recherche ; retourne le dict de `--json`.
+
+        Lève ValueError pour des arguments invalides (catégorie inconnue,
+        aucune source disponible), SearchTimeout si `deadline`
+        (`time.monotonic`) est dépassée entre deux phases.
+        """
+        t0 = time.perf_counter()
+        try:
+            self._maybe_check_freshness()
+            _check_deadline(deadline, "contrôle de fraîcheur")
+            args = self._parse(argv)
+            raw_query = " ".join(args.query).strip()
+            if not raw_query:
+                raise ValueError("Requête vide")
+            category_path = args.category
+            if category_path:
+                category_path = _resolve_category_path(category_path)
+                if not category_path:
+                    raise ValueError("Catégorie inconnue")
+            if not category_path and args.auto_category:
+                category_path = detect_category_from_text(raw_query)
+
+            query = build_query(raw_query, category_path, args)
+            adapters = build_adapters(args)
+            if not adapters:
+                raise ValueError("Aucun adapter disponible")
+            self._track_inventories(adapters)
+
+            federation = FederatedSearch(
+                adapters,
+                max_workers=args.workers,
+                default_timeout_per_adapter=args.timeout,
+                verbose=False,
+            )
+            total_timeout = args.total_timeout
+            if deadline is not None:
+                remaining = _check_deadline(deadline, "chargement des sources")
+                # Même défaut que FederatedSearch.search, borné au temps restant
+                total_timeout = min(total_timeout or federation.default_timeout * 2, remaining)
+            result = federation.search(query, total_timeout=total_timeout)
+            # Même sérialisation que `--json` (default=str) pour une réponse identique
+            payload = json.loads(json.dumps(result.to_dict(), ensure_ascii=False, default=str))
+        except Exception:
+            with self._stats_lock:
+                self._errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            with self._stats_lock:
+                self._queries += 1
+                self._latencies_ms.append(elapsed_ms)
+        return payload
+
+    def warm(self, argv: Optional[List[str]] = None) -> int:
+        """Importe le registre et charge en mémoire les inventaires dédiés en
+        cache local. Retourne le nombre d'inventaires chargés."""
+        args = self._parse(argv or ["warmup", "--dedicated-cache-only"])
+        adapters = build_adapters(args)
+        self._track_inventories(adapters)
+        loaded = 0
+        for adapter in adapters:
+            slug = getattr(adapter, "slug", None)
+            if slug and self.cache.local_timestamp(slug) is not None:
+                loaded += 1
+        return loaded
+
+    def mark_stale(self) -> None:
+        """Force le contrôle de fraîcheur à la prochaine requête."""
+        self._next_refresh_check = 0.0
+
+    def check_freshness(self) -> int:
+        """Invalide les inventaires locaux plus anciens que `scraped_site_data`.
+        Retourne le nombre d'entrées invalidées."""
+        remote = self.cache.remote_timestamps()
+        if not remote:
+            return 0
+        with self._keys_lock:
+            keys = list(self._inventory_keys.items())
+        invalidated = 0
+        for key, aliases in keys:
+            local = self.cache.local_timestamp(key)
+            if local is None:
+                continue
+            newest = max((remote.get(name, 0.0) for name in [key, *aliases]), default=0.0)
+            if newest > local:
+                self.cache.invalidate(key)
+                invalidated += 1
+        if invalidated:
+            with self._stats_lock:
+                self._invalidations += invalidated
+        return invalidated
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            latencies = sorted(self._latencies_ms)
+            data: Dict[str, Any] = {
+                "queries": self._queries,
+                "errors": self._errors,
+                "inventories_invalidated": self._invalidations,
+            }
+        with self._keys_lock:
+            data["inventories_tracked"] = len(self._inventory_keys)
+        if latencies:
+            data["p50_ms"] = round(statistics.median(latencies), 1)
+            data["p95_ms"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1)
+        return data
+
+    # ── Interne ──
+
+    def _parse(self, argv: List[str]):
+        try:
+            return self._parser.parse_args(argv)
+        except SystemExit as e:
+            # argparse quitte sur argument invalide : inacceptable dans le serveur
+            raise ValueError(f"Arguments de recherche invalides : {argv}") from e
+
+    def _track_inventories(self, adapters: list) -> None:
+        with self._keys_lock:
+            for adapter in adapters:
+                slug = getattr(adapter, "slug", None)
+                if slug and slug not in self._inventory_keys and hasattr(adapter, "_cache_aliases"):
+                    self._inventory_keys[slug] = list(adapter._cache_aliases())
+
+    def _maybe_check_freshness(self) -> None:
+        if time.monotonic() < self._next_refresh_check:
+            return
+        # Un seul thread fait le contrôle, les autres requêtes ne l'attendent pas
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() < self._next_refresh_check:
+                return
+            self._next_refresh_check = time.monotonic() + self.refresh_check_seconds
+            self.check_freshness()
+        finally:
+            self._refresh_lock.release()
+
+
+def _check_deadline(deadline: Optional[float], phase: str) -> float:
+    """Temps restant avant `deadline` ; lève SearchTimeout s'il est écoulé."""
+    if deadline is None:
+        return float("inf")
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise SearchTimeout(f"Échéance dépassée après {phase}")
+    return remaining
+
+
+_service: Optional[SearchService] = None
+_service_lock = threading.Lock()
+
+
+def get_search_service() -> SearchService:
+    """Service du process (créé à la première demande)."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = SearchService()
+        return _service
+
+
+def mark_search_inventories_stale() -> None:
+    """À appeler quand le cron a rafraîchi `scraped_site_data`."""
+    service = _service
+    if service is not None:
+        service.mark_stale()
@@ -0,0 +1,120 @@
+"""Tests de SearchCache (scraper_search/cache.py) : LRU mémoire, chargement
+single-flight et sonde de fraîcheur Supabase."""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from scraper_ai.scraper_search import cache as cache_mod
+from scraper_ai.scraper_search.adapters.dedicated import DedicatedScraperAdapter
+from scraper_ai.scraper_search.cache import CacheLookupStats, SearchCache
+from scraper_ai.scraper_search.federation import FederatedSearch
+from scraper_ai.scraper_search.query_parser import parse_query
+
+
+class _Response:
+    def __init__(self, rows):
+        self.status_code = 200
+        self._rows = rows
+
+    def json(self):
+        return self._rows
+
+
+class _FakeSupabase:
+    """`requests` réduit à GET scraped_site_data ; enregistre chaque select."""
+
+    def __init__(self, scraped_at, products, delay=0.0):
+        self.scraped_at = scraped_at
+        self.products = products
+        self.delay = delay
+        self.selects = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.selects.append(params["select"])
+        row = {"status": "success",
+               "scraped_at": datetime.fromtimestamp(self.scraped_at, timezone.utc).isoformat()}
+        if "products" in params["select"]:
+            time.sleep(self.delay)
+            row["products"] = self.products
+        return _Response([row])
+
+    @property
+    def downloads(self):
+        return sum(1 for s in self.selects if "products" in s)
+
+
+@pytest.fixture()
+def inventory_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(SearchCache, "_memory", {})
+    monkeypatch.setattr(SearchCache, "_flights", {})
+    monkeypatch.setenv("SUPABASE_URL", "https://supabase.test")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon")
+    return tmp_path
+
+
+def _products(n):
+    return [{"name": f"Honda CRF{i}", "marque": "Honda", "modele": f"CRF{i}",
+             "sourceUrl": f"https://dealer.test/{i}"} for i in range(n)]
+
+
+def test_concurrent_adapters_share_one_download(inventory_dir, monkeypatch):
+    fake = _FakeSupabase(time.time() - 60, _products(5), delay=0.3)
+    monkeypatch.setattr(cache_mod, "requests", fake)
+    cache = SearchCache()
+    adapters = [DedicatedScraperAdapter("dealer", cache=cache, cache_only=True) for _ in range(6)]
+
+    result = FederatedSearch(adapters, max_workers=6, verbose=False).search(
+        parse_query("honda crf"), total_timeout=30)
+
+    assert fake.downloads == 1
+    runs = result.adapters_run
+    assert sum(r.cache_misses for r in runs) == 1
+    assert sum(r.cache_coalesced for r in runs) == 5
+    assert all(r.hits_returned for r in runs)
+
+    lookups = CacheLookupStats()
+    assert len(cache.get("dealer", stats=lookups)) == 5
+    assert lookups.memory_hits == 1 and fake.downloads == 1
+
+
+def test_probe_skips_download_of_stale_remote(inventory_dir, monkeypatch):
+    fake = _FakeSupabase(time.time() - 3 * 3600, _products(5))
+    monkeypatch.setattr(cache_mod, "requests", fake)
+    assert SearchCache().get("dealer", max_age_seconds=3600) is None
+    assert fake.selects and fake.downloads == 0
+
+
+def test_stale_local_copy_refreshed_only_from_fresh_remote(inventory_dir, monkeypatch):
+    SearchCache().set("dealer", _products(2), timestamp=time.time() - 600)
+    fake = _FakeSupabase(time.time() - 900, _products(5))
+    monkeypatch.setattr(cache_mod, "requests", fake)
+    assert SearchCache().get("dealer", max_age_seconds=300) is None
+    assert fake.downloads == 0
+
+    fake.scraped_at = time.time() - 60
+    assert len(SearchCache().get("dealer", max_age_seconds=300)) == 5
+    assert fake.downloads == 1
+
+
+def test_memory_is_bounded_lru(inventory_dir, monkeypatch):
+    for key in ("a", "b", "c"):
+        SearchCache().set(key, _products(20))
+    size = (inventory_dir / "a.inv").stat().st_size
+    monkeypatch.setattr(SearchCache, "memory_bytes", 2 * size)
+    monkeypatch.setattr(SearchCache, "_memory", {})
+
+    cache = SearchCache()
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")          # « a » redevient le plus récent
+    cache.get("c")          # évince « b »
+    remembered = {Path(p).name for p in SearchCache._memory}
+    assert remembered == {"a.inv", "c.inv"}
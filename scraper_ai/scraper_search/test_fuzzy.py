@@ -0,0 +1,91 @@
+"""Non-régression du fuzzy matching (scraper_search/scoring.py) : les bornes
+ajoutées devant SequenceMatcher ne doivent changer aucune décision."""
+from __future__ import annotations
+
+import random
+import re
+from difflib import SequenceMatcher
+
+from scraper_ai.scraper_search.scoring import (
+    _FUZZY_THRESHOLD, _fuzzy_contains, _similar, _window_candidates,
+)
+
+_ALPHABET = "abcdefghiklmnorstuxyz0123456789    "
+
+
+def _reference_fuzzy_contains(needle: str, haystack: str) -> bool:
+    """Implémentation d'origine (SequenceMatcher sur chaque token/fenêtre)."""
+    if len(needle) < 5 or not haystack:
+        return False
+    for token in haystack.split():
+        if len(token) < 3:
+            continue
+        if SequenceMatcher(None, needle, token).ratio() >= _FUZZY_THRESHOLD:
+            return True
+    h_compact = haystack.replace(" ", "")
+    n_compact = needle.replace(" ", "")
+    if n_compact in h_compact:
+        return True
+    if len(n_compact) >= 5 and len(h_compact) >= len(n_compact):
+        for i in range(0, len(h_compact) - len(n_compact) + 1):
+            chunk = h_compact[i:i + len(n_compact)]
+            if SequenceMatcher(None, n_compact, chunk).ratio() >= _FUZZY_THRESHOLD:
+                return True
+    n_alpha = re.sub(r"[^a-z0-9]", "", needle)
+    h_alpha = re.sub(r"[^a-z0-9]", "", haystack)
+    return bool(n_alpha and n_alpha in h_alpha)
+
+
+def _mutate(rng: random.Random, text: str) -> str:
+    chars = list(text)
+    for _ in range(rng.randint(0, 2)):
+        op = rng.randrange(3)
+        pos = rng.randrange(len(chars) + 1)
+        if op == 0:
+            chars.insert(pos, rng.choice(_ALPHABET))
+        elif chars and op == 1:
+            del chars[min(pos, len(chars) - 1)]
+        elif chars:
+            chars[min(pos, len(chars) - 1)] = rng.choice(_ALPHABET)
+    return "".join(chars)
+
+
+def _random_text(rng: random.Random, size: int) -> str:
+    return " ".join("".join(rng.choice(_ALPHABET[:-4]) for _ in range(rng.randint(2, 8)))
+                    for _ in range(size)).strip()
+
+
+def test_similar_matches_sequence_matcher():
+    rng = random.Random(7)
+    for _ in range(3000):
+        a = _random_text(rng, 1)
+        b = _mutate(rng, a) if rng.random() < 0.7 else _random_text(rng, 1)
+        expected = SequenceMatcher(None, a, b).ratio() >= _FUZZY_THRESHOLD
+        assert _similar(a, b) is expected, (a, b)
+
+
+def test_window_candidates_keep_every_matching_window():
+    rng = random.Random(11)
+    for _ in range(500):
+        text = _random_text(rng, 6).replace(" ", "")
+        needle = _mutate(rng, text[rng.randrange(len(text)):][:rng.randint(5, 9)]).replace(" ", "")
+        if len(needle) < 5 or len(needle) > len(text):
+            continue
+        kept = set(_window_candidates(needle, text))
+        for i in range(len(text) - len(needle) + 1):
+            ratio = SequenceMatcher(None, needle, text[i:i + len(needle)]).ratio()
+            if ratio >= _FUZZY_THRESHOLD:
+                assert i in kept, (needle, text, i)
+
+
+def test_fuzzy_contains_matches_reference():
+    rng = random.Random(3)
+    for _ in range(1500):
+        haystack = _random_text(rng, rng.randint(1, 12))
+        words = haystack.split()
+        source = " ".join(words[rng.randrange(len(words)):][:2])
+        needle = _mutate(rng, source).strip()
+        assert _fuzzy_contains(needle, haystack) == _reference_fuzzy_contains(needle, haystack), \
+            (needle, haystack)
+    assert _fuzzy_contains("skidoo", "bombardier ski doo summit")
+    assert _fuzzy_contains("kawazaki", "kawasaki ninja 400")
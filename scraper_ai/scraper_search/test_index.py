@@ -0,0 +1,128 @@
+"""Non-régression de l'index inversé (scraper_search/index.py) : les hits
+avec index doivent être identiques au scan complet de `select_hits`."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from scraper_ai.scraper_search.index import InventoryIndex
+from scraper_ai.scraper_search.query_parser import parse_query
+from scraper_ai.scraper_search.scoring import select_hits
+
+# Requêtes relevées sur /product-search (texte, catégorie)
+RECORDED_QUERIES = [
+    ("KTM SX 150 2026", None),
+    ("honda crf450r", None),
+    ("Honda CRF 450R 2024", "vehicule.moto"),
+    ("yamaha yz250f", None),
+    ("Yamaha YZ 250 F 2023", None),
+    ("skidoo summit 850", None),
+    ("Ski-Doo MXZ 600 2019", "vehicule.motoneige"),
+    ("kawasaki ninja 400 2022 < 8000$", None),
+    ("can-am outlander 2020-2023", None),
+    ("polaris rzr xp 1000", "vehicule.cote-a-cote"),
+    ("harley davidson street glide", None),
+    ("Harley-Davidson Road King 2018", None),
+    ("bmw r 1250 gs", None),
+    ("bmw", None),
+    ("ktm", None),
+    ("suzuki dr-z400 usagé", None),
+    ("moto cross 2021", None),
+    ("VTT 4x4 rouge", None),
+    ("Kawazaki Ninja", None),
+    ("Hondaa Rebel 500", None),
+    ("Triumph Bonneville 2015", None),
+    ("yamaha grizzly 700 2025 neuf", None),
+    ("arctic cat 2010", None),
+    ("CFMoto CForce 600", None),
+    ("Ducati Panigale V4", None),
+]
+
+_BRANDS = {
+    "Honda": ["CRF450R", "CRF 250F", "Rebel 500", "Africa Twin", "TRX420"],
+    "Yamaha": ["YZ250F", "YZ 450F", "MT-07", "Grizzly 700", "Ténéré 700"],
+    "Kawasaki": ["Ninja 400", "KX450", "Brute Force 750", "Z900"],
+    "Ski-Doo": ["Summit X 850", "MXZ 600", "Renegade 900"],
+    "Polaris": ["RZR XP 1000", "Sportsman 570", "General 1000"],
+    "Can-Am": ["Outlander 700", "Maverick X3", "Spyder F3"],
+    "KTM": ["150 SX", "300 XC", "890 Adventure", "SX-F 450"],
+    "Harley-Davidson": ["Street Glide", "Road King", "Sportster 883"],
+    "BMW": ["R 1250 GS", "S 1000 RR"],
+    "Suzuki": ["DR-Z400", "GSX-R600", "King Quad 750"],
+    "CFMOTO": ["CForce 600", "ZForce 950"],
+}
+_CATEGORIES = ["moto", "vtt", "motoneige", "cote-a-cote", ""]
+
+
+def _inventory(seed: int, size: int) -> list:
+    rng = random.Random(seed)
+    products = []
+    for i in range(size):
+        marque = rng.choice(list(_BRANDS))
+        modele = rng.choice(_BRANDS[marque])
+        annee = rng.randint(2008, 2026)
+        name = f"{marque} {modele} {annee}"
+        product = {
+            "name": name, "marque": marque, "modele": modele, "annee": annee,
+            "prix": rng.choice([None, rng.randint(2000, 30000)]),
+            "etat": rng.choice(["neuf", "usagé", None]),
+            "couleur": rng.choice(["Rouge", "Noir", "Blanc", ""]),
+            "categorie": rng.choice(_CATEGORIES),
+            "description": f"{name} — très propre",
+            "sourceUrl": f"https://dealer.test/{rng.choice(_CATEGORIES) or 'inventaire'}/{i}",
+        }
+        variant = rng.random()
+        if variant < 0.08:
+            product["marque"] = ""  # marque seulement dans le nom
+        elif variant < 0.14:
+            product.pop("annee")  # année à déduire du texte
+        elif variant < 0.18:
+            product["annee"] = None
+            product["name"] = f"{marque} {modele}"
+            product["description"] = "Prix sur demande"
+        elif variant < 0.22:
+            product["name"] = product["name"].replace("-", "").replace("a", "e", 1)  # coquille
+        elif variant < 0.24:
+            product["marque"] = None
+        products.append(product)
+    products.append("pas un produit")
+    return products
+
+
+def _signature(result):
+    hits, scanned, approx = result
+    return ([(h.source_url, round(h.score, 9), h.match_reason, h.is_approximate) for h in hits],
+            scanned, approx)
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_indexed_hits_match_full_scan(seed):
+    products = _inventory(seed, 300)
+    index = InventoryIndex(products)
+    pruned = 0
+    for text, category in RECORDED_QUERIES:
+        query = parse_query(text)
+        query.category_path = category
+        query.max_results = 30
+        kwargs = dict(max_results=30, source_site="dealer.test", source_slug="dealer")
+        expected = _signature(select_hits(query, products, **kwargs))
+        assert _signature(select_hits(query, products, index=index, **kwargs)) == expected, text
+        candidates = index.candidates(query)
+        if candidates is not None:
+            pruned += len(products) - len(candidates)
+    assert pruned > len(RECORDED_QUERIES) * 150
+
+
+def test_cache_builds_index_on_set(tmp_path, monkeypatch):
+    from scraper_ai.scraper_search import cache as cache_mod
+    from scraper_ai.scraper_search.cache import SearchCache
+
+    monkeypatch.setattr(cache_mod, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(SearchCache, "_memory", {})
+    products = _inventory(4, 50)
+    SearchCache().set("dealer", products)
+    cached = SearchCache().get("dealer")
+    index = SearchCache().index_for("dealer", cached)
+    assert index is not None and index is SearchCache().index_for("dealer", cached)
+    assert SearchCache().index_for("dealer", list(cached)) is None
@@ -0,0 +1,77 @@
+"""Tests du format `.inv` des inventaires en cache (scraper_search/inventory_file.py)."""
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from scraper_ai.scraper_search import cache as cache_mod
+from scraper_ai.scraper_search.cache import SearchCache
+from scraper_ai.scraper_search.inventory_file import MappedInventory, read_header
+from scraper_ai.scraper_search.query_parser import parse_query
+
+
+@pytest.fixture()
+def inventory_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(SearchCache, "_memory", {})
+    monkeypatch.delenv("SEARCH_CACHE_FORMAT", raising=False)
+    for var in ("SUPABASE_URL", "NEXT_PUBLIC_SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY",
+                "SUPABASE_ANON_KEY", "NEXT_PUBLIC_SUPABASE_ANON_KEY"):
+        monkeypatch.delenv(var, raising=False)
+    return tmp_path
+
+
+def _products(n):
+    brands = ["Honda", "Yamaha", "Kawasaki", "Ski-Doo"]
+    return [{"name": f"{brands[i % 4]} Modèle {i}", "marque": brands[i % 4], "modele": f"M{i}",
+             "annee": 2015 + i % 10, "prix": 1000 + i, "sourceUrl": f"https://dealer.test/{i}"}
+            for i in range(n)]
+
+
+def test_products_decoded_on_access(inventory_dir, monkeypatch):
+    products = _products(40)
+    SearchCache().set("dealer", products, timestamp=time.time() - 30)
+    assert (inventory_dir / "dealer.inv").exists() and not (inventory_dir / "dealer.json").exists()
+    monkeypatch.setattr(SearchCache, "_memory", {})  # nouveau process
+
+    assert read_header(inventory_dir / "dealer.inv")[1] == 40
+    assert 25 < SearchCache().age_seconds("dealer") < 60
+    cached = SearchCache().get("dealer")
+    assert isinstance(cached, MappedInventory) and cached.decoded == 0
+    assert cached[7] == products[7] and cached[-1] == products[-1] and cached.decoded == 2
+    assert list(cached) == products and SearchCache().get("dealer") is cached
+
+
+def test_index_read_back_from_file(inventory_dir, monkeypatch):
+    from scraper_ai.scraper_search.index import InventoryIndex
+
+    products = _products(60)
+    SearchCache().set("dealer", products)
+    monkeypatch.setattr(SearchCache, "_memory", {})
+    cached = SearchCache().get("dealer")
+    index = SearchCache().index_for("dealer", cached)
+    assert cached.decoded == 0
+    for text in ("Kawasaki 2019", "Honda M12", "Ski-Doo"):
+        query = parse_query(text)
+        assert index.candidates(query) == InventoryIndex(products).candidates(query)
+
+
+def test_legacy_json_still_read(inventory_dir):
+    products = _products(3)
+    (inventory_dir / "dealer.json").write_text(json.dumps(
+        {"key": "dealer", "timestamp": time.time(), "products": products}))
+    assert SearchCache().get("dealer") == products
+    assert SearchCache().list_keys() == ["dealer"]
+
+    SearchCache().set("dealer", products[:2])
+    assert not (inventory_dir / "dealer.json").exists()
+    assert list(SearchCache().get("dealer")) == products[:2]
+    assert SearchCache().invalidate("dealer") and SearchCache().list_keys() == []
+
+
+def test_json_format_opt_out(inventory_dir, monkeypatch):
+    monkeypatch.setenv("SEARCH_CACHE_FORMAT", "json")
+    SearchCache().set("dealer", _products(2))
+    assert (inventory_dir / "dealer.json").exists() and not (inventory_dir / "dealer.inv").exists()
@@ -0,0 +1,120 @@
+"""Tests du service de recherche résident (scraper_search/service.py)."""
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from scraper_ai.scraper_search import cache as cache_mod
+from scraper_ai.scraper_search.cache import SearchCache
+from scraper_ai.scraper_search.service import SearchService, SearchTimeout
+
+
+@pytest.fixture()
+def inventory_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_mod, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(SearchCache, "_memory", {})
+    for var in ("SUPABASE_URL", "NEXT_PUBLIC_SUPABASE_URL", "SUPABASE_SERVICE_ROLE_KEY",
+                "SUPABASE_ANON_KEY", "NEXT_PUBLIC_SUPABASE_ANON_KEY"):
+        monkeypatch.delenv(var, raising=False)
+    return tmp_path
+
+
+def _slug() -> str:
+    from scraper_ai.dedicated_scrapers.registry import DedicatedScraperRegistry
+
+    infos = DedicatedScraperRegistry.list_all()
+    if not infos:
+        pytest.skip("registre des scrapers dédiés vide")
+    return infos[0]["slug"]
+
+
+def _write(directory, slug, names, timestamp=None):
+    products = [{"name": n, "marque": n.split()[0], "modele": n.split()[1], "prix": 9999,
+                 "sourceUrl": f"https://dealer.test/{i}"} for i, n in enumerate(names)]
+    (directory / f"{slug}.json").write_text(json.dumps({
+        "key": slug, "timestamp": timestamp or time.time(), "products": products}))
+
+
+def test_inventory_decoded_once_until_file_changes(inventory_dir, monkeypatch):
+    _write(inventory_dir, "dealer", ["Honda CRF450R"])
+    decodes = []
+    real_loads = json.loads
+    monkeypatch.setattr(cache_mod.json, "loads", lambda raw: decodes.append(1) or real_loads(raw))
+
+    first = SearchCache().get("dealer")
+    assert SearchCache().get("dealer") is first and len(decodes) == 1
+    assert SearchCache().age_seconds("dealer") is not None and len(decodes) == 1
+
+    _write(inventory_dir, "dealer", ["Honda CRF450R", "Yamaha YZ250F 2025"])
+    assert len(SearchCache().get("dealer")) == 2 and len(decodes) == 2
+
+
+def test_service_matches_cli_json(inventory_dir, capsys):
+    from scraper_ai.scraper_search.main import main
+
+    slug = _slug()
+    _write(inventory_dir, slug, ["Honda CRF450R", "Yamaha YZ250F", "Kawasaki KX450"])
+    argv = ["honda crf450r", "--json", "--quiet", "--only", slug, "--dedicated-cache-only"]
+
+    main(argv)
+    expected = json.loads(capsys.readouterr().out)
+    result = SearchService().search(argv)
+
+    for payload in (expected, result):
+        payload.pop("elapsed_seconds")
+        for run in payload["adapters_run"]:
+            run.pop("duration_seconds")
+    assert result == expected
+    assert result["hits"] and result["hits"][0]["name"] == "Honda CRF450R"
+
+
+def test_invalid_arguments_raise_value_error(inventory_dir):
+    service = SearchService()
+    with pytest.raises(ValueError):
+        service.search(["honda", "--category", "pas-une-categorie"])
+    with pytest.raises(ValueError):
+        service.search(["honda", "--max-results", "beaucoup"])
+    assert service.stats()["errors"] == 2
+
+
+def test_expired_deadline_stops_between_phases(inventory_dir, monkeypatch):
+    from scraper_ai.scraper_search import service as service_mod
+    from scraper_ai.scraper_search.models import SearchResult
+
+    slug = _slug()
+    _write(inventory_dir, slug, ["Honda CRF450R"])
+    argv = ["honda crf450r", "--only", slug, "--dedicated-cache-only"]
+    searches = []
+    monkeypatch.setattr(service_mod.FederatedSearch, "search",
+                        lambda self, query, total_timeout=None:
+                        searches.append(total_timeout) or SearchResult(query=query))
+    service = SearchService()
+
+    with pytest.raises(SearchTimeout):
+        service.search(argv, deadline=time.monotonic() - 1)
+    assert searches == [] and service.stats()["errors"] == 1
+
+    # Échéance lointaine : timeout total de la fédération inchangé
+    service.search(argv + ["--total-timeout", "20"], deadline=time.monotonic() + 3600)
+    # Échéance proche : borné au temps restant
+    service.search(argv + ["--total-timeout", "20"], deadline=time.monotonic() + 2)
+    assert searches[0] == 20 and 0 < searches[1] <= 2
+
+
+def test_cron_refresh_invalidates_older_inventory(inventory_dir, monkeypatch):
+    slug = _slug()
+    _write(inventory_dir, slug, ["Honda CRF450R"], timestamp=time.time() - 600)
+    service = SearchService(refresh_check_seconds=3600)
+    service.warm(["x", "--only", slug, "--dedicated-cache-only"])
+
+    remote = {slug: time.time() - 900}
+    monkeypatch.setattr(SearchCache, "remote_timestamps", lambda self: dict(remote))
+    assert service.check_freshness() == 0
+
+    remote[slug] = time.time()
+    service.mark_stale()
+    service.search(["honda", "--only", slug, "--dedicated-cache-only"])
+    assert not (inventory_dir / f"{slug}.json").exists()
+    assert service.stats()["inventories_invalidated"] == 1
@@ -10,6 +10,10 @@ Sous-étapes :
   1.6 Détection anti-bot
   1.7 Encodage et langue
   1.8 Persistance de l'analyse
+
+Les pages listing / détail passent par un PageMemo propre à l'analyse (un
+GET et un parsing par URL, préchargement parallèle des échantillons) ; le
+temps et les GET de chaque sous-étape finissent dans SiteAnalysis.phase_stats.
 """
 from __future__ import annotations
 
@@ -37,6 +41,7 @@ from .domain_profiles import (
     detect_domain_profile, get_profile,
 )
 from .listing_detector import best_listing, measure_completeness
+from .page_memo import PREFETCH_WORKERS, PageMemo
 from .stealth import stealth_headers, random_user_agent
 from .template_clusters import cluster_detail_templates
 from .url_filters import (
@@ -95,13 +100,16 @@ class SiteAnalyzer:
 
     def __init__(self, *, use_playwright: bool = True, verbose: bool = True,
                  domain_profile: Optional[DomainProfile] = None,
-                 force_profile_key: Optional[str] = None):
+                 force_profile_key: Optional[str] = None,
+                 session: Optional[requests.Session] = None):
         """
         Args:
             use_playwright : autorise l'usage de Playwright (interception API + fallback Phase 1)
             verbose : logs détaillés
             domain_profile : profil métier imposé (auto, ecommerce, real_estate, jobs)
             force_profile_key : alternative string ('auto'|'ecommerce'|...) pour CLI
+            session : session HTTP fournie par l'appelant (batch parallèle :
+                      pool de connexions et débit par hôte partagés)
         """
         self.verbose = verbose
         self.use_playwright = use_playwright
@@ -116,8 +124,10 @@ class SiteAnalyzer:
 
         self._auto_detect_profile = (domain_profile is None and not force_profile_key)
 
-        self.session = requests.Session()
+        self.session = session if session is not None else requests.Session()
         self.session.headers.update(stealth_headers())
+        # Pages listing / détail de l'analyse en cours (recréé par analyze)
+        self._pages = PageMemo(self.session, log_fn=self._log)
 
         # BrowserAgent partagé : lancé à la 1ère utilisation, réutilisé par
         # 1.3bis et 1.5 pour éviter de relancer Chromium deux fois.
@@ -152,6 +162,13 @@ class SiteAnalyzer:
     # ------------------------------------------------------------------
 
     def analyze(self, url: str) -> SiteAnalysis:
+        self._pages = PageMemo(self.session, log_fn=self._log)
+        try:
+            return self._analyze(url)
+        finally:
+            self._pages.close()
+
+    def _analyze(self, url: str) -> SiteAnalysis:
         self._log(f"Analyse de {url}")
         start = time.time()
 
@@ -188,6 +205,7 @@ class SiteAnalyzer:
             self._log(f"    Domaine mis à jour après redirect: {analysis.domain}")
 
         # 1.1 Détection plateforme
+        self._pages.start_phase("1.1 plateforme")
         self._log("1.1 Détection plateforme...")
         t0 = time.time()
         analysis.platform = detect_platform(homepage_html, homepage_headers, url)
@@ -206,6 +224,7 @@ class SiteAnalyzer:
         analysis.domain_profile_key = self.profile.domain_type.value
 
         # 1.2 Anti-bot EARLY (avant de bombarder le site de requêtes)
+        self._pages.start_phase("1.2 anti-bot")
         self._log("1.2 Détection anti-bot + timing...")
         t0 = time.time()
         self._detect_anti_bot(analysis, url)
@@ -217,6 +236,7 @@ class SiteAnalyzer:
             return analysis
 
         # 1.3 Cartographie structure
+        self._pages.start_phase("1.3 structure")
         self._log("1.3 Cartographie structure...")
         t0 = time.time()
         self._map_structure(analysis, soup, analysis.site_url)
@@ -225,6 +245,7 @@ class SiteAnalyzer:
 
         # 1.3bis Si requests n'a rien trouvé (0 listing actif), tenter le rendu Playwright
         if self.use_playwright and not any(lp.estimated_products > 0 for lp in analysis.listing_pages):
+            self._pages.start_phase("1.3bis rendu")
             self._log("1.3bis Aucun listing exploitable en HTML brut → fallback Playwright...")
             t_render = time.time()
             # On capture les réponses JSON dès ce rendu : si 1.5 visite la
@@ -261,6 +282,7 @@ class SiteAnalyzer:
                         ))
 
         # 1.4 Test rendu JS (iframes, scroll infini, load more)
+        self._pages.start_phase("1.4 rendu JS")
         self._log("1.4 Test rendu JavaScript...")
         t0 = time.time()
         self._test_js_rendering(analysis, soup, url)
@@ -268,6 +290,7 @@ class SiteAnalyzer:
                   f"scroll={analysis.has_infinite_scroll}, loadmore={analysis.has_load_more_button} ({time.time()-t0:.1f}s)")
 
         # 1.5 Interception API internes
+        self._pages.start_phase("1.5 API")
         if self.use_playwright:
             self._log("1.5 Interception API internes (Playwright)...")
             t0 = time.time()
@@ -277,6 +300,7 @@ class SiteAnalyzer:
             self._log("1.5 Interception API SKIP (playwright désactivé)")
 
         # 1.6 Mapping sélecteurs CSS
+        self._pages.start_phase("1.6 sélecteurs listing")
         self._log("1.6 Mapping sélecteurs CSS...")
         t0 = time.time()
         self._map_selectors(analysis)
@@ -285,6 +309,7 @@ class SiteAnalyzer:
                   f"json_ld={analysis.json_ld_available} ({time.time()-t0:.1f}s)")
 
         # 1.7 Encodage et langue
+        self._pages.start_phase("1.7 encodage")
         self._log("1.7 Encodage et langue...")
         t0 = time.time()
         self._detect_encoding_language(analysis, homepage_html, soup, url)
@@ -292,12 +317,14 @@ class SiteAnalyzer:
                   f"langues={list(analysis.language_versions.keys())} ({time.time()-t0:.1f}s)")
 
         # 1.8 Warm-up
+        self._pages.start_phase("1.8 warm-up")
         self._log("1.8 Test warm-up...")
         t0 = time.time()
         self._detect_warm_up(analysis, url)
         self._log(f"    -> warm_up={analysis.warm_up_required} ({time.time()-t0:.1f}s)")
 
         # 1.8bis Détection de variantes de templates de fiche détail (P2.2)
+        self._pages.start_phase("1.8bis templates")
         self._log("1.8bis Clustering des templates de fiche détail...")
         t0 = time.time()
         try:
@@ -308,6 +335,8 @@ class SiteAnalyzer:
                   f"({time.time()-t0:.1f}s)")
 
         # Slug + nom du site
+        self._pages.finish()
+        analysis.phase_stats = self._pages.report()
         analysis.slug = self._generate_slug(analysis)
         if not analysis.site_name:
             title = soup.find("title")
@@ -326,13 +355,19 @@ class SiteAnalyzer:
         self._log(f"Analyse terminée en {elapsed:.1f}s — {len(analysis.listing_pages)} listings, "
                   f"{len(analysis.sitemap_urls)} URLs sitemap, {len(analysis.detected_apis)} APIs, "
                   f"prix={analysis.price_display_mode.value}")
+        self._log_phase_stats(analysis.phase_stats)
 
         # 1.9 Persistance
         self._save(analysis)
 
-        # Libère Chromium dès la fin de l'analyse — on n'en a plus besoin
-        # pour les phases suivantes (stratégie, génération).
+        # Rend le contexte Chromium au pool dès la fin de l'analyse — on n'en
+        # a plus besoin pour les phases suivantes (stratégie, génération).
         self._close_browser_agent()
+        try:
+            from scraper_ai.dedicated_scrapers._browser_pool import log_browser_pool_stats
+            log_browser_pool_stats(self._log)
+        except Exception:
+            pass
         return analysis
 
     # ------------------------------------------------------------------
@@ -401,6 +436,10 @@ class SiteAnalyzer:
         max_consecutive_zeros = 15 if platform_known else 10
 
         for i, (link_url, link_text) in enumerate(unique_candidates[:max_candidates]):
+            # Précharge les candidats suivants pendant l'analyse de celui-ci ;
+            # fenêtre bornée : un arrêt anticipé ne gaspille que quelques GET.
+            self._pages.prefetch(
+                u for u, _ in unique_candidates[i + 1:min(i + 1 + PREFETCH_WORKERS, max_candidates)])
             self._log(f"    Analyse listing {i+1}/{max_candidates}: {link_url[:80]}...")
             etat, cat = self._classify_listing(link_text, link_url)
 
@@ -440,6 +479,8 @@ class SiteAnalyzer:
         sitemap_urls, sitemap_xml_url = probe_sitemap(self.session, base_url, analysis.platform)
         analysis.sitemap_urls = sitemap_urls
         analysis.sitemap_xml_url = sitemap_xml_url
+        # Les fiches d'échantillon (1.6) se chargent pendant 1.4 / 1.5
+        self._pages.prefetch(sitemap_urls[:5])
         self._log(f"    Sitemap : {len(sitemap_urls)} URLs produit, xml={sitemap_xml_url[:60] if sitemap_xml_url else 'none'} ({time.time()-t0:.1f}s)")
 
     def _is_excluded_path(self, path: str, excludes: Optional[List[str]] = None) -> bool:
@@ -590,10 +631,9 @@ class SiteAnalyzer:
 
     def _estimate_product_count(self, url: str) -> int:
         try:
-            resp = self.session.get(url, timeout=15)
-            if resp.status_code != 200:
+            html, soup = self._pages.page(url)
+            if html is None:
                 return 0
-            soup = BeautifulSoup(resp.text, "lxml")
             total_el = soup.select_one(
                 ".total-products, .result-count, .woocommerce-result-count, "
                 ".products-count, [data-total], .search-result-count"
@@ -619,7 +659,7 @@ class SiteAnalyzer:
 
             # 2) Fallback statistique : détecte les groupes d'items répétés
             cand = best_listing(
-                resp.text,
+                html,
                 item_hints=self.profile.listing_item_hints,
                 base_url=url,
                 min_items=4,
@@ -634,10 +674,9 @@ class SiteAnalyzer:
     def _measure_listing_completeness(self, url: str) -> float:
         """Mesure combien de champs clés sont disponibles sur la page listing."""
         try:
-            resp = self.session.get(url, timeout=15)
-            if resp.status_code != 200:
+            soup = self._pages.soup(url)
+            if soup is None:
                 return 0.0
-            soup = BeautifulSoup(resp.text, "lxml")
             items = soup.select(
                 "article, .product, .product-miniature, .product-card, "
                 ".vehicle-card, .inventory-item, .pg-vehicle-card"
@@ -915,10 +954,14 @@ class SiteAnalyzer:
             else:
                 self._log(f"      -> aucun sélecteur trouvé ({time.time()-t0:.1f}s)")
 
+        self._pages.start_phase("1.6 URLs détail")
         self._log("    Recherche URLs détail pour échantillon...")
         t0 = time.time()
         sample_urls = self._get_sample_detail_urls(analysis)
         self._log(f"    {len(sample_urls)} URLs détail trouvées ({time.time()-t0:.1f}s)")
+        self._pages.prefetch(sample_urls[:5])
+
+        self._pages.start_phase("1.6 sélecteurs détail")
 
         for i, detail_url in enumerate(sample_urls[:5]):
             self._log(f"    Détection sélecteurs détail {i+1}/{min(5,len(sample_urls))}: {detail_url[:70]}...")
@@ -926,11 +969,13 @@ class SiteAnalyzer:
             self._detect_detail_selectors(detail_url, analysis)
             self._log(f"      -> ({time.time()-t0:.1f}s)")
 
+        self._pages.start_phase("1.6 JSON-LD")
         self._log("    Détection JSON-LD...")
         t0 = time.time()
         self._detect_json_ld(sample_urls[:3], analysis)
         self._log(f"    -> json_ld={analysis.json_ld_available} type={analysis.json_ld_type} ({time.time()-t0:.1f}s)")
 
+        self._pages.start_phase("1.6 mode prix")
         self._log("    Détection mode prix...")
         t0 = time.time()
         self._detect_price_display_mode(analysis)
@@ -956,18 +1001,10 @@ class SiteAnalyzer:
             self._log(f"    Pas assez d'URLs détail ({len(urls)}) — skip clustering")
             return
 
-        def _fetch(u: str) -> Optional[str]:
-            try:
-                resp = self.session.get(u, timeout=15)
-                if resp.status_code != 200:
-                    return None
-                return resp.text
-            except Exception:
-                return None
-
+        self._pages.prefetch(urls)
         clusters = cluster_detail_templates(
             urls,
-            fetch_html=_fetch,
+            fetch_html=self._pages.html,
             log_fn=self._log,
         )
         analysis.detail_template_clusters = clusters
@@ -981,10 +1018,9 @@ class SiteAnalyzer:
 
         for lp in listing_pages_with_products[:3]:
             try:
-                resp = self.session.get(lp.url, timeout=15)
-                if resp.status_code != 200:
+                soup = self._pages.soup(lp.url)
+                if soup is None:
                     continue
-                soup = BeautifulSoup(resp.text, "lxml")
                 domain = urlparse(lp.url).netloc
 
                 item_sel = analysis.selectors.listing_item.selector
@@ -1034,10 +1070,9 @@ class SiteAnalyzer:
              (essai sériel des candidats fixes).
         """
         try:
-            resp = self.session.get(listing_url, timeout=15)
-            if resp.status_code != 200:
+            html, soup = self._pages.page(listing_url)
+            if html is None:
                 return None
-            soup = BeautifulSoup(resp.text, "lxml")
 
             profile_candidates = [(s, "a") for s in self.profile.listing_item_hints]
             base_candidates = [
@@ -1054,7 +1089,7 @@ class SiteAnalyzer:
 
             # 1) Statistique en premier
             cand = best_listing(
-                resp.text,
+                html,
                 item_hints=self.profile.listing_item_hints,
                 base_url=listing_url,
                 min_items=4,
@@ -1217,10 +1252,9 @@ class SiteAnalyzer:
 
     def _detect_detail_selectors(self, detail_url: str, analysis: SiteAnalysis) -> None:
         try:
-            resp = self.session.get(detail_url, timeout=15)
-            if resp.status_code != 200:
+            soup = self._pages.soup(detail_url)
+            if soup is None:
                 return
-            soup = BeautifulSoup(resp.text, "lxml")
 
             h1 = soup.find("h1")
             if h1:
@@ -1292,10 +1326,9 @@ class SiteAnalyzer:
         }
         for url in detail_urls:
             try:
-                resp = self.session.get(url, timeout=15)
-                if resp.status_code != 200:
+                soup = self._pages.soup(url)
+                if soup is None:
                     continue
-                soup = BeautifulSoup(resp.text, "lxml")
                 for script in soup.find_all("script", type="application/ld+json"):
                     try:
                         data = json.loads(script.string or "")
@@ -1325,10 +1358,9 @@ class SiteAnalyzer:
         pages_with_products = [lp for lp in analysis.listing_pages if lp.estimated_products > 0]
         for lp in pages_with_products[:2]:
             try:
-                resp = self.session.get(lp.url, timeout=15)
-                if resp.status_code != 200:
+                soup = self._pages.soup(lp.url)
+                if soup is None:
                     continue
-                soup = BeautifulSoup(resp.text, "lxml")
                 items = soup.select(
                     analysis.selectors.listing_item.selector or
                     "article, .product, .product-miniature, .product-card, .vehicle-card, .item"
@@ -1583,6 +1615,14 @@ class SiteAnalyzer:
         slug = re.sub(r"[^a-z0-9]+", "-", slug.lower()).strip("-")
         return slug or "unknown-site"
 
+    def _log_phase_stats(self, stats: Dict[str, Dict[str, float]]) -> None:
+        fetches = sum(s["fetches"] for s in stats.values())
+        hits = sum(s["memo_hits"] for s in stats.values())
+        self._log(f"    Pages : {fetches} GET, {hits} relecture(s) servie(s) par le mémo")
+        for phase, s in stats.items():
+            self._log(f"      {phase:<24} {s['seconds']:6.1f}s  {s['fetches']:3d} GET  "
+                      f"{s['memo_hits']:3d} mémo  {s['prefetched']:3d} préchargé(s)")
+
     def _log(self, msg: str) -> None:
         if self.verbose:
             print(f"  [SiteAnalyzer] {msg}")
@@ -0,0 +1,279 @@
+"""
+Batch parallèle de l'usine : N pipelines de sites dans un seul process.
+
+`main.py --batch urls.txt --parallel N` (et `scripts/usine_bench.py
+--in-process`) : au lieu d'un `python -m scraper_ai.scraper_usine.main URL`
+par site — un Chromium, un pool HTTP, des imports et un forkserver de test
+par process — les pipelines tournent dans des threads et partagent :
+
+  - le pool Chromium du process (dedicated_scrapers/_browser_pool.py),
+    agrandi pour prêter un contexte à chacun des N pipelines (SiteAnalyzer
+    garde le sien toute l'analyse) ;
+  - un pool de connexions HTTP (`HTTPAdapter` monté sur la session de
+    chaque SiteAnalyzer) ;
+  - le contrôle de débit par hôte (dedicated_scrapers/_rate_control.py) :
+    deux sites du même hôte ne le frappent pas au double de la cadence ;
+  - le runner chaud des tests de scrapers (scraper_runner), démarré avant
+    le premier site.
+
+Les écritures partagées (registre des scrapers générés, commit/push Git)
+sont sérialisées par leurs modules. La sortie de chaque pipeline (print du
+thread du site) va dans `scraper_cache/usine_logs/<slug>.log` et, préfixée
+du slug, sur la sortie standard ; les threads auxiliaires (préchargements,
+pool navigateur) écrivent sans préfixe.
+
+`BatchSiteResult.phases` : secondes par phase du pipeline ; le résumé
+donne le débit (sites/heure) et le cumul par phase.
+"""
+from __future__ import annotations
+
+import io
+import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+from scraper_ai.dedicated_scrapers._browser_pool import get_browser_pool
+from scraper_ai.dedicated_scrapers._rate_control import RateControlledSession
+
+from .page_memo import PREFETCH_WORKERS
+
+BATCH_LOG_DIR = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "usine_logs"
+
+DEFAULT_PARALLEL = 3
+# Hôtes distincts gardés dans le pool de connexions partagé
+POOL_HOSTS = 64
+
+# Ordre d'affichage des phases (clés remplies par main._process_url)
+PHASES = ("analyse", "strategie", "generation", "validation", "correction",
+          "agent", "publication")
+
+
+def slug_for_url(url: str) -> str:
+    """Slug deviné depuis l'URL (même règle que l'analyse)."""
+    domain = urlparse(url).netloc.replace("www.", "")
+    base = re.sub(r"\.(com|ca|net|org|fr|qc\.ca)$", "", domain)
+    return re.sub(r"[^a-z0-9]+", "-", base.lower()).strip("-")
+
+
+@dataclass
+class BatchSiteResult:
+    url: str
+    slug: str
+    score: Optional[int] = None
+    grade: Optional[str] = None
+    products: int = 0
+    seconds: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    log_path: Optional[str] = None
+
+
+class _SharedAdapter(HTTPAdapter):
+    """Pool de connexions commun : `Session.close()` d'un site ne le ferme pas."""
+
+    def close(self) -> None:
+        pass
+
+    def close_pool(self) -> None:
+        super().close()
+
+
+class BatchResources:
+    """Ressources partagées par les pipelines d'un batch."""
+
+    def __init__(self, parallel: int):
+        self.parallel = parallel
+        self.adapter = _SharedAdapter(pool_connections=POOL_HOSTS,
+                                      pool_maxsize=PREFETCH_WORKERS * 2)
+
+    def session(self) -> RateControlledSession:
+        """Session d'analyse d'un site : cookies propres, connexions et débit partagés."""
+        session = RateControlledSession(max_concurrency=PREFETCH_WORKERS)
+        session.mount("http://", self.adapter)
+        session.mount("https://", self.adapter)
+        return session
+
+    def close(self) -> None:
+        self.adapter.close_pool()
+
+
+class _SiteStdout(io.TextIOBase):
+    """sys.stdout du batch : les threads de pipeline écrivent dans leur journal."""
+
+    def __init__(self, real, echo: bool):
+        self._real = real
+        self._echo = echo
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def bind(self, prefix: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._local.sink = path.open("w", encoding="utf-8")
+        self._local.prefix = prefix
+        self._local.pending = ""
+
+    def unbind(self) -> None:
+        sink = getattr(self._local, "sink", None)
+        if sink is None:
+            return
+        if self._local.pending:
+            self._emit(self._local.pending + "\n")
+        sink.close()
+        self._local.sink = None
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        sink = getattr(self._local, "sink", None)
+        if sink is None:
+            with self._lock:
+                return self._real.write(text)
+        sink.write(text)
+        if self._echo:
+            *lines, self._local.pending = (self._local.pending + text).split("\n")
+            if lines:
+                self._emit("".join(f"{line}\n" for line in lines))
+        return len(text)
+
+    def console(self, text: str) -> None:
+        """Écrit sur la vraie sortie, sans journal ni préfixe."""
+        with self._lock:
+            self._real.write(text)
+            self._real.flush()
+
+    def _emit(self, text: str) -> None:
+        prefix = f"[{self._local.prefix}] "
+        with self._lock:
+            self._real.write("".join(prefix + line for line in text.splitlines(True)))
+            self._real.flush()
+
+    def flush(self) -> None:
+        sink = getattr(self._local, "sink", None)
+        if sink is not None:
+            sink.flush()
+        with self._lock:
+            self._real.flush()
+
+
+def run_batch(urls: List[str], process_url: Callable[..., Any], *,
+              parallel: int = DEFAULT_PARALLEL, verbose: bool = True,
+              log_dir: Path = BATCH_LOG_DIR, json_path: Optional[str] = None,
+              **pipeline_opts) -> List[BatchSiteResult]:
+    """Lance `process_url(url, session=..., phase_times=..., **pipeline_opts)`
+    sur chaque URL, `parallel` à la fois, et affiche le résumé du batch."""
+    sites: Dict[str, str] = {}
+    for url in urls:
+        slug = slug_for_url(url)
+        if slug in sites:
+            print(f"  [batch] {url} ignorée : même site que {sites[slug]}")
+            continue
+        sites[slug] = url
+
+    parallel = max(1, min(parallel, len(sites) or 1))
+    browser_pool = get_browser_pool()
+    if browser_pool is not None:
+        browser_pool.reserve(parallel)
+    resources = BatchResources(parallel)
+    try:
+        from .scraper_runner import get_runner
+        get_runner().warm()
+    except Exception as e:
+        print(f"  [batch] Runner de test non préchauffé : {type(e).__name__}: {e}")
+
+    print(f"  [batch] {len(sites)} site(s), {parallel} en parallèle — journaux : {log_dir}")
+    real_stdout = sys.stdout
+    router = _SiteStdout(real_stdout, echo=verbose)
+
+    def _one(slug: str, url: str) -> BatchSiteResult:
+        result = BatchSiteResult(url=url, slug=slug, log_path=str(log_dir / f"{slug}.log"))
+        router.bind(slug, log_dir / f"{slug}.log")
+        start = time.time()
+        try:
+            report = process_url(url, session=resources.session(),
+                                 phase_times=result.phases, verbose=verbose, **pipeline_opts)
+            if report is not None:
+                result.score = report.score
+                result.grade = report.grade
+                result.products = report.products_tested
+            else:
+                result.error = "pipeline interrompu (voir le journal)"
+        except Exception as e:
+            import traceback
+            traceback.print_exc(file=sys.stdout)
+            result.error = f"{type(e).__name__}: {str(e)[:300]}"
+        finally:
+            result.seconds = round(time.time() - start, 1)
+            router.unbind()
+        score = f"{result.score}/100" if result.score is not None else result.error
+        router.console(f"  [batch] {slug} terminé en {result.seconds:.0f}s — {score}\n")
+        return result
+
+    wall_start = time.time()
+    sys.stdout = router
+    try:
+        with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="usine-site") as pool:
+            futures = [pool.submit(_one, slug, url) for slug, url in sites.items()]
+            results = [f.result() for f in futures]
+    finally:
+        sys.stdout = real_stdout
+        resources.close()
+    wall = time.time() - wall_start
+
+    summary = batch_summary(results, wall, parallel)
+    _print_summary(results, summary)
+    try:
+        from scraper_ai.dedicated_scrapers._browser_pool import log_browser_pool_stats
+        log_browser_pool_stats()
+    except Exception:
+        pass
+    if json_path:
+        Path(json_path).write_text(json.dumps(
+            {"summary": summary, "results": [asdict(r) for r in results]},
+            indent=2, ensure_ascii=False,
+        ), encoding="utf-8")
+    return results
+
+
+def batch_summary(results: List[BatchSiteResult], wall_seconds: float,
+                  parallel: int) -> Dict[str, Any]:
+    """Débit du batch et secondes cumulées par phase."""
+    phases: Dict[str, float] = {}
+    for r in results:
+        for name, seconds in r.phases.items():
+            phases[name] = round(phases.get(name, 0.0) + seconds, 1)
+    busy = sum(r.seconds for r in results)
+    return {
+        "sites": len(results),
+        "parallel": parallel,
+        "wall_seconds": round(wall_seconds, 1),
+        "site_seconds": round(busy, 1),
+        "sites_per_hour": round(len(results) * 3600 / wall_seconds, 1) if wall_seconds else 0.0,
+        "phases": {name: phases[name] for name in (*PHASES, *sorted(set(phases) - set(PHASES)))
+                   if name in phases},
+    }
+
+
+def _print_summary(results: List[BatchSiteResult], summary: Dict[str, Any]) -> None:
+    print(f"\n{'='*70}")
+    print(f"  BATCH : {summary['sites']} site(s) en {summary['wall_seconds']:.0f}s "
+          f"({summary['parallel']} en parallèle) — {summary['sites_per_hour']} sites/heure")
+    print(f"{'='*70}")
+    for r in results:
+        status = f"{r.score}/100 ({r.grade})" if r.score is not None else f"ÉCHEC — {r.error}"
+        print(f"  {r.slug:30s} {r.seconds:6.0f}s  {status}")
+    if summary["phases"]:
+        busy = summary["site_seconds"] or 1.0
+        print("  Temps cumulé par phase :")
+        for name, seconds in summary["phases"].items():
+            print(f"    {name:12s} {seconds:7.0f}s ({seconds / busy:.0%})")
+    print(f"{'='*70}\n")
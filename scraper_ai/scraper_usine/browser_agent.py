@@ -10,6 +10,10 @@ Pourquoi c'est nécessaire : la stratégie historique `wait_until="networkidle"`
 timeoute systématiquement (20-25 s) sur les sites avec heartbeats permanents
 (GA4, chat widgets, websockets). Ici on inverse — DCL d'abord, networkidle
 bornée ensuite — et on borne le coût à ~12-16 s/page.
+
+Chromium vient du pool du process (dedicated_scrapers/_browser_pool.py) :
+chaque BrowserAgent reçoit un BrowserContext isolé sur un navigateur déjà
+lancé, et le rend à close(). SCRAPER_BROWSER_POOL=0 → un Chromium par agent.
 """
 from __future__ import annotations
 
@@ -181,6 +185,7 @@ class BrowserAgent:
         self._pw = None
         self._browser = None
         self._context = None
+        self._lease = None
         self._started = False
 
     # ------------------------------------------------------------------
@@ -188,10 +193,13 @@ class BrowserAgent:
     # ------------------------------------------------------------------
 
     def start(self) -> "BrowserAgent":
-        """Lance Playwright + Chromium + un BrowserContext stealth.
+        """Obtient un BrowserContext stealth : bail sur le pool de Chromium
+        chauds, sinon lance Playwright + Chromium comme avant.
         Idempotent : ne fait rien si déjà démarré."""
         if self._started:
             return self
+        if self._start_pooled():
+            return self
         try:
             from playwright.sync_api import sync_playwright
         except ImportError as e:
@@ -221,10 +229,51 @@ class BrowserAgent:
         self._started = True
         return self
 
+    def _context_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {
+            "user_agent": self.user_agent,
+            "locale": self.locale,
+            "viewport": self.viewport,
+        }
+        if self.proxy:
+            options["proxy"] = self.proxy
+        return options
+
+    def _start_pooled(self) -> bool:
+        try:
+            from scraper_ai.dedicated_scrapers._browser_pool import get_browser_pool
+            pool = get_browser_pool()
+            if pool is None:
+                return False
+            t0 = time.time()
+            lease = pool.lease(
+                context_options=self._context_options(),
+                setup=apply_stealth_to_playwright_context,
+            )
+        except Exception as e:
+            self._log(f"[BrowserAgent] pool indisponible ({type(e).__name__}: {e}) — lancement dédié")
+            return False
+        if lease is None:
+            self._log("[BrowserAgent] pool saturé — lancement dédié")
+            return False
+        self._log(f"[BrowserAgent] contexte prêté par le pool ({time.time()-t0:.1f}s)")
+        self._lease = lease
+        self._started = True
+        return True
+
     def close(self) -> None:
-        """Ferme le browser et arrête Playwright. Idempotent."""
+        """Rend le contexte au pool, ou ferme le browser et arrête Playwright.
+        Idempotent."""
         if not self._started:
             return
+        if self._lease is not None:
+            try:
+                self._lease.release()
+            except Exception:
+                pass
+            self._lease = None
+            self._started = False
+            return
         try:
             if self._context is not None:
                 self._context.close()
@@ -255,6 +304,18 @@ class BrowserAgent:
     def started(self) -> bool:
         return self._started
 
+    def add_cookies(self, cookies: List[Dict[str, Any]]) -> None:
+        """Injecte des cookies dans le contexte (session marketplace…)."""
+        if not self._started:
+            self.start()
+        self._on_context(lambda context: context.add_cookies(cookies))
+
+    def _on_context(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Exécute fn(context, ...) là où le contexte vit (thread du pool ou local)."""
+        if self._lease is not None:
+            return self._lease.call(fn, *args, **kwargs)
+        return fn(self._context, *args, **kwargs)
+
     # ------------------------------------------------------------------
     # Rendu
     # ------------------------------------------------------------------
@@ -288,13 +349,44 @@ class BrowserAgent:
         if not self._started:
             self.start()
 
+        result = self._on_context(
+            self._render, url,
+            timeout_ms=timeout_ms,
+            networkidle_ms=networkidle_ms,
+            capture_responses=capture_responses,
+            scroll=scroll,
+            max_scrolls=max_scrolls,
+            load_more_selector=load_more_selector,
+            max_load_more_clicks=max_load_more_clicks,
+            dismiss_cookies=dismiss_cookies,
+            post_load_wait_ms=post_load_wait_ms,
+        )
+        if self._lease is not None:
+            self._lease.record_render(result.elapsed_ms)
+        return result
+
+    def _render(
+        self,
+        context,
+        url: str,
+        *,
+        timeout_ms: int,
+        networkidle_ms: int,
+        capture_responses: bool,
+        scroll: bool,
+        max_scrolls: int,
+        load_more_selector: str,
+        max_load_more_clicks: int,
+        dismiss_cookies: bool,
+        post_load_wait_ms: Optional[int],
+    ) -> RenderResult:
         result = RenderResult()
         post_load_wait_ms = (
             self.POST_LOAD_WAIT_MS if post_load_wait_ms is None else post_load_wait_ms
         )
 
         captured: List[Dict[str, Any]] = []
-        page = self._context.new_page()
+        page = context.new_page()
 
         try:
             if self.block_assets:
@@ -379,8 +471,19 @@ class BrowserAgent:
         """
         if not self._started:
             self.start()
+        t0 = time.time()
+        links = self._on_context(
+            self._extract_links, url,
+            timeout_ms=timeout_ms, dismiss_cookies=dismiss_cookies,
+        )
+        if self._lease is not None:
+            self._lease.record_render((time.time() - t0) * 1000)
+        return links
 
-        page = self._context.new_page()
+    def _extract_links(
+        self, context, url: str, *, timeout_ms: int, dismiss_cookies: bool,
+    ) -> List[Dict[str, str]]:
+        page = context.new_page()
         try:
             if self.block_assets:
                 self._install_blocking_route(page)
@@ -35,8 +35,10 @@ from bs4 import BeautifulSoup
 
 from .models import GeneratedScraper, ScrapingStrategy, SiteAnalysis
 from .domain_profiles import get_profile
-from .generator import DEDICATED_DIR, GENERATED_REGISTRY_PATH
+from .generator import DEDICATED_DIR, GENERATED_REGISTRY_PATH, REGISTRY_LOCK
 from .html_cleanup import clean_html_for_llm
+from .http_cassette import cassette_for
+from .scraper_runner import get_runner
 from .lessons import record_lesson
 
 try:
@@ -700,7 +702,8 @@ class ClaudeAgent:
 
         path = DEDICATED_DIR / f"{module_name}.py"
         path.write_text(code, encoding="utf-8")
-        self._update_generated_registry(slug, module_name, class_name)
+        with REGISTRY_LOCK:
+            self._update_generated_registry(slug, module_name, class_name)
         return {
             "ok": True,
             "path": str(path),
@@ -713,55 +716,29 @@ class ClaudeAgent:
                                sample_limit: int = 3) -> Dict[str, Any]:
         """Exécute le scraper en sous-processus isolé avec timeout dur.
 
-        Utilise ``Queue`` (pas Pipe) pour éviter le deadlock quand le
-        payload dépasse 64 KB.
+        Même runner que la validation (scraper_runner) : fork du serveur
+        chaud, module relu sur disque à chaque test, timeout et plafond
+        mémoire appliqués par le parent.
         """
-        import multiprocessing as mp
-
         cats = categories or ["all"]
-        ctx = mp.get_context("spawn")
-        result_queue: "mp.Queue" = ctx.Queue()
         # Plafond explicite : sample_limit URLs (défaut 3) ou TEST_MAX_URLS_PER_CATEGORY
         # selon le plus grand des deux. Évite de lancer 1733 fetch.
         max_urls = max(sample_limit, TEST_MAX_URLS_PER_CATEGORY)
-        proc = ctx.Process(
-            target=_run_scraper_subprocess,
-            args=(module_name, class_name, cats, result_queue, max_urls),
-            daemon=True,
+        # Même cassette HTTP que la validation : chaque test de l'agent
+        # rejoue les pages déjà vues au lieu de re-télécharger le site.
+        payload = get_runner().run(
+            module_name, class_name, cats,
+            max_urls=max_urls, timeout=AGENT_TEST_TIMEOUT, workers=2, http_timeout=20,
+            cassette=cassette_for(slug),
         )
-        proc.start()
-
-        payload: Optional[Dict[str, Any]] = None
-        try:
-            payload = result_queue.get(timeout=AGENT_TEST_TIMEOUT)
-        except Exception:
-            pass
-
-        proc.join(timeout=5)
-        if proc.is_alive():
-            proc.terminate()
-            proc.join(timeout=3)
-            if proc.is_alive():
-                proc.kill()
-            try:
-                result_queue.close()
-            except Exception:
-                pass
-            if payload is None:
-                return {
-                    "ok": False,
-                    "products_count": 0,
-                    "errors": [f"timeout > {AGENT_TEST_TIMEOUT}s"],
-                    "products": [],
-                    "field_coverage": {},
-                }
-
-        try:
-            result_queue.close()
-        except Exception:
-            pass
-        if payload is None:
-            payload = {"products": [], "error": "no payload received"}
+        if payload["timed_out"]:
+            return {
+                "ok": False,
+                "products_count": 0,
+                "errors": [f"timeout > {AGENT_TEST_TIMEOUT}s"],
+                "products": [],
+                "field_coverage": {},
+            }
 
         products = (payload.get("products") or [])[:sample_limit]
         errors = [payload["error"]] if payload.get("error") else []
@@ -858,6 +835,10 @@ class ClaudeAgent:
             "platform": recipe.platform_type.value,
             "platform_name": recipe.name,
             "inheritable_class": recipe.inheritable_scraper_class or None,
+            "platform_engine": (
+                f"from .{recipe.platform_engine_module} import {recipe.platform_engine}"
+                if recipe.platform_engine else None
+            ),
             "default_listing_selector": recipe.default_listing_selector or "",
             "default_item_selector": recipe.default_item_selector or "",
             "default_price_selector": recipe.default_price_selector or "",
@@ -871,6 +852,14 @@ class ClaudeAgent:
                     if recipe.inheritable_scraper_class
                     else "Pas de classe d'héritage disponible — utiliser les sélecteurs proposés."
                 )
+                + (
+                    f" Moteur `{recipe.platform_engine}` disponible : sitemap + JSON-LD + "
+                    f"bloc prix déjà implémentés, parsing lxml sans BeautifulSoup ; un "
+                    f"site s'y réduit à sa configuration (SITE_*, _NAME_NOISE_RES, "
+                    f"_DESC_NOISE_RES, NAME_DEDUP_WINDOW)."
+                    if recipe.platform_engine
+                    else ""
+                )
             ),
         }
 
@@ -1088,6 +1077,12 @@ class ClaudeAgent:
 
         GENERATED_REGISTRY_PATH.write_text(content, encoding="utf-8")
 
+        try:
+            from scraper_ai.dedicated_scrapers.registry import refresh_manifest
+            refresh_manifest()
+        except Exception as e:
+            self._log(f"Manifeste du registre non régénéré : {type(e).__name__}: {e}")
+
     @staticmethod
     def _serialize_block(block: Any) -> Dict[str, Any]:
         """Convertit un block du SDK Anthropic en dict pour le re-poster."""
@@ -1139,63 +1134,6 @@ class ClaudeAgent:
             print(f"  [ClaudeAgent] {msg}")
 
 
-# ---------------------------------------------------------------------------
-# Helpers exécutés dans un sous-processus séparé (multiprocessing spawn)
-# ---------------------------------------------------------------------------
-
-def _run_scraper_subprocess(module_name: str, class_name: str,
-                             categories: List[str], queue,
-                             max_urls: int = 5) -> None:
-    """Réimplémentation locale de validator._run_scraper_subprocess.
-
-    Patche ``discover_product_urls`` du scraper pour limiter strictement
-    le nombre d'URLs scrapées (par défaut 5). Sinon un site avec 1733
-    URLs sitemap fait systématiquement timeout pendant un simple test.
-
-    Utilise Queue (pas Pipe) pour éviter le deadlock du buffer 64 KB.
-    """
-    import importlib as _imp
-    payload: Dict[str, Any] = {"products": [], "error": ""}
-    try:
-        module_path = f"scraper_ai.dedicated_scrapers.{module_name}"
-        mod = _imp.import_module(module_path)
-        scraper_class = getattr(mod, class_name)
-        scraper = scraper_class()
-
-        scraper.MAX_WORKERS = 2
-        if hasattr(scraper, "WORKERS"):
-            scraper.WORKERS = 2
-        scraper.HTTP_TIMEOUT = 20
-        if hasattr(scraper, "DETAIL_TIMEOUT"):
-            scraper.DETAIL_TIMEOUT = 20
-
-        original_discover = scraper.discover_product_urls
-
-        def limited_discover(categories=None):
-            urls = original_discover(categories=categories)
-            if isinstance(urls, list) and len(urls) > max_urls:
-                return urls[:max_urls]
-            return urls
-
-        scraper.discover_product_urls = limited_discover
-
-        result = scraper.scrape(categories=categories, inventory_only=False)
-        # Tronqué pour rester sous la limite de sérialisation Queue
-        # et pour limiter la quantité de tokens redonnée à Claude.
-        products = result.get("products", [])
-        payload["products"] = [_sanitize_product(p) for p in products]
-    except Exception as e:
-        import traceback
-        payload["error"] = (
-            f"{type(e).__name__}: {str(e)[:400]}\n"
-            f"{traceback.format_exc()[-1200:]}"
-        )
-    try:
-        queue.put(payload, timeout=10)
-    except Exception:
-        pass
-
-
 def _sanitize_product(p: Dict[str, Any]) -> Dict[str, Any]:
     """Tronque les valeurs longues pour ne pas exploser le contexte Claude."""
     out: Dict[str, Any] = {}
@@ -3,12 +3,13 @@ Phase 3 : ScraperCodeGenerator -- Génère le fichier Python du DedicatedScraper
 
 Utilise Jinja2 pour assembler des blocs de code (.py.j2) en un fichier
 complet hérité de DedicatedScraper ou d'une classe plateforme.
-Gère aussi la mise à jour de _generated_registry.py.
+Gère aussi la mise à jour de _generated_registry.py (et du manifeste du registre).
 """
 from __future__ import annotations
 
 import ast
 import re
+import threading
 from datetime import date
 from pathlib import Path
 from typing import Any, Dict, Optional
@@ -27,6 +28,9 @@ BLOCKS_DIR = Path(__file__).parent / "blocks"
 DEDICATED_DIR = Path(__file__).resolve().parent.parent / "dedicated_scrapers"
 GENERATED_REGISTRY_PATH = DEDICATED_DIR / "_generated_registry.py"
 STRATEGIES_DIR = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "strategies"
+# Lecture-modification-écriture de _generated_registry.py : sérialisée entre
+# les pipelines d'un batch parallèle (main.py --parallel) et l'agent
+REGISTRY_LOCK = threading.RLock()
 
 
 class ScraperCodeGenerator:
@@ -63,7 +67,8 @@ class ScraperCodeGenerator:
         file_path.write_text(code, encoding="utf-8")
         self._log(f"Scraper généré : {file_path}")
 
-        self._update_generated_registry(slug, module_name, class_name, analysis.domain)
+        with REGISTRY_LOCK:
+            self._update_generated_registry(slug, module_name, class_name, analysis.domain)
         self._persist_strategy(slug, analysis, strategy)
 
         return GeneratedScraper(
@@ -440,6 +445,17 @@ class ScraperCodeGenerator:
         self._log(f"Registry mis à jour : {slug} -> {class_name}")
 
         self._ensure_registry_import()
+        self._refresh_registry_manifest()
+
+    def _refresh_registry_manifest(self) -> None:
+        """Régénère `_manifest.py` pour que le registre paresseux résolve le
+        nouveau slug sans passer par le fallback `_generated_registry.py`."""
+        try:
+            from scraper_ai.dedicated_scrapers.registry import refresh_manifest
+            count = refresh_manifest()
+            self._log(f"Manifeste du registre régénéré ({count} scrapers)")
+        except Exception as e:
+            self._log(f"Manifeste non régénéré ({type(e).__name__}: {e}) — fallback _generated_registry")
 
     def _persist_strategy(self, slug: str, analysis: SiteAnalysis,
                           strategy: ScrapingStrategy) -> None:
@@ -26,6 +26,7 @@ from __future__ import annotations
 import os
 import shlex
 import subprocess
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional
@@ -36,6 +37,8 @@ from .workflow_generator import workflow_path_for_slug
 DEFAULT_BRANCH = "main"
 DEFAULT_AUTHOR_NAME = "scraper_usine"
 DEFAULT_AUTHOR_EMAIL = "scraper-usine@go-data.ca"
+# Un seul add/commit/push à la fois dans le process (batch parallèle)
+_GIT_LOCK = threading.Lock()
 
 # Fichiers tracés à inclure dans chaque commit auto.
 def _files_to_stage(generated: GeneratedScraper) -> List[Path]:
@@ -49,6 +52,7 @@ def _files_to_stage(generated: GeneratedScraper) -> List[Path]:
         Path(generated.file_path).resolve(),
         # Registry mis à jour
         project_root / "scraper_ai" / "dedicated_scrapers" / "_generated_registry.py",
+        project_root / "scraper_ai" / "dedicated_scrapers" / "_manifest.py",
         # Stratégie persistée (pour le validator)
         project_root / "scraper_cache" / "strategies" / f"{slug}_strategy.json",
         # Workflow GitHub Action dédié (auto-généré par workflow_generator)
@@ -109,6 +113,14 @@ def commit_and_push_scraper(
             files_committed=[],
         )
 
+    with _GIT_LOCK:
+        return _commit_and_push_locked(generated, pat=pat, repo=repo, branch=branch,
+                                       score=score, message_extra=message_extra,
+                                       verbose=verbose)
+
+
+def _commit_and_push_locked(generated: GeneratedScraper, *, pat: str, repo: str, branch: str,
+                            score: int, message_extra: str, verbose: bool) -> GitPushResult:
     project_root = Path(generated.file_path).resolve().parent.parent.parent
 
     # 1) Vérifier qu'on est dans un repo git
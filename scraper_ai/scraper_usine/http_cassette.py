@@ -0,0 +1,231 @@
+"""
+Cassettes HTTP pour la boucle génération → validation → correction (Phase 4).
+
+Chaque itération (ScraperValidator._run_scraper, outil run_scraper_test de
+l'agent) relance le scraper généré dans un sous-processus contre le vrai
+site : 5 itérations = les mêmes ~30 pages (sitemaps, listings, fiches, JSON
+d'API) téléchargées 5 fois. La cassette du slug enregistre le trafic de la
+première exécution dans `scraper_cache/cassettes/<slug>.sqlite` ; les
+suivantes le rejouent hors ligne, à l'identique.
+
+Interception au niveau `requests.adapters.HTTPAdapter.send` dans le
+sous-processus : toute requête `requests` (session du scraper, `requests.get`
+direct, redirections hop par hop) passe par la cassette. Clé : méthode +
+URL (+ empreinte du corps pour les POST d'API). Le rendu Playwright n'est pas
+enregistré.
+
+Modes (USINE_CASSETTE, ou `main.py --live-http`) :
+  - auto    (défaut) : rejoue ce qui est enregistré, enregistre le reste ;
+              une cassette plus vieille que CASSETTE_MAX_AGE_HOURS est
+              réenregistrée au premier run du process ;
+  - record  : repart d'une cassette vide au premier run du process, puis auto ;
+  - replay  : strictement hors ligne — une requête absente lève ConnectionError
+              (banc reproductible, cf. scripts/usine_bench.py --cassette) ;
+  - live    : pas de cassette (les health checks sont toujours live).
+
+Sous cassette, le sous-processus coupe le cache de validateurs, le moteur
+async (httpx, non intercepté) et le contrôle de débit adaptatif : des
+réponses rejouées ne doivent pas fausser les cadences apprises.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+CASSETTE_DIR = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "cassettes"
+
+MODES = ("auto", "record", "replay", "live")
+# Au-delà, le site a pu changer : la cassette est réenregistrée (mode auto)
+CASSETTE_MAX_AGE_HOURS = 6
+# Corps stocké décodé : ces headers ne décrivent plus le corps rejoué
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+# Slugs déjà remis à zéro par ce process (record / cassette périmée)
+_reset_slugs: set = set()
+
+
+def cassette_mode() -> str:
+    mode = os.environ.get("USINE_CASSETTE", "auto").strip().lower()
+    return mode if mode in MODES else "auto"
+
+
+def cassette_for(slug: str, *, live: bool = False) -> Optional[Tuple[str, str]]:
+    """(chemin, mode du sous-processus) de la cassette de `slug`, None en live.
+
+    Appelé côté parent avant chaque exécution ; la remise à zéro (record,
+    cassette périmée) n'a lieu qu'une fois par process.
+    """
+    mode = cassette_mode()
+    if live or mode == "live" or not slug:
+        return None
+    path = CASSETTE_DIR / f"{slug}.sqlite"
+    if slug not in _reset_slugs:
+        _reset_slugs.add(slug)
+        if mode == "record" or (mode == "auto" and _is_stale(path)):
+            _remove(path)
+    return str(path), ("replay" if mode == "replay" else "auto")
+
+
+def _is_stale(path: Path) -> bool:
+    try:
+        age = time.time() - path.stat().st_mtime
+    except OSError:
+        return False
+    return age > CASSETTE_MAX_AGE_HOURS * 3600
+
+
+def _remove(path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(f"{path}{suffix}")
+        except OSError:
+            pass
+
+
+def _request_key(request) -> str:
+    key = f"{request.method} {request.url}"
+    body = request.body
+    if body:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if isinstance(body, bytes):
+            key += " " + hashlib.sha1(body).hexdigest()[:16]
+    return key
+
+
+class HttpCassette:
+    """Réponses HTTP enregistrées d'un scraper (SQLite, thread-safe)."""
+
+    def __init__(self, path: Path, mode: str = "auto"):
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {"replayed": 0, "recorded": 0, "missing": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " status INTEGER NOT NULL,"
+                " reason TEXT,"
+                " headers TEXT NOT NULL,"
+                " body BLOB NOT NULL,"
+                " recorded_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, request) -> Optional[Tuple[int, str, Dict[str, str], bytes]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT status, reason, headers, body FROM responses WHERE key = ?",
+                (_request_key(request),),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1] or "", json.loads(row[2]), bytes(row[3])
+
+    def record(self, request, response: requests.Response) -> None:
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in _DROPPED_HEADERS}
+        body = response.content or b""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (_request_key(request), response.status_code, response.reason,
+                 json.dumps(headers), body, time.time()),
+            )
+            conn.commit()
+            self._stats["recorded"] += 1
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, **self._stats}
+
+
+def replayed_response(request, adapter, status: int, reason: str,
+                      headers: Dict[str, str], body: bytes) -> requests.Response:
+    """requests.Response équivalente à la réponse enregistrée."""
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.headers["Content-Length"] = str(len(body))
+    response._content = body
+    response._content_consumed = True
+    response.raw = io.BytesIO(body)
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.from_cassette = True
+    return response
+
+
+_installed: Optional[HttpCassette] = None
+_original_send = HTTPAdapter.send
+
+
+def install_cassette(path: str, mode: str = "auto") -> HttpCassette:
+    """Branche la cassette sur toutes les requêtes `requests` du process.
+
+    À appeler dans le sous-processus d'exécution, avant d'instancier le
+    scraper (les toggles d'environnement sont lus à la construction).
+    """
+    global _installed
+    os.environ["SCRAPER_HTTP_CACHE"] = "0"
+    os.environ["SCRAPER_ASYNC_FETCH"] = "0"
+    os.environ["SCRAPER_RATE_CONTROL"] = "0"
+    _installed = HttpCassette(Path(path), mode)
+    HTTPAdapter.send = _cassette_send
+    return _installed
+
+
+def uninstall_cassette() -> None:
+    global _installed
+    _installed = None
+    HTTPAdapter.send = _original_send
+
+
+def _cassette_send(self, request, stream=False, **kwargs):
+    cassette = _installed
+    if cassette is None:
+        return _original_send(self, request, stream=stream, **kwargs)
+    entry = cassette.lookup(request)
+    if entry is not None:
+        cassette.count("replayed")
+        return replayed_response(request, self, *entry)
+    if cassette.mode == "replay":
+        cassette.count("missing")
+        raise requests.exceptions.ConnectionError(
+            f"cassette: {request.method} {request.url} absent (USINE_CASSETTE=replay)",
+            request=request,
+        )
+    response = _original_send(self, request, stream=stream, **kwargs)
+    # Erreurs passagères (429, 5xx) : refaites au prochain run, pas figées
+    if response.status_code != 429 and response.status_code < 500:
+        cassette.record(request, response)
+    return response
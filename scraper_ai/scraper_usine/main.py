@@ -6,6 +6,7 @@ Orchestre les 4 phases : Analyse → Stratégie → Génération → Validation.
 Usage:
   python -m scraper_ai.scraper_usine.main <url>
   python -m scraper_ai.scraper_usine.main --batch urls.txt
+  python -m scraper_ai.scraper_usine.main --batch urls.txt --parallel 3
   python -m scraper_ai.scraper_usine.main --dry-run <url>
   python -m scraper_ai.scraper_usine.main --resume <url>
   python -m scraper_ai.scraper_usine.main --check <slug>
@@ -19,9 +20,12 @@ import os
 import sys
 import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+import requests
 
 from .analyzer import SiteAnalyzer, ANALYSIS_DIR
+from .batch import DEFAULT_PARALLEL, run_batch, slug_for_url
 from .models import GeneratedScraper, SiteAnalysis, ValidationReport
 from .planner import StrategyPlanner
 from .generator import ScraperCodeGenerator
@@ -40,6 +44,13 @@ def main(argv: Optional[List[str]] = None) -> None:
     )
     parser.add_argument("url", nargs="?", help="URL du site à analyser")
     parser.add_argument("--batch", metavar="FILE", help="Fichier avec une URL par ligne")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N",
+                        help="Avec --batch : N sites en parallèle dans ce process "
+                             "(pool Chromium, connexions HTTP et débit par hôte partagés ; "
+                             f"ex. {DEFAULT_PARALLEL})")
+    parser.add_argument("--batch-json", metavar="FILE",
+                        help="Avec --parallel : écrit le résumé du batch (scores, "
+                             "temps par phase, sites/heure) dans FILE")
     parser.add_argument("--dry-run", action="store_true",
                         help="Analyse + stratégie sans générer le scraper")
     parser.add_argument("--resume", action="store_true",
@@ -57,6 +68,9 @@ def main(argv: Optional[List[str]] = None) -> None:
                              "où le hybride n'a pas suffi (cf. /admin/usine).")
     parser.add_argument("--force-playwright", action="store_true",
                         help="Forcer l'utilisation de Playwright")
+    parser.add_argument("--live-http", action="store_true",
+                        help="Validation toujours contre le site réel, sans cassette HTTP "
+                             "(équivaut à USINE_CASSETTE=live)")
     parser.add_argument("--check", metavar="SLUG",
                         help="Health check sur un scraper existant")
     parser.add_argument("--check-all", action="store_true",
@@ -78,6 +92,8 @@ def main(argv: Optional[List[str]] = None) -> None:
 
     args = parser.parse_args(argv)
     verbose = not args.quiet
+    if args.live_http:
+        os.environ["USINE_CASSETTE"] = "live"
 
     if args.audit:
         _print_audit(args.audit)
@@ -115,6 +131,22 @@ def main(argv: Optional[List[str]] = None) -> None:
         parser.print_help()
         sys.exit(1)
 
+    pipeline_opts = dict(
+        dry_run=args.dry_run,
+        resume=args.resume,
+        no_claude=args.no_claude,
+        no_agent_fallback=args.no_agent_fallback,
+        no_hybrid=args.no_hybrid,
+        force_playwright=args.force_playwright,
+        profile=args.profile,
+        publish=not args.no_publish,
+        publish_threshold=args.publish_threshold,
+    )
+    if args.parallel > 1 and len(urls) > 1:
+        run_batch(urls, _process_url, parallel=args.parallel, verbose=verbose,
+                  json_path=args.batch_json, **pipeline_opts)
+        return
+
     for url in urls:
         _process_url(
             url,
@@ -148,8 +180,16 @@ def _process_url(
     profile: Optional[str] = None,
     publish: bool = True,
     publish_threshold: int = 95,
+    session: Optional[requests.Session] = None,
+    phase_times: Optional[Dict[str, float]] = None,
 ) -> Optional[ValidationReport]:
+    """Pipeline complet d'une URL.
+
+    ``session`` : session HTTP de l'analyse (batch parallèle) ;
+    ``phase_times`` : rempli avec les secondes par phase (cf. batch.PHASES).
+    """
     total_start = time.time()
+    timings = phase_times if phase_times is not None else {}
 
     print(f"\n{'='*70}")
     print(f"  SCRAPER USINE : {url}")
@@ -182,9 +222,10 @@ def _process_url(
         phase1_start = time.time()
         analyzer = SiteAnalyzer(
             use_playwright=True, verbose=verbose,
-            force_profile_key=profile,
+            force_profile_key=profile, session=session,
         )
         analysis = analyzer.analyze(url)
+        timings["analyse"] = round(time.time() - phase1_start, 1)
         print(f"  [{_ts()}] Phase 1 terminée en {time.time()-phase1_start:.1f}s")
 
         # Durcissement Phase 3 du plan : l'anti-bot n'arrête plus le pipeline.
@@ -243,6 +284,7 @@ def _process_url(
     phase2_start = time.time()
     planner = StrategyPlanner(verbose=verbose)
     strategy = planner.plan(analysis)
+    timings["strategie"] = round(time.time() - phase2_start, 1)
     print(f"  [{_ts()}] Phase 2 terminée en {time.time()-phase2_start:.1f}s")
 
     if force_playwright:
@@ -264,6 +306,7 @@ def _process_url(
     phase3_start = time.time()
     generator = ScraperCodeGenerator(verbose=verbose)
     generated = generator.generate(analysis, strategy)
+    timings["generation"] = round(time.time() - phase3_start, 1)
     print(f"  [{_ts()}] Phase 3 terminée en {time.time()-phase3_start:.1f}s")
     print(f"    Fichier: {generated.file_path}")
     print(f"    Classe: {generated.class_name}")
@@ -300,7 +343,9 @@ def _process_url(
     # On passe le supervisor au validator pour partager le compteur de réécritures.
     validator = ScraperValidator(verbose=verbose, supervisor=supervisor if supervisor.enabled else None)
     report = validator.validate(generated, analysis, strategy)
+    timings["validation"] = round(time.time() - phase4_start, 1)
     print(f"  [{_ts()}] Phase 4 terminée en {time.time()-phase4_start:.1f}s")
+    correction_start = time.time()
 
     # --- Auto-correction Claude (Phase 4) ---
     if report.score < 80 and not no_claude:
@@ -331,6 +376,8 @@ def _process_url(
                 report = validator.validate(generated, analysis, strategy)
                 print(f"  [{_ts()}] Score après correction ciblée: {report.score}/100")
 
+    timings["correction"] = round(time.time() - correction_start, 1)
+
     # --- Phase 4.5 : AI Agent Claude (fallback from-scratch) ---
     # Déclenché quand le code templates + corrections n'a pas atteint le seuil.
     # L'agent reconstruit le scraper avec tool use Anthropic (fetch HTML,
@@ -354,8 +401,10 @@ def _process_url(
                 print(f"  [{_ts()}] Score après agent : {report.score}/100")
             else:
                 print(f"  [{_ts()}] Agent n'a pas produit de scraper validé — on garde l'ancien code")
+            timings["agent"] = round(time.time() - agent_start, 1)
 
     # --- Verdict final go/no-go (avant publication) ---
+    publication_start = time.time()
     final_verdict_status = "ok"
     if supervisor.enabled and publish:
         v_final = supervisor.final_go_no_go(generated, analysis, strategy, report)
@@ -497,6 +546,7 @@ def _process_url(
         except Exception as e:
             print(f"  [{_ts()}] ⚠️ Run initial impossible : {type(e).__name__}: {e}")
 
+    timings["publication"] = round(time.time() - publication_start, 1)
     elapsed = time.time() - total_start
 
     # --- Résumé ---
@@ -682,13 +732,7 @@ def _print_audit(slug: str) -> None:
 
 def _try_load_analysis(url: str, verbose: bool) -> Optional[SiteAnalysis]:
     """Tente de charger une analyse sauvegardée pour cette URL."""
-    import re
-    from urllib.parse import urlparse
-    domain = urlparse(url).netloc.replace("www.", "")
-    slug = re.sub(r"\.(com|ca|net|org|fr|qc\.ca)$", "", domain)
-    slug = re.sub(r"[^a-z0-9]+", "-", slug.lower()).strip("-")
-
-    path = ANALYSIS_DIR / f"{slug}_analysis.json"
+    path = ANALYSIS_DIR / f"{slug_for_url(url)}_analysis.json"
     if path.exists():
         try:
             return SiteAnalysis.load(path)
@@ -100,6 +100,11 @@ class PlatformRecipe:
     default_price_selector: str = ""
     default_sitemap_path: str = ""
     inheritable_scraper_class: Optional[str] = None
+    # Moteur de plateforme des scrapers écrits à la main (classe de
+    # dedicated_scrapers, module `platform_engine_module`) : un site de la
+    # plateforme s'y réduit à sa configuration.
+    platform_engine: Optional[str] = None
+    platform_engine_module: str = ""
 
 
 @dataclass
@@ -309,6 +314,10 @@ class SiteAnalysis:
     # le générateur peut produire un dispatcher (P2.2-bis).
     detail_template_clusters: List[DetailTemplateCluster] = field(default_factory=list)
 
+    # Par sous-étape : temps mur, GET réseau, relectures servies par le mémo
+    # de pages et préchargements (cf. page_memo.PageMemo.report)
+    phase_stats: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
     analysis_timestamp: str = ""
 
     def save(self, path: Path) -> None:
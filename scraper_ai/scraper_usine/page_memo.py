@@ -0,0 +1,162 @@
+"""
+Mémo des pages de l'analyse (Phase 1) : un seul GET et un seul parsing par URL.
+
+Les sous-étapes de SiteAnalyzer relisent les mêmes listings et fiches
+détail : estimation du nombre de produits, complétude, sélecteurs listing,
+URLs d'échantillon, mode prix, JSON-LD, clustering des templates… Le mémo
+est créé pour une analyse : chaque URL est téléchargée une fois (les appels
+concurrents attendent le même GET), son HTML est parsé une fois en un soup
+partagé (lecture seule), et les URLs connues à l'avance sont préchargées
+en parallèle.
+
+Les requêtes qui mesurent le site (anti-bot, timing, warm-up) ne passent
+pas par le mémo.
+
+Chaque GET et chaque lecture mémoïsée est imputé à l'étape courante
+(`start_phase`) ; `report()` donne par étape le temps mur, les GET réseau,
+les lectures servies par le mémo et les préchargements.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+
+# Préchargements simultanés sur le site analysé
+PREFETCH_WORKERS = 4
+DEFAULT_TIMEOUT = 15
+
+
+class PageMemo:
+    """Pages GET d'une analyse, partagées entre les sous-étapes."""
+
+    def __init__(self, session: requests.Session, *, timeout: int = DEFAULT_TIMEOUT,
+                 max_workers: int = PREFETCH_WORKERS,
+                 log_fn: Optional[Callable[[str], None]] = None):
+        self.session = session
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._log = log_fn or (lambda _msg: None)
+        self._lock = threading.Lock()
+        self._pages: Dict[str, Future] = {}
+        self._soups: Dict[str, BeautifulSoup] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._phase = "accueil"
+        self._phase_start = time.time()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # -- Étapes ---------------------------------------------------------
+
+    def start_phase(self, name: str) -> None:
+        """Clôt l'étape courante et ouvre `name`."""
+        with self._lock:
+            self._close_phase()
+            self._phase = name
+            self._phase_start = time.time()
+
+    def finish(self) -> None:
+        """Clôt la dernière étape (avant `report()`)."""
+        with self._lock:
+            self._close_phase()
+            self._phase = "fin"
+            self._phase_start = time.time()
+
+    def _close_phase(self) -> None:
+        stats = self._phase_stats(self._phase)
+        stats["seconds"] = round(stats["seconds"] + time.time() - self._phase_start, 2)
+
+    def _phase_stats(self, phase: str) -> Dict[str, float]:
+        return self._stats.setdefault(
+            phase, {"seconds": 0.0, "fetches": 0, "memo_hits": 0, "prefetched": 0})
+
+    def _count(self, phase: str, key: str) -> None:
+        with self._lock:
+            self._phase_stats(phase)[key] += 1
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Par étape : seconds, fetches (GET réseau), memo_hits, prefetched."""
+        with self._lock:
+            return {phase: dict(stats) for phase, stats in self._stats.items()
+                    if stats["seconds"] or stats["fetches"] or stats["memo_hits"]}
+
+    # -- Pages ----------------------------------------------------------
+
+    def get(self, url: str) -> Optional[requests.Response]:
+        """Réponse GET de `url` (None si la requête a échoué)."""
+        with self._lock:
+            page = self._pages.get(url)
+            owner = page is None
+            if owner:
+                page = Future()
+                self._pages[url] = page
+            phase = self._phase
+        if owner:
+            page.set_result(self._fetch(url, phase))
+        else:
+            self._count(phase, "memo_hits")
+        try:
+            return page.result()
+        except CancelledError:
+            return None
+
+    def html(self, url: str) -> Optional[str]:
+        """HTML de `url` si la réponse est un 200, sinon None."""
+        return self._html(self.get(url))
+
+    def soup(self, url: str) -> Optional[BeautifulSoup]:
+        """Soup partagé de `url` (parsé une fois) — à ne pas modifier."""
+        return self.page(url)[1]
+
+    def page(self, url: str) -> Tuple[Optional[str], Optional[BeautifulSoup]]:
+        """(HTML, soup partagé) de `url` en une lecture ; (None, None) hors 200."""
+        html = self._html(self.get(url))
+        if html is None:
+            return None, None
+        with self._lock:
+            soup = self._soups.get(url)
+        if soup is None:
+            soup = BeautifulSoup(html, "lxml")
+            with self._lock:
+                soup = self._soups.setdefault(url, soup)
+        return html, soup
+
+    @staticmethod
+    def _html(resp: Optional[requests.Response]) -> Optional[str]:
+        if resp is None or resp.status_code != 200:
+            return None
+        return resp.text
+
+    def prefetch(self, urls: Iterable[str]) -> int:
+        """Lance en arrière-plan le GET des URLs pas encore demandées."""
+        submitted = 0
+        with self._lock:
+            phase = self._phase
+            for url in urls:
+                if not url or url in self._pages:
+                    continue
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="analyzer-prefetch")
+                self._pages[url] = self._pool.submit(self._fetch, url, phase)
+                self._phase_stats(phase)["prefetched"] += 1
+                submitted += 1
+        return submitted
+
+    def _fetch(self, url: str, phase: str) -> Optional[requests.Response]:
+        self._count(phase, "fetches")
+        try:
+            return self.session.get(url, timeout=self.timeout)
+        except Exception as e:
+            self._log(f"    GET échoué {url[:70]}: {type(e).__name__}: {e}")
+            return None
+
+    def close(self) -> None:
+        """Abandonne les préchargements pas encore partis."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -34,6 +34,8 @@ PLATFORM_RECIPES: List[PlatformRecipe] = [
         default_item_selector="a.pg-vehicle-card",
         default_price_selector="div.pg-vehicle-price",
         inheritable_scraper_class="MotoplexScraper",
+        platform_engine="PowerGoScraper",
+        platform_engine_module="_powergo",
     ),
     PlatformRecipe(
         platform_type=PlatformType.PRESTASHOP,
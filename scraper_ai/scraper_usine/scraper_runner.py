@@ -0,0 +1,288 @@
+"""
+Exécution isolée des scrapers générés (validation Phase 4, outil run_scraper_test de l'agent).
+
+Avant : un process `spawn` neuf par test, qui réimportait bs4, lxml, requests
+et `dedicated_scrapers.base` avant le moindre travail ; la fonction exécutée
+était dupliquée dans validator.py et claude_agent.py.
+
+Ici, un serveur `forkserver` est démarré une fois par process avec ces
+imports préchargés (PRELOAD) ; chaque job est un fork de ce serveur chaud :
+  - isolation identique (un process par job, tué à la fin) ;
+  - le module du scraper n'est jamais préchargé : chaque job importe le code
+    tel qu'il est sur disque (rechargé après chaque correction) ;
+  - timeout dur par job et plafond mémoire (RSS du job surveillé par le
+    parent, USINE_RUNNER_MEMORY_MB) : le job est tué au dépassement ;
+  - `startup_ms` (demande → job prêt à importer le scraper) est mesuré à
+    chaque job ; bench : scripts/bench_scraper_runner.py.
+
+USINE_RUNNER_START=spawn revient à un interpréteur neuf par job (défaut
+aussi quand forkserver n'existe pas sur la plateforme).
+"""
+from __future__ import annotations
+
+import importlib
+import multiprocessing as mp
+import os
+import queue as queue_mod
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Imports lourds chargés une fois dans le forkserver
+PRELOAD = [
+    "requests",
+    "bs4",
+    "lxml.etree",
+    "scraper_ai.dedicated_scrapers.base",
+    "scraper_ai.dedicated_scrapers._usine_helpers",
+    "scraper_ai.scraper_usine.http_cassette",
+    "scraper_ai.scraper_usine.scraper_runner",
+]
+SCRAPER_PACKAGE = "scraper_ai.dedicated_scrapers"
+# Plafond RSS d'un job (0 = pas de plafond)
+DEFAULT_MEMORY_LIMIT_MB = 2048
+# Fréquence de surveillance (timeout, RSS, crash) pendant l'attente du résultat
+POLL_SECONDS = 0.25
+# Valeurs tronquées avant le retour par Queue
+MAX_VALUE_CHARS = 500
+MAX_LIST_ITEMS = 5
+
+
+def start_method() -> str:
+    wanted = os.environ.get("USINE_RUNNER_START", "forkserver").strip().lower()
+    if wanted not in mp.get_all_start_methods():
+        return "spawn"
+    return wanted
+
+
+def memory_limit_mb() -> int:
+    try:
+        return max(0, int(os.environ.get("USINE_RUNNER_MEMORY_MB", DEFAULT_MEMORY_LIMIT_MB)))
+    except ValueError:
+        return DEFAULT_MEMORY_LIMIT_MB
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """RSS d'un process (Linux, /proc) ; None ailleurs."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def truncate_products(products: List[Dict]) -> List[Dict]:
+    """Tronque les valeurs longues pour que la sérialisation Queue reste rapide.
+
+    Le scoring n'a besoin que de savoir quels champs sont présents et leur
+    format approximatif — pas des descriptions de 5 Ko ni des listes de 30
+    images.
+    """
+    out: List[Dict] = []
+    for p in products:
+        clean: Dict = {}
+        for k, v in p.items():
+            if isinstance(v, str) and len(v) > MAX_VALUE_CHARS:
+                clean[k] = v[:MAX_VALUE_CHARS]
+            elif isinstance(v, list) and len(v) > MAX_LIST_ITEMS:
+                clean[k] = v[:MAX_LIST_ITEMS]
+            else:
+                clean[k] = v
+        out.append(clean)
+    return out
+
+
+class ScraperRunner:
+    """Lance les jobs de test de scrapers dans des process isolés et chauds."""
+
+    def __init__(self, *, method: Optional[str] = None, memory_limit: Optional[int] = None,
+                 log_fn: Optional[Callable[[str], None]] = None):
+        self.method = method or start_method()
+        self.memory_limit = memory_limit_mb() if memory_limit is None else memory_limit
+        self._log = log_fn or (lambda _msg: None)
+        self._ctx = mp.get_context(self.method)
+        if self.method == "forkserver":
+            self._ctx.set_forkserver_preload(PRELOAD)
+
+    def warm(self) -> None:
+        """Démarre le forkserver (et ses imports) sans attendre le premier job."""
+        if self.method == "forkserver":
+            from multiprocessing import forkserver
+            t0 = time.time()
+            forkserver.ensure_running()
+            self._log(f"Forkserver prêt en {time.time() - t0:.1f}s ({len(PRELOAD)} imports préchargés)")
+
+    def run(self, module_name: str, class_name: str, categories: List[str], *,
+            max_urls: int, timeout: float, workers: int = 3, http_timeout: int = 25,
+            cassette: Optional[tuple] = None, package: str = SCRAPER_PACKAGE) -> Dict[str, Any]:
+        """Exécute `scrape()` sur au plus `max_urls` URLs.
+
+        Retourne {products, error, timed_out, memory_exceeded, startup_ms,
+        elapsed, peak_rss_mb, cassette}. `error` est vide si tout s'est bien
+        passé ; `cassette` = (chemin, mode) de http_cassette.cassette_for.
+        """
+        return self._execute(
+            _scrape_job,
+            (f"{package}.{module_name}", class_name, categories, max_urls,
+             workers, http_timeout, cassette),
+            timeout,
+        )
+
+    def ping(self, timeout: float = 60) -> Dict[str, Any]:
+        """Job vide (imports PRELOAD seulement) : mesure le coût de démarrage."""
+        return self._execute(_noop_job, (), timeout)
+
+    def _execute(self, target, args: tuple, timeout: float) -> Dict[str, Any]:
+        result_queue = self._ctx.Queue()
+        queued_at = time.time()
+        proc = self._ctx.Process(target=target, args=(*args, result_queue, queued_at), daemon=True)
+        payload: Optional[Dict[str, Any]] = None
+        timed_out = memory_exceeded = False
+        peak_rss = 0.0
+        try:
+            proc.start()
+            deadline = queued_at + timeout
+            while payload is None:
+                try:
+                    payload = result_queue.get(timeout=POLL_SECONDS)
+                    break
+                except queue_mod.Empty:
+                    pass
+                if not proc.is_alive():
+                    # Dernière chance : le résultat a pu arriver juste avant la sortie
+                    try:
+                        payload = result_queue.get(timeout=1)
+                    except queue_mod.Empty:
+                        pass
+                    break
+                if time.time() > deadline:
+                    timed_out = True
+                    break
+                rss = _rss_mb(proc.pid)
+                if rss is not None:
+                    peak_rss = max(peak_rss, rss)
+                    if self.memory_limit and rss > self.memory_limit:
+                        memory_exceeded = True
+                        break
+        finally:
+            self._stop(proc)
+            try:
+                result_queue.close()
+            except Exception:
+                pass
+
+        result: Dict[str, Any] = {
+            "products": [], "error": "", "startup_ms": None, "cassette": None,
+            **(payload or {}),
+            "timed_out": timed_out,
+            "memory_exceeded": memory_exceeded,
+            "elapsed": round(time.time() - queued_at, 2),
+            "peak_rss_mb": round(peak_rss, 1),
+        }
+        if payload is None:
+            if timed_out:
+                result["error"] = f"Timeout: scraper > {timeout:.0f}s"
+            elif memory_exceeded:
+                result["error"] = f"Mémoire: scraper > {self.memory_limit} Mo (RSS)"
+            else:
+                result["error"] = "Sous-processus terminé sans résultat (probable crash)"
+        return result
+
+    @staticmethod
+    def _stop(proc) -> None:
+        if proc.pid is None:
+            return
+        proc.join(timeout=5 if not proc.is_alive() else 0.1)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.kill()
+                proc.join(timeout=3)
+
+
+_shared_runner: Optional[ScraperRunner] = None
+_shared_lock = threading.Lock()
+
+
+def get_runner(log_fn: Optional[Callable[[str], None]] = None) -> ScraperRunner:
+    """Runner partagé par le validator et l'agent (un forkserver par process)."""
+    global _shared_runner
+    with _shared_lock:
+        if _shared_runner is None:
+            _shared_runner = ScraperRunner(log_fn=log_fn)
+        return _shared_runner
+
+
+# ---------------------------------------------------------------------------
+# Jobs (exécutés dans le process isolé)
+# ---------------------------------------------------------------------------
+
+def _preload() -> None:
+    """No-op dans un fork du forkserver ; en spawn, paie les imports ici."""
+    for name in PRELOAD:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _noop_job(result_queue, queued_at: float) -> None:
+    _preload()
+    result_queue.put({"startup_ms": round((time.time() - queued_at) * 1000, 1)}, timeout=10)
+
+
+def _scrape_job(module_path: str, class_name: str, categories: List[str], max_urls: int,
+                workers: int, http_timeout: int, cassette: Optional[tuple],
+                result_queue, queued_at: float) -> None:
+    """Instancie le scraper, limite `discover_product_urls` à `max_urls`, scrape."""
+    _preload()
+    payload: Dict[str, Any] = {
+        "products": [], "error": "",
+        "startup_ms": round((time.time() - queued_at) * 1000, 1),
+    }
+    recorder = None
+    try:
+        if cassette:
+            from scraper_ai.scraper_usine.http_cassette import install_cassette
+            recorder = install_cassette(*cassette)
+
+        # Jamais préchargé, mais on s'assure de lire le code corrigé sur disque
+        sys.modules.pop(module_path, None)
+        importlib.invalidate_caches()
+        mod = importlib.import_module(module_path)
+        scraper = getattr(mod, class_name)()
+
+        scraper.MAX_WORKERS = workers
+        if hasattr(scraper, "WORKERS"):
+            scraper.WORKERS = workers
+        scraper.HTTP_TIMEOUT = http_timeout
+        if hasattr(scraper, "DETAIL_TIMEOUT"):
+            scraper.DETAIL_TIMEOUT = http_timeout
+
+        # Crucial pour les sites de >100 produits (sinon timeout)
+        original_discover = scraper.discover_product_urls
+
+        def limited_discover(categories=None):
+            urls = original_discover(categories=categories)
+            if isinstance(urls, list) and len(urls) > max_urls:
+                return urls[:max_urls]
+            return urls
+
+        scraper.discover_product_urls = limited_discover
+
+        result = scraper.scrape(categories=categories, inventory_only=False)
+        payload["products"] = truncate_products(result.get("products", []))
+    except Exception as e:
+        import traceback
+        payload["error"] = f"{type(e).__name__}: {str(e)[:500]}\n{traceback.format_exc()[-1500:]}"
+    if recorder is not None:
+        payload["cassette"] = recorder.report()
+    try:
+        result_queue.put(payload, timeout=10)
+    except Exception:
+        pass
@@ -0,0 +1,96 @@
+"""Tests du batch parallèle de l'usine (batch.run_batch).
+
+Lancer : ``pytest scraper_ai/scraper_usine/test_batch.py -v``
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from scraper_ai.dedicated_scrapers._browser_pool import close_browser_pool, get_browser_pool
+from scraper_ai.dedicated_scrapers._rate_control import RateControlledSession
+from scraper_ai.scraper_usine import batch
+from scraper_ai.scraper_usine.batch import run_batch
+
+
+@pytest.fixture(autouse=True)
+def no_runner_warmup(monkeypatch):
+    monkeypatch.setenv("SCRAPER_BROWSER_POOL_SIZE", "1")
+    monkeypatch.setenv("SCRAPER_BROWSER_CONTEXTS", "2")
+    monkeypatch.setattr("scraper_ai.scraper_usine.scraper_runner.ScraperRunner.warm",
+                        lambda self: None)
+    close_browser_pool()
+    yield
+    close_browser_pool()
+
+
+def test_browser_pool_sized_for_parallel_pipelines(tmp_path):
+    def process_url(url, *, session, phase_times, verbose):
+        return None
+
+    urls = [f"https://moto-{i}.ca/" for i in range(5)]
+    run_batch(urls, process_url, parallel=5, log_dir=tmp_path, verbose=False)
+    # Un contexte par pipeline : 5 contextes à 2 par navigateur → 3 navigateurs
+    assert get_browser_pool().capacity >= 5 and get_browser_pool().size == 3
+
+
+def test_sites_run_concurrently_with_shared_resources(tmp_path, capsys):
+    sessions = []
+    lock = threading.Lock()
+
+    def process_url(url, *, session, phase_times, verbose, publish):
+        with lock:
+            sessions.append(session)
+        print(f"analyse de {url}")
+        time.sleep(0.3)
+        phase_times["analyse"] = 0.3
+        phase_times["validation"] = 0.1
+        return SimpleNamespace(score=90, grade="A", products_tested=12)
+
+    urls = ["https://www.moto-a.ca/", "https://moto-b.com/", "https://moto-c.ca/inventaire"]
+    start = time.monotonic()
+    results = run_batch(urls, process_url, parallel=3, log_dir=tmp_path,
+                        json_path=str(tmp_path / "batch.json"), publish=False)
+    assert time.monotonic() - start < 0.8          # séquentiel : 0.9 s
+
+    assert [r.slug for r in results] == ["moto-a", "moto-b", "moto-c"]
+    assert all(r.score == 90 and r.products == 12 for r in results)
+    assert all(isinstance(s, RateControlledSession) for s in sessions)
+    assert len({id(s.get_adapter("https://x.test")) for s in sessions}) == 1
+    assert len(set(map(id, sessions))) == 3
+
+    assert (tmp_path / "moto-b.log").read_text() == "analyse de https://moto-b.com/\n"
+    out = capsys.readouterr().out
+    assert "[moto-b] analyse de https://moto-b.com/" in out
+    assert "sites/heure" in out
+
+    summary = json.loads((tmp_path / "batch.json").read_text())["summary"]
+    assert summary["sites"] == 3 and summary["sites_per_hour"] > 0
+    assert list(summary["phases"]) == ["analyse", "validation"]
+    assert summary["phases"]["analyse"] == pytest.approx(0.9)
+
+
+def test_failures_and_duplicate_sites(tmp_path):
+    def process_url(url, *, session, phase_times, verbose):
+        if "boom" in url:
+            raise RuntimeError("DNS")
+        return None
+
+    results = run_batch(["https://boom.ca", "https://calme.ca", "https://www.calme.ca/neuf"],
+                        process_url, parallel=2, log_dir=tmp_path, verbose=False)
+    assert [r.slug for r in results] == ["boom", "calme"]
+    assert results[0].error == "RuntimeError: DNS"
+    assert "Traceback" in (tmp_path / "boom.log").read_text()
+    assert results[1].error.startswith("pipeline interrompu")
+
+
+def test_summary_orders_known_phases_first():
+    results = [batch.BatchSiteResult(url="u", slug="s", seconds=10,
+                                     phases={"zzz": 1.0, "validation": 4.0, "analyse": 5.0})]
+    summary = batch.batch_summary(results, wall_seconds=20, parallel=1)
+    assert list(summary["phases"]) == ["analyse", "validation", "zzz"]
+    assert summary["sites_per_hour"] == 180.0
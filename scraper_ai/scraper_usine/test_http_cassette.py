@@ -0,0 +1,124 @@
+"""Tests des cassettes HTTP de la Phase 4 (http_cassette).
+
+Lancer : ``pytest scraper_ai/scraper_usine/test_http_cassette.py -v``
+"""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from scraper_ai.scraper_usine import http_cassette
+from scraper_ai.scraper_usine.http_cassette import (
+    cassette_for, install_cassette, uninstall_cassette,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits = []
+
+    def do_GET(self):
+        type(self).hits.append(self.path)
+        if self.path == "/old":
+            self.send_response(301)
+            self.send_header("Location", "/fiche")
+            self.end_headers()
+            return
+        if self.path == "/flaky":
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = f"<html><h1>Fiché {self.path}</h1></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = self.rfile.read(length)
+        type(self).hits.append(f"POST {payload.decode()}")
+        body = b'{"items": [' + payload + b']}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    _Handler.hits = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cassette_env(monkeypatch, tmp_path):
+    # install_cassette écrit ces toggles : restaurés après le test
+    for name in ("SCRAPER_HTTP_CACHE", "SCRAPER_ASYNC_FETCH", "SCRAPER_RATE_CONTROL"):
+        monkeypatch.setenv(name, "1")
+    monkeypatch.setattr(http_cassette, "CASSETTE_DIR", tmp_path)
+    monkeypatch.setattr(http_cassette, "_reset_slugs", set())
+    yield tmp_path
+    uninstall_cassette()
+
+
+def test_second_run_replays_offline(site, cassette_env):
+    path = cassette_env / "dealer.sqlite"
+    recorder = install_cassette(str(path))
+    session = requests.Session()
+    first = session.get(f"{site}/old")
+    api = requests.post(f"{site}/api", data='{"page": 1}')
+    assert first.status_code == 200 and first.url.endswith("/fiche")
+    assert recorder.report()["recorded"] == 3
+    hits = list(_Handler.hits)
+
+    replay = install_cassette(str(path), "replay")
+    again = requests.Session().get(f"{site}/old")
+    api_again = requests.post(f"{site}/api", data='{"page": 1}')
+
+    assert _Handler.hits == hits
+    assert again.text == first.text and "Fiché" in again.text
+    assert [r.status_code for r in again.history] == [301]
+    assert api_again.json() == api.json() == {"items": [{"page": 1}]}
+    assert replay.report() == {"mode": "replay", "replayed": 3, "recorded": 0, "missing": 0}
+
+
+def test_strict_replay_miss_and_transient_errors(site, cassette_env):
+    path = cassette_env / "dealer.sqlite"
+    install_cassette(str(path))
+    assert requests.get(f"{site}/flaky").status_code == 503
+
+    replay = install_cassette(str(path), "replay")
+    with pytest.raises(requests.exceptions.ConnectionError):
+        requests.get(f"{site}/flaky")
+    assert replay.report()["missing"] == 1
+
+
+def test_modes(cassette_env, monkeypatch):
+    stale = cassette_env / "a.sqlite"
+    stale.write_bytes(b"x")
+    monkeypatch.setenv("USINE_CASSETTE", "record")
+    assert cassette_for("a") == (str(stale), "auto")
+    assert not stale.exists()
+
+    stale.write_bytes(b"x")
+    assert cassette_for("a") == (str(stale), "auto")      # une seule remise à zéro
+    assert stale.exists()
+
+    monkeypatch.setenv("USINE_CASSETTE", "replay")
+    assert cassette_for("b")[1] == "replay"
+    assert cassette_for("b", live=True) is None
+    monkeypatch.setenv("USINE_CASSETTE", "live")
+    assert cassette_for("b") is None
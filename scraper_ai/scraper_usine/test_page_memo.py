@@ -0,0 +1,89 @@
+"""Tests du mémo de pages de l'analyse (PageMemo).
+
+Lancer : ``pytest scraper_ai/scraper_usine/test_page_memo.py -v``
+"""
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+from scraper_ai.scraper_usine.analyzer import SiteAnalyzer
+from scraper_ai.scraper_usine.page_memo import PageMemo
+
+LISTING_HTML = "<html><body>" + "".join(
+    f'<div class="product-card"><a href="/moto/{i}">Moto {i}</a>'
+    f'<img src="/{i}.jpg"><span>{1000 + i} $</span></div>'
+    for i in range(6)
+) + "</body></html>"
+
+
+class FakeSession:
+    def __init__(self, pages, delay=0.0):
+        self.pages = pages
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, **kwargs):
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        if url not in self.pages:
+            return SimpleNamespace(status_code=404, text="", url=url)
+        return SimpleNamespace(status_code=200, text=self.pages[url], url=url)
+
+
+def test_one_get_and_one_parse_per_url():
+    session = FakeSession({"http://d.test/a": LISTING_HTML})
+    memo = PageMemo(session)
+
+    first = memo.soup("http://d.test/a")
+    html, again = memo.page("http://d.test/a")
+    assert first is again and html == LISTING_HTML
+    assert memo.html("http://d.test/missing") is None
+    assert memo.soup("http://d.test/missing") is None
+    assert session.calls == ["http://d.test/a", "http://d.test/missing"]
+
+
+def test_prefetch_runs_in_parallel_and_is_shared():
+    urls = [f"http://d.test/{i}" for i in range(4)]
+    session = FakeSession({u: LISTING_HTML for u in urls}, delay=0.2)
+    memo = PageMemo(session, max_workers=4)
+
+    start = time.monotonic()
+    assert memo.prefetch(urls + urls[:2]) == 4
+    assert all(memo.html(u) == LISTING_HTML for u in urls)
+    elapsed = time.monotonic() - start
+    memo.close()
+
+    assert sorted(session.calls) == sorted(urls)
+    assert elapsed < 0.6        # séquentiel : 0.8 s
+
+
+def test_report_per_phase():
+    session = FakeSession({"http://d.test/a": LISTING_HTML})
+    memo = PageMemo(session)
+    memo.start_phase("1.3 structure")
+    memo.html("http://d.test/a")
+    memo.start_phase("1.6 mode prix")
+    memo.soup("http://d.test/a")
+    memo.finish()
+
+    report = memo.report()
+    assert report["1.3 structure"]["fetches"] == 1
+    assert report["1.6 mode prix"] == {**report["1.6 mode prix"], "fetches": 0, "memo_hits": 1}
+    assert all("seconds" in stats for stats in report.values())
+
+
+def test_analyzer_phases_share_listing_fetch():
+    analyzer = SiteAnalyzer(use_playwright=False, verbose=False)
+    session = FakeSession({"http://d.test/inventaire": LISTING_HTML})
+    analyzer.session = session
+    analyzer._pages = PageMemo(session)
+
+    url = "http://d.test/inventaire"
+    assert analyzer._estimate_product_count(url) == 6
+    assert analyzer._measure_listing_completeness(url) > 0
+    assert analyzer._detect_listing_selectors(url) is not None
+    assert session.calls == [url]
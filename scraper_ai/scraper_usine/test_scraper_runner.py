@@ -0,0 +1,94 @@
+"""Tests du runner des scrapers générés (scraper_runner).
+
+Les scrapers factices sont définis ici : le job les importe par
+``package="scraper_ai.scraper_usine"`` / ``module_name="test_scraper_runner"``.
+
+Lancer : ``pytest scraper_ai/scraper_usine/test_scraper_runner.py -v``
+"""
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from scraper_ai.scraper_usine.scraper_runner import ScraperRunner, truncate_products
+
+PACKAGE = "scraper_ai.scraper_usine"
+MODULE = "test_scraper_runner"
+
+
+class TinyScraper:
+    MAX_WORKERS = 8
+    HTTP_TIMEOUT = 60
+
+    def discover_product_urls(self, categories=None):
+        return [f"https://d.test/moto/{i}" for i in range(10)]
+
+    def scrape(self, categories=None, inventory_only=True):
+        return {"products": [
+            {"name": url, "sourceUrl": url, "description": "x" * 2000,
+             "workers": self.MAX_WORKERS, "timeout": self.HTTP_TIMEOUT, "pid": os.getpid()}
+            for url in self.discover_product_urls(categories)
+        ]}
+
+
+class SleepyScraper(TinyScraper):
+    def scrape(self, categories=None, inventory_only=True):
+        time.sleep(60)
+        return {"products": []}
+
+
+class HungryScraper(TinyScraper):
+    def scrape(self, categories=None, inventory_only=True):
+        hog = bytearray(400 * 1024 * 1024)
+        time.sleep(60)
+        return {"products": [{"name": str(len(hog))}]}
+
+
+class CrashingScraper(TinyScraper):
+    def scrape(self, categories=None, inventory_only=True):
+        os._exit(3)
+
+
+@pytest.fixture(scope="module", params=["forkserver", "spawn"])
+def runner(request):
+    return ScraperRunner(method=request.param, memory_limit=200)
+
+
+def test_run_limits_urls_and_applies_settings(runner):
+    result = runner.run(MODULE, "TinyScraper", ["inventaire"], max_urls=3, timeout=60,
+                        workers=2, http_timeout=20, package=PACKAGE)
+    assert result["error"] == "" and not result["timed_out"]
+    products = result["products"]
+    assert [p["name"] for p in products] == [f"https://d.test/moto/{i}" for i in range(3)]
+    assert products[0]["workers"] == 2 and products[0]["timeout"] == 20
+    assert len(products[0]["description"]) == 500
+    assert products[0]["pid"] != os.getpid()
+    assert result["startup_ms"] is not None
+
+
+def test_timeout_kills_job(runner):
+    start = time.monotonic()
+    result = runner.run(MODULE, "SleepyScraper", [], max_urls=3, timeout=2, package=PACKAGE)
+    assert result["timed_out"] and result["error"] == "Timeout: scraper > 2s"
+    assert time.monotonic() - start < 15
+
+
+def test_crash_and_import_errors(runner):
+    crashed = runner.run(MODULE, "CrashingScraper", [], max_urls=3, timeout=30, package=PACKAGE)
+    assert crashed["error"] == "Sous-processus terminé sans résultat (probable crash)"
+    missing = runner.run(MODULE, "NoSuchScraper", [], max_urls=3, timeout=30, package=PACKAGE)
+    assert missing["error"].startswith("AttributeError")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="RSS lu dans /proc")
+def test_memory_limit_kills_job(runner):
+    result = runner.run(MODULE, "HungryScraper", [], max_urls=3, timeout=60, package=PACKAGE)
+    assert result["memory_exceeded"] and result["error"].startswith("Mémoire")
+    assert result["elapsed"] < 30
+
+
+def test_truncate_products():
+    out = truncate_products([{"a": "y" * 600, "b": list(range(9)), "c": 1}])
+    assert out == [{"a": "y" * 500, "b": [0, 1, 2, 3, 4], "c": 1}]
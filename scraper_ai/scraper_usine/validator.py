@@ -23,6 +23,8 @@ from .models import (
     ScrapingStrategy, SiteAnalysis, ValidationReport, _from_dict,
 )
 from .domain_profiles import DomainProfile, get_profile, AUTO_PROFILE
+from .http_cassette import cassette_for
+from .scraper_runner import get_runner
 
 REPORTS_DIR = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "reports"
 STRATEGIES_DIR = Path(__file__).resolve().parent.parent.parent / "scraper_cache" / "strategies"
@@ -93,7 +95,10 @@ class ScraperValidator:
         generated: GeneratedScraper,
         analysis: SiteAnalysis,
         strategy: ScrapingStrategy,
+        *,
+        live: bool = False,
     ) -> ValidationReport:
+        """``live=True`` ignore la cassette HTTP du slug (cf. http_cassette)."""
         self._log(f"Validation de {generated.slug}...")
         report = ValidationReport(
             site_url=analysis.site_url,
@@ -115,7 +120,7 @@ class ScraperValidator:
 
         products, errors, elapsed = self._run_scraper(
             generated, categories=categories, timeout=timeout,
-            sample_mode=self.sample_mode,
+            sample_mode=self.sample_mode, live=live,
         )
         report.execution_time_seconds = elapsed
         report.errors = errors
@@ -174,77 +179,56 @@ class ScraperValidator:
     def _run_scraper(self, generated: GeneratedScraper,
                      categories: Optional[List[str]] = None,
                      timeout: int = DEFAULT_RUN_TIMEOUT_SECONDS,
-                     sample_mode: bool = False) -> tuple:
+                     sample_mode: bool = False, live: bool = False) -> tuple:
         """Exécute le scraper généré dans un sous-processus avec timeout dur.
 
-        Utilise ``multiprocessing.Queue`` (et non Pipe) pour éviter le deadlock
-        classique : si le payload dépasse la capacité du Pipe (~64 KB sur
-        macOS), ``conn.send()`` bloque et ``proc.join()`` attendrait
-        indéfiniment. Queue gère le buffering en interne sans cette limite.
+        Le sous-processus est un fork du serveur chaud de scraper_runner
+        (imports lourds déjà faits, module du scraper relu sur disque) ;
+        timeout et plafond mémoire sont appliqués par le runner, qui tue le
+        job au dépassement.
 
-        Si ``sample_mode`` est vrai, on patche ``discover_product_urls`` du
-        scraper dans le sous-processus pour limiter à SAMPLE_MODE_MAX_URLS
-        — utile sur les gros catalogues pour éviter les timeouts pendant la
-        validation.
-        """
-        import multiprocessing as mp
+        Si ``sample_mode`` est vrai, ``discover_product_urls`` est limité à
+        SAMPLE_MODE_MAX_URLS — utile sur les gros catalogues pour éviter les
+        timeouts pendant la validation.
 
+        Le trafic HTTP passe par la cassette du slug (http_cassette) : la
+        première exécution l'enregistre, les corrections suivantes la
+        rejouent hors ligne. ``live=True`` (health checks) l'ignore.
+        """
         products: List[Dict] = []
         errors: List[str] = []
         start = time.time()
         cats = categories or ["inventaire"]
 
-        ctx = mp.get_context("spawn")  # spawn = pas de fork, plus sûr
-        result_queue: "mp.Queue" = ctx.Queue()
         # En mode sample explicit, on garde la limite par défaut basse
         # (VALIDATION_MAX_URLS). Sinon, on relève la limite pour les profils
         # gros catalogue (laisse au subprocess le soin d'appliquer son défaut).
         max_urls = SAMPLE_MODE_MAX_URLS if sample_mode else VALIDATION_MAX_URLS
-        proc = ctx.Process(
-            target=_run_scraper_subprocess,
-            args=(generated.module_name, generated.class_name, cats, result_queue, max_urls),
-            daemon=True,
-        )
+        runner = get_runner()
         try:
             self._log(f"Lancement sous-processus (timeout {timeout}s, categories={cats})...")
-            proc.start()
-
-            # On lit la Queue avec timeout au lieu de proc.join() : ça évite
-            # le deadlock si le child meurt sans envoyer (on aurait attendu
-            # le timeout complet pour rien).
-            payload: Optional[Dict] = None
-            try:
-                payload = result_queue.get(timeout=timeout)
-            except Exception:
-                pass
-
-            # Le child doit avoir fini si payload reçu, sinon on tue.
-            proc.join(timeout=5)
-            if proc.is_alive():
+            run = runner.run(
+                generated.module_name, generated.class_name, cats,
+                max_urls=max_urls, timeout=timeout, workers=3, http_timeout=25,
+                cassette=cassette_for(generated.slug, live=live),
+            )
+            if run["timed_out"]:
                 self._log(f"TIMEOUT après {timeout}s → kill sous-processus")
-                proc.terminate()
-                proc.join(timeout=5)
-                if proc.is_alive():
-                    proc.kill()
-                    proc.join(timeout=3)
-                if payload is None:
-                    errors.append(f"Timeout: scraper > {timeout}s")
-
-            if isinstance(payload, dict):
-                products = payload.get("products", [])
-                if payload.get("error"):
-                    errors.append(payload["error"])
-            elif payload is None and not errors:
-                errors.append("Sous-processus terminé sans résultat (probable crash)")
-
+            elif run["memory_exceeded"]:
+                self._log(f"MÉMOIRE > {runner.memory_limit} Mo → kill sous-processus")
+            products = run["products"]
+            if run["error"]:
+                errors.append(run["error"])
+            if run["startup_ms"] is not None:
+                self._log(f"Démarrage sous-processus ({runner.method}) : "
+                          f"{run['startup_ms']:.0f} ms, pic RSS {run['peak_rss_mb']:.0f} Mo")
+            if run["cassette"]:
+                c = run["cassette"]
+                self._log(f"Cassette HTTP ({c['mode']}) : {c['replayed']} rejouée(s), "
+                          f"{c['recorded']} enregistrée(s), {c['missing']} absente(s)")
         except Exception as e:
             errors.append(f"{type(e).__name__}: {str(e)[:500]}")
             self._log(f"ERREUR runner: {type(e).__name__}: {e}")
-        finally:
-            try:
-                result_queue.close()
-            except Exception:
-                pass
 
         elapsed = time.time() - start
         self._log(f"Run complet en {elapsed:.1f}s — {len(products)} produits, {len(errors)} erreurs")
@@ -732,7 +716,7 @@ class ScraperValidator:
         )
 
         analysis, strategy = self._load_persisted_context(slug, scraper)
-        report = self.validate(gen, analysis, strategy)
+        report = self.validate(gen, analysis, strategy, live=True)
 
         last_report = self._load_last_report(slug)
         if last_report:
@@ -940,73 +924,3 @@ def _sanitize(product: Dict) -> Dict:
 # validation cherche juste à confirmer que le scraper extrait correctement
 # les champs cibles — un échantillon de 30 URLs suffit largement.
 VALIDATION_MAX_URLS = 30
-
-
-def _run_scraper_subprocess(module_name: str, class_name: str,
-                             categories: List[str], queue,
-                             max_urls: int = VALIDATION_MAX_URLS) -> None:
-    """Exécuté dans un sous-processus séparé pour isoler le scraper.
-
-    Patche ``discover_product_urls`` pour limiter strictement l'échantillon
-    testé à ``max_urls`` (défaut 30). Tronque les valeurs longues du payload
-    avant de l'envoyer via Queue (évite la sérialisation de gros HTML/base64).
-    """
-    import importlib as _imp
-    payload: Dict[str, object] = {"products": [], "error": ""}
-    try:
-        module_path = f"scraper_ai.dedicated_scrapers.{module_name}"
-        mod = _imp.import_module(module_path)
-        scraper_class = getattr(mod, class_name)
-        scraper = scraper_class()
-
-        scraper.MAX_WORKERS = 3
-        if hasattr(scraper, "WORKERS"):
-            scraper.WORKERS = 3
-        scraper.HTTP_TIMEOUT = 25
-        if hasattr(scraper, "DETAIL_TIMEOUT"):
-            scraper.DETAIL_TIMEOUT = 25
-
-        # Patch discover_product_urls pour ne valider qu'un échantillon.
-        # Crucial pour les sites de >100 produits (sinon 180s timeout).
-        original_discover = scraper.discover_product_urls
-
-        def limited_discover(categories=None):
-            urls = original_discover(categories=categories)
-            if isinstance(urls, list) and len(urls) > max_urls:
-                return urls[:max_urls]
-            return urls
-
-        scraper.discover_product_urls = limited_discover
-
-        result = scraper.scrape(categories=categories, inventory_only=False)
-        payload["products"] = _truncate_products_for_queue(
-            result.get("products", []),
-        )
-    except Exception as e:
-        import traceback
-        payload["error"] = f"{type(e).__name__}: {str(e)[:500]}\n{traceback.format_exc()[-1500:]}"
-    try:
-        queue.put(payload, timeout=10)
-    except Exception:
-        pass
-
-
-def _truncate_products_for_queue(products: List[Dict]) -> List[Dict]:
-    """Tronque les valeurs longues pour que la sérialisation Queue reste rapide.
-
-    Le scoring du validator n'a besoin que de savoir quels champs sont
-    présents et leur format approximatif — pas du contenu intégral des
-    descriptions de 5KB ni des listes de 30 images en base64.
-    """
-    out: List[Dict] = []
-    for p in products:
-        clean: Dict = {}
-        for k, v in p.items():
-            if isinstance(v, str) and len(v) > 500:
-                clean[k] = v[:500]
-            elif isinstance(v, list) and len(v) > 5:
-                clean[k] = v[:5]
-            else:
-                clean[k] = v
-        out.append(clean)
-    return out
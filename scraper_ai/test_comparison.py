@@ -0,0 +1,146 @@
+"""Le normaliseur compilé/mémoïsé doit produire exactement les clés d'origine."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from scraper_ai import comparison
+from scraper_ai.comparison import normalize_product_key
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from bench_normalizer import legacy_normalize_product_key  # noqa: E402
+
+DATA = PROJECT_ROOT / "scraped_data.json"
+
+
+def _products():
+    if not DATA.exists():
+        pytest.skip("scraped_data.json absent")
+    return json.loads(DATA.read_text(encoding="utf-8"))["products"]
+
+
+def _variants(product):
+    yield product
+    # Nom seul : détection de marque et d'année depuis le nom
+    yield {"name": product.get("name", ""), "sourceUrl": product.get("sourceUrl", "")}
+    # Marque connue, modèle absent : retrait de la marque en tête/fin du nom
+    yield {"marque": product.get("marque", ""), "name": product.get("name", "")}
+
+
+@pytest.mark.parametrize("ignore_colors", [True, False])
+def test_keys_identical_to_legacy_on_scraped_data(ignore_colors):
+    comparison._cached_product_key.cache_clear()
+    mismatches = []
+    for product in _products():
+        for variant in _variants(product):
+            expected = legacy_normalize_product_key(variant, ignore_colors=ignore_colors)
+            got = normalize_product_key(variant, ignore_colors=ignore_colors)
+            if got != expected or type(got[2]) is not type(expected[2]):
+                mismatches.append((variant, expected, got))
+    assert not mismatches, mismatches[:5]
+
+
+@pytest.mark.parametrize("product", [
+    {"name": "Moto Kawasaki Ninja 500 SE 2025 à vendre chez Moto Ducharme"},
+    {"name": "2024 Can-Am Outlander 700 XT Noir"},
+    {"name": "Harley-Davidson Street Glide 2023", "annee": "2023"},
+    {"name": "Sea-Doo GTI 130 Ski-Doo bundle"},
+    {"name": "MINI Cooper kawasaki", "sourceUrl": "https://x.ca/mini-cooper-2021-a-vendre/"},
+    {"marque": "Brand: Yamaha", "modele": "Modèle : MT-07 Neuf pré-commande 50th anniversary"},
+    {"marque": "Honda", "name": "CRF250R Honda"},
+    {"name": "Remorque sans marque"},
+    {"name": "", "marque": None, "modele": 0, "annee": True},
+    {"name": "Polaris RZR", "annee": 2024.0},
+])
+def test_edge_cases_identical_to_legacy(product):
+    for ignore_colors in (True, False):
+        assert normalize_product_key(product, ignore_colors) == \
+            legacy_normalize_product_key(product, ignore_colors)
+        # Deuxième appel : servi par le cache, même résultat et même type d'année
+        cached = normalize_product_key(product, ignore_colors)
+        expected = legacy_normalize_product_key(product, ignore_colors)
+        assert cached == expected and type(cached[2]) is type(expected[2])
+
+
+def test_unhashable_fields_fall_back_to_direct_computation():
+    product = {"name": "Kawasaki Z900 2024", "annee": [], "sourceUrl": "https://x.ca/z900"}
+    assert normalize_product_key(product) == legacy_normalize_product_key(product)
+
+
+def _matching_summary(matched):
+    return [(p.get("sourceUrl"), p["produitReference"]["sourceUrl"], p["prixReference"])
+            for p in matched]
+
+
+def _site_split(products):
+    """Deux « sites » à partir de scraped_data : noms altérés côté concurrent."""
+    reference = [dict(p) for p in products[::2]]
+    competitor = []
+    for p in products[1::2] + products[::7]:
+        comp = dict(p)
+        comp["sourceUrl"] = (comp.get("sourceUrl") or "") + "?concurrent"
+        competitor.append(comp)
+    return reference, competitor
+
+
+@pytest.mark.parametrize("match_mode", comparison.MATCH_MODES)
+@pytest.mark.parametrize("ignore_colors", [True, False])
+def test_stored_match_keys_give_same_matches(match_mode, ignore_colors, monkeypatch):
+    reference, competitor = _site_split(_products())
+    # Aller-retour JSON : l'index est relu depuis la colonne JSONB
+    ref_keys = json.loads(json.dumps(comparison.build_match_key_index(reference)))
+    comp_keys = json.loads(json.dumps(comparison.build_match_key_index(competitor)))
+
+    live = comparison.find_matching_products(
+        [dict(p) for p in reference], [dict(p) for p in competitor],
+        "https://ref", "https://comp", ignore_colors=ignore_colors, match_mode=match_mode)
+
+    calls = []
+    real = comparison.normalize_product_key
+    monkeypatch.setattr(comparison, "normalize_product_key",
+                        lambda *a, **k: calls.append(a) or real(*a, **k))
+    stored = comparison.find_matching_products(
+        [dict(p) for p in reference], [dict(p) for p in competitor],
+        "https://ref", "https://comp", ignore_colors=ignore_colors, match_mode=match_mode,
+        reference_match_keys=ref_keys, comparison_match_keys=comp_keys)
+
+    assert _matching_summary(stored) == _matching_summary(live)
+    assert live, "le jeu de test doit produire des correspondances"
+    assert not calls, "toutes les clés devaient venir de l'index stocké"
+
+
+def test_stale_or_foreign_index_falls_back_to_live_keys():
+    reference, competitor = _site_split(_products()[:200])
+    keys = comparison.build_match_key_index(reference)
+    outdated = {**keys, "version": comparison.NORMALIZER_VERSION - 1}
+    assert comparison._stored_key_table(outdated, True) == {}
+
+    # Produit modifié après le calcul de l'index : empreinte différente → calcul live
+    edited = [dict(p) for p in reference]
+    edited[0]["modele"] = "Modele totalement different"
+    table = comparison._stored_key_table(keys, True)
+    assert comparison.match_key_fingerprint(edited[0]) not in table
+
+    live = comparison.find_matching_products(
+        [dict(p) for p in edited], [dict(p) for p in competitor], "r", "c")
+    stored = comparison.find_matching_products(
+        [dict(p) for p in edited], [dict(p) for p in competitor], "r", "c",
+        reference_match_keys=outdated, comparison_match_keys={"garbage": True})
+    assert _matching_summary(stored) == _matching_summary(live)
+
+
+def test_index_keys_match_cleaned_products():
+    """Les clés sont calculées sur la forme comparée par compare_from_cache."""
+    product = {"name": "PRÉ-COMMANDE Kawasaki Ninja 500 SE", "sourceUrl": "https://x.ca/ninja-2025/"}
+    keys = comparison.build_match_key_index([product])
+    assert product["name"] == "PRÉ-COMMANDE Kawasaki Ninja 500 SE"  # produit non modifié
+
+    prepared = dict(product)
+    comparison.enrich_product_year(prepared)
+    comparison.clean_product_name(prepared)
+    entry = keys["keys"]["ignore_colors"][comparison.match_key_fingerprint(prepared)]
+    marque, modele, annee = normalize_product_key(prepared)
+    assert entry == [marque, modele, annee, comparison._strip_model_suffixes(modele)]
@@ -4,15 +4,26 @@ Fournit `request_with_retry` : un wrapper autour de requests qui retry
 automatiquement sur les erreurs transitoires (timeout, 5xx, connexion
 coupée). Essentiel pour les runners GitHub Actions où les cold starts
 Supabase peuvent prendre >15 s.
+
+Toutes les requêtes passent par une session partagée au niveau du module
+(keep-alive, pool de connexions) : les lectures/upserts PostgREST d'un cron
+réutilisent la même connexion TLS au lieu d'en ouvrir une par appel.
+Chaque endpoint accumule des métriques (appels, retries, latence) que les
+crons affichent en fin de run via `log_http_metrics`.
 """
 
 from __future__ import annotations
 
+import gzip
+import json
+import threading
 import time
-from typing import Any, Optional
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 from requests.exceptions import (
     ConnectionError as RequestsConnectionError,
     ReadTimeout,
@@ -22,6 +33,111 @@ from requests.exceptions import (
 RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504, 520, 522, 524}
 RETRYABLE_EXC = (ReadTimeout, Timeout, RequestsConnectionError)
 
+# Au moins MAX_CONCURRENT_SITES de scraper_cron : chaque thread garde sa
+# connexion ouverte au lieu d'en rouvrir une quand le pool déborde.
+POOL_MAXSIZE = 32
+
+# Corps compressés (compress=True) à partir de cette taille — typiquement
+# les upserts `products` de scraped_site_data et scrapings (plusieurs Mo).
+GZIP_MIN_BYTES = 64 * 1024
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+# Hôtes qui ont refusé un corps gzip : on leur renvoie du JSON brut.
+_gzip_rejected_hosts: set = set()
+
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, Dict[str, float]] = {}
+
+
+def get_session() -> requests.Session:
+    """Session partagée (créée au premier appel)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _endpoint(method: str, url: str) -> str:
+    return f"{method} {urlparse(url).path or '/'}"
+
+
+def _record(endpoint: str, attempts: int, elapsed: float, ok: bool) -> None:
+    with _metrics_lock:
+        m = _metrics.setdefault(endpoint, {
+            "calls": 0, "retries": 0, "failures": 0,
+            "total_s": 0.0, "max_s": 0.0,
+        })
+        m["calls"] += 1
+        m["retries"] += attempts - 1
+        m["failures"] += 0 if ok else 1
+        m["total_s"] += elapsed
+        m["max_s"] = max(m["max_s"], elapsed)
+
+
+def http_metrics() -> Dict[str, Dict[str, float]]:
+    """Copie des métriques par endpoint ("POST /rest/v1/scrapings" → compteurs).
+
+    failures = appels restés sans réponse (une réponse 4xx compte comme reçue).
+    """
+    with _metrics_lock:
+        return {k: dict(v) for k, v in _metrics.items()}
+
+
+def reset_http_metrics() -> None:
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def log_http_metrics(logger=print) -> None:
+    """Affiche un résumé par endpoint : appels, retries, échecs, latence."""
+    metrics = http_metrics()
+    if not metrics:
+        return
+    logger("   🌐 HTTP (appels | retries | échecs | moy | max):")
+    for endpoint, m in sorted(metrics.items(), key=lambda kv: -kv[1]["total_s"]):
+        avg = m["total_s"] / m["calls"] if m["calls"] else 0.0
+        logger(f"      {endpoint}: {m['calls']:.0f} | {m['retries']:.0f} | "
+               f"{m['failures']:.0f} | {avg:.2f}s | {m['max_s']:.2f}s")
+
+
+def _compressed_body(kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """kwargs avec le corps gzippé, ou None si le corps est trop petit/absent."""
+    if "json" in kwargs and kwargs["json"] is not None:
+        body = json.dumps(kwargs["json"], allow_nan=False).encode("utf-8")
+    elif isinstance(kwargs.get("data"), (str, bytes)):
+        body = kwargs["data"]
+        body = body.encode("utf-8") if isinstance(body, str) else body
+    else:
+        return None
+    if len(body) < GZIP_MIN_BYTES:
+        return None
+    compressed = {k: v for k, v in kwargs.items() if k != "json"}
+    compressed["data"] = gzip.compress(body, compresslevel=5)
+    compressed["headers"] = {
+        **(kwargs.get("headers") or {}),
+        "Content-Type": "application/json",
+        "Content-Encoding": "gzip",
+    }
+    return compressed
+
+
+def _gzip_refused(resp: Response) -> bool:
+    """Le serveur n'a pas décodé le corps gzip (PostgREST sans décompression)."""
+    if resp.status_code == 415:
+        return True
+    if resp.status_code != 400:
+        return False
+    text = (resp.text or "")[:500].lower()
+    return "pgrst102" in text or "invalid json" in text or "content-encoding" in text
+
 
 def request_with_retry(
     method: str,
@@ -31,6 +147,7 @@ def request_with_retry(
     base_backoff: float = 2.0,
     timeout: float = 30.0,
     logger=None,
+    compress: bool = False,
     **kwargs: Any,
 ) -> Optional[Response]:
     """Exécute une requête HTTP avec retry exponentiel sur erreurs transitoires.
@@ -38,21 +155,36 @@ def request_with_retry(
     - max_attempts : nombre total de tentatives (1 = pas de retry).
     - base_backoff : délai initial (doublé à chaque retry, max 20 s).
     - timeout      : timeout de lecture par tentative (en secondes).
+    - compress     : gzip le corps (json= ou data=) au-delà de GZIP_MIN_BYTES.
+      Si le serveur ne sait pas le lire (415, ou 400 « invalid json »), la
+      requête est rejouée en clair et
+      l'hôte n'est plus compressé pour le reste du process.
 
     Retourne la réponse (même si non-2xx et non-retryable) ou None si toutes
     les tentatives ont échoué sur exception.
     """
+    host = urlparse(url).netloc
+    send_kwargs = kwargs
+    if compress and host not in _gzip_rejected_hosts:
+        send_kwargs = _compressed_body(kwargs) or kwargs
+    compressed = send_kwargs is not kwargs
+
+    endpoint = _endpoint(method, url)
+    session = get_session()
     last_exc: Optional[Exception] = None
+    start = time.time()
+    attempt = 0
 
     for attempt in range(1, max_attempts + 1):
         try:
-            resp = requests.request(method, url, timeout=timeout, **kwargs)
+            resp = session.request(method, url, timeout=timeout, **send_kwargs)
         except RETRYABLE_EXC as e:
             last_exc = e
             if attempt >= max_attempts:
                 if logger:
                     logger(f"   ❌ {method} {url.split('?')[0]}: {type(e).__name__} "
                            f"après {attempt} tentatives — abandon ({e})")
+                _record(endpoint, attempt, time.time() - start, False)
                 return None
             delay = min(base_backoff * (2 ** (attempt - 1)), 20.0)
             if logger:
@@ -63,6 +195,7 @@ def request_with_retry(
         except Exception as e:
             if logger:
                 logger(f"   ❌ {method} {url.split('?')[0]}: exception non-retryable — {e}")
+            _record(endpoint, attempt, time.time() - start, False)
             raise
 
         if resp.status_code in RETRYABLE_STATUS and attempt < max_attempts:
@@ -73,10 +206,23 @@ def request_with_retry(
             time.sleep(delay)
             continue
 
+        _record(endpoint, attempt, time.time() - start, True)
+
+        if compressed and _gzip_refused(resp):
+            _gzip_rejected_hosts.add(host)
+            if logger:
+                logger(f"   ⚠️  {host}: corps gzip refusé (HTTP {resp.status_code}) "
+                       f"— envoi non compressé")
+            return request_with_retry(
+                method, url, max_attempts=max_attempts, base_backoff=base_backoff,
+                timeout=timeout, logger=logger, compress=False, **kwargs,
+            )
+
         return resp
 
     if last_exc and logger:
         logger(f"   ❌ {method} {url.split('?')[0]}: échec final — {last_exc}")
+    _record(endpoint, attempt, time.time() - start, False)
     return None
 
 
@@ -0,0 +1,535 @@
+"""Stockage normalisé des produits pré-scrapés (table scraped_products).
+
+Une ligne par produit, clé (site_domain, unit_key) — unit_key calculée par
+scraper_ai.grouping.compute_unit_key. Au lieu de réécrire tout le tableau
+`scraped_site_data.products` à chaque cron :
+  - `product_rows` calcule la clé et l'empreinte (content_hash) de chaque produit ;
+  - `diff_rows` compare aux empreintes stockées → lignes à insérer/mettre à
+    jour et clés à supprimer ;
+  - `apply` envoie ce diff à la RPC apply_scraped_products, qui reconstruit
+    aussi le tableau dérivé `scraped_site_data.products` pour les lecteurs
+    existants (voir dashboard_web/supabase/migration_scraped_products.sql).
+
+Chaque ligne garde sa position dans le scrape (colonne pos) : le tableau
+dérivé reste dans l'ordre du scrape. La position n'entre pas dans
+content_hash ; quand seul l'ordre change, le diff ne porte que la liste
+ordonnée des clés (`ProductChanges.order`).
+
+`product_digest` résume chaque unité par une empreinte des seuls champs
+« matériels » (prix, disponibilité, identité — ceux que lisent le trigger
+product_price_history, detectChanges et les clés de matching) : le cron
+compare ce résumé à celui du scrape précédent et saute l'écriture des
+produits quand rien de matériel n'a bougé.
+
+Deux backends de même interface :
+  - PostgrestProductStore : Supabase (via _http_helpers) ;
+  - SqliteProductStore    : doublure locale, mêmes règles, pour tester hors
+    ligne (et rejouer un diff sans Supabase).
+
+`ProductStream` écrit un scrape au fil de l'eau : chaque produit est
+comparé aux empreintes stockées dès qu'il arrive et les lignes modifiées
+partent par paquets dans une zone d'attente (scraped_products_staging) ;
+`finish`, une fois le scrape validé, les promeut dans scraped_products,
+supprime les unités disparues et reconstruit le tableau dérivé, en une
+transaction. Seuls les clés et empreintes restent en mémoire.
+
+SCRAPED_PRODUCTS_STORE=0 désactive le stockage par lignes (retour au
+tableau complet).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from _http_helpers import get_with_retry, post_with_retry  # noqa: E402
+from scraper_ai.grouping import compute_unit_key  # noqa: E402
+
+PRODUCT_TABLE = "scraped_products"
+APPLY_RPC = "apply_scraped_products"
+STAGE_RPC = "stage_scraped_products"
+# PostgREST plafonne les réponses (max-rows, 1000 par défaut sur Supabase)
+PAGE_SIZE = 1000
+# Lignes modifiées accumulées par ProductStream avant un envoi
+STREAM_CHUNK = 200
+
+# Champs lus par le trigger product_price_history, detectChanges et
+# normalize_product_key : une différence ailleurs (image, description…)
+# n'est pas matérielle et ne justifie pas une réécriture.
+PRICE_FIELDS = (
+    "name", "prix", "disponibilite", "etat", "marque", "modele", "annee",
+    "kilometrage", "inventaire", "vin", "couleur", "sourceUrl", "quantity", "units",
+)
+# À incrémenter si PRICE_FIELDS ou l'attribution des clés change : un
+# résumé d'une autre version force une écriture complète.
+DIGEST_VERSION = 2
+
+
+def store_enabled() -> bool:
+    """SCRAPED_PRODUCTS_STORE=0 désactive le stockage par lignes."""
+    return os.environ.get("SCRAPED_PRODUCTS_STORE", "1") not in ("0", "false", "False")
+
+
+def content_hash(product: dict) -> str:
+    """Empreinte du produit complet (ordre des clés indifférent)."""
+    payload = json.dumps(product, sort_keys=True, ensure_ascii=False,
+                         separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def price_hash(product: dict) -> str:
+    """Empreinte des seuls PRICE_FIELDS."""
+    payload = json.dumps([product.get(f) for f in PRICE_FIELDS], sort_keys=True,
+                         ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _identity_tag(product: dict) -> str:
+    """Suffixe de collision : empreinte de l'identité de l'annonce."""
+    identity = "|".join(str(product.get(f) or "").strip()
+                        for f in ("sourceUrl", "inventaire", "vin"))
+    return hashlib.blake2b(identity.encode("utf-8"), digest_size=4).hexdigest()
+
+
+def _unique_key(product: dict, seen: set, stored=None) -> str:
+    """unit_key du produit, rendue unique parmi `seen` (qu'elle rejoint).
+
+    Une clé déjà vue (même inventaire republié sous deux annonces) reçoit un
+    suffixe « #<empreinte> » tiré de sourceUrl/inventaire/vin, pas de l'ordre
+    d'arrivée. Un produit qui portait déjà sa clé suffixée dans `stored`
+    (clés du scrape précédent) la garde : deux unités qui échangent leur
+    place dans le scrape gardent chacune leur ligne.
+    """
+    base = compute_unit_key(product)
+    tagged = f"{base}#{_identity_tag(product)}"
+    if stored and tagged in stored and tagged not in seen:
+        key = tagged
+    elif base not in seen:
+        key = base
+    else:
+        # Annonces identiques jusqu'à l'URL : seul cas départagé par l'ordre
+        key = tagged
+        n = 1
+        while key in seen:
+            n += 1
+            key = f"{tagged}-{n}"
+    seen.add(key)
+    return key
+
+
+def _keyed(products: Iterable[dict], stored=None):
+    """(unit_key, produit) dans l'ordre du scrape, clés rendues uniques."""
+    seen: set = set()
+    for product in products:
+        yield _unique_key(product, seen, stored), product
+
+
+def product_rows(products: Iterable[dict], stored=None) -> Dict[str, dict]:
+    """unit_key → {'unit_key', 'content_hash', 'product', 'pos'}, dans l'ordre
+    du scrape. `stored` : clés actuellement en base (suffixes de collision)."""
+    return {
+        key: {"unit_key": key, "content_hash": content_hash(product), "product": product, "pos": pos}
+        for pos, (key, product) in enumerate(_keyed(products, stored))
+    }
+
+
+def product_digest(products: Iterable[dict], previous=None) -> dict:
+    """Résumé {'version', 'units': {unit_key: price_hash}} stocké avec le site.
+
+    `previous` : résumé du scrape précédent, dont les clés suffixées sont
+    reprises (voir `_unique_key`).
+    """
+    stored = previous.get("units") if isinstance(previous, dict) else None
+    if not isinstance(stored, dict):
+        stored = None
+    return {
+        "version": DIGEST_VERSION,
+        "units": {key: price_hash(product) for key, product in _keyed(products, stored)},
+    }
+
+
+def digest_delta(previous, current: dict) -> Optional[Dict[str, int]]:
+    """{'added', 'changed', 'removed'} entre deux résumés, None si `previous`
+    est absent ou d'une autre version (écriture complète nécessaire)."""
+    if not isinstance(previous, dict) or previous.get("version") != DIGEST_VERSION:
+        return None
+    prev_units = previous.get("units")
+    if not isinstance(prev_units, dict):
+        return None
+    units = current["units"]
+    return {
+        "added": sum(1 for k in units if k not in prev_units),
+        "changed": sum(1 for k, h in units.items() if k in prev_units and prev_units[k] != h),
+        "removed": sum(1 for k in prev_units if k not in units),
+    }
+
+
+class ProductChanges:
+    """Diff entre l'état stocké et un nouveau scrape.
+
+    `order` : unit_keys dans l'ordre du scrape quand il diffère de l'ordre
+    stocké (positions à réécrire), sinon None.
+    """
+
+    __slots__ = ("upserts", "deletes", "unchanged", "order")
+
+    def __init__(self, upserts: List[dict], deletes: List[str], unchanged: int,
+                 order: Optional[List[str]] = None):
+        self.upserts = upserts
+        self.deletes = deletes
+        self.unchanged = unchanged
+        self.order = order
+
+    @property
+    def empty(self) -> bool:
+        return not self.upserts and not self.deletes and self.order is None
+
+    def payload_bytes(self) -> int:
+        """Taille approximative du diff envoyé (avant compression)."""
+        return len(json.dumps([self.upserts, self.deletes, self.order],
+                              ensure_ascii=False, default=str))
+
+    def summary(self) -> str:
+        return (f"{len(self.upserts)} écrit(s), {len(self.deletes)} retiré(s), "
+                f"{self.unchanged} inchangé(s)")
+
+
+def diff_rows(stored: Dict[str, str], rows: Dict[str, dict]) -> ProductChanges:
+    """stored : unit_key → content_hash actuellement en base, dans l'ordre stocké."""
+    upserts = [row for key, row in rows.items() if stored.get(key) != row["content_hash"]]
+    deletes = [key for key in stored if key not in rows]
+    order = list(rows)
+    return ProductChanges(upserts, deletes, len(rows) - len(upserts),
+                          order=None if order == list(stored) else order)
+
+
+class ProductStream:
+    """Écriture en flux d'un scrape dans scraped_products.
+
+    `add` calcule la clé et l'empreinte de chaque produit dès son arrivée et
+    met les lignes modifiées en attente par paquets de `chunk_size`
+    (`store.stage`), sans toucher à scraped_products. `finish` (après
+    validation du scrape) envoie le reste, promeut les lignes en attente,
+    supprime les unités disparues et reconstruit le tableau. Un scrape
+    abandonné (partiel, échec) ne modifie aucune ligne : ses lignes en
+    attente sont effacées à la promotion suivante du site.
+    """
+
+    def __init__(self, store, domain: str, scraped_at: str, chunk_size: int = STREAM_CHUNK):
+        self.store = store
+        self.domain = domain
+        self.scraped_at = scraped_at
+        self.chunk_size = chunk_size
+        # None : empreintes illisibles, le flux est inutilisable
+        self.stored = store.stored_hashes(domain) if store.available else None
+        self.units: Dict[str, str] = {}
+        self.count = 0
+        self.staged = 0
+        self.upserted = 0
+        self.deleted = 0
+        self.unchanged = 0
+        self.failed = False
+        self.bytes_full = 0
+        self.bytes_sent = 0
+        self._seen: set = set()
+        self._pending: List[dict] = []
+
+    @property
+    def ready(self) -> bool:
+        return self.stored is not None and not self.failed
+
+    def add(self, product: dict) -> None:
+        key = _unique_key(product, self._seen, self.stored)
+        self.units[key] = price_hash(product)
+        row = {"unit_key": key, "content_hash": content_hash(product), "product": product,
+               "pos": self.count}
+        self.count += 1
+        self.bytes_full += len(json.dumps(product, ensure_ascii=False, default=str)) + 1
+        if self.stored.get(key) == row["content_hash"]:
+            self.unchanged += 1
+            return
+        self._pending.append(row)
+        if len(self._pending) >= self.chunk_size:
+            self._stage(self._pending)
+            self._pending = []
+
+    def digest(self) -> dict:
+        """Résumé du scrape, même format que `product_digest`."""
+        return {"version": DIGEST_VERSION, "units": dict(self.units)}
+
+    def finish(self, scraped_at: Optional[str] = None) -> bool:
+        """Envoie le reste, les suppressions, et reconstruit le tableau dérivé."""
+        if self.failed:
+            return False
+        deletes = [key for key in self.stored if key not in self.units]
+        order = list(self.units)
+        if order == list(self.stored):
+            order = None
+        if self._pending or deletes or self.staged or order is not None:
+            changes = ProductChanges(self._pending, deletes, 0, order=order)
+            # Toujours le run courant : la promotion vide aussi les lignes
+            # laissées en attente par un run abandonné
+            if not self.store.apply(self.domain, changes, scraped_at or self.scraped_at,
+                                    stage_run=self.scraped_at):
+                self.failed = True
+                return False
+            self.bytes_sent += changes.payload_bytes()
+            self.upserted = self.staged + len(self._pending)
+            self._pending = []
+        self.deleted = len(deletes)
+        return True
+
+    def summary(self) -> str:
+        return (f"{self.upserted} écrit(s), {self.deleted} retiré(s), "
+                f"{self.unchanged} inchangé(s)")
+
+    def _stage(self, rows: List[dict]) -> None:
+        if self.failed:
+            return
+        # scraped_at identifie le run : seules ses lignes seront promues
+        if not self.store.stage(self.domain, self.scraped_at, rows):
+            self.failed = True
+            return
+        self.staged += len(rows)
+        self.bytes_sent += len(json.dumps(rows, ensure_ascii=False, default=str))
+
+
+def _filter_columns(product: dict) -> dict:
+    """Colonnes de filtre — mêmes règles que la RPC apply_scraped_products."""
+    annee = str(product.get("annee") or "")
+    return {
+        "marque_norm": str(product.get("marque") or "").strip().lower() or None,
+        "annee": int(annee) if len(annee) == 4 and annee.isdigit() else None,
+        "etat": str(product.get("etat") or "").strip().lower() or None,
+        "source_categorie": product.get("sourceCategorie") or None,
+    }
+
+
+def _missing_relation(resp) -> bool:
+    """Table/RPC pas encore migrée (PostgREST : 404, PGRST202/PGRST205, 42P01)."""
+    if resp is None:
+        return False
+    if resp.status_code == 404:
+        return True
+    text = (resp.text or "")[:500]
+    return resp.status_code == 400 and any(
+        code in text for code in ("PGRST202", "PGRST205", "42P01", "42883"))
+
+
+class PostgrestProductStore:
+    """Lignes scraped_products via PostgREST."""
+
+    def __init__(self, supabase_url: str, supabase_key: str, logger=None):
+        self.base = supabase_url.rstrip("/")
+        self.headers = {
+            "apikey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}",
+        }
+        self.logger = logger
+        # Devient False au premier « relation inexistante » : migration non appliquée
+        self.available = True
+
+    def _select(self, params: dict) -> Optional[List[dict]]:
+        rows: List[dict] = []
+        offset = 0
+        while True:
+            resp = get_with_retry(
+                f"{self.base}/rest/v1/{PRODUCT_TABLE}",
+                params={**params, "order": "pos.asc.nullslast,unit_key",
+                        "limit": PAGE_SIZE, "offset": offset},
+                headers=self.headers,
+                timeout=30,
+                max_attempts=4,
+                logger=self.logger,
+            )
+            if _missing_relation(resp):
+                self.available = False
+                return None
+            if resp is None or resp.status_code != 200:
+                return None
+            page = resp.json() or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            offset += PAGE_SIZE
+
+    def stored_hashes(self, domain: str) -> Optional[Dict[str, str]]:
+        """unit_key → content_hash du site (ordre stocké), ou None si illisible."""
+        rows = self._select({"select": "unit_key,content_hash", "site_domain": f"eq.{domain}"})
+        if rows is None:
+            return None
+        return {r["unit_key"]: r.get("content_hash") or "" for r in rows}
+
+    def stage(self, domain: str, run_id: str, rows: List[dict]) -> bool:
+        """Lignes en attente du run `run_id` (promues par `apply(stage_run=...)`)."""
+        return self._rpc(STAGE_RPC, {"p_site_domain": domain, "p_run_id": run_id,
+                                     "p_upserts": rows})
+
+    def apply(self, domain: str, changes: ProductChanges, scraped_at: str,
+              rebuild_blob: bool = True, stage_run: Optional[str] = None) -> bool:
+        return self._rpc(APPLY_RPC, {
+            "p_site_domain": domain,
+            "p_upserts": changes.upserts,
+            "p_deletes": changes.deletes,
+            "p_order": changes.order,
+            "p_scraped_at": scraped_at,
+            "p_rebuild_blob": rebuild_blob,
+            "p_stage_run": stage_run,
+        })
+
+    def _rpc(self, name: str, payload: dict) -> bool:
+        resp = post_with_retry(
+            f"{self.base}/rest/v1/rpc/{name}",
+            json=payload,
+            headers={**self.headers, "Content-Type": "application/json"},
+            timeout=90,
+            max_attempts=4,
+            logger=self.logger,
+            compress=True,
+        )
+        if _missing_relation(resp):
+            self.available = False
+            return False
+        return resp is not None and resp.status_code in (200, 204)
+
+    def save(self, domain: str, products: List[dict], scraped_at: str) -> Optional[ProductChanges]:
+        """Diff + application. None si le stockage par lignes est indisponible."""
+        if not self.available:
+            return None
+        stored = self.stored_hashes(domain)
+        if stored is None:
+            return None
+        changes = diff_rows(stored, product_rows(products, stored))
+        if not self.apply(domain, changes, scraped_at):
+            return None
+        return changes
+
+
+class SqliteProductStore:
+    """Doublure locale de scraped_products + du tableau dérivé scraped_site_data.products."""
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS scraped_products ("
+            " site_domain TEXT NOT NULL,"
+            " unit_key TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " product TEXT NOT NULL,"
+            " marque_norm TEXT,"
+            " annee INTEGER,"
+            " etat TEXT,"
+            " source_categorie TEXT,"
+            " pos INTEGER,"
+            " scraped_at TEXT,"
+            " PRIMARY KEY (site_domain, unit_key));"
+            "CREATE TABLE IF NOT EXISTS scraped_products_staging ("
+            " site_domain TEXT NOT NULL,"
+            " run_id TEXT NOT NULL,"
+            " unit_key TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " product TEXT NOT NULL,"
+            " pos INTEGER,"
+            " PRIMARY KEY (site_domain, run_id, unit_key));"
+            "CREATE TABLE IF NOT EXISTS scraped_site_data ("
+            " site_domain TEXT PRIMARY KEY,"
+            " products TEXT NOT NULL,"
+            " product_count INTEGER NOT NULL);"
+        )
+        self.available = True
+
+    def stored_hashes(self, domain: str) -> Optional[Dict[str, str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT unit_key, content_hash FROM scraped_products WHERE site_domain = ?"
+                " ORDER BY pos IS NULL, pos, unit_key",
+                (domain,),
+            ).fetchall()
+        return dict(rows)
+
+    def stage(self, domain: str, run_id: str, rows: List[dict]) -> bool:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scraped_products_staging"
+                " (site_domain, run_id, unit_key, content_hash, product, pos)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(domain, run_id, row["unit_key"], row["content_hash"],
+                  json.dumps(row["product"], ensure_ascii=False, default=str), row.get("pos"))
+                 for row in rows],
+            )
+            self._conn.commit()
+        return True
+
+    def apply(self, domain: str, changes: ProductChanges, scraped_at: str,
+              rebuild_blob: bool = True, stage_run: Optional[str] = None) -> bool:
+        with self._lock:
+            conn = self._conn
+            upserts = changes.upserts
+            if stage_run is not None:
+                staged = [
+                    {"unit_key": k, "content_hash": h, "product": json.loads(p), "pos": pos}
+                    for k, h, p, pos in conn.execute(
+                        "SELECT unit_key, content_hash, product, pos FROM scraped_products_staging"
+                        " WHERE site_domain = ? AND run_id = ?", (domain, stage_run))
+                ]
+                upserts = staged + upserts
+                conn.execute("DELETE FROM scraped_products_staging WHERE site_domain = ?", (domain,))
+            conn.executemany(
+                "DELETE FROM scraped_products WHERE site_domain = ? AND unit_key = ?",
+                [(domain, key) for key in changes.deletes],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO scraped_products"
+                " (site_domain, unit_key, content_hash, product,"
+                "  marque_norm, annee, etat, source_categorie, pos, scraped_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (domain, row["unit_key"], row["content_hash"],
+                     json.dumps(row["product"], ensure_ascii=False, default=str),
+                     *_filter_columns(row["product"]).values(), row.get("pos"), scraped_at)
+                    for row in upserts
+                ],
+            )
+            if changes.order is not None:
+                conn.executemany(
+                    "UPDATE scraped_products SET pos = ? WHERE site_domain = ? AND unit_key = ?",
+                    [(pos, domain, key) for pos, key in enumerate(changes.order)],
+                )
+            if rebuild_blob:
+                products = [json.loads(r[0]) for r in conn.execute(
+                    "SELECT product FROM scraped_products WHERE site_domain = ?"
+                    " ORDER BY pos IS NULL, pos, unit_key",
+                    (domain,),
+                )]
+                conn.execute(
+                    "INSERT OR REPLACE INTO scraped_site_data (site_domain, products, product_count)"
+                    " VALUES (?, ?, ?)",
+                    (domain, json.dumps(products, ensure_ascii=False, default=str), len(products)),
+                )
+            conn.commit()
+        return True
+
+    def site_products(self, domain: str) -> List[dict]:
+        """Tableau dérivé (équivalent de scraped_site_data.products)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT products FROM scraped_site_data WHERE site_domain = ?", (domain,),
+            ).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def save(self, domain: str, products: List[dict], scraped_at: str) -> Optional[ProductChanges]:
+        stored = self.stored_hashes(domain) or {}
+        changes = diff_rows(stored, product_rows(products, stored))
+        self.apply(domain, changes, scraped_at)
+        return changes
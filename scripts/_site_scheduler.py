@@ -0,0 +1,261 @@
+"""Ordonnancement des sites du cron horaire (scraper_cron.py).
+
+Historique (scraper_cache/site_history.json) : pour chaque site, durée
+attendue (moyenne glissante des scrapes réussis), dernier nombre de
+produits et dernier résultat. Un site jamais vu est amorcé par
+scraped_site_data.scrape_duration_seconds, à défaut par le prior statique
+du cron (gros site connu ou non).
+
+Plan : sites triés du plus long au plus court (LPT) ; le timeout de chaque
+site est tiré de sa durée attendue (TIMEOUT_FACTOR ×, borné) au lieu de
+deux valeurs fixes.
+
+File partagée (SiteQueue, SQLite en WAL) : les process batch et leurs
+threads prennent le prochain site de la file au lieu d'une tranche fixe —
+un thread libre vole le travail restant, la durée du cron tend vers celle
+du site le plus long. Un site en échec est remis en file après une pause
+(au plus `max_retries` fois) ; un timeout ne l'est pas.
+
+SCRAPER_SCHEDULER=0 revient aux tranches fixes par site_slug.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+HISTORY_PATH = PROJECT_ROOT / "scraper_cache" / "site_history.json"
+QUEUE_DIR = PROJECT_ROOT / "scraper_cache" / "cron_queue"
+
+# Poids du dernier scrape dans la durée attendue
+EWMA_ALPHA = 0.4
+# Timeout = TIMEOUT_FACTOR × durée attendue, borné
+TIMEOUT_FACTOR = 2.5
+MIN_TIMEOUT = 300
+MAX_TIMEOUT = 2400
+# Pause avant une nouvelle tentative (× numéro de tentative)
+RETRY_DELAY_SECONDS = 5
+# Un site « running » depuis plus longtemps que son timeout + cette marge
+# appartient à un worker mort : il est rendu à la file
+STALE_CLAIM_GRACE = 300
+
+
+def scheduler_enabled() -> bool:
+    """SCRAPER_SCHEDULER=0 désactive la file partagée (tranches fixes)."""
+    return os.environ.get("SCRAPER_SCHEDULER", "1") not in ("0", "false", "False")
+
+
+class SiteHistory:
+    """Durées et volumes observés par site, persistés entre les runs."""
+
+    def __init__(self, path: Path = HISTORY_PATH):
+        self.path = Path(path)
+        try:
+            self.sites: Dict[str, dict] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.sites = {}
+
+    def expected_seconds(self, domain: str, fallback: float) -> float:
+        entry = self.sites.get(domain)
+        if entry and entry.get("seconds"):
+            return float(entry["seconds"])
+        return float(fallback)
+
+    def timeout(self, domain: str, fallback: int) -> int:
+        """Timeout tiré de l'historique, `fallback` pour un site sans historique."""
+        entry = self.sites.get(domain)
+        if not entry or not entry.get("seconds"):
+            return fallback
+        return int(min(MAX_TIMEOUT, max(MIN_TIMEOUT, TIMEOUT_FACTOR * entry["seconds"])))
+
+    def record(self, domain: str, seconds: float, product_count: int,
+               success: bool, timed_out: bool = False) -> None:
+        entry = self.sites.setdefault(domain, {})
+        previous = entry.get("seconds")
+        if success:
+            entry["seconds"] = round(
+                seconds if not previous else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * previous, 1)
+            entry["products"] = product_count
+        elif timed_out:
+            # Durée réelle inconnue (≥ timeout) : le site passe en tête du
+            # prochain plan et son timeout grandit
+            entry["seconds"] = round(max(previous or 0, seconds), 1)
+        entry["last_seconds"] = round(seconds, 1)
+        entry["last_status"] = "success" if success else ("timeout" if timed_out else "error")
+        entry["updated_at"] = time.time()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.sites, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def plan_sites(sites: List[dict], history: SiteHistory, default_seconds, default_timeout) -> List[dict]:
+    """Pose `_expected_seconds` / `_timeout` sur chaque site et les trie du
+    plus long au plus court. `default_seconds(site)` / `default_timeout(site)`
+    servent aux sites sans historique."""
+    for site in sites:
+        domain = site["site_domain"]
+        site["_expected_seconds"] = history.expected_seconds(domain, default_seconds(site))
+        site["_timeout"] = history.timeout(domain, default_timeout(site))
+    return sorted(sites, key=lambda s: s["_expected_seconds"], reverse=True)
+
+
+def makespan_estimate(sites: List[dict], slots: int) -> float:
+    """Durée attendue du cron en ordonnancement glouton (LPT) sur `slots` threads."""
+    loads = [0.0] * max(1, slots)
+    for site in sorted(sites, key=lambda s: s["_expected_seconds"], reverse=True):
+        i = loads.index(min(loads))
+        loads[i] += site["_expected_seconds"]
+    return max(loads)
+
+
+class SiteQueue:
+    """File des sites d'un run, partagée par les process batch (SQLite)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @classmethod
+    def create(cls, sites: List[dict], max_retries: int, path: Optional[Path] = None) -> "SiteQueue":
+        """Nouvelle file, dans l'ordre de `sites` (déjà planifiés)."""
+        if path is None:
+            QUEUE_DIR.mkdir(parents=True, exist_ok=True)
+            path = QUEUE_DIR / f"run-{os.getpid()}-{int(time.time())}.sqlite"
+        queue = cls(path)
+        conn = sqlite3.connect(path, timeout=60)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                "DROP TABLE IF EXISTS sites;"
+                "DROP TABLE IF EXISTS meta;"
+                "CREATE TABLE sites ("
+                " pos INTEGER PRIMARY KEY,"
+                " domain TEXT UNIQUE NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " state TEXT NOT NULL DEFAULT 'pending',"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " not_before REAL NOT NULL DEFAULT 0,"
+                " worker TEXT,"
+                " claimed_at REAL,"
+                " result TEXT);"
+                "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);"
+            )
+            conn.executemany(
+                "INSERT INTO sites (pos, domain, payload) VALUES (?, ?, ?)",
+                [(i, s["site_domain"], json.dumps(s, default=str)) for i, s in enumerate(sites)],
+            )
+            conn.execute("INSERT INTO meta VALUES ('max_retries', ?)", (str(max_retries),))
+            conn.commit()
+        finally:
+            conn.close()
+        return queue
+
+    def _connect(self) -> "_Transaction":
+        return _Transaction(sqlite3.connect(self.path, timeout=60, isolation_level=None))
+
+    def claim(self, worker: str) -> Optional[dict]:
+        """Prend le prochain site prêt (None si aucun pour l'instant)."""
+        now = time.time()
+        with self._connect() as conn:
+            self._reclaim_abandoned(conn, now)
+            row = conn.execute(
+                "SELECT pos, payload, attempts FROM sites"
+                " WHERE state = 'pending' AND not_before <= ? ORDER BY pos LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE sites SET state = 'running', worker = ?, claimed_at = ? WHERE pos = ?",
+                (worker, now, row[0]),
+            )
+        site = json.loads(row[1])
+        site["_attempt"] = row[2]
+        return site
+
+    def _reclaim_abandoned(self, conn, now: float) -> None:
+        for pos, payload, claimed_at in conn.execute(
+            "SELECT pos, payload, claimed_at FROM sites WHERE state = 'running'"
+        ).fetchall():
+            timeout = json.loads(payload).get("_timeout") or MAX_TIMEOUT
+            if claimed_at is not None and now - claimed_at > timeout + STALE_CLAIM_GRACE:
+                conn.execute(
+                    "UPDATE sites SET state = 'pending', worker = NULL, claimed_at = NULL"
+                    " WHERE pos = ?", (pos,))
+
+    def finish(self, site: dict, result: dict) -> bool:
+        """Enregistre le résultat d'une tentative. True si le site est remis en file."""
+        summary = {k: result.get(k) for k in
+                   ("success", "partial", "timed_out", "elapsed", "product_count", "error")}
+        with self._connect() as conn:
+            max_retries = int(conn.execute(
+                "SELECT value FROM meta WHERE key = 'max_retries'").fetchone()[0])
+            attempts = conn.execute(
+                "SELECT attempts FROM sites WHERE domain = ?", (site["site_domain"],)
+            ).fetchone()[0]
+            retry = not result.get("success") and not result.get("timed_out") and attempts < max_retries
+            conn.execute(
+                "UPDATE sites SET state = ?, attempts = attempts + ?, not_before = ?,"
+                " worker = NULL, result = ? WHERE domain = ?",
+                (
+                    "pending" if retry else ("done" if result.get("success") else "failed"),
+                    1 if retry else 0,
+                    time.time() + RETRY_DELAY_SECONDS * (attempts + 1) if retry else 0,
+                    json.dumps(summary, default=str),
+                    site["site_domain"],
+                ),
+            )
+        return retry
+
+    def active(self) -> bool:
+        """Reste-t-il des sites en attente ou en cours ?"""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT 1 FROM sites WHERE state IN ('pending', 'running') LIMIT 1"
+            ).fetchone() is not None
+
+    def results(self) -> List[dict]:
+        """Sites du run avec leur dernier résultat (`_result`) et `_attempts`."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload, state, attempts, result FROM sites ORDER BY pos").fetchall()
+        sites = []
+        for payload, state, attempts, result in rows:
+            site = json.loads(payload)
+            site["_state"] = state
+            site["_attempts"] = attempts
+            site["_result"] = json.loads(result) if result else None
+            sites.append(site)
+        return sites
+
+    def remove(self) -> None:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(f"{self.path}{suffix}")
+            except OSError:
+                pass
+
+
+class _Transaction:
+    """Connexion SQLite en transaction IMMEDIATE le temps d'un `with`."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, *exc):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Benchmark du pool Chromium (dedicated_scrapers/_browser_pool.py).
+
+Rend la même série d'URLs de deux façons :
+  - sans pool : un `with BrowserAgent()` par URL (cold start Playwright +
+    Chromium à chaque fois, comme les adapters SERP avant le pool) ;
+  - avec pool : même code appelant, contextes prêtés par des navigateurs chauds.
+
+Usage:
+    python scripts/bench_browser_pool.py [--renders 10] [--url https://...]
+    python scripts/bench_browser_pool.py --threads 4   # appelants concurrents
+
+Sans --url, une page locale (serveur HTTP du bench) est rendue : la mesure
+isole alors le coût navigateur du réseau. Requiert Playwright + Chromium.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai.dedicated_scrapers import _browser_pool
+from scraper_ai.scraper_usine.browser_agent import BrowserAgent
+
+_PAGE = (
+    "<html><body><h1>Bench</h1>"
+    + "".join(f"<div class='card'><a href='/p/{i}'>Produit {i}</a></div>" for i in range(200))
+    + "<script>document.body.dataset.ready = '1'</script></body></html>"
+).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(_PAGE)))
+        self.end_headers()
+        self.wfile.write(_PAGE)
+
+
+def _render_once(url: str) -> float:
+    """Un appel complet tel que le fait un adapter SERP (start → render → close)."""
+    t0 = time.perf_counter()
+    with BrowserAgent(block_assets=True, locale="fr-CA") as agent:
+        result = agent.render(url, networkidle_ms=0, post_load_wait_ms=0, dismiss_cookies=False)
+    if not result.success:
+        raise RuntimeError(f"rendu échoué : {result.error}")
+    return (time.perf_counter() - t0) * 1000
+
+
+def _series(url: str, renders: int, threads: int) -> List[float]:
+    if threads <= 1:
+        return [_render_once(url) for _ in range(renders)]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(_render_once, [url] * renders))
+
+
+def _summary(label: str, timings: List[float], wall: float) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"   {label:<12} p50 {statistics.median(ordered):>7.0f} ms   p95 {p95:>7.0f} ms   "
+          f"total {wall:>6.1f} s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--url", help="URL réelle à rendre (défaut : page locale)")
+    args = parser.parse_args()
+
+    httpd = None
+    url = args.url
+    if not url:
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{httpd.server_port}/"
+
+    try:
+        os.environ["SCRAPER_BROWSER_POOL"] = "0"
+        t0 = time.perf_counter()
+        cold = _series(url, args.renders, args.threads)
+        cold_wall = time.perf_counter() - t0
+
+        os.environ["SCRAPER_BROWSER_POOL"] = "1"
+        _browser_pool.get_browser_pool().reserve(args.threads)
+        t0 = time.perf_counter()
+        pooled = _series(url, args.renders, args.threads)
+        pooled_wall = time.perf_counter() - t0
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+
+    print(f"\n📊 {args.renders} appels BrowserAgent ({args.threads} thread(s)) sur {url}")
+    _summary("sans pool", cold, cold_wall)
+    _summary("avec pool", pooled, pooled_wall)
+    print(f"   gain p50 : x{statistics.median(cold) / statistics.median(pooled):.1f}")
+    _browser_pool.log_browser_pool_stats()
+    _browser_pool.close_browser_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Benchmark de l'extraction des pages détail des scrapers dédiés.
+
+Compare le chemin historique (`DedicatedScraper._extract_all` : batches de
+ThreadPoolExecutor) au moteur async (dedicated_scrapers/_async_fetch.py),
+avec parsing en thread puis en pool de process.
+
+Usage:
+    # Serveur local simulé (pages de ~25 Ko, latence fixe)
+    python scripts/bench_detail_fetch.py [--pages 600] [--latency-ms 80]
+
+    # Site réel (réseau) : URLs découvertes par le scraper, tronquées
+    python scripts/bench_detail_fetch.py --slug motoplex --limit 200
+
+Sortie : URLs/s par variante et le gain par rapport au chemin threads. Les
+produits extraits doivent être identiques d'une variante à l'autre.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("SCRAPER_HTTP_CACHE", "0")
+
+from scraper_ai.dedicated_scrapers._async_fetch import AsyncDetailEngine
+from scraper_ai.dedicated_scrapers.base import DedicatedScraper
+
+
+# ── Site simulé ──
+
+_FILLER = "".join(
+    f"<li class='spec'><span>Caractéristique {i}</span><b>valeur {i}</b></li>" for i in range(300)
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.08
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(type(self).latency)
+        i = self.path.rstrip("/").split("-")[-1]
+        body = (
+            f"<html><head><title>Moto {i}</title></head><body>"
+            f"<h1 class='titre'>Kawasaki Ninja {i}</h1>"
+            f"<div class='prix'>{12000 + int(i)} $</div><div class='stock'>K{i}</div>"
+            f"<ul>{_FILLER}</ul></body></html>"
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BenchScraper(DedicatedScraper):
+    SITE_NAME = "Bench"
+    SITE_SLUG = "bench-detail-fetch"
+    SITE_URL = "http://127.0.0.1/"
+    HTTP_VALIDATOR_CACHE = False
+
+    def discover_product_urls(self, categories=None):
+        return []
+
+    def extract_from_detail_page(self, url, html, soup):
+        return {
+            "name": soup.select_one("h1.titre").get_text(strip=True),
+            "prix": self.clean_price(soup.select_one(".prix").get_text()),
+            "inventaire": soup.select_one(".stock").get_text(strip=True),
+            "specs": len(soup.select("li.spec")),
+        }
+
+
+def _local_urls(pages: int, latency: float) -> Tuple[List[str], Callable[[], DedicatedScraper], Callable[[], None]]:
+    _Handler.latency = latency
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    return [f"{base}/inventaire/moto-{i}" for i in range(pages)], BenchScraper, httpd.shutdown
+
+
+def _site_urls(slug: str, limit: int) -> Tuple[List[str], Callable[[], DedicatedScraper], Callable[[], None]]:
+    from scraper_ai.dedicated_scrapers.registry import DedicatedScraperRegistry
+
+    scraper = DedicatedScraperRegistry.get_by_slug(slug)
+    if scraper is None:
+        raise SystemExit(f"❌ Scraper inconnu : {slug}")
+    urls = scraper.discover_product_urls()[:limit]
+    return urls, type(scraper), lambda: None
+
+
+# ── Bench ──
+
+def _run(label: str, fn: Callable[[], list], n_urls: int) -> Tuple[float, list]:
+    start = time.perf_counter()
+    products = fn()
+    elapsed = time.perf_counter() - start
+    rate = n_urls / elapsed if elapsed > 0 else 0.0
+    print(f"   → {label}: {len(products)} produits en {elapsed:.1f}s ({rate:.1f} URLs/s)\n")
+    return rate, products
+
+
+def _threads(cls, urls: List[str]) -> list:
+    os.environ["SCRAPER_ASYNC_FETCH"] = "0"
+    try:
+        return cls()._extract_all(urls)
+    finally:
+        os.environ.pop("SCRAPER_ASYNC_FETCH", None)
+
+
+def _canonical(products: list) -> List[str]:
+    return sorted(json.dumps(p, sort_keys=True, default=str) for p in products)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=600)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--slug", help="scraper dédié réel (réseau) au lieu du site simulé")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.slug:
+        urls, cls, stop = _site_urls(args.slug, args.limit)
+    else:
+        urls, cls, stop = _local_urls(args.pages, args.latency_ms / 1000)
+    print(f"📊 {len(urls)} URLs ({args.slug or 'site simulé'})\n")
+
+    try:
+        base_rate, base_products = _run("threads (actuel)", lambda: _threads(cls, urls), len(urls))
+        variants = [
+            ("async, parsing en thread", lambda: AsyncDetailEngine(cls(), parse_workers=0).run(urls)),
+            ("async, parsing en process",
+             lambda: AsyncDetailEngine(cls(), parse_workers=args.parse_workers).run(urls)),
+        ]
+        results = [(label, *_run(label, fn, len(urls))) for label, fn in variants]
+    finally:
+        stop()
+
+    print(f"{'variante':<28} {'URLs/s':>8}  gain")
+    print(f"{'threads (actuel)':<28} {base_rate:>8.1f}")
+    mismatches = 0
+    for label, rate, products in results:
+        gain = rate / base_rate if base_rate else 0.0
+        print(f"{label:<28} {rate:>8.1f}  x{gain:.2f}")
+        if _canonical(cls()._deduplicate(products)) != _canonical(base_products):
+            mismatches += 1
+    if mismatches and not args.slug:
+        print(f"❌ {mismatches} variante(s) avec des produits différents du chemin threads")
+        return 1
+    print("✅ Produits identiques au chemin threads" if not mismatches
+          else "ℹ️  Produits différents (site réel : inventaire mouvant entre deux passes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Micro-benchmark du fuzzy matching de scraper_search/scoring.py.
+
+Passe des requêtes relevées sur /product-search dans `select_hits` (scan
+complet, sans index) sur un vrai dump d'inventaire, deux fois :
+  - avant : SequenceMatcher.ratio() sur chaque token et chaque fenêtre
+    glissante (implémentation d'origine, réinjectée dans le module) ;
+  - après : bornes length/multiset (`_similar`, `_window_candidates`)
+    devant SequenceMatcher.
+Vérifie que les hits sont identiques et affiche le temps par requête.
+
+Usage:
+    python scripts/bench_fuzzy_scoring.py [--dump scraped_data.json] [--repeat 1]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai.scraper_search import scoring
+from scraper_ai.scraper_search.query_parser import parse_query
+
+QUERIES = [
+    "KTM SX 150 2026",
+    "honda crf450r",
+    "skidoo summit 850",
+    "Ski-Doo MXZ 600 2019",
+    "kawasaki ninja 400 2022 < 8000$",
+    "can-am outlander 2020-2023",
+    "polaris rzr xp 1000",
+    "Harley-Davidson Road King 2018",
+    "Kawazaki Ninja",
+    "Hondaa Rebel 500",
+    "yamaha grizzly 700 2025 neuf",
+    "CFMoto CForce 600",
+    "Suzuki Vstrom 650",
+    "Triumph Bonneville 2015",
+]
+
+
+def _legacy_similar(a: str, b: str) -> bool:
+    return SequenceMatcher(None, a, b).ratio() >= scoring._FUZZY_THRESHOLD
+
+
+def _legacy_windows(needle: str, text: str):
+    return range(len(text) - len(needle) + 1)
+
+
+def _run(products: List[Dict], repeat: int) -> Tuple[Dict[str, float], Dict[str, list]]:
+    timings: Dict[str, float] = {}
+    hits: Dict[str, list] = {}
+    for raw in QUERIES:
+        query = parse_query(raw)
+        samples = []
+        for _ in range(repeat):
+            if hasattr(scoring._similar, "cache_clear"):
+                scoring._similar.cache_clear()
+            t0 = time.perf_counter()
+            found, _, _ = scoring.select_hits(query, products, max_results=50,
+                                              source_site="bench", source_slug="bench")
+            samples.append((time.perf_counter() - t0) * 1000)
+        timings[raw] = statistics.median(samples)
+        hits[raw] = [(h.source_url, round(h.score, 6)) for h in found]
+    return timings, hits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dump", default=str(PROJECT_ROOT / "scraped_data.json"),
+                        help="JSON d'inventaire ({'products': [...]} ou liste)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    data = json.loads(Path(args.dump).read_text(encoding="utf-8"))
+    products = data.get("products", []) if isinstance(data, dict) else data
+
+    new_similar, new_windows = scoring._similar, scoring._window_candidates
+    scoring._similar, scoring._window_candidates = _legacy_similar, _legacy_windows
+    try:
+        before, before_hits = _run(products, args.repeat)
+    finally:
+        scoring._similar, scoring._window_candidates = new_similar, new_windows
+    after, after_hits = _run(products, args.repeat)
+
+    print(f"\n📊 {len(QUERIES)} requêtes × {len(products)} produits ({Path(args.dump).name}, "
+          f"médiane de {args.repeat})")
+    print(f"   {'requête':<34} {'avant':>9} {'après':>9}   gain")
+    for raw in QUERIES:
+        print(f"   {raw[:34]:<34} {before[raw]:>7.0f}ms {after[raw]:>7.0f}ms   "
+              f"x{before[raw] / max(after[raw], 1e-3):.1f}")
+    total_before, total_after = sum(before.values()), sum(after.values())
+    print(f"   {'total':<34} {total_before:>7.0f}ms {total_after:>7.0f}ms   "
+          f"x{total_before / max(total_after, 1e-3):.1f}")
+
+    mismatches = [raw for raw in QUERIES if before_hits[raw] != after_hits[raw]]
+    if mismatches:
+        print(f"❌ Hits différents : {mismatches}")
+        return 1
+    print("✅ Hits identiques sur toutes les requêtes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark du cache d'inventaires : ancien format `.json` vs `.inv` (mmap).
+
+Écrit les mêmes inventaires dans les deux formats, puis mesure dans un
+process neuf par format (comme un CLI ou un backend qui redémarre) :
+  - info   : `age_seconds` de chaque clé (équivalent de --cache-info) ;
+  - requête: première recherche indexée sur chaque inventaire (get +
+    index_for + select_hits) ;
+  - scan   : parcours complet de tous les produits ;
+  - RSS    : mémoire résidente du process après la requête et après le
+             scan (VmRSS, hors imports).
+
+Usage:
+    python scripts/bench_inventory_cache.py [--sites 5] [--products 20000]
+    python scripts/bench_inventory_cache.py --real --sites 5   # plus gros inventaires locaux
+
+Sans --real, chaque site est le dump scraped_data.json répété jusqu'à
+--products produits.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai.scraper_search import cache as cache_mod
+
+QUERY = "Suzuki SV650 2025"
+
+
+def _rss_mb() -> float:
+    """Mémoire résidente courante (Linux ; 0 ailleurs)."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def _child(cache_dir: str) -> int:
+    """Mesures dans un process neuf ; imprime un JSON sur stdout."""
+    from scraper_ai.scraper_search.query_parser import parse_query
+    from scraper_ai.scraper_search.scoring import select_hits
+
+    cache_mod.CACHE_DIR = Path(cache_dir)
+    cache = cache_mod.SearchCache(ttl_seconds=10 ** 9)
+    rss0 = _rss_mb()
+    keys = cache.list_keys()
+
+    t0 = time.perf_counter()
+    for key in keys:
+        cache.age_seconds(key)
+    info_ms = (time.perf_counter() - t0) * 1000
+
+    query = parse_query(QUERY)
+    t0 = time.perf_counter()
+    hits = 0
+    for key in keys:
+        products = cache.get(key)
+        found, _, _ = select_hits(query, products, max_results=50, source_site=key,
+                                  source_slug=key, index=cache.index_for(key, products))
+        hits += len(found)
+    query_ms = (time.perf_counter() - t0) * 1000
+    rss_query = _rss_mb()
+
+    t0 = time.perf_counter()
+    total = sum(1 for key in keys for p in cache.get(key) if p)
+    scan_ms = (time.perf_counter() - t0) * 1000
+    rss_scan = _rss_mb()
+
+    print(json.dumps({"info_ms": info_ms, "query_ms": query_ms, "scan_ms": scan_ms,
+                      "hits": hits, "products": total,
+                      "rss_query_mb": rss_query - rss0,
+                      "rss_scan_mb": rss_scan - rss0}))
+    return 0
+
+
+def _inventories(args) -> dict:
+    if args.real:
+        files = sorted(cache_mod.CACHE_DIR.glob("*.json"), key=lambda p: p.stat().st_size, reverse=True)
+        result = {}
+        for path in files[:args.sites]:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(data.get("products"), list):
+                result[path.stem] = data["products"]
+        return result
+    data = json.loads((PROJECT_ROOT / "scraped_data.json").read_text(encoding="utf-8"))
+    base = data.get("products", []) if isinstance(data, dict) else data
+    result = {}
+    for s in range(args.sites):
+        products = []
+        while len(products) < args.products:
+            for p in base:
+                products.append({**p, "sourceUrl": f"{p.get('sourceUrl', '')}#{s}-{len(products)}"})
+                if len(products) >= args.products:
+                    break
+        result[f"site-{s}"] = products
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=5)
+    parser.add_argument("--products", type=int, default=20000, help="produits par site (synthétique)")
+    parser.add_argument("--real", action="store_true",
+                        help="plus gros inventaires de scraper_cache/search_inventory/")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return _child(args.child)
+
+    inventories = _inventories(args)
+    if not inventories:
+        print("Aucun inventaire à mesurer.")
+        return 1
+    results = {}
+    for fmt in ("json", "inv"):
+        cache_dir = Path(tempfile.mkdtemp(prefix=f"bench-inv-{fmt}-"))
+        try:
+            os.environ["SEARCH_CACHE_FORMAT"] = fmt
+            cache_mod.CACHE_DIR = cache_dir
+            cache = cache_mod.SearchCache()
+            for key, products in inventories.items():
+                cache.set(key, products)
+            size_mb = sum(p.stat().st_size for p in cache_dir.iterdir()) / 1e6
+            out = subprocess.run([sys.executable, __file__, "--child", str(cache_dir)],
+                                 capture_output=True, text=True, check=True)
+            results[fmt] = {**json.loads(out.stdout.strip().splitlines()[-1]), "size_mb": size_mb}
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    count = sum(len(p) for p in inventories.values())
+    print(f"\n📊 {len(inventories)} inventaire(s), {count} produits, requête « {QUERY} »")
+    print(f"   {'format':<6} {'disque':>8} {'info':>9} {'requête':>9} {'scan':>9} "
+          f"{'RSS req.':>9} {'RSS scan':>9}")
+    for fmt, r in results.items():
+        print(f"   {fmt:<6} {r['size_mb']:>6.1f}MB {r['info_ms']:>7.0f}ms {r['query_ms']:>7.0f}ms "
+              f"{r['scan_ms']:>7.0f}ms {r['rss_query_mb']:>7.0f}MB {r['rss_scan_mb']:>7.0f}MB")
+    if results["json"]["hits"] != results["inv"]["hits"]:
+        print("❌ Nombre de hits différent entre les formats")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
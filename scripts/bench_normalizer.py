@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Benchmark du normaliseur de clés produit (scraper_ai.comparison).
+
+Compare l'implémentation d'origine (copie figée ci-dessous : regex non
+compilées, listes de motifs redéclarées à chaque appel, balayage linéaire
+des marques) au moteur actuel (regex précompilées, détection de marque en
+une passe, clés mémoïsées).
+
+Usage:
+    python scripts/bench_normalizer.py [--data scraped_data.json] [--rounds 5]
+
+Sortie : produits/s pour chaque variante et le gain. Le moteur est mesuré
+à froid (cache vidé à chaque tour) puis à chaud (même inventaire
+re-normalisé, cas de compare_from_cache qui repasse sur chaque utilisateur).
+
+La copie figée sert aussi de référence au test d'égalité octet pour octet
+(scraper_ai/test_comparison.py) — ne pas la modifier.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai import comparison
+from scraper_ai.comparison import (
+    COLOR_KEYWORDS,
+    KNOWN_BRANDS,
+    _BRAND_ALIASES,
+    extract_year_from_text,
+    extract_year_from_url,
+)
+
+
+# ── Implémentation d'origine (figée) ──
+
+def _legacy_strip_accents(text: str) -> str:
+    """Retire les accents d'une chaîne (é→e, è→e, etc.)"""
+    import unicodedata
+    nfkd = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in nfkd if not unicodedata.category(c).startswith('M'))
+
+
+def _legacy_deep_normalize(text: str) -> str:
+    """Normalisation profonde : minuscules, sans accents, sans ponctuation, espaces unifiés.
+    Insère un espace entre lettres et chiffres collés (ninja500 → ninja 500).
+    Fusionne les lettres simples consécutives en un seul token (r l → rl, s x f → sxf)
+    pour que "KLX110R L" et "KLX110RL" produisent le même résultat.
+    """
+    import re
+    if not text:
+        return ''
+    text = text.lower().strip()
+    text = _legacy_strip_accents(text)
+    # Insérer un espace entre lettres et chiffres collés: "ninja500" → "ninja 500"
+    text = re.sub(r'([a-z])(\d)', r'\1 \2', text)
+    text = re.sub(r'(\d)([a-z])', r'\1 \2', text)
+    # Retirer tout sauf lettres, chiffres, espaces
+    text = re.sub(r'[^a-z0-9\s]', ' ', text)
+    # Unifier les espaces multiples
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    # Fusionner les lettres simples consécutives: "r l" → "rl", "s x f" → "sxf"
+    # Cela uniformise "KLX110R L" (→ klx 110 r l → klx 110 rl)
+    # et "KLX110RL" (→ klx 110 rl) vers le même résultat.
+    words = text.split()
+    merged: list = []
+    i = 0
+    while i < len(words):
+        if len(words[i]) == 1 and words[i].isalpha():
+            # Début d'une séquence potentielle de lettres simples
+            letters = [words[i]]
+            j = i + 1
+            while j < len(words) and len(words[j]) == 1 and words[j].isalpha():
+                letters.append(words[j])
+                j += 1
+            if len(letters) > 1:
+                merged.append(''.join(letters))
+            else:
+                merged.append(words[i])
+            i = j
+        else:
+            merged.append(words[i])
+            i += 1
+    text = ' '.join(merged)
+
+    return text
+
+
+def _legacy_remove_colors(text: str) -> str:
+    """Retire les mots de couleur d'une chaîne de caractères.
+    Compare des mots entiers (pas de substring) pour éviter les faux positifs.
+    """
+    if not text:
+        return ''
+
+    normalized = _legacy_deep_normalize(text)
+    words = normalized.split()
+    filtered_words = []
+
+    # Normaliser les mots-couleur une seule fois
+    normalized_colors = set(_legacy_deep_normalize(c) for c in COLOR_KEYWORDS if c)
+
+    for word in words:
+        if word not in normalized_colors:
+            filtered_words.append(word)
+
+    return ' '.join(filtered_words)
+
+
+
+_LEGACY_BRANDS = [(_legacy_deep_normalize(b), b) for b in KNOWN_BRANDS]
+
+
+def legacy_normalize_product_key(product: dict, ignore_colors: bool = True) -> Tuple[str, str, int]:
+    """Crée une clé normalisée pour identifier les produits (marque + modèle + année).
+
+    Exclut du matching : localisation, concessionnaire, préfixes catégorie, couleurs.
+    L'état (neuf/occasion) n'est PAS dans la clé — un usagé peut matcher un neuf du même modèle.
+    """
+    import re
+
+    raw_marque = str(product.get('marque', '')).strip()
+    raw_modele = str(product.get('modele', '')).strip()
+    annee = product.get('annee', 0) or 0
+
+    # ── Toujours tenter d'extraire l'année si absente ──
+    if not annee:
+        annee = extract_year_from_text(product.get('name', ''))
+    if not annee:
+        annee = extract_year_from_url(product.get('sourceUrl', ''))
+
+    # Nettoyer les préfixes courants
+    raw_marque = re.sub(
+        r'^(manufacturier|fabricant|marque|brand)\s*:\s*', '', raw_marque, flags=re.I)
+    raw_modele = re.sub(r'^(modèle|modele|model)\s*:\s*',
+                        '', raw_modele, flags=re.I)
+
+    marque = _legacy_deep_normalize(raw_marque)
+    modele = _legacy_deep_normalize(raw_modele)
+
+    # ── Extraction depuis 'name' si marque ou modèle manquant ──
+    if not marque or not modele:
+        name = str(product.get('name', '')).strip()
+        if name:
+            name_norm = _legacy_deep_normalize(name)
+
+            detected_brand = ''
+            rest_of_name = name_norm
+
+            for norm_brand, original_brand in _LEGACY_BRANDS:
+                if name_norm.startswith(norm_brand + ' ') or name_norm == norm_brand:
+                    detected_brand = norm_brand
+                    rest_of_name = name_norm[len(norm_brand):].strip()
+                    break
+                # Chercher la marque n'importe où dans le nom
+                idx = name_norm.find(norm_brand)
+                if idx >= 0:
+                    detected_brand = norm_brand
+                    rest_of_name = (
+                        name_norm[:idx] + ' ' + name_norm[idx + len(norm_brand):]).strip()
+                    rest_of_name = re.sub(r'\s+', ' ', rest_of_name)
+                    break
+
+            if detected_brand:
+                if not marque:
+                    marque = detected_brand
+                if not modele:
+                    # Retirer l'année du reste pour avoir le modèle pur
+                    year_match = re.search(r'\b(19|20)\d{2}\b', rest_of_name)
+                    if year_match:
+                        if not annee:
+                            annee = int(year_match.group(0))
+                        rest_of_name = rest_of_name[:year_match.start(
+                        )] + rest_of_name[year_match.end():]
+                    modele = re.sub(r'\s+', ' ', rest_of_name).strip()
+            elif not modele:
+                # Aucune marque connue détectée dans le nom — utiliser le nom nettoyé comme modèle
+                # Cas fréquent : marque déjà définie (JSON-LD), nom = juste le modèle (ex: "Z900")
+                year_match = re.search(r'\b(19|20)\d{2}\b', name_norm)
+                if year_match:
+                    if not annee:
+                        annee = int(year_match.group(0))
+                    name_norm = name_norm[:year_match.start(
+                    )] + name_norm[year_match.end():]
+                # Si la marque est déjà définie, la retirer du nom pour éviter la duplication
+                cleaned_name = name_norm
+                if marque:
+                    marque_norm = _legacy_deep_normalize(marque)
+                    if cleaned_name.startswith(marque_norm + ' '):
+                        cleaned_name = cleaned_name[len(marque_norm):].strip()
+                    elif cleaned_name.endswith(' ' + marque_norm):
+                        cleaned_name = cleaned_name[:-
+                                                    len(marque_norm):].strip()
+                modele = re.sub(r'\s+', ' ', cleaned_name).strip()
+
+    # Unifier les alias de marques
+    marque = _BRAND_ALIASES.get(marque, marque)
+
+    # ── Nettoyage du modèle : retirer UNIQUEMENT localisation, concessionnaire, état ──
+    # Tout le reste (couleurs, trims, variantes) est conservé pour un matching strict.
+
+    _DEALER_NOISE_PATTERNS = [
+        r'\b(?:en\s+vente|disponible|neuf|usage|usag[ée]|occasion)\s+(?:a|à|chez|au)\b.*$',
+        r"\bd['\u2019]?occasion\s+(?:a|à|chez|au)\b.*$",
+        r'\b(?:a|à)\s+vendre\s+(?:a|à|chez|au)\b.*$',
+        r'\b(?:concessionnaire|dealer|showroom|magasin|succursale)\b.*$',
+        r'\b\w+\s+(?:motosport|motorsport|powersports?)\s*$',
+        r'\b(?:moto|motos|auto|autos)\s+\w+\s*$',
+        r'\b\w+\s+(?:moto|motos|sport[s]?|auto[s]?|motors?|marine|performance|center|centre)\s*$',
+    ]
+    for pattern in _DEALER_NOISE_PATTERNS:
+        modele = re.sub(pattern, '', modele, flags=re.I).strip()
+
+    _CATEGORY_PREFIX_PATTERNS = [
+        r'^(?:c[oô]te\s+[aà]\s+c[oô]te|cote\s+a\s+cote|side\s*by\s*side|sxs)\s+',
+        r'^(?:vtt|atv|quad|motoneige|snowmobile|moto|scooter)\s+',
+        r'^(?:motomarine|watercraft|jet\s*ski|personal\s+watercraft|pwc)\s+',
+        r'^(?:ponton|pontoon|bateau|boat|embarcation)\s+',
+        r'^(?:moteur\s+hors[\s-]?bord|outboard|hors[\s-]?bord)\s+',
+        r'^(?:sportive|routiere|routière|touring|adventure|aventure|cruiser|custom|standard|naked|enduro|supermoto|trail|dual[\s-]?sport|double[\s-]?usage|sport[\s-]?touring|grand[\s-]?touring|retro)\s+',
+        r'^(?:3[\s-]?roues|three[\s-]?wheel|trike)\s+',
+        r'^(?:velo[\s-]?electrique|e[\s-]?bike|ebike)\s+',
+    ]
+    for pattern in _CATEGORY_PREFIX_PATTERNS:
+        modele = re.sub(pattern, '', modele, flags=re.I).strip()
+
+    _ETAT_STANDALONE = r'\b(?:neuf|new|usage|usagee?|occasion|used|demo|demonstrateur|preowned|pre[\s-]?owned|certifie|certified)\b'
+    modele = re.sub(_ETAT_STANDALONE, '', modele, flags=re.I).strip()
+
+    modele = re.sub(r'\bpre\s*commande\b', '', modele, flags=re.I).strip()
+    modele = re.sub(r'\bpre\s*order\b', '', modele, flags=re.I).strip()
+
+    if ignore_colors:
+        modele = _legacy_remove_colors(modele)
+
+    modele = re.sub(
+        r'(\d+)\s+(?:th|st|nd|rd|e|eme)\s+(?:annivers\w*|anniv)\b',
+        r'\1 anniversaire',
+        modele,
+    )
+
+    marque = re.sub(r'\s+', ' ', marque).strip()
+    modele = re.sub(r'\s+', ' ', modele).strip()
+
+    return (marque, modele, annee)
+
+
+
+# ── Bench ──
+
+def load_products(path: Path) -> List[dict]:
+    data = json.loads(path.read_text(encoding='utf-8'))
+    return data.get('products', []) if isinstance(data, dict) else data
+
+
+def _time_run(fn: Callable[[dict], Tuple[str, str, int]], products: List[dict],
+              rounds: int, before_round: Callable[[], None] = lambda: None) -> float:
+    """Meilleur débit (produits/s) sur `rounds` passes complètes."""
+    best = 0.0
+    for _ in range(rounds):
+        before_round()
+        start = time.perf_counter()
+        for product in products:
+            fn(product)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            best = max(best, len(products) / elapsed)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default=str(PROJECT_ROOT / 'scraped_data.json'))
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    products = load_products(Path(args.data))
+    if not products:
+        print(f"❌ Aucun produit dans {args.data}")
+        return 1
+
+    # Variantes « nom seul » : exercent la détection de marque depuis le nom
+    name_only = [
+        {'name': p.get('name', ''), 'sourceUrl': p.get('sourceUrl', '')}
+        for p in products
+    ]
+    workload = products + name_only
+
+    mismatches = sum(
+        1 for p in workload
+        if legacy_normalize_product_key(p) != comparison.normalize_product_key(p)
+    )
+
+    clear = comparison._cached_product_key.cache_clear
+    legacy = _time_run(legacy_normalize_product_key, workload, args.rounds)
+    cold = _time_run(comparison.normalize_product_key, workload, args.rounds, clear)
+    uncached = _time_run(
+        lambda p: comparison._compute_product_key(
+            str(p.get('marque', '')), str(p.get('modele', '')), p.get('annee', 0),
+            p.get('name', ''), p.get('sourceUrl', ''), True),
+        workload, args.rounds)
+    clear()
+    for p in workload:
+        comparison.normalize_product_key(p)
+    warm = _time_run(comparison.normalize_product_key, workload, args.rounds)
+
+    print(f"📊 {len(workload)} produits ({args.data}), meilleur de {args.rounds} passes")
+    print(f"   avant (origine)        : {legacy:>12,.0f} produits/s")
+    print(f"   après, sans cache      : {uncached:>12,.0f} produits/s  (x{uncached / legacy:.1f})")
+    print(f"   après, cache froid     : {cold:>12,.0f} produits/s  (x{cold / legacy:.1f})")
+    print(f"   après, cache chaud     : {warm:>12,.0f} produits/s  (x{warm / legacy:.1f})")
+    if mismatches:
+        print(f"❌ {mismatches} clés différentes de l'implémentation d'origine")
+        return 1
+    print("✅ Clés identiques à l'implémentation d'origine")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
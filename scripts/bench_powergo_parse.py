@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmark du parsing des pages détail PowerGO (dedicated_scrapers/_powergo.py).
+
+Compare, sur une même page et le même scraper :
+  - soupe : BeautifulSoup(html, 'lxml') construite par
+    DedicatedScraper._extract_detail (chemin des scrapers PowerGO d'avant
+    le moteur), puis extraction ;
+  - lxml : PowerGoScraper._extract_detail, un seul arbre lxml, sans soupe.
+
+Usage:
+    python scripts/bench_powergo_parse.py [--pages 200] [--html page.html]
+
+Sans --html, une fiche synthétique de taille réaliste (~200 Ko : payload
+Next.js, menus, carrousel « similaires ») est générée.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai.dedicated_scrapers.base import DedicatedScraper
+from scraper_ai.dedicated_scrapers.smsport import SmsportScraper
+
+URL = "https://smsport.ca/fr/neuf/motocyclette/inventaire/kawasaki-ninja-650-a-vendre-13867/"
+
+
+def synthetic_page() -> str:
+    vehicle = {
+        "@type": "Vehicle", "name": "Kawasaki Ninja 650 2025 neuf à Québec | SM Sport",
+        "brand": {"@type": "Brand", "name": "Kawasaki"}, "model": "Ninja 650",
+        "vehicleModelDate": "2025", "color": "Vert", "sku": "13867",
+        "mileageFromOdometer": {"value": None}, "itemCondition": "NewCondition",
+        "offers": {"@type": "Offer", "price": "9499.00"},
+        "image": [f"https://cdn.powergo.ca/img/{i}.jpg" for i in range(20)],
+        "description": "Sportive polyvalente. " * 40,
+    }
+    ld = json.dumps({"@graph": [{"@type": "Organization"}, {"@type": "WebPage"}, vehicle]})
+    menu = "".join(f'<li class="nav-item"><a href="/fr/p{i}/">Lien {i}</a></li>' for i in range(300))
+    cards = "".join(
+        f'<div class="pg-vehicle-card"><a class="pg-vehicle-card" href="/fr/x{i}/">'
+        f'<img src="https://cdn.powergo.ca/c{i}.jpg"><h3>Modèle {i}</h3>'
+        f'<div class="pg-vehicle-card-price">{9000 + i} $</div></a></div>'
+        for i in range(120))
+    specs = "".join(f"<tr><th>Spec {i}</th><td>Valeur {i}</td></tr>" for i in range(80))
+    next_data = json.dumps({"props": {"pageProps": {"blob": "x" * 150_000}}})
+    return (
+        "<!DOCTYPE html><html><head><title>Kawasaki Ninja 650</title>"
+        '<meta property="og:title" content="Kawasaki Ninja 650 2025">'
+        '<meta property="og:image" content="https://cdn.powergo.ca/og.jpg">'
+        f'<script type="application/ld+json">{ld}</script></head><body>'
+        f"<nav><ul>{menu}</ul></nav><main>"
+        '<div class="pg-vehicle-price"><span class="list-price line-through">10 999 $</span>'
+        '<div class="sale-price">9 499 $</div></div>'
+        f"<table>{specs}</table><section>{cards}</section></main>"
+        f'<script id="__NEXT_DATA__" type="application/json">{next_data}</script>'
+        "</body></html>"
+    )
+
+
+def _time(fn: Callable[[], object], pages: int) -> List[float]:
+    fn()
+    samples = []
+    for _ in range(pages):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--html", help="Fiche PowerGO enregistrée (sinon page synthétique)")
+    args = parser.parse_args()
+
+    html = Path(args.html).read_text(encoding="utf-8") if args.html else synthetic_page()
+    scraper = SmsportScraper()
+    with_soup = DedicatedScraper._extract_detail(scraper, URL, html)
+    lxml_only = scraper._extract_detail(URL, html)
+    if with_soup != lxml_only:
+        raise RuntimeError("Les deux chemins ne donnent pas le même produit")
+
+    soup_ms = _time(lambda: DedicatedScraper._extract_detail(scraper, URL, html), args.pages)
+    lxml_ms = _time(lambda: scraper._extract_detail(URL, html), args.pages)
+
+    print(f"\n📊 {args.pages} pages détail ({len(html) / 1024:.0f} Ko) — "
+          f"{lxml_only.get('name')} à {lxml_only.get('prix')} $")
+    for label, samples in (("soupe", soup_ms), ("lxml", lxml_ms)):
+        print(f"   {label:<6} p50 {statistics.median(samples):7.2f} ms | "
+              f"max {max(samples):7.2f} ms | {1000 / statistics.median(samples):6.0f} pages/s")
+    print(f"   gain p50 : x{statistics.median(soup_ms) / statistics.median(lxml_ms):.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Benchmark de `/product-search` : subprocess CLI vs service résident.
+
+Exécute les mêmes requêtes de deux façons :
+  - actuel : un `python -m scraper_ai.scraper_search.main ... --json` par
+    requête (ce que faisait le backend) ;
+  - service : `SearchService.search(argv)` dans le process (inventaires
+    décodés gardés en mémoire).
+
+Usage:
+    # Inventaires synthétiques (dossier temporaire, un par scraper dédié)
+    python scripts/bench_product_search.py [--queries 30] [--products 200]
+
+    # Inventaires réels de scraper_cache/search_inventory/
+    python scripts/bench_product_search.py --real
+
+    # Requêtes concurrentes côté service
+    python scripts/bench_product_search.py --concurrency 8
+
+Sortie : latences p50/p95 par chemin et le gain.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai.scraper_search import cache as cache_mod
+
+QUERIES = [
+    "honda crf450r", "yamaha yz250f 2024", "kawasaki ninja 400", "ski-doo summit",
+    "polaris rzr xp 1000", "can-am outlander", "ktm 300 xc", "suzuki dr-z400",
+    "harley-davidson street glide", "bmw r 1250 gs", "moto cross usagée < 8000$",
+]
+_BRANDS = {
+    "Honda": ["CRF450R", "CRF250F", "Rebel 500", "Africa Twin"],
+    "Yamaha": ["YZ250F", "MT-07", "Grizzly 700", "Ténéré 700"],
+    "Kawasaki": ["Ninja 400", "KX450", "Brute Force 750"],
+    "Ski-Doo": ["Summit X", "MXZ 600", "Renegade"],
+    "Polaris": ["RZR XP 1000", "Sportsman 570"],
+    "Can-Am": ["Outlander 700", "Maverick X3"],
+    "KTM": ["300 XC", "890 Adventure"],
+}
+
+
+def _synthetic_inventories(directory: Path, products: int) -> int:
+    from scraper_ai.dedicated_scrapers.registry import DedicatedScraperRegistry
+
+    rng = random.Random(7)
+    slugs = [info["slug"] for info in DedicatedScraperRegistry.list_all()]
+    for slug in slugs:
+        items = []
+        for i in range(products):
+            marque = rng.choice(list(_BRANDS))
+            modele = rng.choice(_BRANDS[marque])
+            annee = rng.randint(2015, 2026)
+            items.append({
+                "name": f"{marque} {modele} {annee}", "marque": marque, "modele": modele,
+                "annee": annee, "prix": rng.randint(3000, 30000),
+                "etat": rng.choice(["neuf", "occasion"]),
+                "description": "Véhicule inspecté, garantie disponible. " * 4,
+                "sourceUrl": f"https://{slug}.test/inventaire/{i}",
+            })
+        (directory / f"{slug}.json").write_text(json.dumps(
+            {"key": slug, "timestamp": time.time(), "count": len(items), "products": items},
+            ensure_ascii=False), encoding="utf-8")
+    return len(slugs)
+
+
+def _argv(query: str) -> List[str]:
+    # Mêmes arguments que backend/main.py pour une recherche concessionnaires
+    return [query, "--json", "--quiet", "--max-results", "30", "--min-score", "0.3",
+            "--timeout", "30", "--total-timeout", "50", "--dedicated-cache-only"]
+
+
+def _subprocess_once(query: str, cache_dir: Optional[Path]) -> float:
+    if cache_dir is None:
+        cmd = [sys.executable, "-u", "-m", "scraper_ai.scraper_search.main", *_argv(query)]
+    else:
+        # Même coût que `-m` (interpréteur + imports), CACHE_DIR redirigé
+        code = ("import sys, pathlib; from scraper_ai.scraper_search import cache; "
+                f"cache.CACHE_DIR = pathlib.Path({str(cache_dir)!r}); "
+                "from scraper_ai.scraper_search.main import main; main(sys.argv[1:])")
+        cmd = [sys.executable, "-u", "-c", code, *_argv(query)]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=str(PROJECT_ROOT), capture_output=True, text=True)
+    elapsed = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-500:])
+    return elapsed
+
+
+def _summary(label: str, timings: List[float]) -> float:
+    ordered = sorted(timings)
+    p50 = statistics.median(ordered)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"   {label:<22} p50 {p50:>8.1f} ms   p95 {p95:>8.1f} ms")
+    return p50
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=30)
+    parser.add_argument("--products", type=int, default=200,
+                        help="produits par inventaire synthétique")
+    parser.add_argument("--real", action="store_true",
+                        help="inventaires réels de scraper_cache/search_inventory/")
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+    tmp = None
+    cache_dir = None
+    if not args.real:
+        tmp = tempfile.TemporaryDirectory()
+        cache_dir = Path(tmp.name)
+        cache_mod.CACHE_DIR = cache_dir
+        n = _synthetic_inventories(cache_dir, args.products)
+        print(f"📦 {n} inventaires synthétiques × {args.products} produits")
+
+    from scraper_ai.scraper_search.service import SearchService
+
+    try:
+        print(f"📊 {len(queries)} requêtes\n")
+        current = [_subprocess_once(q, cache_dir) for q in queries]
+
+        service = SearchService()
+        t0 = time.perf_counter()
+        service.warm()
+        print(f"   (préchargement service : {(time.perf_counter() - t0) * 1000:.0f} ms)")
+
+        def timed(query: str) -> float:
+            t = time.perf_counter()
+            service.search(_argv(query))
+            return (time.perf_counter() - t) * 1000
+
+        if args.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                resident = list(executor.map(timed, queries))
+        else:
+            resident = [timed(q) for q in queries]
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    base = _summary("subprocess (actuel)", current)
+    label = f"service ({args.concurrency} conc.)" if args.concurrency > 1 else "service résident"
+    fast = _summary(label, resident)
+    print(f"\n   gain p50 : x{base / fast:.1f}" if fast else "")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark du démarrage des jobs de test (scraper_usine/scraper_runner.py).
+
+Lance N jobs vides (imports PRELOAD seulement, comme avant l'import du
+scraper généré) avec chaque méthode de démarrage :
+  - spawn : un interpréteur neuf par job (comportement d'avant le runner) ;
+  - forkserver : fork d'un serveur chaud, imports déjà faits.
+
+Usage:
+    python scripts/bench_scraper_runner.py [--jobs 10]
+
+Le premier job forkserver inclut le démarrage du serveur (coût payé une
+fois par process de l'usine) ; il est rapporté à part.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai.scraper_usine.scraper_runner import ScraperRunner
+
+
+def _series(method: str, jobs: int) -> tuple:
+    runner = ScraperRunner(method=method)
+    t0 = time.perf_counter()
+    first = runner.ping()
+    first_ms = (time.perf_counter() - t0) * 1000
+    if first["error"]:
+        raise RuntimeError(f"{method}: {first['error']}")
+    startups: List[float] = []
+    walls: List[float] = []
+    for _ in range(jobs):
+        t0 = time.perf_counter()
+        result = runner.ping()
+        walls.append((time.perf_counter() - t0) * 1000)
+        startups.append(result["startup_ms"])
+    return first_ms, startups, walls
+
+
+def _summary(label: str, first_ms: float, startups: List[float], walls: List[float]) -> None:
+    print(f"   {label:<11} 1er job {first_ms:7.0f} ms | démarrage p50 "
+          f"{statistics.median(startups):6.0f} ms, max {max(startups):6.0f} ms | "
+          f"job complet p50 {statistics.median(walls):6.0f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10)
+    args = parser.parse_args()
+
+    cold = _series("spawn", args.jobs)
+    warm = _series("forkserver", args.jobs)
+
+    print(f"\n📊 {args.jobs} jobs vides par méthode (après un 1er job de chauffe)")
+    _summary("spawn", *cold)
+    _summary("forkserver", *warm)
+    print(f"   gain démarrage p50 : x{statistics.median(cold[1]) / statistics.median(warm[1]):.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Régénère / vérifie le manifeste du registre des scrapers dédiés.
+
+Le registre (`scraper_ai/dedicated_scrapers/registry.py`) résout les slugs
+et domaines depuis `_manifest.py` sans importer les ~40 modules de
+scrapers. Ce script reconstruit ce manifeste en important toutes les
+classes déclarées (registry.py + _generated_registry.py).
+
+Usage:
+    python scripts/build_scraper_manifest.py           # réécrit _manifest.py
+    python scripts/build_scraper_manifest.py --check   # vérifie sans écrire
+
+Exit code:
+    0 si le manifeste est à jour (ou vient d'être réécrit)
+    1 si --check détecte un écart (manifeste périmé, classe invalide,
+      domaine revendiqué par deux slugs)
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scraper_ai.dedicated_scrapers import registry  # noqa: E402
+
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Manifeste du registre des scrapers dédiés")
+    parser.add_argument("--check", action="store_true",
+                        help="Vérifie le manifeste contre les classes sans l'écrire.")
+    args = parser.parse_args()
+
+    if args.check:
+        manifest = registry.build_manifest()
+        problems = registry.check_manifest(manifest)
+        if problems:
+            print(f"❌ Manifeste périmé ({len(problems)} écart(s)) :")
+            for problem in problems:
+                print(f"   - {problem}")
+            print("   → python scripts/build_scraper_manifest.py")
+            return 1
+        print(f"✅ Manifeste à jour ({len(manifest)} scrapers)")
+        return 0
+
+    count = registry.refresh_manifest()
+    print(f"✅ scraper_ai/dedicated_scrapers/_manifest.py : {count} scrapers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
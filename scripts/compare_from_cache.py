@@ -7,7 +7,8 @@ Flow :
   1. Lit la config utilisateur (référence + concurrents)
   2. Pour chaque site → lit les produits depuis scraped_site_data
   3. Si un site n'a AUCUNE donnée → fallback scraping temps-réel + stockage
-  4. Compare les produits (find_matching_products)
+  4. Compare les produits (find_matching_products, avec les clés de
+     matching précalculées par le cron quand elles sont à jour)
   5. Sauvegarde le résultat dans scrapings
 
 Temps typique :
@@ -15,6 +16,13 @@ Temps typique :
   - 1 site manquant + fallback scrape : ~30-90 s
   - Tous les sites manquants : ~3-10 min (équivalent au mode classique)
 
+Mode batch (run_batch_comparisons, utilisé par scraper_cron et
+surveillance_cron) : chaque site distinct est chargé et préparé une seule
+fois puis partagé entre tous les utilisateurs qui le référencent ; les
+comparaisons tournent dans un pool de threads et les lignes scrapings sont
+insérées par paquets. Le coût d'une passe suit le nombre de sites, pas le
+nombre d'utilisateurs.
+
 Usage :
   python scripts/compare_from_cache.py --user-id UUID
 """
@@ -23,8 +31,9 @@ import argparse
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 
 SCRIPT_DIR = Path(__file__).parent
@@ -34,9 +43,11 @@ if str(PROJECT_ROOT) not in sys.path:
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from _http_helpers import get_with_retry, post_with_retry
+from _http_helpers import get_with_retry, log_http_metrics, post_with_retry
 
 from scraper_ai.comparison import (
+    NORMALIZER_VERSION,
+    build_match_key_index,
     find_matching_products,
     enrich_product_year,
     clean_product_name,
@@ -125,32 +136,39 @@ def _is_cron_running(supabase_url: str, supabase_key: str) -> bool:
         return False
 
 
-def _fetch_site_products(supabase_url: str, supabase_key: str, domain: str) -> tuple[List[dict], bool, int]:
-    """Lit les produits pré-scrapés. Retourne (products, is_stale, age_minutes).
+def _fetch_site_products(supabase_url: str, supabase_key: str, domain: str) -> tuple[List[dict], bool, int, dict]:
+    """Lit les produits pré-scrapés. Retourne (products, is_stale, age_minutes, match_keys).
     
-    Retourne ([], False, 0) si rien n'existe.
-    Retourne (products, True, age) si les données existent mais sont vieilles de >2h.
-    Retourne (products, False, age) si les données sont fraîches.
+    Retourne ([], False, 0, {}) si rien n'existe.
+    Retourne (products, True, age, keys) si les données existent mais sont vieilles de >2h.
+    Retourne (products, False, age, keys) si les données sont fraîches.
+    match_keys = index de clés précalculé par le cron ({} si absent).
     """
-    resp = get_with_retry(
-        f"{supabase_url}/rest/v1/scraped_site_data",
-        params={
-            "select": "products,product_count,scraped_at,status",
-            "site_domain": f"eq.{domain}",
-        },
-        headers=_headers(supabase_key),
-        timeout=30,
-        max_attempts=4,
-        logger=print,
-    )
+    def _get(select: str):
+        return get_with_retry(
+            f"{supabase_url}/rest/v1/scraped_site_data",
+            params={
+                "select": select,
+                "site_domain": f"eq.{domain}",
+            },
+            headers=_headers(supabase_key),
+            timeout=30,
+            max_attempts=4,
+            logger=print,
+        )
+
+    resp = _get("products,product_count,scraped_at,status,match_keys")
+    if resp is not None and resp.status_code == 400 and "match_keys" in resp.text:
+        # Colonne pas encore migrée : lecture sans l'index
+        resp = _get("products,product_count,scraped_at,status")
     if resp is None or resp.status_code != 200 or not resp.json():
-        return [], False, 0
+        return [], False, 0, {}
     row = resp.json()[0]
     if row.get("status") != "success":
-        return [], False, 0
+        return [], False, 0, {}
     products = row.get("products", [])
     if not products:
-        return [], False, 0
+        return [], False, 0, {}
 
     scraped_at = row.get("scraped_at", "")
     is_stale = False
@@ -165,7 +183,7 @@ def _fetch_site_products(supabase_url: str, supabase_key: str, domain: str) -> t
         except Exception:
             pass
 
-    return products, is_stale, age_min
+    return products, is_stale, age_min, row.get("match_keys") or {}
 
 
 def _fallback_scrape(domain: str, site_url: str, supabase_url: str, supabase_key: str) -> List[dict]:
@@ -210,6 +228,9 @@ def _save_fallback_to_cache(supabase_url: str, supabase_key: str,
         "site_domain": domain,
         "products": products,
         "product_count": len(products),
+        "match_keys": build_match_key_index(products),
+        # Résumé invalidé : le prochain cron réécrira le tableau complet
+        "product_digest": None,
         "metadata": metadata,
         "scraped_at": now,
         "scrape_duration_seconds": round(elapsed, 1),
@@ -231,7 +252,22 @@ def _save_fallback_to_cache(supabase_url: str, supabase_key: str,
             timeout=45,
             max_attempts=3,
             logger=print,
+            compress=True,
         )
+        for column in ("match_keys", "product_digest"):
+            if resp is not None and resp.status_code == 400 and column in resp.text:
+                # Colonne pas encore migrée : sauvegarde sans elle
+                row.pop(column)
+                resp = post_with_retry(
+                    f"{supabase_url}/rest/v1/scraped_site_data",
+                    json=row,
+                    headers=headers,
+                    params={"on_conflict": "site_domain"},
+                    timeout=45,
+                    max_attempts=3,
+                    logger=print,
+                    compress=True,
+                )
         if resp is None:
             print(f"   ⚠️  {domain}: sauvegarde fallback impossible (Supabase injoignable)")
         elif resp.status_code in (200, 201):
@@ -255,6 +291,7 @@ def _save_scrapings(supabase_url: str, supabase_key: str, row: dict) -> bool:
         timeout=45,
         max_attempts=4,
         logger=print,
+        compress=True,
     )
     if resp is None:
         print("⚠️  Supabase injoignable — sauvegarde scrapings échouée")
@@ -269,161 +306,164 @@ def _save_scrapings(supabase_url: str, supabase_key: str, row: dict) -> bool:
         return False
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Comparaison rapide depuis cache')
-    parser.add_argument('--user-id', required=True, help='ID utilisateur')
-    parser.add_argument('--reference', default=None, help='URL de référence (override config DB)')
-    parser.add_argument('--competitors', default=None, help='URLs concurrents séparées par des virgules (override config DB)')
-    args = parser.parse_args()
+# ── Chargement / préparation des inventaires ──
 
-    user_id = args.user_id
-    supabase_url = os.environ.get('SUPABASE_URL') or os.environ.get('NEXT_PUBLIC_SUPABASE_URL', '')
-    supabase_key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY', '')
-
-    if not supabase_url or not supabase_key:
-        print("❌ SUPABASE_URL et SUPABASE_SERVICE_ROLE_KEY sont requis")
-        sys.exit(1)
+# Mode batch : sites chargés en parallèle (I/O PostgREST + fallback scrape),
+# comparaisons en parallèle, insertion des scrapings par paquets.
+BATCH_SITE_WORKERS = 8
+BATCH_COMPARE_WORKERS = 4
+BATCH_INSERT_CHUNK = 10
+# Au-delà, un site (fallback scrape trop long) est traité comme indisponible
+# pour cette passe. Le scrape continue en arrière-plan et alimente le cache.
+BATCH_SITE_TIMEOUT = 300
 
-    start_time = time.time()
-    print(f"\n{'='*60}")
-    print(f"⚡ COMPARAISON RAPIDE (méthode du cache)")
-    print(f"{'='*60}")
 
-    # ── 1. Config utilisateur (CLI override > DB) ──
-    config = _fetch_user_config(supabase_url, supabase_key, user_id)
+def _load_site(domain: str, url: str, supabase_url: str, supabase_key: str,
+               cron_running: bool, logger=print) -> dict:
+    """Charge l'inventaire d'un site (cache → refresh si stale → fallback scrape).
 
-    reference_url = (args.reference or (config.get("reference_url", "") if config else "")).strip()
-    if not reference_url:
-        print("❌ Pas d'URL de référence configurée")
-        sys.exit(1)
+    Retourne {'products', 'match_keys', 'source', 'skipped_cron'} où source vaut
+    'cache', 'stale_refreshed', 'fallback' ou None (aucun produit disponible).
+    """
+    products, is_stale, age_min, match_keys = _fetch_site_products(supabase_url, supabase_key, domain)
+    site = {'products': [], 'match_keys': {}, 'source': None, 'skipped_cron': False}
+
+    # Pas de sourceSite ici : l'inventaire est partagé par tous les
+    # utilisateurs du batch, chacun avec sa propre URL du site.
+    # _compare_user le pose sur ses copies.
+    def _use(items: List[dict], keys: dict, source: str):
+        site.update(products=items, match_keys=keys, source=source)
+
+    if products and not is_stale:
+        _use(products, match_keys, 'cache')
+        logger(f"   ✅ {domain}: {len(products)} produits (cache {age_min} min)")
+
+    elif products and is_stale:
+        if cron_running:
+            _use(products, match_keys, 'cache')
+            site['skipped_cron'] = True
+            logger(f"   🔒 {domain}: cache stale ({age_min} min) mais cron en cours — {len(products)} produits")
+        else:
+            logger(f"   ⏳ {domain}: cache stale ({age_min} min, >{STALE_THRESHOLD_HOURS}h) → tentative de refresh...")
+            fresh_products = _fallback_scrape(domain, url, supabase_url, supabase_key)
+            if fresh_products:
+                _use(fresh_products, {}, 'stale_refreshed')
+                logger(f"   ✅ {domain}: rafraîchi → {len(fresh_products)} produits")
+            else:
+                _use(products, match_keys, 'cache')
+                logger(f"   ⚠️  {domain}: refresh échoué, ancien cache utilisé ({len(products)} produits, {age_min} min)")
 
-    if args.competitors is not None:
-        competitor_urls = [u.strip() for u in args.competitors.split(',') if u.strip()]
     else:
-        competitor_urls = (config.get("competitor_urls", []) if config else []) or []
+        if cron_running:
+            site['skipped_cron'] = True
+            logger(f"   🔒 {domain}: aucun cache mais cron en cours — ignoré (sera disponible après le cron)")
+        else:
+            logger(f"   ❌ {domain}: aucun cache → scraping temps-réel...")
+            fallback_products = _fallback_scrape(domain, url, supabase_url, supabase_key)
+            if fallback_products:
+                _use(fallback_products, {}, 'fallback')
+            else:
+                logger(f"   ❌ {domain}: aucun produit disponible")
 
-    ignore_colors = (config.get("ignore_colors", False) if config else False)
-    match_mode = (config.get("match_mode", "exact") if config else "exact")
+    return site
 
-    ref_domain = _domain(reference_url)
-    all_domains: Dict[str, str] = {ref_domain: reference_url}
+
+def _prepare_site(site: dict, build_keys: bool = False) -> None:
+    """Enrichit l'année et nettoie le nom des produits d'un site, en place.
+
+    Idempotent : fait une fois par site, quel que soit le nombre
+    d'utilisateurs qui le comparent. build_keys=True calcule l'index de clés
+    quand celui du cache est absent ou d'une autre version, pour que chaque
+    comparaison du batch fasse des jointures par hash au lieu de renormaliser.
+    """
+    for p in site['products']:
+        enrich_product_year(p)
+        clean_product_name(p)
+    keys = site.get('match_keys')
+    if build_keys and site['products'] and (
+            not isinstance(keys, dict) or keys.get('version') != NORMALIZER_VERSION):
+        site['match_keys'] = build_match_key_index(site['products'])
+
+
+def _source_counts(sites: Dict[str, dict], domains) -> Dict[str, int]:
+    counts = {'cache_hits': 0, 'stale_refreshed': 0, 'fallback_scrapes': 0, 'skipped_cron': 0}
+    for d in domains:
+        site = sites.get(d) or {}
+        source = site.get('source')
+        if source == 'cache':
+            counts['cache_hits'] += 1
+        elif source == 'stale_refreshed':
+            counts['stale_refreshed'] += 1
+        elif source == 'fallback':
+            counts['fallback_scrapes'] += 1
+        if site.get('skipped_cron'):
+            counts['skipped_cron'] += 1
+    return counts
+
+
+def _user_domains(reference_url: str, competitor_urls: List[str]) -> Dict[str, str]:
+    """Domaines à charger pour un utilisateur (référence d'abord) → URL."""
+    domains: Dict[str, str] = {_domain(reference_url): reference_url}
     for url in competitor_urls:
         d = _domain(url)
-        if d not in all_domains:
-            all_domains[d] = url
-
-    print(f"⭐ Référence: {reference_url} ({ref_domain})")
-    print(f"📦 Concurrents: {len(competitor_urls)}")
-    print(f"🔗 Sites à charger: {len(all_domains)}\n")
+        if d not in domains:
+            domains[d] = url
+    return domains
 
-    # ── 2. Charger les produits (cache → fallback scrape si manquant ou stale) ──
-    cron_running = _is_cron_running(supabase_url, supabase_key)
-    if cron_running:
-        print("🔒 Cron en cours d'exécution — fallback scraping désactivé (utilisation du cache existant)")
 
-    site_products: Dict[str, List[dict]] = {}
-    cache_hits = 0
-    fallback_scrapes = 0
-    stale_refreshed = 0
-    skipped_cron = 0
+# ── Comparaison d'un utilisateur ──
 
-    for domain, url in all_domains.items():
-        products, is_stale, age_min = _fetch_site_products(supabase_url, supabase_key, domain)
-
-        if products and not is_stale:
-            for p in products:
-                if not p.get('sourceSite'):
-                    p['sourceSite'] = url
-            site_products[domain] = products
-            cache_hits += 1
-            print(f"   ✅ {domain}: {len(products)} produits (cache {age_min} min)")
-
-        elif products and is_stale:
-            if cron_running:
-                for p in products:
-                    if not p.get('sourceSite'):
-                        p['sourceSite'] = url
-                site_products[domain] = products
-                cache_hits += 1
-                skipped_cron += 1
-                print(f"   🔒 {domain}: cache stale ({age_min} min) mais cron en cours — {len(products)} produits")
-            else:
-                print(f"   ⏳ {domain}: cache stale ({age_min} min, >{STALE_THRESHOLD_HOURS}h) → tentative de refresh...")
-                fresh_products = _fallback_scrape(domain, url, supabase_url, supabase_key)
-                if fresh_products:
-                    for p in fresh_products:
-                        if not p.get('sourceSite'):
-                            p['sourceSite'] = url
-                    site_products[domain] = fresh_products
-                    stale_refreshed += 1
-                    print(f"   ✅ {domain}: rafraîchi → {len(fresh_products)} produits")
-                else:
-                    for p in products:
-                        if not p.get('sourceSite'):
-                            p['sourceSite'] = url
-                    site_products[domain] = products
-                    cache_hits += 1
-                    print(f"   ⚠️  {domain}: refresh échoué, ancien cache utilisé ({len(products)} produits, {age_min} min)")
+def _compare_user(user_id: str, reference_url: str, competitor_urls: List[str],
+                  ignore_colors: bool, match_mode: str,
+                  sites: Dict[str, dict], start_time: float,
+                  verbose: bool = True) -> Optional[dict]:
+    """Compare la référence d'un utilisateur à ses concurrents.
 
-        else:
-            if cron_running:
-                skipped_cron += 1
-                print(f"   🔒 {domain}: aucun cache mais cron en cours — ignoré (sera disponible après le cron)")
-            else:
-                print(f"   ❌ {domain}: aucun cache → scraping temps-réel...")
-                fallback_products = _fallback_scrape(domain, url, supabase_url, supabase_key)
-                if fallback_products:
-                    for p in fallback_products:
-                        if not p.get('sourceSite'):
-                            p['sourceSite'] = url
-                    site_products[domain] = fallback_products
-                    fallback_scrapes += 1
-                else:
-                    print(f"   ❌ {domain}: aucun produit disponible")
+    Les inventaires de `sites` (préparés par _prepare_site) sont partagés
+    entre utilisateurs : chaque comparaison travaille sur des copies des
+    produits, que find_matching_products et l'assemblage annotent.
 
-    print(f"\n📊 Cache frais: {cache_hits} | Stale rafraîchi: {stale_refreshed} | "
-          f"Fallback: {fallback_scrapes} | "
-          f"Indisponible: {len(all_domains) - cache_hits - fallback_scrapes - stale_refreshed}"
-          + (f" | Skippé (cron): {skipped_cron}" if skipped_cron else ""))
-
-    # ── 3. Vérifier le site de référence ──
-    reference_products = site_products.get(ref_domain, [])
+    Retourne la ligne scrapings à insérer, ou None si la référence n'a aucun
+    produit.
+    """
+    ref_domain = _domain(reference_url)
+    ref_site = sites.get(ref_domain) or {}
+    reference_products = [dict(p) for p in ref_site.get('products', [])]
     if not reference_products:
-        print(f"\n❌ Aucun produit pour le site de référence ({ref_domain})")
-        sys.exit(1)
+        return None
 
     for p in reference_products:
-        enrich_product_year(p)
-        clean_product_name(p)
         p['sourceSite'] = reference_url
         p['isReferenceProduct'] = True
 
-    # ── 4. Comparer avec chaque concurrent ──
+    comp_products_by_url: Dict[str, List[dict]] = {}
     all_matched_products = []
     for url in competitor_urls:
         comp_domain = _domain(url)
-        comp_products = site_products.get(comp_domain, [])
+        comp_site = sites.get(comp_domain) or {}
+        comp_products = [dict(p) for p in comp_site.get('products', [])]
+        comp_products_by_url[url] = comp_products
         if not comp_products:
             continue
 
         for p in comp_products:
-            enrich_product_year(p)
-            clean_product_name(p)
             if not p.get('sourceSite'):
                 p['sourceSite'] = url
 
-        if reference_products and comp_products:
-            matched = find_matching_products(
-                reference_products=reference_products,
-                comparison_products=comp_products,
-                reference_url=reference_url,
-                comparison_url=url,
-                ignore_colors=ignore_colors,
-                match_mode=match_mode,
-            )
-            all_matched_products.extend(matched)
-
-    # ── 5. Assembler le résultat (même format que main.py) ──
+        matched = find_matching_products(
+            reference_products=reference_products,
+            comparison_products=comp_products,
+            reference_url=reference_url,
+            comparison_url=url,
+            ignore_colors=ignore_colors,
+            match_mode=match_mode,
+            reference_match_keys=ref_site.get('match_keys'),
+            comparison_match_keys=comp_site.get('match_keys'),
+            verbose=verbose,
+        )
+        all_matched_products.extend(matched)
+
+    # ── Assembler le résultat (même format que main.py) ──
     all_products_to_save = list(reference_products)
     added_source_urls = {p.get('sourceUrl') for p in reference_products if p.get('sourceUrl')}
 
@@ -436,8 +476,7 @@ def main():
             added_source_urls.add(source_url)
 
     for url in competitor_urls:
-        comp_domain = _domain(url)
-        for product in site_products.get(comp_domain, []):
+        for product in comp_products_by_url.get(url, []):
             source_url = product.get('sourceUrl')
             if source_url and source_url in added_source_urls:
                 continue
@@ -448,9 +487,9 @@ def main():
                 added_source_urls.add(source_url)
 
     elapsed = time.time() - start_time
+    counts = _source_counts(sites, _user_domains(reference_url, competitor_urls))
 
-    # ── 6. Sauvegarder dans scrapings ──
-    scraping_row = {
+    return {
         "user_id": user_id,
         "reference_url": reference_url,
         "competitor_urls": competitor_urls,
@@ -464,23 +503,264 @@ def main():
             "scraping_time_seconds": round(elapsed, 1),
             "mode": "from_cache",
             "source": "scraped_site_data",
-            "cache_hits": cache_hits,
-            "stale_refreshed": stale_refreshed,
-            "fallback_scrapes": fallback_scrapes,
+            "cache_hits": counts['cache_hits'],
+            "stale_refreshed": counts['stale_refreshed'],
+            "fallback_scrapes": counts['fallback_scrapes'],
         },
         "scraping_time_seconds": round(elapsed, 1),
         "mode": "from_cache",
     }
 
+
+# ── Mode batch ──
+
+def _fetch_user_configs(supabase_url: str, supabase_key: str, user_ids: List[str]) -> Dict[str, dict]:
+    """Lit ignore_colors/match_mode de plusieurs utilisateurs en une requête."""
+    if not user_ids:
+        return {}
+    resp = get_with_retry(
+        f"{supabase_url}/rest/v1/scraper_config",
+        params={
+            "select": "user_id,ignore_colors,match_mode",
+            "user_id": f"in.({','.join(user_ids)})",
+        },
+        headers=_headers(supabase_key),
+        timeout=30,
+        max_attempts=4,
+        logger=print,
+    )
+    if resp is None or resp.status_code != 200:
+        return {}
+    configs: Dict[str, dict] = {}
+    for row in resp.json() or []:
+        configs.setdefault(row.get("user_id"), row)
+    return configs
+
+
+def _save_scrapings_bulk(supabase_url: str, supabase_key: str, rows: List[dict],
+                         logger=print) -> int:
+    """Insère les lignes scrapings par paquets de BATCH_INSERT_CHUNK.
+
+    Un paquet refusé est réessayé ligne par ligne pour isoler la ligne
+    fautive. Retourne le nombre de lignes sauvegardées.
+    """
+    headers = {
+        **_headers(supabase_key),
+        "Content-Type": "application/json",
+        "Prefer": "return=minimal",
+    }
+    saved = 0
+    for i in range(0, len(rows), BATCH_INSERT_CHUNK):
+        chunk = rows[i:i + BATCH_INSERT_CHUNK]
+        resp = post_with_retry(
+            f"{supabase_url}/rest/v1/scrapings",
+            json=chunk,
+            headers=headers,
+            timeout=90,
+            max_attempts=4,
+            logger=logger,
+            compress=True,
+        )
+        if resp is not None and resp.status_code in (200, 201, 204):
+            saved += len(chunk)
+            continue
+        status = resp.status_code if resp is not None else "injoignable"
+        logger(f"   ⚠️  Insertion groupée refusée ({status}) — repli ligne par ligne")
+        for row in chunk:
+            if _save_scrapings(supabase_url, supabase_key, row):
+                saved += 1
+    return saved
+
+
+def run_batch_comparisons(supabase_url: str, supabase_key: str, configs: List[dict],
+                          site_workers: int = BATCH_SITE_WORKERS,
+                          compare_workers: int = BATCH_COMPARE_WORKERS,
+                          logger=print) -> dict:
+    """Compare tous les utilisateurs de `configs` dans ce process.
+
+    configs : [{'user_id', 'reference_url', 'competitor_urls',
+    ['ignore_colors', 'match_mode']}]. Les réglages absents sont lus dans
+    scraper_config en une seule requête.
+
+    Chaque site distinct est chargé et préparé une fois, puis partagé entre
+    les utilisateurs. Retourne {'success', 'failed', 'users', 'sites', 'elapsed'}.
+    """
+    start_total = time.time()
+
+    users: List[dict] = []
+    seen_users = set()
+    for c in configs:
+        uid = c.get("user_id")
+        if not uid or uid in seen_users or not (c.get("reference_url") or "").strip():
+            continue
+        seen_users.add(uid)
+        users.append(c)
+
+    summary = {'success': 0, 'failed': 0, 'users': len(users), 'sites': 0, 'elapsed': 0.0}
+    if not users:
+        return summary
+
+    missing = [u["user_id"] for u in users
+               if "ignore_colors" not in u or "match_mode" not in u]
+    stored = _fetch_user_configs(supabase_url, supabase_key, missing)
+
+    all_domains: Dict[str, str] = {}
+    for u in users:
+        for d, url in _user_domains(u["reference_url"].strip(), u.get("competitor_urls") or []).items():
+            all_domains.setdefault(d, url)
+    summary['sites'] = len(all_domains)
+
+    logger(f"   🔗 {len(users)} utilisateur(s), {len(all_domains)} site(s) distinct(s)")
+
+    cron_running = _is_cron_running(supabase_url, supabase_key)
+    if cron_running:
+        logger("   🔒 Cron en cours d'exécution — fallback scraping désactivé")
+
+    def _load(domain: str, url: str) -> dict:
+        site = _load_site(domain, url, supabase_url, supabase_key, cron_running, logger=logger)
+        _prepare_site(site, build_keys=True)
+        return site
+
+    # ── 1. Un chargement par site distinct ──
+    sites: Dict[str, dict] = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, min(site_workers, len(all_domains))))
+    futures = {executor.submit(_load, d, url): d for d, url in all_domains.items()}
+    try:
+        for future in as_completed(futures, timeout=BATCH_SITE_TIMEOUT):
+            domain = futures[future]
+            try:
+                sites[domain] = future.result()
+            except Exception as e:
+                logger(f"   ❌ {domain}: chargement échoué — {e}")
+    except FuturesTimeout:
+        pending = [d for f, d in futures.items() if not f.done()]
+        logger(f"   ⏰ {len(pending)} site(s) non chargé(s) après {BATCH_SITE_TIMEOUT}s "
+               f"— ignorés pour cette passe: {', '.join(pending)}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # ── 2. Comparaisons en parallèle sur les inventaires partagés ──
+    def _compare(u: dict) -> Optional[dict]:
+        cfg = stored.get(u["user_id"], {})
+        ignore_colors = u.get("ignore_colors", cfg.get("ignore_colors", False))
+        match_mode = u.get("match_mode", cfg.get("match_mode", "exact"))
+        return _compare_user(
+            u["user_id"], u["reference_url"].strip(), u.get("competitor_urls") or [],
+            bool(ignore_colors), match_mode or "exact",
+            sites, time.time(), verbose=False,
+        )
+
+    rows: List[dict] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(compare_workers, len(users)))) as pool:
+        futures = {pool.submit(_compare, u): u for u in users}
+        for future in as_completed(futures):
+            uid_short = futures[future]["user_id"][:8]
+            try:
+                row = future.result()
+            except Exception as e:
+                summary['failed'] += 1
+                logger(f"   ❌ User {uid_short}... — {e}")
+                continue
+            if row is None:
+                summary['failed'] += 1
+                logger(f"   ⚠️  User {uid_short}... — aucun produit pour le site de référence")
+                continue
+            meta = row["metadata"]
+            logger(f"   ✅ User {uid_short}... — {meta['total_matched_products']} correspondance(s), "
+                   f"{meta['total_products']} produits")
+            rows.append(row)
+
+    # ── 3. Insertion groupée ──
+    saved = _save_scrapings_bulk(supabase_url, supabase_key, rows, logger=logger) if rows else 0
+    summary['success'] = saved
+    summary['failed'] += len(rows) - saved
+    summary['elapsed'] = time.time() - start_total
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Comparaison rapide depuis cache')
+    parser.add_argument('--user-id', required=True, help='ID utilisateur')
+    parser.add_argument('--reference', default=None, help='URL de référence (override config DB)')
+    parser.add_argument('--competitors', default=None, help='URLs concurrents séparées par des virgules (override config DB)')
+    args = parser.parse_args()
+
+    user_id = args.user_id
+    supabase_url = os.environ.get('SUPABASE_URL') or os.environ.get('NEXT_PUBLIC_SUPABASE_URL', '')
+    supabase_key = os.environ.get('SUPABASE_SERVICE_ROLE_KEY', '')
+
+    if not supabase_url or not supabase_key:
+        print("❌ SUPABASE_URL et SUPABASE_SERVICE_ROLE_KEY sont requis")
+        sys.exit(1)
+
+    start_time = time.time()
+    print(f"\n{'='*60}")
+    print(f"⚡ COMPARAISON RAPIDE (méthode du cache)")
+    print(f"{'='*60}")
+
+    # ── 1. Config utilisateur (CLI override > DB) ──
+    config = _fetch_user_config(supabase_url, supabase_key, user_id)
+
+    reference_url = (args.reference or (config.get("reference_url", "") if config else "")).strip()
+    if not reference_url:
+        print("❌ Pas d'URL de référence configurée")
+        sys.exit(1)
+
+    if args.competitors is not None:
+        competitor_urls = [u.strip() for u in args.competitors.split(',') if u.strip()]
+    else:
+        competitor_urls = (config.get("competitor_urls", []) if config else []) or []
+
+    ignore_colors = (config.get("ignore_colors", False) if config else False)
+    match_mode = (config.get("match_mode", "exact") if config else "exact")
+
+    ref_domain = _domain(reference_url)
+    all_domains = _user_domains(reference_url, competitor_urls)
+
+    print(f"⭐ Référence: {reference_url} ({ref_domain})")
+    print(f"📦 Concurrents: {len(competitor_urls)}")
+    print(f"🔗 Sites à charger: {len(all_domains)}\n")
+
+    # ── 2. Charger les produits (cache → fallback scrape si manquant ou stale) ──
+    cron_running = _is_cron_running(supabase_url, supabase_key)
+    if cron_running:
+        print("🔒 Cron en cours d'exécution — fallback scraping désactivé (utilisation du cache existant)")
+
+    sites: Dict[str, dict] = {}
+    for domain, url in all_domains.items():
+        sites[domain] = _load_site(domain, url, supabase_url, supabase_key, cron_running)
+        _prepare_site(sites[domain])
+
+    counts = _source_counts(sites, all_domains)
+    cache_hits = counts['cache_hits']
+    stale_refreshed = counts['stale_refreshed']
+    fallback_scrapes = counts['fallback_scrapes']
+    skipped_cron = counts['skipped_cron']
+
+    print(f"\n📊 Cache frais: {cache_hits} | Stale rafraîchi: {stale_refreshed} | "
+          f"Fallback: {fallback_scrapes} | "
+          f"Indisponible: {len(all_domains) - cache_hits - fallback_scrapes - stale_refreshed}"
+          + (f" | Skippé (cron): {skipped_cron}" if skipped_cron else ""))
+
+    # ── 3-5. Comparer et assembler ──
+    scraping_row = _compare_user(user_id, reference_url, competitor_urls,
+                                 ignore_colors, match_mode, sites, start_time)
+    if scraping_row is None:
+        print(f"\n❌ Aucun produit pour le site de référence ({ref_domain})")
+        sys.exit(1)
+
+    # ── 6. Sauvegarder dans scrapings ──
     saved = _save_scrapings(supabase_url, supabase_key, scraping_row)
 
+    meta = scraping_row["metadata"]
     print(f"\n{'='*60}")
-    print(f"✅ COMPARAISON TERMINÉE en {elapsed:.1f}s")
+    print(f"✅ COMPARAISON TERMINÉE en {meta['scraping_time_seconds']:.1f}s")
     print(f"{'='*60}")
-    print(f"⭐ Référence: {len(reference_products)} produits")
-    print(f"🔍 Correspondances: {len(all_matched_products)}")
-    print(f"📦 Total sauvegardé: {len(all_products_to_save)}")
+    print(f"⭐ Référence: {meta['reference_products_count']} produits")
+    print(f"🔍 Correspondances: {meta['total_matched_products']}")
+    print(f"📦 Total sauvegardé: {meta['total_products']}")
     print(f"📊 Cache: {cache_hits} | Stale refresh: {stale_refreshed} | Fallback: {fallback_scrapes}")
+    log_http_metrics()
     print(f"{'='*60}\n")
 
     if not saved:
@@ -11,9 +11,14 @@ Comportement :
   1. Lit la ligne ``shared_scrapers`` correspondant au slug.
   2. Si --force absent, skip le scraping si le cache est frais (<55 min).
   3. Lookup le scraper dédié via ``DedicatedScraperRegistry``.
-  4. Exécute ``scraper.scrape(categories=['inventaire','occasion','catalogue'])``.
-  5. Upsert le résultat dans ``scraped_site_data`` (succès ou erreur).
-  6. Code de sortie 0 si succès, 1 sinon.
+  4. Exécute ``scraper.iter_products(categories=['inventaire','occasion','catalogue'])`` ;
+     avec la table ``scraped_products``, chaque produit y part en flux dès
+     qu'il est parsé (``_product_store.ProductStream``) au lieu d'être tenu
+     en mémoire. ``SCRAPER_STREAM=0`` garde la liste complète.
+  5. Upsert le résultat dans ``scraped_site_data`` (succès ou erreur), puis
+     suppression des unités disparues et reconstruction du tableau dérivé.
+  6. Code de sortie 0 si succès, 1 sinon. Le pic de RSS du process est loggé
+     et stocké dans ``metadata.memory``.
 
 Variables d'environnement requises :
     SUPABASE_URL              — URL du projet Supabase
@@ -24,19 +29,22 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import resource
 import sys
 import time
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
-import requests
 from supabase import create_client
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
 
+from _http_helpers import log_http_metrics, post_with_retry  # noqa: E402
 from scraper_ai.dedicated_scrapers.registry import DedicatedScraperRegistry  # noqa: E402
 
 STALE_THRESHOLD_MINUTES = 55
@@ -61,6 +69,24 @@ def _read_shared_scraper(supabase, slug: str) -> dict | None:
     return rows[0] if rows else None
 
 
+def _open_stream(supabase_url: str, supabase_key: str, site_domain: str):
+    """ProductStream vers scraped_products, ou None (désactivé / non migré)."""
+    if os.environ.get("SCRAPER_STREAM", "1") in ("0", "false", "False"):
+        return None
+    from _product_store import PostgrestProductStore, ProductStream, store_enabled
+    if not store_enabled():
+        return None
+    store = PostgrestProductStore(supabase_url, supabase_key, logger=_log)
+    stream = ProductStream(store, site_domain, datetime.now(timezone.utc).isoformat())
+    return stream if stream.ready else None
+
+
+def _peak_rss_mb() -> float:
+    """Pic de RSS du process (Mo) — un seul site par process ici."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1_048_576 if sys.platform == "darwin" else peak / 1024
+
+
 def _is_stale(supabase, site_domain: str, threshold_min: int) -> bool:
     """Retourne True si le cache est plus vieux que ``threshold_min`` minutes
     (ou inexistant / en erreur)."""
@@ -101,6 +127,7 @@ def _save_result(
     products: list,
     metadata: dict,
     elapsed: float,
+    stream=None,
 ) -> bool:
     headers = {
         "apikey": supabase_key,
@@ -110,14 +137,20 @@ def _save_result(
     }
     now = datetime.now(timezone.utc).isoformat()
 
-    if products:
+    count = stream.count if stream is not None else len(products)
+    if stream is not None:
+        # Produits déjà dans scraped_products : la ligne ne porte que le résumé
+        headers["Prefer"] = "resolution=merge-duplicates,return=minimal"
+    if count:
         meta = {**metadata, "temporarily_hidden": False}
         row = {
             "site_url": site["site_url"],
             "site_domain": site["site_domain"],
             "shared_scraper_id": site["id"],
             "products": products,
-            "product_count": len(products),
+            "product_count": count,
+            # Résumé invalidé : le prochain cron réécrira le tableau complet
+            "product_digest": None,
             "metadata": meta,
             "scraped_at": now,
             "scrape_duration_seconds": round(elapsed, 1),
@@ -134,17 +167,40 @@ def _save_result(
             "error_message": "0 produits extraits",
             "updated_at": now,
         }
+    if stream is not None and count:
+        del row["products"]
+        row["product_digest"] = stream.digest()
 
-    resp = requests.post(
-        f"{supabase_url}/rest/v1/scraped_site_data",
-        headers=headers,
-        params={"on_conflict": "site_domain"},
-        data=json.dumps(row, default=str),
-        timeout=HTTP_TIMEOUT,
-    )
+    def _post(payload: dict):
+        return post_with_retry(
+            f"{supabase_url}/rest/v1/scraped_site_data",
+            headers=headers,
+            params={"on_conflict": "site_domain"},
+            data=json.dumps(payload, default=str),
+            timeout=HTTP_TIMEOUT,
+            max_attempts=3,
+            logger=_log,
+            compress=True,
+        )
 
-    if resp.status_code in (200, 201):
-        _log(f"✅ Sauvegarde Supabase OK ({len(products)} produits)")
+    resp = _post(row)
+    if resp is not None and resp.status_code == 400 and "product_digest" in row and "product_digest" in resp.text:
+        # Colonne pas encore migrée : sauvegarde sans elle
+        row.pop("product_digest")
+        resp = _post(row)
+
+    if resp is None:
+        _log("⚠️  Supabase injoignable — sauvegarde perdue")
+        return False
+
+    if resp.status_code in (200, 201, 204):
+        if stream is not None and not stream.finish(now):
+            _log("⚠️  Fin d'écriture en flux impossible — tableau products non reconstruit")
+            _save_error(supabase_url, supabase_key, site,
+                        "Écriture en flux scraped_products incomplète")
+            return False
+        detail = f", {stream.summary()}" if stream is not None else ""
+        _log(f"✅ Sauvegarde Supabase OK ({count} produits{detail})")
         return True
 
     _log(f"⚠️  Erreur sauvegarde Supabase {resp.status_code}: {resp.text[:300]}")
@@ -173,12 +229,13 @@ def _save_error(
         "updated_at": now,
     }
     try:
-        requests.post(
+        post_with_retry(
             f"{supabase_url}/rest/v1/scraped_site_data",
             headers=headers,
             params={"on_conflict": "site_domain"},
             data=json.dumps(row),
             timeout=30,
+            max_attempts=2,
         )
     except Exception as e:
         _log(f"⚠️  Impossible de logger l'erreur dans Supabase: {e}")
@@ -260,11 +317,17 @@ def main() -> int:
 
     # 4. Exécution
     start = time.time()
+    stream = _open_stream(supabase_url, supabase_key, site["site_domain"])
+    products: list = []
     try:
-        result = scraper.scrape(
+        for product in scraper.iter_products(
             categories=args.categories,
             inventory_only=args.inventory_only,
-        )
+        ):
+            if stream is None:
+                products.append(product)
+            else:
+                stream.add(product)
     except Exception as e:
         elapsed = time.time() - start
         err = f"Exception scraper: {type(e).__name__}: {e}"
@@ -273,18 +336,28 @@ def main() -> int:
         return 1
 
     elapsed = time.time() - start
-    products = result.get("products", [])
-    metadata = result.get("metadata", {})
+    metadata = scraper.last_scrape_metadata
+    count = stream.count if stream is not None else len(products)
+    peak = _peak_rss_mb()
+    metadata["memory"] = {"rss_peak_mb": round(peak, 1), "streamed": stream is not None}
+    _log(f"🧠 Pic RSS {peak:.0f} Mo, produits {'en flux' if stream is not None else 'en mémoire'}")
 
-    if not products:
+    if not count:
         _log(f"⚠️  0 produits extraits en {elapsed:.1f}s")
         _save_error(supabase_url, supabase_key, site, "0 produits extraits")
         return 1
 
-    _log(f"✅ {len(products)} produits en {elapsed:.1f}s")
+    if stream is not None and stream.failed:
+        err = "Écriture en flux scraped_products interrompue"
+        _log(f"⚠️  {err}")
+        _save_error(supabase_url, supabase_key, site, err)
+        return 1
+
+    _log(f"✅ {count} produits en {elapsed:.1f}s")
 
     # 5. Upsert Supabase
-    ok = _save_result(supabase_url, supabase_key, site, products, metadata, elapsed)
+    ok = _save_result(supabase_url, supabase_key, site, products, metadata, elapsed, stream)
+    log_http_metrics(_log)
     return 0 if ok else 1
 
 
@@ -7,8 +7,22 @@ Stratégie :
   - TOUS les sites scrapés en parallèle (8 workers max)
   - Durée totale ≈ durée du site le plus lent (~16 min) au lieu de la somme
   - 2 rounds de retry en parallèle après le scraping principal
-
-Sharding (batches de 20 par défaut) :
+  - Re-scrape incrémental : une page détail dont le <lastmod> sitemap n'a
+    pas bougé est réutilisée (ratio de réutilisation loggé par site)
+
+Ordonnancement (file partagée, cf. _site_scheduler.py) :
+  - L'orchestrateur filtre les sites stale, les trie du plus long au plus
+    court d'après l'historique (scraper_cache/site_history.json : durée
+    moyenne et nombre de produits par site) et les pose dans une file
+    SQLite locale. Chaque process batch (un par tranche de 20 sites) lance
+    MAX_CONCURRENT_SITES threads qui prennent le prochain site de la file :
+    un thread libre vole le travail restant au lieu d'attendre la fin d'une
+    tranche fixe. Timeout par site tiré de l'historique ; KNOWN_LARGE_DOMAINS
+    ne sert plus que de prior pour un site jamais vu.
+  - Un site en échec est remis en file (MAX_RETRY_ROUNDS fois au plus).
+  - SCRAPER_SCHEDULER=0 revient aux tranches fixes ci-dessous.
+
+Sharding (batches de 20 par défaut, mode historique) :
   - Sans flag, le script tourne en mode ORCHESTRATEUR : il lit tous les
     `shared_scrapers` actifs triés par site_slug et, si on a > BATCH_SIZE
     sites, il spawn un sous-processus de lui-même par tranche de 20 sites
@@ -19,7 +33,24 @@ Sharding (batches de 20 par défaut) :
     gérées une seule fois par l'orchestrateur).
 
 Règle de persistance :
-  - Succès  → UPSERT complet (products, product_count, status, scraped_at)
+  - Succès  → UPSERT complet (products, product_count, match_keys, status, scraped_at)
+    `match_keys` = clés de matching précalculées (4 MATCH_MODES, avec et
+    sans couleurs) : compare_from_cache ne re-normalise plus les produits
+    `product_digest` = empreinte des champs matériels (prix, dispo, identité)
+    par unit_key : si elle est identique au scrape précédent, seuls
+    scraped_at/status/metadata sont écrits (products non renvoyé) ; le bilan
+    des octets évités est affiché en fin de run
+    Avec la table scraped_products (_product_store) : la ligne du site est
+    upsertée SANS products, puis seul le diff par unit_key est envoyé ; la
+    RPC reconstruit le tableau products dérivé. Repli sur l'upsert complet
+    si la table/RPC est absente ou si le diff échoue.
+    Scrape en flux (scraper.iter_products → _product_store.ProductStream) :
+    avec scraped_products, chaque produit est comparé aux empreintes dès
+    qu'il est parsé et les lignes modifiées partent par paquets pendant le
+    scrape ; le site ne garde en mémoire que clés et empreintes. Suppressions
+    et reconstruction du tableau dérivé attendent la validation du scrape.
+    Le pic de RSS du process pendant chaque site est loggé et stocké dans
+    metadata.memory. SCRAPER_STREAM=0 revient à la liste complète.
   - Erreur  → UPSERT status + error_message UNIQUEMENT
     (products de l'heure précédente restent intacts dans scraped_site_data)
 
@@ -29,11 +60,13 @@ Variables d'environnement requises :
 """
 
 import argparse
+import json
 import math
 import os
 import subprocess
 import sys
 import signal
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
@@ -49,8 +82,12 @@ if str(PROJECT_ROOT) not in sys.path:
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from _http_helpers import post_with_retry
+from _http_helpers import log_http_metrics, post_with_retry
+from _site_scheduler import (
+    SiteHistory, SiteQueue, makespan_estimate, plan_sites, scheduler_enabled,
+)
 
+from scraper_ai.comparison import add_match_keys, build_match_key_index
 from scraper_ai.dedicated_scrapers.registry import DedicatedScraperRegistry
 
 STALE_THRESHOLD_MINUTES = 55
@@ -96,6 +133,11 @@ MAX_CONCURRENT_SITES = 8
 LARGE_SITE_TIMEOUT = 1200   # 20 min
 SMALL_SITE_TIMEOUT = 600    # 10 min
 MAX_RETRY_ROUNDS = 2
+# Durée supposée d'un site sans historique ni scrape_duration_seconds
+LARGE_SITE_EXPECTED_SECONDS = 600
+SMALL_SITE_EXPECTED_SECONDS = 120
+# Attente d'un thread quand la file n'a plus de site prêt (retries en pause)
+QUEUE_POLL_SECONDS = 2
 # ── Détection de scrape partiel ──
 # Un scrape qui rapporte moins de PARTIAL_SCRAPE_RATIO × le nombre de
 # produits connus d'un site (pagination cassée, timeout silencieux d'une
@@ -105,6 +147,18 @@ MAX_RETRY_ROUNDS = 2
 # l'accepte comme le nouvel inventaire réel (vraie liquidation).
 PARTIAL_SCRAPE_RATIO = 0.6
 PARTIAL_MIN_KNOWN = 10
+# ── Re-scrape incrémental ──
+# Les pages détail dont le <lastmod> sitemap n'a pas bougé sont réutilisées
+# depuis scraper_cache/incremental/ (cf. dedicated_scrapers/_incremental.py),
+# avec un re-fetch forcé au-delà de INCREMENTAL_MAX_AGE_HOURS.
+# SCRAPER_FULL_RESCRAPE=1 désactive le mode (re-fetch complet).
+INCREMENTAL_ENABLED = os.environ.get("SCRAPER_FULL_RESCRAPE", "0") not in ("1", "true", "True")
+INCREMENTAL_MAX_AGE_HOURS = 24
+# ── Scrape en flux ──
+# Les produits partent vers scraped_products au fil du scrape au lieu d'être
+# tenus en mémoire jusqu'à la sauvegarde (cf. _product_store.ProductStream).
+# SCRAPER_STREAM=0 garde la liste complète en mémoire.
+STREAM_ENABLED = os.environ.get("SCRAPER_STREAM", "1") not in ("0", "false", "False")
 print_lock = Lock()
 
 
@@ -114,6 +168,39 @@ def _log(msg: str):
         print(f"[{ts}] {msg}", flush=True)
 
 
+def _rss_mb() -> float | None:
+    """RSS courant du process en Mo (None hors Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class _RssPeak:
+    """Pic de RSS du process observé pendant le scrape d'un site.
+
+    Les sites tournent en threads dans le même process : le pic inclut les
+    scrapes concurrents, c'est un majorant du coût mémoire du site.
+    """
+
+    def __init__(self):
+        self.start = self.peak = _rss_mb()
+
+    def sample(self) -> None:
+        rss = _rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def report(self) -> dict | None:
+        if self.start is None:
+            return None
+        return {"rss_start_mb": round(self.start, 1), "rss_peak_mb": round(self.peak, 1)}
+
+
 def _set_cron_lock(supabase_url: str, supabase_key: str, status: str):
     """Upsert un verrou dans scraped_site_data pour signaler que le cron tourne.
 
@@ -161,57 +248,125 @@ def _scrape_single_site(
     site_domain: str,
     known_count: int = 0,
     prev_status: str | None = None,
+    store=None,
 ) -> dict:
     """Scrape un site via son scraper dédié. Thread-safe.
 
     `known_count` = nombre de produits du dernier scrape complet (cache) ;
     sert à détecter un scrape partiel. `prev_status` = statut du dernier
     passage ("partial" signifie que la baisse a déjà été observée une fois).
+    Avec `store` (scraped_products), les produits partent en flux pendant le
+    scrape : le résultat porte alors `stream` et `match_keys`, pas `products`.
     """
     try:
         scraper = DedicatedScraperRegistry.get_by_slug(slug)
         if not scraper:
             return {"success": False, "error": f"Scraper '{slug}' introuvable dans le registre"}
 
+        if INCREMENTAL_ENABLED:
+            scraper.enable_incremental(INCREMENTAL_MAX_AGE_HOURS)
+
         _log(f"   🔄 Scraping {site_domain}...")
         start = time.time()
-        result = scraper.scrape(
+        stream = _open_stream(store, site_domain)
+        match_keys = build_match_key_index([]) if stream is not None else None
+        products: list[dict] = []
+        memory = _RssPeak()
+        for product in scraper.iter_products(
             categories=['inventaire', 'occasion', 'catalogue'],
             inventory_only=False,
-        )
+        ):
+            if stream is None:
+                products.append(product)
+            else:
+                stream.add(product)
+                match_keys = _add_match_keys(site_domain, match_keys, product)
+            memory.sample()
         elapsed = time.time() - start
-        products = result.get('products', [])
+        result = {'metadata': scraper.last_scrape_metadata}
+        count = stream.count if stream is not None else len(products)
+
+        rss = memory.report()
+        if rss:
+            rss["streamed"] = stream is not None
+            result['metadata']['memory'] = rss
+            _log(
+                f"   🧠 {site_domain}: pic RSS {rss['rss_peak_mb']:.0f} Mo "
+                f"(+{rss['rss_peak_mb'] - rss['rss_start_mb']:.0f} Mo), "
+                f"produits {'en flux' if stream is not None else 'en mémoire'}"
+            )
 
-        if not products:
+        incremental = scraper.incremental_report()
+        if incremental and incremental["checked"]:
+            result.setdefault('metadata', {})['incremental'] = incremental
+            _log(
+                f"   ♻️  {site_domain}: {incremental['reused']}/{incremental['checked']} pages "
+                f"réutilisées ({incremental['reuse_ratio']:.0%}), "
+                f"{incremental['changed']} modifiée(s)"
+            )
+
+        http_cache = scraper.http_cache_report()
+        if http_cache:
+            hits = sum(c["hit"] for c in http_cache.values())
+            not_modified = sum(c["not_modified"] for c in http_cache.values())
+            misses = sum(c["miss"] for c in http_cache.values())
+            saved_mb = sum(c["bytes_saved"] for c in http_cache.values()) / 1_048_576
+            result.setdefault('metadata', {})['http_cache'] = http_cache
+            _log(
+                f"   🗄️  {site_domain}: cache HTTP — {hits} revalidation(s), "
+                f"{not_modified} × 304, {misses} miss ({saved_mb:.1f} Mo évités)"
+            )
+
+        rate_control = scraper.rate_control_report()
+        if rate_control:
+            result.setdefault('metadata', {})['rate_control'] = rate_control
+            throttled = sum(c["throttled"] for c in rate_control.values())
+            limits = ", ".join(f"{host} ≤{c['limit']:.0f}" for host, c in rate_control.items())
+            _log(f"   🚦 {site_domain}: cadence apprise {limits} ({throttled} × 429)")
+
+        if not count:
             _log(f"   ⚠️  {site_domain}: 0 produits en {elapsed:.0f}s")
             return {"success": False, "error": "0 produits extraits", "elapsed": elapsed}
 
+        if stream is not None and stream.failed:
+            _log(f"   ⚠️  {site_domain}: écriture en flux interrompue — ancien cache conservé")
+            return {"success": False, "error": "Écriture en flux scraped_products interrompue",
+                    "elapsed": elapsed}
+
         # ── Validation de complétude ──
         if (
             known_count >= PARTIAL_MIN_KNOWN
-            and len(products) < known_count * PARTIAL_SCRAPE_RATIO
+            and count < known_count * PARTIAL_SCRAPE_RATIO
         ):
             if prev_status == "partial":
                 # Deuxième cron consécutif avec la même baisse : ce n'est
                 # plus une anomalie de scraping, c'est le nouvel inventaire.
                 _log(
                     f"   ⚠️  {site_domain}: baisse confirmée sur 2 passages "
-                    f"({known_count} → {len(products)} produits) — acceptée comme nouvelle référence"
+                    f"({known_count} → {count} produits) — acceptée comme nouvelle référence"
                 )
             else:
                 _log(
-                    f"   ⚠️  {site_domain}: scrape PARTIEL suspect — {len(products)} produits "
+                    f"   ⚠️  {site_domain}: scrape PARTIEL suspect — {count} produits "
                     f"vs {known_count} connus (<{int(PARTIAL_SCRAPE_RATIO * 100)} %). "
                     f"Ancien cache conservé, retry."
                 )
                 return {
                     "success": False,
                     "partial": True,
-                    "error": f"Scrape partiel: {len(products)} produits vs {known_count} attendus",
+                    "error": f"Scrape partiel: {count} produits vs {known_count} attendus",
                     "elapsed": elapsed,
                 }
 
-        _log(f"   ✅ {site_domain}: {len(products)} produits en {elapsed:.0f}s")
+        _log(f"   ✅ {site_domain}: {count} produits en {elapsed:.0f}s")
+        if stream is not None:
+            return {
+                "success": True,
+                "stream": stream,
+                "match_keys": match_keys,
+                "metadata": result.get('metadata', {}),
+                "elapsed": elapsed,
+            }
         return {
             "success": True,
             "products": products,
@@ -224,10 +379,110 @@ def _scrape_single_site(
         return {"success": False, "error": str(e)}
 
 
+def _open_stream(store, site_domain: str):
+    """ProductStream du site, ou None (flux désactivé / empreintes illisibles)."""
+    if store is None or not STREAM_ENABLED:
+        return None
+    from _product_store import ProductStream
+    stream = ProductStream(store, site_domain, datetime.now(timezone.utc).isoformat())
+    return stream if stream.ready else None
+
+
+def _add_match_keys(site_domain: str, match_keys: dict | None, product: dict) -> dict | None:
+    """Ajoute les clés de matching d'un produit ; None (plus de clés) si échec."""
+    if match_keys is None:
+        return None
+    try:
+        add_match_keys(match_keys, product)
+        return match_keys
+    except Exception as e:
+        _log(f"   ⚠️  {site_domain}: clés de matching non précalculées — {e}")
+        return None
+
+
+def _match_key_index(site: dict, products: list[dict]) -> dict | None:
+    """Clés de matching précalculées (lues par compare_from_cache). None si échec."""
+    try:
+        return build_match_key_index(products)
+    except Exception as e:
+        _log(f"   ⚠️  {site['site_domain']}: clés de matching non précalculées — {e}")
+        return None
+
+
+_product_store_lock = Lock()
+_product_store_instance = None
+
+
+def _product_store(supabase_url: str, supabase_key: str):
+    """Stockage par lignes partagé par les threads, ou None (désactivé / non migré)."""
+    global _product_store_instance
+    with _product_store_lock:
+        if _product_store_instance is None:
+            from _product_store import PostgrestProductStore, store_enabled
+            if not store_enabled():
+                return None
+            _product_store_instance = PostgrestProductStore(supabase_url, supabase_key, logger=_log)
+        store = _product_store_instance
+    return store if store.available else None
+
+
+# Bilan des écritures delta du process (affiché en fin de run)
+_delta_lock = Lock()
+_delta_stats = {"unchanged": 0, "delta": 0, "full": 0, "bytes_full": 0, "bytes_sent": 0}
+
+
+def _json_size(payload) -> int:
+    return len(json.dumps(payload, ensure_ascii=False, default=str))
+
+
+def _record_delta(kind: str, bytes_full: int, bytes_sent: int) -> None:
+    with _delta_lock:
+        _delta_stats[kind] += 1
+        _delta_stats["bytes_full"] += bytes_full
+        _delta_stats["bytes_sent"] += bytes_sent
+
+
+def _log_delta_report() -> None:
+    with _delta_lock:
+        stats = dict(_delta_stats)
+    if not (stats["unchanged"] or stats["delta"] or stats["full"]):
+        return
+    saved = stats["bytes_full"] - stats["bytes_sent"]
+    _log(f"   📉 Écritures produits : {stats['unchanged']} inchangé(s) (scraped_at seul), "
+         f"{stats['delta']} en diff, {stats['full']} complète(s) — "
+         f"{saved / 1_048_576:.1f} Mo évités sur {stats['bytes_full'] / 1_048_576:.1f} Mo")
+
+
+def _read_product_digests(supabase, sites: list) -> None:
+    """Pose site["_prev_digest"] (résumé du dernier scrape écrit) pour chaque site."""
+    if not sites:
+        return
+    try:
+        result = (
+            supabase.table("scraped_site_data")
+            .select("site_domain, product_digest")
+            .in_("site_domain", [s["site_domain"] for s in sites])
+            .execute()
+        )
+        rows = {r["site_domain"]: r.get("product_digest") for r in (result.data or [])}
+    except Exception as e:
+        # Colonne pas encore migrée : toutes les écritures seront complètes
+        _log(f"⚠️  Lecture product_digest impossible ({e}) — écritures complètes")
+        return
+    for site in sites:
+        site["_prev_digest"] = rows.get(site["site_domain"])
+
+
 def _save_site_data(supabase_url: str, supabase_key: str, site: dict, scrape_result: dict):
     """Upsert les produits dans scraped_site_data.
 
     Succès → écrase tout + efface le flag hidden. Erreur → ne touche PAS products/product_count.
+    Succès sans changement matériel (résumé identique au scrape précédent) →
+    seuls scraped_at/status/metadata sont écrits, products n'est pas renvoyé.
+    Avec scraped_products, les produits partent en diff après l'upsert de la ligne.
+    Scrape en flux (`stream`) : les lignes modifiées sont déjà parties, la
+    ligne du site est upsertée puis `stream.finish` supprime les unités
+    disparues et reconstruit le tableau dérivé.
     """
     headers = {
         "apikey": supabase_key,
@@ -237,15 +492,27 @@ def _save_site_data(supabase_url: str, supabase_key: str, site: dict, scrape_res
     }
 
     now = datetime.now(timezone.utc).isoformat()
+    unchanged = False
+    bytes_full = 0
+    stream = scrape_result.get("stream")
 
     if scrape_result["success"]:
+        from _product_store import digest_delta, product_digest
+
+        products = scrape_result.get("products")
         metadata = {**scrape_result.get("metadata", {}), "temporarily_hidden": False}
+        if stream is not None:
+            digest = stream.digest()
+            bytes_full = stream.bytes_full
+        else:
+            digest = product_digest(products, site.get("_prev_digest"))
+            bytes_full = _json_size(products)
+        delta = digest_delta(site.get("_prev_digest"), digest)
+        unchanged = delta is not None and not any(delta.values())
         row = {
             "site_url": site["site_url"],
             "site_domain": site["site_domain"],
             "shared_scraper_id": site["id"],
-            "products": scrape_result["products"],
-            "product_count": len(scrape_result["products"]),
             "metadata": metadata,
             "scraped_at": now,
             "scrape_duration_seconds": round(scrape_result.get("elapsed", 0), 1),
@@ -253,6 +520,22 @@ def _save_site_data(supabase_url: str, supabase_key: str, site: dict, scrape_res
             "error_message": None,
             "updated_at": now,
         }
+        if stream is not None and not unchanged:
+            row.update({
+                "product_count": stream.count,
+                "match_keys": scrape_result.get("match_keys"),
+                "product_digest": digest,
+            })
+        elif not unchanged:
+            row.update({
+                "products": products,
+                "product_count": len(products),
+                "match_keys": _match_key_index(site, products),
+                "product_digest": digest,
+            })
+        if delta is not None:
+            _log(f"   🔎 {site['site_domain']}: {delta['added']} nouveau(x), "
+                 f"{delta['changed']} modifié(s), {delta['removed']} retiré(s)")
     else:
         row = {
             "site_url": site["site_url"],
@@ -265,21 +548,78 @@ def _save_site_data(supabase_url: str, supabase_key: str, site: dict, scrape_res
             "updated_at": now,
         }
 
-    try:
-        resp = post_with_retry(
+    def _post(payload: dict):
+        return post_with_retry(
             f"{supabase_url}/rest/v1/scraped_site_data",
-            json=row,
+            json=payload,
             headers=headers,
             params={"on_conflict": "site_domain"},
             timeout=45,
             max_attempts=5,
             base_backoff=3.0,
             logger=_log,
+            compress=True,
         )
+
+    store = None
+    if scrape_result["success"] and not unchanged and stream is None:
+        store = _product_store(supabase_url, supabase_key)
+    if store is not None:
+        # Ligne du site d'abord (status='success', scraped_at) : le trigger
+        # d'historique de prix voit ensuite le tableau reconstruit par la RPC.
+        row.pop("products")
+    if unchanged or store is not None or stream is not None:
+        # return=minimal : ne pas rapatrier le tableau products en réponse.
+        headers["Prefer"] = "resolution=merge-duplicates,return=minimal"
+
+    try:
+        resp = _post(row)
+        for column in ("match_keys", "product_digest"):
+            if resp is not None and resp.status_code == 400 and column in row and column in resp.text:
+                # Colonne pas encore migrée : sauvegarde sans elle
+                _log(f"   ⚠️  {site['site_domain']}: colonne {column} absente — sauvegarde sans")
+                row.pop(column)
+                resp = _post(row)
+        bytes_sent = _json_size(row)
+        if stream is not None and resp is not None and resp.status_code in (200, 201, 204):
+            if not stream.finish(now):
+                # Tableau dérivé non reconstruit : statut en erreur (re-scrape
+                # au prochain cron) et résumé effacé (prochaine écriture complète)
+                _log(f"   ⚠️  {site['site_domain']}: fin d'écriture en flux impossible — ancien cache conservé")
+                _post({
+                    "site_url": site["site_url"],
+                    "site_domain": site["site_domain"],
+                    "status": "error",
+                    "error_message": "Écriture en flux scraped_products incomplète",
+                    "product_digest": None,
+                    "updated_at": now,
+                })
+                return
+            if stream.upserted or stream.deleted:
+                _log(f"   🧩 {site['site_domain']}: produits en flux — {stream.summary()}")
+            _record_delta("unchanged" if unchanged else "delta", bytes_full,
+                          bytes_sent + stream.bytes_sent)
+        elif store is not None and resp is not None and resp.status_code in (200, 201, 204):
+            changes = store.save(site["site_domain"], products, now)
+            if changes is not None:
+                _log(f"   🧩 {site['site_domain']}: produits par diff — {changes.summary()}")
+                bytes_sent += changes.payload_bytes()
+                _record_delta("delta", bytes_full, bytes_sent)
+            else:
+                _log(f"   ⚠️  {site['site_domain']}: diff scraped_products impossible — upsert complet")
+                row["products"] = products
+                resp = _post(row)
+                bytes_sent += _json_size(row)
+                _record_delta("full", bytes_full, bytes_sent)
+        elif scrape_result["success"] and stream is None:
+            _record_delta("unchanged" if unchanged else "full", bytes_full, bytes_sent)
         if resp is None:
             _log(f"   ⚠️  {site['site_domain']}: Supabase injoignable — sauvegarde perdue")
-        elif resp.status_code in (200, 201):
-            status = "✅" if scrape_result["success"] else "⚠️  (erreur, ancien cache conservé)"
+        elif resp.status_code in (200, 201, 204):
+            if unchanged:
+                status = "✅ (inchangé, scraped_at mis à jour)"
+            else:
+                status = "✅" if scrape_result["success"] else "⚠️  (erreur, ancien cache conservé)"
             _log(f"   {status} {site['site_domain']}")
         else:
             _log(f"   ⚠️  {site['site_domain']}: erreur PostgREST ({resp.status_code}): {resp.text[:200]}")
@@ -376,8 +716,12 @@ def _get_stale_sites(supabase, sites: list) -> list:
 
 
 def _run_user_comparisons(supabase, supabase_url: str, supabase_key: str):
-    """Après le scraping, lance compare_from_cache pour chaque utilisateur avec des alertes actives."""
-    import subprocess
+    """Après le scraping, compare tous les utilisateurs avec des alertes actives.
+
+    Une seule passe batch en process (compare_from_cache.run_batch_comparisons) :
+    chaque site est chargé une fois pour tous les utilisateurs qui le suivent.
+    """
+    from compare_from_cache import run_batch_comparisons
 
     try:
         result = (
@@ -409,39 +753,14 @@ def _run_user_comparisons(supabase, supabase_url: str, supabase_key: str):
     _log(f"📊 COMPARAISONS : {len(unique_alerts)} utilisateur(s)")
     _log(f"{'─'*50}")
 
-    compare_script = str(SCRIPT_DIR / "compare_from_cache.py")
-
-    for alert in unique_alerts:
-        uid = alert["user_id"]
-        ref_url = alert.get("reference_url", "")
-        competitors = alert.get("competitor_urls") or []
+    try:
+        summary = run_batch_comparisons(supabase_url, supabase_key, unique_alerts, logger=_log)
+    except Exception as e:
+        _log(f"   ❌ Comparaisons batch échouées — {e}")
+        return
 
-        if not ref_url:
-            continue
-
-        cmd = [sys.executable, compare_script, "--user-id", uid, "--reference", ref_url]
-        if competitors:
-            cmd.extend(["--competitors", ",".join(competitors)])
-
-        _log(f"   🔄 User {uid[:8]}... — ref={ref_url}")
-        try:
-            proc = subprocess.run(
-                cmd,
-                cwd=str(PROJECT_ROOT),
-                capture_output=True,
-                text=True,
-                timeout=120,
-                env={**os.environ, "SUPABASE_URL": supabase_url, "SUPABASE_SERVICE_ROLE_KEY": supabase_key},
-            )
-            if proc.returncode == 0:
-                _log(f"   ✅ User {uid[:8]}... — comparaison OK")
-            else:
-                last_lines = (proc.stdout or proc.stderr or "").strip().split("\n")[-3:]
-                _log(f"   ⚠️  User {uid[:8]}... — code {proc.returncode}: {' | '.join(last_lines)}")
-        except subprocess.TimeoutExpired:
-            _log(f"   ⏰ User {uid[:8]}... — timeout (>2 min)")
-        except Exception as e:
-            _log(f"   ❌ User {uid[:8]}... — {e}")
+    _log(f"   📊 {summary['success']}/{summary['users']} comparaison(s) OK, "
+         f"{summary['failed']} échouée(s) — {summary['sites']} site(s) en {summary['elapsed']:.1f}s")
 
 
 def _parse_args() -> argparse.Namespace:
@@ -461,6 +780,14 @@ def _parse_args() -> argparse.Namespace:
         default=DEFAULT_BATCH_SIZE,
         help=f"Nombre maximal de sites par batch (défaut : {DEFAULT_BATCH_SIZE}).",
     )
+    parser.add_argument(
+        "--queue",
+        default=None,
+        help=(
+            "File partagée (SQLite) créée par l'orchestrateur. Si fourni, le "
+            "script tourne en mode worker et prend ses sites dans la file."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -498,7 +825,7 @@ def _enrich_with_product_count(supabase, sites: list) -> None:
         domains = [s["site_domain"] for s in sites]
         cached = (
             supabase.table("scraped_site_data")
-            .select("site_domain, product_count, status")
+            .select("site_domain, product_count, status, scrape_duration_seconds")
             .in_("site_domain", domains)
             .execute()
         )
@@ -507,6 +834,7 @@ def _enrich_with_product_count(supabase, sites: list) -> None:
             row = rows.get(site["site_domain"], {})
             site["_known_product_count"] = row.get("product_count", 0) or 0
             site["_prev_status"] = row.get("status")
+            site["_last_duration"] = row.get("scrape_duration_seconds")
     except Exception as e:
         _log(f"⚠️  Erreur lecture product_count: {e}")
 
@@ -530,6 +858,7 @@ def _scrape_sites(
         return True
 
     print(f"🔧 {batch_label} : {len(sites)}/{len(sites_subset)} sites à scraper\n")
+    _read_product_digests(supabase, sites)
     return _run_scraping(supabase_url, supabase_key, sites)
 
 
@@ -551,7 +880,21 @@ def _spawn_batch_workers(num_batches: int, batch_size: int) -> bool:
         _log(f"🧵 Spawn batch worker #{i} (size={batch_size})")
         proc = subprocess.Popen(cmd, env=os.environ.copy())
         procs.append((i, proc))
+    return _wait_for_workers(procs)
+
+
+def _spawn_queue_workers(num_workers: int, queue_path: Path) -> bool:
+    """Lance N sous-processus qui se servent dans la même file de sites."""
+    procs: list[tuple[int, subprocess.Popen]] = []
+    for i in range(num_workers):
+        cmd = [sys.executable, "-u", str(Path(__file__).resolve()), "--queue", str(queue_path)]
+        _log(f"🧵 Spawn worker #{i} sur la file partagée")
+        procs.append((i, subprocess.Popen(cmd, env=os.environ.copy())))
+    return _wait_for_workers(procs)
 
+
+def _wait_for_workers(procs: list[tuple[int, subprocess.Popen]]) -> bool:
+    """Attend les workers (deadline commune). True si au moins un a rc==0."""
     any_success = False
     deadline = time.time() + BATCH_WORKER_TIMEOUT_SECONDS
     for idx, proc in procs:
@@ -583,6 +926,10 @@ def main():
         print("❌ SUPABASE_URL et SUPABASE_SERVICE_ROLE_KEY sont requis")
         sys.exit(1)
 
+    if args.queue:
+        _run_queue_worker(supabase_url, supabase_key, Path(args.queue))
+        return
+
     supabase = create_client(supabase_url, supabase_key)
 
     if args.batch_index is not None:
@@ -615,6 +962,7 @@ def _run_batch_worker(
         return
 
     had_success = _scrape_sites(supabase, supabase_url, supabase_key, my_sites, label)
+    log_http_metrics(_log)
     sys.exit(0 if had_success else 1)
 
 
@@ -639,6 +987,12 @@ def _run_orchestrator(
             return
 
         total = len(all_sites)
+        if scheduler_enabled():
+            should_compare = _schedule_sites(
+                supabase, supabase_url, supabase_key, all_sites, batch_size,
+            )
+            return
+
         num_batches = math.ceil(total / batch_size)
         print(f"\n📋 {total} scrapers actifs → {num_batches} batch(es) de ≤{batch_size}")
 
@@ -655,6 +1009,7 @@ def _run_orchestrator(
         _set_cron_lock(supabase_url, supabase_key, "idle")
         if should_compare:
             _run_user_comparisons(supabase, supabase_url, supabase_key)
+        log_http_metrics(_log)
 
 
 def _run_scraping(supabase_url: str, supabase_key: str, sites: list) -> bool:
@@ -701,6 +1056,8 @@ def _run_scraping(supabase_url: str, supabase_key: str, sites: list) -> bool:
         )
 
     global_timeout = max(site_timeouts.values()) + 120
+    # Scraped_products disponible : les sites y écrivent en flux
+    store = _product_store(supabase_url, supabase_key) if STREAM_ENABLED else None
 
     with ThreadPoolExecutor(max_workers=workers) as executor:
         futures = {
@@ -711,6 +1068,7 @@ def _run_scraping(supabase_url: str, supabase_key: str, sites: list) -> bool:
                 site["site_domain"],
                 site.get("_known_product_count", 0),
                 site.get("_prev_status"),
+                store,
             ): site
             for site in sites
         }
@@ -783,6 +1141,7 @@ def _run_scraping(supabase_url: str, supabase_key: str, sites: list) -> bool:
                         site["site_domain"],
                         site.get("_known_product_count", 0),
                         site.get("_prev_status"),
+                        store,
                     ): site
                     for site in still_failed
                 }
@@ -819,19 +1178,200 @@ def _run_scraping(supabase_url: str, supabase_key: str, sites: list) -> bool:
 
         failed_sites = still_failed
 
-    elapsed_total = time.time() - cron_start
+    _log_cron_summary(total_success, len(sites), total_failed, failed_sites,
+                      time.time() - cron_start)
+    return total_success > 0 and not shutdown
+
 
+def _log_cron_summary(
+    succeeded: int, total: int, failed: int, failed_sites: list, elapsed: float,
+    recovered: int | None = None, estimate: float | None = None,
+) -> None:
+    """Bilan de fin de cron. `recovered` / `estimate` : stats du mode file
+    partagée (sites réussis après retry, durée estimée par le planificateur)."""
+    retried = f" ({recovered} après retry)" if recovered is not None else ""
+    planned = f" (estimée {estimate / 60:.1f} min)" if estimate is not None else ""
     print(f"\n{'='*70}")
-    print(f"✅ SCRAPER CRON TERMINÉ")
-    print(f"   {total_success}/{len(sites)} OK, {total_failed} échoué(s)")
+    print("✅ SCRAPER CRON TERMINÉ")
+    print(f"   {succeeded}/{total} OK{retried}, {failed} échoué(s)")
     if failed_sites:
         print(f"   ⚠️  Sites encore en erreur (ancien cache conservé): "
               f"{', '.join(s['site_domain'] for s in failed_sites)}")
-        print(f"   → Sera re-tenté dans 1h par le prochain cron")
-    print(f"   Durée: {elapsed_total / 60:.1f} min")
+        print("   → Sera re-tenté dans 1h par le prochain cron")
+    print(f"   Durée: {elapsed / 60:.1f} min{planned}")
+    _log_delta_report()
     print(f"{'='*70}\n")
 
-    return total_success > 0 and not shutdown
+
+def _default_expected_seconds(site: dict) -> float:
+    """Durée supposée d'un site absent de l'historique."""
+    if site.get("_last_duration"):
+        return float(site["_last_duration"])
+    if site["site_domain"] in KNOWN_LARGE_DOMAINS:
+        return LARGE_SITE_EXPECTED_SECONDS
+    return SMALL_SITE_EXPECTED_SECONDS
+
+
+def _default_timeout(site: dict) -> int:
+    return LARGE_SITE_TIMEOUT if site["site_domain"] in KNOWN_LARGE_DOMAINS else SMALL_SITE_TIMEOUT
+
+
+def _result_product_count(result: dict) -> int:
+    if result.get("stream") is not None:
+        return result["stream"].count
+    return len(result.get("products") or [])
+
+
+def _schedule_sites(
+    supabase, supabase_url: str, supabase_key: str, all_sites: list, batch_size: int,
+) -> bool:
+    """Mode file partagée : plan du plus long au plus court, workers qui se
+    servent dans la file. Retourne True si au moins 1 site a réussi."""
+    _enrich_with_product_count(supabase, all_sites)
+    print(f"\n📋 {len(all_sites)} scrapers actifs à examiner")
+    sites = _get_stale_sites(supabase, all_sites)
+    if not sites:
+        print(f"✅ Tous les {len(all_sites)} sites sont à jour")
+        return True
+    _read_product_digests(supabase, sites)
+
+    history = SiteHistory()
+    sites = plan_sites(sites, history, _default_expected_seconds, _default_timeout)
+    num_workers = math.ceil(len(sites) / batch_size)
+    slots = min(len(sites), num_workers * MAX_CONCURRENT_SITES)
+    estimate = makespan_estimate(sites, slots)
+    longest = sites[0]
+
+    print(f"🔧 {len(sites)}/{len(all_sites)} sites à scraper — {num_workers} process × "
+          f"{MAX_CONCURRENT_SITES} threads sur une file partagée")
+    for site in sites[:5]:
+        print(f"   ⏱️  {site['site_name']}: ~{site['_expected_seconds'] / 60:.1f} min attendues "
+              f"(timeout {site['_timeout'] // 60} min)")
+    print(f"   → durée estimée {estimate / 60:.1f} min "
+          f"(site le plus long : {longest['_expected_seconds'] / 60:.1f} min)\n")
+
+    cron_start = time.time()
+    queue = SiteQueue.create(sites, MAX_RETRY_ROUNDS)
+    try:
+        if num_workers <= 1:
+            _work_queue(queue, supabase_url, supabase_key)
+        else:
+            _spawn_queue_workers(num_workers, queue.path)
+        results = queue.results()
+    finally:
+        queue.remove()
+
+    for site in results:
+        result = site["_result"]
+        if result:
+            history.record(site["site_domain"], result.get("elapsed") or 0,
+                           result.get("product_count") or 0, bool(result.get("success")),
+                           bool(result.get("timed_out")))
+    history.save()
+    return _log_schedule_report(supabase_url, supabase_key, results, cron_start, estimate)
+
+
+def _run_queue_worker(supabase_url: str, supabase_key: str, queue_path: Path):
+    """Mode worker sur file partagée (spawné par l'orchestrateur)."""
+    print(f"\n🔄 WORKER {os.getpid()} — file {queue_path.name}")
+    _work_queue(SiteQueue(queue_path), supabase_url, supabase_key)
+    _log_delta_report()
+    log_http_metrics(_log)
+
+
+def _work_queue(queue: SiteQueue, supabase_url: str, supabase_key: str) -> None:
+    """MAX_CONCURRENT_SITES threads prennent les sites de la file jusqu'à
+    épuisement (sites en pause de retry compris)."""
+    store = _product_store(supabase_url, supabase_key) if STREAM_ENABLED else None
+    shutdown = threading.Event()
+
+    def _on_sigterm(signum, frame):
+        print("\n⚠️  SIGTERM reçu — arrêt en cours...")
+        shutdown.set()
+
+    previous = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            previous[signum] = signal.signal(signum, _on_sigterm)
+
+    def _slot(n: int):
+        worker = f"{os.getpid()}/{n}"
+        while not shutdown.is_set():
+            try:
+                site = queue.claim(worker)
+                if site is None:
+                    if not queue.active():
+                        return
+                    time.sleep(QUEUE_POLL_SECONDS)
+                    continue
+                result = _scrape_with_timeout(site, store)
+                _save_site_data(supabase_url, supabase_key, site, result)
+                result["product_count"] = _result_product_count(result)
+                if queue.finish(site, result):
+                    _log(f"   🔄 {site['site_domain']}: remis en file "
+                         f"(tentative {site['_attempt'] + 2}/{MAX_RETRY_ROUNDS + 1})")
+            except Exception as e:
+                _log(f"   ❌ File de sites: {e}")
+                time.sleep(QUEUE_POLL_SECONDS)
+
+    threads = [threading.Thread(target=_slot, args=(i,), name=f"site-slot-{i}")
+               for i in range(MAX_CONCURRENT_SITES)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def _scrape_with_timeout(site: dict, store) -> dict:
+    """`_scrape_single_site` borné par le timeout planifié du site. Au-delà,
+    le scrape est abandonné (son thread finit dans le vide, comme avant)."""
+    box: dict = {}
+    timeout = site.get("_timeout") or _default_timeout(site)
+
+    def _run():
+        box["result"] = _scrape_single_site(
+            site["site_slug"],
+            site["site_url"],
+            site["site_domain"],
+            site.get("_known_product_count", 0),
+            site.get("_prev_status"),
+            store,
+        )
+
+    thread = threading.Thread(target=_run, name=f"scrape-{site['site_domain']}", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        _log(f"   ⏰ {site['site_domain']}: timeout (>{timeout // 60} min) — abandonné")
+        return {
+            "success": False,
+            "timed_out": True,
+            "error": f"Timeout: scraping exceeded {timeout // 60} minutes",
+            "elapsed": float(timeout),
+        }
+    return box.get("result") or {"success": False, "error": "Scrape interrompu"}
+
+
+def _log_schedule_report(
+    supabase_url: str, supabase_key: str, results: list, cron_start: float, estimate: float,
+) -> bool:
+    """Bilan du run en file partagée ; cache de la recherche les échecs durs."""
+    succeeded = [s for s in results if s["_state"] == "done"]
+    failed = [s for s in results if s["_state"] != "done"]
+    recovered = [s for s in succeeded if s["_attempts"]]
+    # Les échecs « partiels » gardent un cache complet valide : on ne les
+    # cache pas de la recherche, on retentera simplement au prochain cron.
+    hard_failed = [s for s in failed if not (s["_result"] or {}).get("partial")]
+    if hard_failed:
+        _hide_failing_sites(supabase_url, supabase_key, hard_failed)
+
+    _log_cron_summary(len(succeeded), len(results), len(failed), failed,
+                      time.time() - cron_start, recovered=len(recovered), estimate=estimate)
+    return bool(succeeded)
 
 
 if __name__ == "__main__":
@@ -7,7 +7,8 @@ en utilisant les données déjà scrapées dans scraped_site_data.
 Ce workflow est complémentaire au scraper_cron.py (qui tourne à :00) :
   - scraper_cron.py  → scrape les sites et met à jour scraped_site_data
   - surveillance_cron.py → lit scraped_site_data et met à jour les comparaisons
-    dans la table scrapings pour chaque utilisateur
+    dans la table scrapings pour chaque utilisateur (une passe batch en
+    process : chaque site n'est lu qu'une fois pour tous les utilisateurs)
 
 Variables d'environnement requises :
   SUPABASE_URL              — URL du projet Supabase
@@ -16,8 +17,6 @@ Variables d'environnement requises :
 
 import os
 import sys
-import subprocess
-import time
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -28,11 +27,10 @@ if str(PROJECT_ROOT) not in sys.path:
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
-from _http_helpers import get_with_retry
+from _http_helpers import get_with_retry, log_http_metrics
+from compare_from_cache import run_batch_comparisons
 
-COMPARE_SCRIPT = str(SCRIPT_DIR / "compare_from_cache.py")
 MAX_USERS = 50
-USER_TIMEOUT = 120
 
 
 def _headers(key: str) -> dict:
@@ -58,7 +56,7 @@ def main():
     resp = get_with_retry(
         f"{supabase_url}/rest/v1/scraper_config",
         params={
-            "select": "user_id,reference_url,competitor_urls",
+            "select": "user_id,reference_url,competitor_urls,ignore_colors,match_mode",
             "reference_url": "not.is.null",
         },
         headers=_headers(supabase_key),
@@ -105,62 +103,17 @@ def main():
 
     print(f"\n📋 {len(unique_configs)} utilisateur(s) à traiter\n")
 
-    success = 0
-    failed = 0
-    start_total = time.time()
-
-    for config in unique_configs:
-        uid = config["user_id"]
-        ref_url = config.get("reference_url", "")
-        competitors = config.get("competitor_urls") or []
-
-        if not ref_url:
-            continue
-
-        cmd = [
-            sys.executable, COMPARE_SCRIPT,
-            "--user-id", uid,
-            "--reference", ref_url,
-        ]
-        if competitors:
-            cmd.extend(["--competitors", ",".join(competitors)])
-
-        uid_short = uid[:8]
-        print(f"   🔄 User {uid_short}... — ref={ref_url}")
-
-        try:
-            proc = subprocess.run(
-                cmd,
-                cwd=str(PROJECT_ROOT),
-                capture_output=True,
-                text=True,
-                timeout=USER_TIMEOUT,
-                env={
-                    **os.environ,
-                    "SUPABASE_URL": supabase_url,
-                    "SUPABASE_SERVICE_ROLE_KEY": supabase_key,
-                },
-            )
-            if proc.returncode == 0:
-                success += 1
-                print(f"   ✅ User {uid_short}... — OK")
-            else:
-                failed += 1
-                last_lines = (proc.stdout or proc.stderr or "").strip().split("\n")[-3:]
-                print(f"   ⚠️  User {uid_short}... — code {proc.returncode}: {' | '.join(last_lines)}")
-        except subprocess.TimeoutExpired:
-            failed += 1
-            print(f"   ⏰ User {uid_short}... — timeout (>{USER_TIMEOUT}s)")
-        except Exception as e:
-            failed += 1
-            print(f"   ❌ User {uid_short}... — {e}")
-
-    elapsed = time.time() - start_total
+    summary = run_batch_comparisons(supabase_url, supabase_key, unique_configs)
+    success = summary["success"]
+    failed = summary["failed"]
+    elapsed = summary["elapsed"]
 
     print(f"\n{'='*60}")
     print(f"✅ SURVEILLANCE TERMINÉE")
     print(f"   {success}/{len(unique_configs)} OK, {failed} échoué(s)")
+    print(f"   {summary['sites']} site(s) chargé(s) une fois chacun")
     print(f"   Durée: {elapsed:.1f}s")
+    log_http_metrics()
     print(f"{'='*60}\n")
 
 
@@ -0,0 +1,147 @@
+"""Mode batch de compare_from_cache : un chargement par site, mêmes résultats.
+
+Usage : python3 -m pytest scripts/test_compare_batch.py
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import compare_from_cache as cfc  # noqa: E402
+
+DATA = PROJECT_ROOT / "scraped_data.json"
+
+
+class _Resp:
+    def __init__(self, status_code=201):
+        self.status_code = status_code
+        self.text = ""
+
+    def json(self):
+        return []
+
+
+def _inventories():
+    if not DATA.exists():
+        pytest.skip("scraped_data.json absent")
+    products = json.loads(DATA.read_text(encoding="utf-8"))["products"][:600]
+    sites = {}
+    for i, name in enumerate(("ref-a.ca", "ref-b.ca", "conc-c.ca")):
+        site = []
+        for p in products[i::2]:
+            q = dict(p)
+            q["sourceUrl"] = f"{q.get('sourceUrl') or ''}?{name}"
+            q.pop("sourceSite", None)
+            q.pop("isReferenceProduct", None)
+            site.append(q)
+        sites[name] = site
+    return sites
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    inventories = _inventories()
+    fetches, posts = [], []
+
+    def fake_fetch(url, key, domain):
+        fetches.append(domain)
+        products = json.loads(json.dumps(inventories.get(domain, [])))
+        return products, False, 5, {}
+
+    def fake_post(url, json=None, **kwargs):
+        posts.append(json)
+        return _Resp()
+
+    monkeypatch.setattr(cfc, "_fetch_site_products", fake_fetch)
+    monkeypatch.setattr(cfc, "_is_cron_running", lambda *a: False)
+    monkeypatch.setattr(cfc, "_fetch_user_configs", lambda *a: {})
+    monkeypatch.setattr(cfc, "post_with_retry", fake_post)
+    monkeypatch.setattr(cfc, "BATCH_INSERT_CHUNK", 2)
+    return inventories, fetches, posts
+
+
+USERS = [
+    {"user_id": "u1", "reference_url": "https://ref-a.ca",
+     "competitor_urls": ["https://conc-c.ca", "https://ref-b.ca"]},
+    {"user_id": "u2", "reference_url": "https://ref-b.ca",
+     "competitor_urls": ["https://conc-c.ca", "https://ref-a.ca"]},
+    {"user_id": "u3", "reference_url": "https://www.ref-a.ca/",
+     "competitor_urls": ["https://conc-c.ca"], "match_mode": "flexible", "ignore_colors": True},
+    {"user_id": "u1", "reference_url": "https://ref-b.ca", "competitor_urls": []},
+]
+
+
+def _single(inventories, user):
+    """Résultat de référence : un utilisateur, inventaires frais, clés à la volée."""
+    sites = {}
+    for domain in cfc._user_domains(user["reference_url"], user["competitor_urls"]):
+        site = {"products": json.loads(json.dumps(inventories.get(domain, []))),
+                "match_keys": {}, "source": "cache", "skipped_cron": False}
+        cfc._prepare_site(site)
+        sites[domain] = site
+    return cfc._compare_user(user["user_id"], user["reference_url"], user["competitor_urls"],
+                             user.get("ignore_colors", False), user.get("match_mode", "exact"),
+                             sites, 0.0, verbose=False)
+
+
+def _summary(row):
+    return [(p.get("sourceUrl"), p.get("sourceSite"), p.get("isReferenceProduct"),
+             p.get("prixReference"), p.get("siteReference"))
+            for p in row["products"]]
+
+
+def test_each_site_loaded_once_and_rows_bulk_inserted(backend):
+    inventories, fetches, posts = backend
+    summary = cfc.run_batch_comparisons("https://sb", "key", USERS, logger=lambda *a: None)
+
+    assert sorted(fetches) == ["conc-c.ca", "ref-a.ca", "ref-b.ca"]
+    assert summary["users"] == 3 and summary["sites"] == 3
+    assert summary["success"] == 3 and summary["failed"] == 0
+    # 3 lignes, paquets de 2 → 2 requêtes
+    assert [len(chunk) for chunk in posts] == [2, 1]
+
+
+def test_batch_rows_match_single_user_runs(backend):
+    inventories, _, posts = backend
+    cfc.run_batch_comparisons("https://sb", "key", USERS, logger=lambda *a: None)
+    rows = {row["user_id"]: row for chunk in posts for row in chunk}
+
+    for user in USERS[:3]:
+        expected = _single(inventories, user)
+        assert expected["metadata"]["total_matched_products"] > 0
+        assert _summary(rows[user["user_id"]]) == _summary(expected)
+
+
+def test_reference_flags_do_not_leak_between_users(backend):
+    _, _, posts = backend
+    cfc.run_batch_comparisons("https://sb", "key", USERS[:2], logger=lambda *a: None)
+    rows = {row["user_id"]: row for chunk in posts for row in chunk}
+
+    # ref-b.ca est la référence de u2 mais un concurrent de u1
+    u1_ref_b = [p for p in rows["u1"]["products"] if p["sourceUrl"].endswith("?ref-b.ca")]
+    assert u1_ref_b and not any(p.get("isReferenceProduct") for p in u1_ref_b)
+    u2_ref_b = [p for p in rows["u2"]["products"] if p["sourceUrl"].endswith("?ref-b.ca")]
+    assert all(p.get("isReferenceProduct") for p in u2_ref_b)
+
+
+def test_source_site_follows_each_users_url(backend):
+    _, _, posts = backend
+    users = [
+        {"user_id": "u1", "reference_url": "https://ref-b.ca", "competitor_urls": ["https://ref-a.ca"]},
+        {"user_id": "u2", "reference_url": "https://ref-b.ca",
+         "competitor_urls": ["https://www.ref-a.ca/"]},
+    ]
+    cfc.run_batch_comparisons("https://sb", "key", users, logger=lambda *a: None)
+    rows = {row["user_id"]: row for chunk in posts for row in chunk}
+
+    # Même inventaire ref-a.ca chargé une fois : chaque ligne garde l'URL de son utilisateur
+    for user in users:
+        ref_a = [p for p in rows[user["user_id"]]["products"]
+                 if p["sourceUrl"].endswith("?ref-a.ca") and not p.get("siteReference")]
+        assert ref_a and {p["sourceSite"] for p in ref_a} == set(user["competitor_urls"])
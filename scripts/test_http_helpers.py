@@ -0,0 +1,107 @@
+"""Session partagée de _http_helpers : keep-alive, gzip, métriques de retry.
+
+Usage : python3 -m pytest scripts/test_http_helpers.py
+"""
+import gzip
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import _http_helpers as http  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    accept_gzip = True
+    fail_first = 0
+    seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"{}"):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        type(self).seen.append(("GET", self.client_address[1], None))
+        if type(self).fail_first > 0:
+            type(self).fail_first -= 1
+            return self._reply(503)
+        self._reply(200)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        encoding = self.headers.get("Content-Encoding")
+        type(self).seen.append(("POST", self.client_address[1], encoding))
+        if encoding == "gzip":
+            if not type(self).accept_gzip:
+                return self._reply(400, b'{"code":"PGRST102","message":"Empty or invalid json"}')
+            raw = gzip.decompress(raw)
+        json.loads(raw)
+        self._reply(201)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    _Handler.seen = []
+    _Handler.accept_gzip = True
+    _Handler.fail_first = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(http, "_session", None)
+    monkeypatch.setattr(http, "_gzip_rejected_hosts", set())
+    http.reset_http_metrics()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_connection_reused_across_calls(server):
+    for _ in range(5):
+        assert http.get_with_retry(f"{server}/rest/v1/sites").status_code == 200
+    ports = {port for _, port, _ in _Handler.seen}
+    assert len(ports) == 1
+
+
+def test_large_bodies_gzipped_and_small_ones_not(server, monkeypatch):
+    monkeypatch.setattr(http, "GZIP_MIN_BYTES", 1024)
+    big = {"products": [{"name": "x" * 50}] * 100}
+    assert http.post_with_retry(f"{server}/rest/v1/scrapings", json=big, compress=True).status_code == 201
+    assert http.post_with_retry(f"{server}/rest/v1/scrapings", json={"a": 1}, compress=True).status_code == 201
+    assert http.post_with_retry(f"{server}/rest/v1/scrapings", json=big).status_code == 201
+    assert [enc for _, _, enc in _Handler.seen] == ["gzip", None, None]
+
+
+def test_gzip_refused_falls_back_to_plain_json(server, monkeypatch):
+    monkeypatch.setattr(http, "GZIP_MIN_BYTES", 16)
+    _Handler.accept_gzip = False
+    body = {"products": list(range(50))}
+    assert http.post_with_retry(f"{server}/rest/v1/scrapings", json=body, compress=True).status_code == 201
+    assert http.post_with_retry(f"{server}/rest/v1/scrapings", json=body, compress=True).status_code == 201
+    # Un seul essai gzip, puis l'hôte est servi en clair
+    assert [enc for _, _, enc in _Handler.seen] == ["gzip", None, None]
+
+
+def test_metrics_count_retries_per_endpoint(server):
+    _Handler.fail_first = 2
+    resp = http.get_with_retry(f"{server}/rest/v1/sites?select=*", base_backoff=0.01)
+    assert resp.status_code == 200
+    http.get_with_retry(f"{server}/rest/v1/other")
+
+    metrics = http.http_metrics()
+    assert metrics["GET /rest/v1/sites"]["calls"] == 1
+    assert metrics["GET /rest/v1/sites"]["retries"] == 2
+    assert metrics["GET /rest/v1/other"]["retries"] == 0
+    lines = []
+    http.log_http_metrics(lines.append)
+    assert any("GET /rest/v1/sites" in line for line in lines)
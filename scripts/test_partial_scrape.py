@@ -13,6 +13,12 @@ from pathlib import Path
 SCRIPT_DIR = Path(__file__).parent
 
 # ── Stubs des dépendances avant l'import du module ──
+# (restaurés après l'import de scraper_cron pour ne pas polluer les autres
+# tests collectés dans le même process pytest)
+_STUBBED = ("supabase", "_http_helpers", "scraper_ai", "scraper_ai.comparison",
+            "scraper_ai.dedicated_scrapers", "scraper_ai.dedicated_scrapers.registry",
+            "scraper_cron")
+_saved_modules = {name: sys.modules.get(name) for name in _STUBBED}
 supabase_stub = types.ModuleType("supabase")
 supabase_stub.create_client = lambda *a, **k: None
 sys.modules["supabase"] = supabase_stub
@@ -32,6 +38,7 @@ def _fake_post(url, json=None, **kwargs):
 
 
 http_stub.post_with_retry = _fake_post
+http_stub.log_http_metrics = lambda *a, **k: None
 sys.modules["_http_helpers"] = http_stub
 
 registry_mod = types.ModuleType("scraper_ai.dedicated_scrapers.registry")
@@ -40,14 +47,27 @@ registry_mod = types.ModuleType("scraper_ai.dedicated_scrapers.registry")
 class FakeScraper:
     """Renvoie `count` produits factices."""
 
+    base_price = 1000
+
     def __init__(self, count):
         self.count = count
 
-    def scrape(self, **kwargs):
-        return {
-            "products": [{"name": f"p{i}", "prix": 1000 + i} for i in range(self.count)],
-            "metadata": {},
-        }
+    def enable_incremental(self, max_age_hours=None):
+        pass
+
+    def incremental_report(self):
+        return None
+
+    def http_cache_report(self):
+        return {}
+
+    def rate_control_report(self):
+        return {}
+
+    def iter_products(self, **kwargs):
+        self.last_scrape_metadata = {}
+        for i in range(self.count):
+            yield {"name": f"p{i}", "prix": self.base_price + i}
 
 
 class DedicatedScraperRegistry:
@@ -59,13 +79,23 @@ class DedicatedScraperRegistry:
 
 
 registry_mod.DedicatedScraperRegistry = DedicatedScraperRegistry
+comparison_mod = types.ModuleType("scraper_ai.comparison")
+comparison_mod.build_match_key_index = lambda products: {"version": 1, "count": len(products)}
+comparison_mod.add_match_keys = lambda index, product: index.update(count=index["count"] + 1)
 sys.modules["scraper_ai"] = types.ModuleType("scraper_ai")
+sys.modules["scraper_ai.comparison"] = comparison_mod
 sys.modules["scraper_ai.dedicated_scrapers"] = types.ModuleType("scraper_ai.dedicated_scrapers")
 sys.modules["scraper_ai.dedicated_scrapers.registry"] = registry_mod
 
 sys.path.insert(0, str(SCRIPT_DIR))
 import scraper_cron  # noqa: E402
 
+for _name, _module in _saved_modules.items():
+    if _module is None:
+        sys.modules.pop(_name, None)
+    else:
+        sys.modules[_name] = _module
+
 FAILS = []
 
 
@@ -115,15 +145,125 @@ scraper_cron._save_site_data("http://sb", "key", site, {"success": False, "parti
 row = captured_rows[-1]
 check("G: résultat partiel → status='partial'", row["status"] == "partial")
 check("G2: partiel → products PAS écrasés", "products" not in row)
+check("G3: partiel → match_keys PAS écrasées", "match_keys" not in row)
 
 captured_rows.clear()
 scraper_cron._save_site_data("http://sb", "key", site, {"success": False, "error": "boom"})
 check("H: échec dur → status='error'", captured_rows[-1]["status"] == "error")
 
+# Sans table scraped_products : upsert complet du tableau
+scraper_cron._product_store = lambda url, key: None
 captured_rows.clear()
 scraper_cron._save_site_data("http://sb", "key", site, {"success": True, "products": [{"name": "p"}], "metadata": {}, "elapsed": 3})
 row = captured_rows[-1]
 check("I: succès → status='success' + products écrits", row["status"] == "success" and row["product_count"] == 1)
+check("I2: succès → clés de matching précalculées écrites", row.get("match_keys", {}).get("count") == 1)
+check("I3: succès → résumé product_digest écrit", len(row.get("product_digest", {}).get("units", {})) == 1)
+
+# Résumé identique au scrape précédent → scraped_at seul, products non renvoyé
+prev_digest = row["product_digest"]
+same_site = {**site, "_prev_digest": prev_digest}
+captured_rows.clear()
+scraper_cron._save_site_data("http://sb", "key", same_site, {"success": True, "products": [{"name": "p"}], "metadata": {}, "elapsed": 3})
+row = captured_rows[-1]
+check("M: inchangé → une seule écriture sans products", len(captured_rows) == 1 and "products" not in row)
+check("M2: inchangé → scraped_at/status mis à jour", row["status"] == "success" and row.get("scraped_at"))
+check("M3: inchangé → match_keys/digest non renvoyés", "match_keys" not in row and "product_digest" not in row)
+
+captured_rows.clear()
+scraper_cron._save_site_data("http://sb", "key", same_site, {"success": True, "products": [{"name": "p", "prix": 999}], "metadata": {}, "elapsed": 3})
+row = captured_rows[-1]
+check("N: prix modifié → upsert complet", row.get("products") == [{"name": "p", "prix": 999}])
+check("N2: prix modifié → nouveau résumé", row.get("product_digest") not in (None, prev_digest))
+
+
+class FakeStore:
+    """Stockage par lignes : enregistre les diffs, ou échoue (None)."""
+
+    def __init__(self, ok):
+        self.ok = ok
+        self.saved = []
+
+    def save(self, domain, products, scraped_at):
+        self.saved.append((domain, len(products)))
+        if not self.ok:
+            return None
+        return types.SimpleNamespace(summary=lambda: "1 écrit(s)")
+
+
+store = FakeStore(ok=True)
+scraper_cron._product_store = lambda url, key: store
+captured_rows.clear()
+scraper_cron._save_site_data("http://sb", "key", site, {"success": True, "products": [{"name": "p"}], "metadata": {}, "elapsed": 3})
+check("J: scraped_products → ligne du site SANS products", len(captured_rows) == 1 and "products" not in captured_rows[0])
+check("J2: scraped_products → produits envoyés en diff", store.saved == [("x.com", 1)])
+
+store = FakeStore(ok=False)
+captured_rows.clear()
+scraper_cron._save_site_data("http://sb", "key", site, {"success": True, "products": [{"name": "p"}], "metadata": {}, "elapsed": 3})
+check("K: diff en échec → repli sur l'upsert complet", len(captured_rows) == 2 and captured_rows[-1].get("products") == [{"name": "p"}])
+
+store = FakeStore(ok=True)
+captured_rows.clear()
+scraper_cron._save_site_data("http://sb", "key", site, {"success": False, "error": "boom"})
+check("L: échec → pas de diff produits", store.saved == [] and "products" not in captured_rows[-1])
+
+print("── Scénarios scrape en flux ──")
+from _product_store import SqliteProductStore  # noqa: E402
+
+flux = SqliteProductStore()
+DedicatedScraperRegistry.next_count = 300
+r = scraper_cron._scrape_single_site("slug", "https://x.com", "x.com", store=flux)
+check("O: flux → résultat sans liste products", r["success"] and "products" not in r and r["stream"].count == 300)
+check("O2: flux → lignes en attente pendant le scrape, scraped_products intact",
+      r["stream"].staged == 200 and flux.stored_hashes("x.com") == {} and flux.site_products("x.com") == [])
+check("O3: flux → pic RSS rapporté", r["metadata"].get("memory", {}).get("streamed") is True)
+
+captured_rows.clear()
+scraper_cron._save_site_data("http://sb", "key", site, r)
+row = captured_rows[-1]
+check("P: flux → ligne sans products, compte et résumé",
+      "products" not in row and row["product_count"] == 300 and len(row["product_digest"]["units"]) == 300)
+check("P2: flux → clés de matching construites au fil de l'eau", row["match_keys"]["count"] == 300)
+check("P3: flux → tableau dérivé reconstruit", len(flux.site_products("x.com")) == 300)
+
+hashes_before = flux.stored_hashes("x.com")
+DedicatedScraperRegistry.next_count = 250
+FakeScraper.base_price = 5000
+r = scraper_cron._scrape_single_site("slug", "https://x.com", "x.com", known_count=1000, store=flux)
+FakeScraper.base_price = 1000
+check("Q: flux partiel → rejeté, aucune unité supprimée",
+      r.get("partial") is True and len(flux.stored_hashes("x.com")) == 300)
+check("Q2: flux partiel → lignes modifiées restées en attente, scraped_products intact",
+      flux._conn.execute("SELECT COUNT(*) FROM scraped_products_staging").fetchone()[0] > 0
+      and flux.stored_hashes("x.com") == hashes_before
+      and len(flux.site_products("x.com")) == 300)
+
+print("── Scénarios file partagée ──")
+import tempfile  # noqa: E402
+import _site_scheduler  # noqa: E402
+from _site_scheduler import SiteQueue  # noqa: E402
+
+scraper_cron._product_store = lambda url, key: None
+DedicatedScraperRegistry.next_count = 5
+queue_sites = [
+    {"site_slug": f"s{i}", "site_url": f"https://s{i}.ca", "site_domain": f"s{i}.ca", "id": f"id{i}",
+     "site_name": f"S{i}", "_expected_seconds": 1, "_timeout": 60,
+     "_known_product_count": 200 if i == 0 else 0}
+    for i in range(4)
+]
+with tempfile.TemporaryDirectory() as tmp:
+    queue = SiteQueue.create(queue_sites, max_retries=1, path=Path(tmp) / "q.sqlite")
+    scraper_cron.QUEUE_POLL_SECONDS = 0.05
+    _site_scheduler.RETRY_DELAY_SECONDS = 0
+    captured_rows.clear()
+    scraper_cron._work_queue(queue, "http://sb", "key")
+    states = {s["site_domain"]: (s["_state"], s["_attempts"]) for s in queue.results()}
+check("R: file → chaque site traité, partiel retenté puis abandonné",
+      states == {"s0.ca": ("failed", 1), "s1.ca": ("done", 0), "s2.ca": ("done", 0), "s3.ca": ("done", 0)},
+      str(states))
+check("R2: file → résultats sauvegardés à chaque tentative",
+      sorted(r["status"] for r in captured_rows) == ["partial", "partial", "success", "success", "success"])
 
 print()
 if FAILS:
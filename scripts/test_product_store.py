@@ -0,0 +1,194 @@
+"""Stockage par lignes (scraped_products) : diff par unit_key, tableau dérivé.
+
+Usage : python3 -m pytest scripts/test_product_store.py
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from _product_store import (  # noqa: E402
+    ProductStream,
+    SqliteProductStore,
+    diff_rows,
+    digest_delta,
+    product_digest,
+    product_rows,
+)
+
+DATA = PROJECT_ROOT / "scraped_data.json"
+NOW = "2026-10-16T12:00:00+00:00"
+
+
+def _products():
+    if not DATA.exists():
+        pytest.skip("scraped_data.json absent")
+    return json.loads(DATA.read_text(encoding="utf-8"))["products"]
+
+
+def _by_url(products):
+    return sorted(json.dumps(p, sort_keys=True) for p in products)
+
+
+def test_first_save_writes_every_row_and_rebuilds_blob():
+    products = _products()
+    store = SqliteProductStore()
+    changes = store.save("site.ca", products, NOW)
+
+    assert len(changes.upserts) == len(products) and not changes.deletes
+    assert _by_url(store.site_products("site.ca")) == _by_url(products)
+
+
+def test_unchanged_scrape_sends_nothing():
+    products = _products()
+    store = SqliteProductStore()
+    store.save("site.ca", products, NOW)
+
+    changes = store.save("site.ca", json.loads(json.dumps(products)), NOW)
+    assert changes.empty and changes.unchanged == len(products)
+
+
+def test_diff_contains_only_changed_added_and_removed_units():
+    products = _products()[:300]
+    store = SqliteProductStore()
+    store.save("site.ca", products, NOW)
+
+    scrape = json.loads(json.dumps(products))
+    scrape[0]["prix"] = (scrape[0].get("prix") or 0) + 500
+    removed = scrape.pop(5)
+    added = dict(scrape[10], inventaire="NEW-UNIT-1", sourceUrl="https://site.ca/neuf-9999999/")
+    scrape.append(added)
+
+    changes = store.save("site.ca", scrape, NOW)
+    changed_keys = {row["unit_key"] for row in changes.upserts}
+    assert len(changes.upserts) == 2 and "NEW-UNIT-1" in changed_keys
+    assert len(changes.deletes) == 1
+    assert changes.deletes[0] not in product_rows(scrape)
+    assert _by_url(store.site_products("site.ca")) == _by_url(scrape)
+    assert removed["sourceUrl"] not in {p["sourceUrl"] for p in store.site_products("site.ca")}
+
+
+def test_duplicate_unit_keys_keep_every_product():
+    a = {"name": "Z900", "inventaire": "K-1", "prix": 10000, "sourceUrl": "https://site.ca/z900-a/"}
+    b = {"name": "Z900 bis", "inventaire": "K-1", "prix": 10500, "sourceUrl": "https://site.ca/z900-b/"}
+    rows = product_rows([a, b])
+    assert list(rows)[0] == "K-1" and list(rows)[1].startswith("K-1#")
+    assert diff_rows({"K-1": rows["K-1"]["content_hash"]}, rows).deletes == []
+    # Suffixe tiré de l'annonce, pas du rang : même clé quel que soit le voisinage
+    assert list(product_rows([a, {"inventaire": "K-0"}, b]))[2] == list(rows)[1]
+
+
+def test_swapped_duplicates_keep_their_rows_and_scrape_order():
+    a = {"name": "Z900", "inventaire": "K-1", "prix": 10000, "sourceUrl": "https://site.ca/z900-a/"}
+    b = {"name": "Z900 bis", "inventaire": "K-1", "prix": 10500, "sourceUrl": "https://site.ca/z900-b/"}
+    c = {"name": "Ninja", "inventaire": "K-2", "prix": 12000}
+    store = SqliteProductStore()
+    store.save("site.ca", [c, a, b], NOW)
+    keys = store.stored_hashes("site.ca")
+
+    changes = store.save("site.ca", [b, a, c], NOW)
+    assert not changes.upserts and not changes.deletes and changes.order is not None
+    assert set(store.stored_hashes("site.ca")) == set(keys)
+    assert [p["name"] for p in store.site_products("site.ca")] == ["Z900 bis", "Z900", "Ninja"]
+    assert store.save("site.ca", [b, a, c], NOW).empty
+
+    before = product_digest([c, a, b])
+    assert digest_delta(before, product_digest([b, a, c], before)) == {"added": 0, "changed": 0, "removed": 0}
+
+
+def test_blob_keeps_scrape_order():
+    products = _products()[:200]
+    store = SqliteProductStore()
+    store.save("site.ca", products, NOW)
+    assert store.site_products("site.ca") == products
+    scrape = list(reversed(products))
+    stream = ProductStream(store, "site.ca", NOW, chunk_size=50)
+    for product in scrape:
+        stream.add(product)
+    assert stream.finish(NOW) and stream.upserted == 0
+    assert store.site_products("site.ca") == scrape
+
+
+def test_filter_columns_written_with_rows():
+    store = SqliteProductStore()
+    store.save("site.ca", [
+        {"name": "a", "inventaire": "1", "marque": "KAWASAKI ", "annee": "2025", "etat": "Neuf",
+         "sourceCategorie": "inventaire"},
+        {"name": "b", "inventaire": "2", "marque": "", "annee": "n/d"},
+    ], NOW)
+    rows = store._conn.execute(
+        "SELECT unit_key, marque_norm, annee, etat, source_categorie FROM scraped_products"
+        " ORDER BY unit_key").fetchall()
+    assert rows == [("1", "kawasaki", 2025, "neuf", "inventaire"), ("2", None, None, None, None)]
+
+
+def test_digest_ignores_non_material_fields():
+    products = [{"name": "Z900", "inventaire": "K-1", "prix": 10000, "image": "a.jpg"}]
+    before = product_digest(products)
+    after = product_digest([dict(products[0], image="b.jpg", description="nouveau texte")])
+    assert digest_delta(before, after) == {"added": 0, "changed": 0, "removed": 0}
+
+
+def test_digest_delta_counts_price_and_inventory_changes():
+    products = [
+        {"name": "Z900", "inventaire": "K-1", "prix": 10000},
+        {"name": "Ninja", "inventaire": "K-2", "prix": 12000},
+    ]
+    before = product_digest(products)
+    after = product_digest([dict(products[0], prix=9500), {"name": "KLX", "inventaire": "K-3"}])
+    assert digest_delta(before, after) == {"added": 1, "changed": 1, "removed": 1}
+    assert digest_delta(None, after) is None
+    assert digest_delta({"version": -1, "units": {}}, after) is None
+
+
+def test_stream_writes_same_rows_as_batch_save():
+    products = _products()[:500]
+    batch = SqliteProductStore()
+    batch.save("site.ca", products, NOW)
+    scrape = json.loads(json.dumps(products))
+    scrape[0]["prix"] = (scrape[0].get("prix") or 0) + 500
+    removed = scrape.pop(5)
+    expected = batch.save("site.ca", scrape, NOW)
+
+    streamed = SqliteProductStore()
+    streamed.save("site.ca", products, NOW)
+    stream = ProductStream(streamed, "site.ca", NOW, chunk_size=50)
+    for product in scrape:
+        stream.add(product)
+    assert stream.finish(NOW)
+
+    assert stream.upserted == len(expected.upserts) and stream.deleted == len(expected.deletes) == 1
+    assert stream.digest() == product_digest(scrape)
+    assert streamed.stored_hashes("site.ca") == batch.stored_hashes("site.ca")
+    assert removed["sourceUrl"] not in {p["sourceUrl"] for p in streamed.site_products("site.ca")}
+
+
+def test_abandoned_stream_leaves_rows_intact():
+    products = _products()[:300]
+    store = SqliteProductStore()
+    store.save("site.ca", products, NOW)
+    hashes = store.stored_hashes("site.ca")
+    scrape = [dict(p, prix=(p.get("prix") or 0) + 1) for p in products[:120]]
+
+    stream = ProductStream(store, "site.ca", NOW, chunk_size=50)
+    for product in scrape:
+        stream.add(product)
+    # Paquets en attente seulement : ni ligne modifiée, ni suppression, ni tableau
+    assert stream.staged == 100 and stream.upserted == 0
+    assert store.stored_hashes("site.ca") == hashes
+    assert _by_url(store.site_products("site.ca")) == _by_url(products)
+
+    # Scrape suivant validé : seules ses lignes sont promues, l'attente est vidée
+    rescrape = json.loads(json.dumps(products))
+    rescrape[0]["prix"] = (rescrape[0].get("prix") or 0) + 7
+    stream = ProductStream(store, "site.ca", "2026-10-16T13:00:00+00:00", chunk_size=50)
+    for product in rescrape:
+        stream.add(product)
+    assert stream.finish() and stream.upserted == 1
+    assert store.site_products("site.ca") == rescrape
+    assert store._conn.execute("SELECT count(*) FROM scraped_products_staging").fetchone() == (0,)
@@ -0,0 +1,127 @@
+"""Ordonnancement du cron : historique des durées, plan LPT, file partagée.
+
+Usage : python3 -m pytest scripts/test_site_scheduler.py
+"""
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import _site_scheduler  # noqa: E402
+from _site_scheduler import SiteHistory, SiteQueue, makespan_estimate, plan_sites  # noqa: E402
+
+
+def _sites(durations):
+    return [{"site_domain": f"s{i}.ca", "site_name": f"S{i}", "_expected_seconds": d}
+            for i, d in enumerate(durations)]
+
+
+def test_history_drives_expected_duration_and_timeout(tmp_path):
+    history = SiteHistory(tmp_path / "history.json")
+    assert history.timeout("a.ca", fallback=600) == 600
+
+    history.record("a.ca", 400, 120, success=True)
+    history.record("a.ca", 600, 130, success=True)
+    history.save()
+
+    reloaded = SiteHistory(tmp_path / "history.json")
+    assert reloaded.expected_seconds("a.ca", 60) == 480
+    assert reloaded.timeout("a.ca", 600) == 1200
+    assert reloaded.sites["a.ca"]["products"] == 130
+
+    reloaded.record("a.ca", 1200, 0, success=False, timed_out=True)
+    assert reloaded.expected_seconds("a.ca", 60) == 1200
+    assert reloaded.timeout("a.ca", 600) == _site_scheduler.MAX_TIMEOUT
+
+
+def test_plan_is_longest_first_with_fallbacks(tmp_path):
+    history = SiteHistory(tmp_path / "history.json")
+    history.record("known.ca", 50, 10, success=True)
+    sites = [{"site_domain": d} for d in ("known.ca", "large.ca", "small.ca")]
+    planned = plan_sites(sites, history,
+                         lambda s: 900 if s["site_domain"] == "large.ca" else 120,
+                         lambda s: 1200)
+    assert [s["site_domain"] for s in planned] == ["large.ca", "small.ca", "known.ca"]
+    assert planned[-1]["_timeout"] == _site_scheduler.MIN_TIMEOUT
+
+
+def test_failed_site_requeued_then_given_up(tmp_path, monkeypatch):
+    monkeypatch.setattr(_site_scheduler, "RETRY_DELAY_SECONDS", 0)
+    queue = SiteQueue.create(_sites([3, 2, 1]), max_retries=1, path=tmp_path / "q.sqlite")
+
+    first = queue.claim("w")
+    assert first["site_domain"] == "s0.ca" and first["_attempt"] == 0
+    assert queue.finish(first, {"success": False, "error": "boom"}) is True
+    assert queue.claim("w")["site_domain"] == "s0.ca"
+    assert queue.finish(first, {"success": False, "error": "boom"}) is False
+
+    timed_out = queue.claim("w")
+    assert queue.finish(timed_out, {"success": False, "timed_out": True}) is False
+    last = queue.claim("w")
+    queue.finish(last, {"success": True, "elapsed": 1.0, "product_count": 4})
+    assert queue.claim("w") is None and not queue.active()
+
+    states = {s["site_domain"]: (s["_state"], s["_attempts"]) for s in queue.results()}
+    assert states == {"s0.ca": ("failed", 1), "s1.ca": ("failed", 0), "s2.ca": ("done", 0)}
+
+
+def test_idle_threads_steal_remaining_sites(tmp_path):
+    # Un gros site + des petits : en tranches fixes, le thread du gros site
+    # aurait aussi reçu sa part de petits sites
+    durations = [0.6] + [0.1] * 12
+    sites = _sites(durations)
+    queue = SiteQueue.create(sites, max_retries=0, path=tmp_path / "q.sqlite")
+    done = []
+    lock = threading.Lock()
+
+    def worker(n):
+        while True:
+            site = queue.claim(f"w{n}")
+            if site is None:
+                if not queue.active():
+                    return
+                time.sleep(0.01)
+                continue
+            time.sleep(site["_expected_seconds"])
+            with lock:
+                done.append(site["site_domain"])
+            queue.finish(site, {"success": True})
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    assert sorted(done) == sorted(s["site_domain"] for s in sites)
+    assert makespan_estimate(sites, 3) == 0.6
+    assert elapsed < 0.6 + 0.35          # tranches fixes de 5 : ≥ 1.0 s
+
+
+def test_queue_shared_across_processes(tmp_path):
+    queue = SiteQueue.create(_sites([0.02] * 30), max_retries=0, path=tmp_path / "q.sqlite")
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {str(SCRIPT_DIR)!r})\n"
+        "from _site_scheduler import SiteQueue\n"
+        f"q = SiteQueue({str(queue.path)!r})\n"
+        "while True:\n"
+        "    site = q.claim('p')\n"
+        "    if site is None:\n"
+        "        break\n"
+        "    time.sleep(site['_expected_seconds'])\n"
+        "    q.finish(site, {'success': True})\n"
+        "    print(site['site_domain'])\n"
+    )
+    procs = [subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True)
+             for _ in range(3)]
+    claimed = [line for p in procs for line in p.communicate(timeout=60)[0].split()]
+
+    assert sorted(claimed) == sorted(f"s{i}.ca" for i in range(30))
+    assert all(s["_state"] == "done" for s in queue.results())
@@ -14,6 +14,10 @@ Usage:
     python scripts/usine_bench.py
     python scripts/usine_bench.py --sites scripts/usine_bench_sites.yaml --parallel 2
     python scripts/usine_bench.py --threshold 90 --skip-claude
+    python scripts/usine_bench.py --cassette record   # puis --cassette replay :
+                                                      # validations rejouées hors ligne
+    python scripts/usine_bench.py --in-process --parallel 3   # un seul process
+                                                      # (main --batch --parallel)
 
 Dépendances:
     - Python 3.11+
@@ -30,6 +34,7 @@ import os
 import re
 import subprocess
 import sys
+import tempfile
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -49,6 +54,10 @@ PROJECT_ROOT = SCRIPT_DIR.parent
 REPORTS_DIR = PROJECT_ROOT / "scraper_cache" / "reports"
 BENCH_DIR = PROJECT_ROOT / "scraper_cache" / "bench"
 
+# "Phase N terminée en X s" des logs du pipeline → clés de batch.PHASES
+_PHASE_LOG_RE = re.compile(r"Phase ([1-4]) terminée en ([\d.]+)s")
+_PHASE_NAMES = {"1": "analyse", "2": "strategie", "3": "generation", "4": "validation"}
+
 
 @dataclass
 class SiteResult:
@@ -72,6 +81,8 @@ class SiteResult:
     cost_breakdown: Dict[str, float] = field(default_factory=dict)
     cache_read_tokens: int = 0
     cache_creation_tokens: int = 0
+    # Secondes par phase du pipeline (analyse, strategie, generation, ...)
+    phases: Dict[str, float] = field(default_factory=dict)
 
 
 def _slug_from_url(url: str) -> str:
@@ -93,8 +104,18 @@ def _parse_log_for_signals(log_text: str) -> Dict[str, Any]:
     }
 
 
+def _parse_phase_times(log_text: str) -> Dict[str, float]:
+    """Temps par phase lus dans les logs d'un run en sous-processus."""
+    phases: Dict[str, float] = {}
+    for num, seconds in _PHASE_LOG_RE.findall(log_text):
+        name = _PHASE_NAMES[num]
+        phases[name] = round(phases.get(name, 0.0) + float(seconds), 1)
+    return phases
+
+
 def _run_one(site: Dict[str, Any], threshold: int, timeout_sec: int,
-             skip_claude: bool, verbose: bool) -> SiteResult:
+             skip_claude: bool, verbose: bool,
+             cassette: Optional[str] = None) -> SiteResult:
     url = site["url"]
     note = site.get("note", "")
     family = site.get("_family", "?")
@@ -112,6 +133,8 @@ def _run_one(site: Dict[str, Any], threshold: int, timeout_sec: int,
 
     env = os.environ.copy()
     env.setdefault("PYTHONUNBUFFERED", "1")
+    if cassette:
+        env["USINE_CASSETTE"] = cassette
 
     start = time.time()
     try:
@@ -141,6 +164,14 @@ def _run_one(site: Dict[str, Any], threshold: int, timeout_sec: int,
     stdout = proc.stdout or ""
     stderr = proc.stderr or ""
     full_log = stdout + ("\n[stderr]\n" + stderr if stderr.strip() else "")
+    result.phases = _parse_phase_times(full_log)
+    return _collect_result(result, full_log, proc.returncode, threshold)
+
+
+def _collect_result(result: SiteResult, full_log: str, returncode: int,
+                    threshold: int) -> SiteResult:
+    """Complète `result` depuis le log du site et son rapport de validation."""
+    url = result.url
     result.log_excerpt = full_log[-4000:]
 
     signals = _parse_log_for_signals(full_log)
@@ -153,10 +184,10 @@ def _run_one(site: Dict[str, Any], threshold: int, timeout_sec: int,
     # Le report JSON est écrit par ScraperValidator dans REPORTS_DIR/{slug}_report.json
     report_path = REPORTS_DIR / f"{slug}_report.json"
     if not report_path.exists():
-        result.verdict = "error" if proc.returncode != 0 else "fail"
+        result.verdict = "error" if returncode != 0 else "fail"
         result.error = (
             f"Rapport introuvable: {report_path.name}"
-            + (f" (exit={proc.returncode})" if proc.returncode != 0 else "")
+            + (f" (exit={returncode})" if returncode != 0 else "")
         )
         return result
 
@@ -204,10 +235,74 @@ def _run_one(site: Dict[str, Any], threshold: int, timeout_sec: int,
     return result
 
 
-def _aggregate(results: List[SiteResult], threshold: int) -> Dict[str, Any]:
+def _run_in_process(sites: List[Dict[str, Any]], threshold: int, timeout_sec: int,
+                    skip_claude: bool, parallel: int,
+                    cassette: Optional[str] = None) -> List[SiteResult]:
+    """Tous les sites dans UN process usine (`main --batch --parallel N`)."""
+    results = {s["url"]: SiteResult(url=s["url"], note=s.get("note", ""),
+                                    family=s.get("_family", "?")) for s in sites}
+    with tempfile.TemporaryDirectory(prefix="usine_bench_") as tmp:
+        urls_path = Path(tmp) / "urls.txt"
+        urls_path.write_text("\n".join(results) + "\n", encoding="utf-8")
+        json_path = Path(tmp) / "batch.json"
+        args = [
+            sys.executable, "-u", "-m", "scraper_ai.scraper_usine.main",
+            "--batch", str(urls_path),
+            "--parallel", str(parallel),
+            "--batch-json", str(json_path),
+            "--no-publish",
+            "--publish-threshold", str(threshold),
+            "--quiet",
+        ]
+        if skip_claude:
+            args.append("--no-claude")
+        env = os.environ.copy()
+        env.setdefault("PYTHONUNBUFFERED", "1")
+        if cassette:
+            env["USINE_CASSETTE"] = cassette
+
+        # Même budget total que `parallel` sous-processus côte à côte
+        budget = timeout_sec * -(-len(sites) // parallel)
+        try:
+            proc = subprocess.run(args, cwd=str(PROJECT_ROOT), env=env,
+                                  capture_output=True, text=True, timeout=budget)
+            returncode, batch_log = proc.returncode, (proc.stdout or "") + (proc.stderr or "")
+        except subprocess.TimeoutExpired as e:
+            returncode, batch_log = -1, f"Timeout du batch après {budget}s\n{e.stdout or ''}"
+        try:
+            batch = json.loads(json_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            batch = {"results": []}
+
+    done = {entry["url"]: entry for entry in batch.get("results", [])}
+    for url, result in results.items():
+        entry = done.get(url)
+        if entry is None:
+            result.verdict = "timeout" if returncode == -1 else "error"
+            result.error = "Site absent du résumé du batch"
+            result.log_excerpt = batch_log[-4000:]
+            continue
+        result.duration_sec = float(entry.get("seconds") or 0.0)
+        result.phases = entry.get("phases") or {}
+        try:
+            site_log = Path(entry["log_path"]).read_text(encoding="utf-8")
+        except (KeyError, TypeError, OSError):
+            site_log = ""
+        if entry.get("error"):
+            site_log += f"\n[batch] {entry['error']}"
+        _collect_result(result, site_log, 0 if entry.get("score") is not None else 1, threshold)
+    return list(results.values())
+
+
+def _aggregate(results: List[SiteResult], threshold: int,
+               wall_sec: float = 0.0) -> Dict[str, Any]:
     scored = [r for r in results if r.score is not None]
     avg = sum(r.score for r in scored) / len(scored) if scored else 0.0
     total_cost = sum(r.cost_usd for r in results)
+    phases: Dict[str, float] = {}
+    for r in results:
+        for name, seconds in r.phases.items():
+            phases[name] = round(phases.get(name, 0.0) + seconds, 1)
     return {
         "total": len(results),
         "scored": len(scored),
@@ -221,6 +316,9 @@ def _aggregate(results: List[SiteResult], threshold: int) -> Dict[str, Any]:
         "claude_supervisor_uses": sum(1 for r in results if r.claude_supervisor_used),
         "claude_agent_uses": sum(1 for r in results if r.claude_agent_used),
         "total_duration_sec": round(sum(r.duration_sec for r in results), 1),
+        "wall_sec": round(wall_sec, 1),
+        "sites_per_hour": round(len(results) * 3600 / wall_sec, 1) if wall_sec else 0.0,
+        "phase_totals_sec": phases,
         "total_cost_usd": round(total_cost, 6),
         "average_cost_usd_per_site": round(total_cost / max(1, len(results)), 6),
     }
@@ -250,6 +348,11 @@ def _render_markdown(results: List[SiteResult], summary: Dict[str, Any],
         f"- Claude agent fallback : utilisé sur {summary['claude_agent_uses']}/{summary['total']} sites"
     )
     lines.append(f"- Durée totale : {summary['total_duration_sec']}s")
+    if summary.get("wall_sec"):
+        lines.append(
+            f"- Débit : **{summary['sites_per_hour']} sites/heure** "
+            f"({summary['wall_sec']}s de bout en bout, mode {summary.get('mode', '?')})"
+        )
     lines.append("")
 
     if summary["gate_pass"]:
@@ -286,6 +389,25 @@ def _render_markdown(results: List[SiteResult], summary: Dict[str, Any],
         )
     lines.append("")
 
+    phase_totals = summary.get("phase_totals_sec") or {}
+    if phase_totals:
+        names = list(phase_totals)
+        busy = sum(r.duration_sec for r in results) or 1.0
+        lines.append("## Temps par phase")
+        lines.append("")
+        lines.append("| Site | " + " | ".join(names) + " | Total |")
+        lines.append("|------|" + "|".join("-" * (len(n) + 2) for n in names) + "|-------|")
+        for r in results:
+            cells = " | ".join(
+                f"{r.phases[n]:.0f}s" if n in r.phases else "—" for n in names
+            )
+            lines.append(f"| {r.slug or r.url} | {cells} | {r.duration_sec:.0f}s |")
+        cells = " | ".join(
+            f"{phase_totals[n]:.0f}s ({phase_totals[n] / busy:.0%})" for n in names
+        )
+        lines.append(f"| **Cumul** | {cells} | {busy:.0f}s |")
+        lines.append("")
+
     fails = [r for r in results if r.verdict in ("fail", "error", "timeout")]
     if fails:
         lines.append("## Diagnostics (sites en échec)")
@@ -341,6 +463,34 @@ def _check_registry_collisions(sites: List[Dict[str, Any]]) -> List[str]:
     return warnings
 
 
+def _run_subprocesses(sites: List[Dict[str, Any]], threshold: int, timeout_sec: int,
+                      skip_claude: bool, parallel: int, verbose: bool,
+                      cassette: Optional[str] = None) -> List[SiteResult]:
+    """Un process usine par site, `parallel` à la fois."""
+    results: List[SiteResult] = []
+    with cf.ThreadPoolExecutor(max_workers=parallel) as pool:
+        future_to_site = {
+            pool.submit(_run_one, site, threshold, timeout_sec,
+                        skip_claude, verbose, cassette): site
+            for site in sites
+        }
+        for fut in cf.as_completed(future_to_site):
+            site = future_to_site[fut]
+            try:
+                res = fut.result()
+            except Exception as e:  # pragma: no cover
+                res = SiteResult(
+                    url=site["url"], note=site.get("note", ""),
+                    family=site.get("_family", "?"),
+                    verdict="error", error=f"{type(e).__name__}: {e}",
+                )
+            results.append(res)
+            verdict_str = res.verdict.upper().ljust(7)
+            score_str = f"{res.score:.0f}" if res.score is not None else " ? "
+            print(f"  [{verdict_str}] score={score_str} {res.url}")
+    return results
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(
         description="Banc de test scraper_usine (gate de décision avant Phase 1).",
@@ -369,6 +519,16 @@ def main(argv: Optional[List[str]] = None) -> int:
         "--quiet", action="store_true",
         help="Ne pas afficher la progression run-par-run.",
     )
+    parser.add_argument(
+        "--cassette", choices=["auto", "record", "replay", "live"], default=None,
+        help="Mode des cassettes HTTP de la validation (USINE_CASSETTE) : "
+             "record puis replay pour un bench reproductible.",
+    )
+    parser.add_argument(
+        "--in-process", action="store_true",
+        help="Un seul process usine pour tous les sites (`main --batch --parallel N`, "
+             "ressources partagées) au lieu d'un process par site.",
+    )
     parser.add_argument(
         "--out-dir", default=str(BENCH_DIR),
         help="Répertoire des rapports markdown (défaut: scraper_cache/bench/).",
@@ -395,37 +555,30 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     print(
         f"[bench] {len(sites)} site(s), parallel={parallel}, "
-        f"threshold={threshold}, timeout={timeout_sec}s, skip_claude={skip_claude}"
+        f"threshold={threshold}, timeout={timeout_sec}s, skip_claude={skip_claude}, "
+        f"cassette={args.cassette or os.environ.get('USINE_CASSETTE', 'auto')}, "
+        f"mode={'in-process' if args.in_process else 'subprocess'}"
     )
     BENCH_DIR.mkdir(parents=True, exist_ok=True)
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    results: List[SiteResult] = []
-    with cf.ThreadPoolExecutor(max_workers=parallel) as pool:
-        future_to_site = {
-            pool.submit(_run_one, site, threshold, timeout_sec,
-                        skip_claude, not args.quiet): site
-            for site in sites
-        }
-        for fut in cf.as_completed(future_to_site):
-            site = future_to_site[fut]
-            try:
-                res = fut.result()
-            except Exception as e:  # pragma: no cover
-                res = SiteResult(
-                    url=site["url"], note=site.get("note", ""),
-                    family=site.get("_family", "?"),
-                    verdict="error", error=f"{type(e).__name__}: {e}",
-                )
-            results.append(res)
-            verdict_str = res.verdict.upper().ljust(7)
+    wall_start = time.time()
+    if args.in_process:
+        results = _run_in_process(sites, threshold, timeout_sec, skip_claude,
+                                  parallel, args.cassette)
+        for res in results:
             score_str = f"{res.score:.0f}" if res.score is not None else " ? "
-            print(f"  [{verdict_str}] score={score_str} {res.url}")
+            print(f"  [{res.verdict.upper().ljust(7)}] score={score_str} {res.url}")
+    else:
+        results = _run_subprocesses(sites, threshold, timeout_sec, skip_claude,
+                                    parallel, not args.quiet, args.cassette)
+    wall_sec = time.time() - wall_start
 
     # Tri pour rapport lisible: famille puis URL
     results.sort(key=lambda r: (r.family, r.url))
 
-    summary = _aggregate(results, threshold)
+    summary = _aggregate(results, threshold, wall_sec)
+    summary["mode"] = "in-process" if args.in_process else "subprocess"
     md = _render_markdown(results, summary, threshold)
 
     ts = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
@@ -447,6 +600,7 @@ def main(argv: Optional[List[str]] = None) -> int:
                         "score": r.score, "grade": r.grade,
                         "products": r.products,
                         "duration_sec": r.duration_sec,
+                        "phases": r.phases,
                         "claude_supervisor_used": r.claude_supervisor_used,
                         "claude_agent_used": r.claude_agent_used,
                         "verdict": r.verdict, "error": r.error,